@@ -36,12 +36,52 @@ class InMemoryRepository(Repository):
     
     This implementation stores objects in a dictionary that exists only for the 
     lifetime of the application. No data persistence between application restarts.
+
+    Attributes listed in unique_indexes (one object per value) or indexes
+    (several objects per value) get a hash index kept up to date by add,
+    update and delete, so get_by_attribute on them is O(1). Other
+    attributes are still found with a full scan.
     """
-    def __init__(self):
+    def __init__(self, unique_indexes=(), indexes=()):
         self._storage = {}
+        self._unique_indexes = {attr: {} for attr in unique_indexes}
+        self._indexes = {attr: {} for attr in indexes}
+        self._indexed_values = {}
+
+    def _check_unique(self, obj, values):
+        for attr, value in values.items():
+            other = self._unique_indexes.get(attr, {}).get(value)
+            if value is not None and other is not None and other.id != obj.id:
+                raise ValueError(f"An item with {attr}={value} already exists")
+
+    def _index(self, obj):
+        values = {attr: getattr(obj, attr, None) for attr in (*self._unique_indexes, *self._indexes)}
+        self._check_unique(obj, values)
+        for attr, index in self._unique_indexes.items():
+            if values[attr] is not None:
+                index[values[attr]] = obj
+        for attr, index in self._indexes.items():
+            index.setdefault(values[attr], {})[obj.id] = obj
+        self._indexed_values[obj.id] = values
+
+    def _unindex(self, obj_id):
+        values = self._indexed_values.pop(obj_id, None)
+        if values is None:
+            return
+        for attr, index in self._unique_indexes.items():
+            if getattr(index.get(values[attr]), 'id', None) == obj_id:
+                del index[values[attr]]
+        for attr, index in self._indexes.items():
+            bucket = index.get(values[attr], {})
+            bucket.pop(obj_id, None)
+            if not bucket:
+                index.pop(values[attr], None)
 
     def add(self, obj):
+        self._check_unique(obj, {attr: getattr(obj, attr, None) for attr in self._unique_indexes})
+        self._unindex(obj.id)
         self._storage[obj.id] = obj
+        self._index(obj)
 
     def get(self, obj_id):
         return self._storage.get(obj_id)
@@ -52,11 +92,19 @@ class InMemoryRepository(Repository):
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
+            self._check_unique(obj, data)
+            self._unindex(obj_id)
             obj.update(data)
+            self._index(obj)
 
     def delete(self, obj_id):
         if obj_id in self._storage:
+            self._unindex(obj_id)
             del self._storage[obj_id]
 
     def get_by_attribute(self, attr_name, attr_value):
+        if attr_name in self._unique_indexes:
+            return self._unique_indexes[attr_name].get(attr_value)
+        if attr_name in self._indexes:
+            return next(iter(self._indexes[attr_name].get(attr_value, {}).values()), None)
         return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
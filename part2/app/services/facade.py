@@ -669,6 +669,93 @@ class Facade:
         del self.reviews_db[review_id]
         return True
 
+    def iter_places(self):
+        """Iterate over all places, one detailed copy at a time
+        
+        Unlike get_places(), the copies are not accumulated in a list, so
+        exports and background jobs keep a flat memory footprint.
+        
+        Yields:
+            dict: A place with detailed amenities
+        """
+        # Initialize places_db if needed
+        if not hasattr(self, 'places_db'):
+            self.places_db = {}
+        
+        # Make sure amenities_db exists
+        if not hasattr(self, 'amenities_db'):
+            self.amenities_db = {}
+        
+        # Snapshot of the IDs only: places may be added or removed while iterating
+        for place_id in list(self.places_db):
+            place = self.places_db.get(place_id)
+            if place is None:
+                continue
+            yield self._place_details(place)
+
+    def _place_details(self, place):
+        """Build the detailed copy of a place returned by iter_places()"""
+        # Defensive copy
+        place_copy = place.copy() if isinstance(place, dict) else {}
+        
+        # Ensure all required fields are present
+        for field in ['id', 'title', 'description', 'price', 'latitude', 'longitude', 
+                    'owner_id', 'created_at', 'updated_at']:
+            if field not in place_copy:
+                if field in ['price', 'latitude', 'longitude']:
+                    place_copy[field] = 0.0
+                elif field in ['created_at', 'updated_at']:
+                    place_copy[field] = datetime.now().isoformat()
+                else:
+                    place_copy[field] = ''
+        
+        # Ajouter les informations du propriétaire
+        owner_id = place_copy.get('owner_id')
+        if owner_id and owner_id in self.users_db:
+            owner = self.users_db[owner_id]
+            place_copy['owner'] = {
+                'id': owner_id,
+                'first_name': owner.get('first_name', ''),
+                'last_name': owner.get('last_name', ''),
+                'email': owner.get('email', '')
+            }
+        else:
+            place_copy['owner'] = {
+                'id': owner_id or '',
+                'first_name': '(unknown)',
+                'last_name': '(unknown)',
+                'email': '(unknown)'
+            }
+        
+        # Gérer les amenities
+        # Si place_copy['amenities'] est déjà une liste d'objets avec id et name,
+        # nous pouvons la conserver telle quelle
+        if isinstance(place_copy.get('amenities'), list):
+            amenities_in_place = place_copy.get('amenities', [])
+            
+            # Si les éléments de la liste sont des dictionnaires avec 'id' et 'name', on les conserve
+            if all(isinstance(a, dict) and 'id' in a and 'name' in a for a in amenities_in_place):
+                # Déjà au bon format, ne rien faire
+                pass
+            # Si ce sont des ID (chaînes), les convertir en objets
+            elif all(isinstance(a, str) for a in amenities_in_place):
+                amenities_objects = []
+                for amenity_id in amenities_in_place:
+                    if amenity_id in self.amenities_db:
+                        amenity = self.amenities_db[amenity_id]
+                        amenities_objects.append({
+                            'id': amenity_id,
+                            'name': amenity.get('name', 'Unknown amenity')
+                        })
+                place_copy['amenities'] = amenities_objects
+            # Sinon, initialiser à une liste vide
+            else:
+                place_copy['amenities'] = []
+        else:
+            place_copy['amenities'] = []
+        
+        return place_copy
+
     def get_places(self):
         """Get all places
         
@@ -676,79 +763,8 @@ class Facade:
             list: List of all places with detailed amenities
         """
         try:
-            # Initialize places_db if needed
-            if not hasattr(self, 'places_db'):
-                self.places_db = {}
-            
-            # Make sure amenities_db exists
-            if not hasattr(self, 'amenities_db'):
-                self.amenities_db = {}
-            
             # Returns a list of values with consistent structure
-            places = []
-            for place_id, place in self.places_db.items():
-                # Defensive copy
-                place_copy = place.copy() if isinstance(place, dict) else {}
-                
-                # Ensure all required fields are present
-                for field in ['id', 'title', 'description', 'price', 'latitude', 'longitude', 
-                            'owner_id', 'created_at', 'updated_at']:
-                    if field not in place_copy:
-                        if field in ['price', 'latitude', 'longitude']:
-                            place_copy[field] = 0.0
-                        elif field in ['created_at', 'updated_at']:
-                            place_copy[field] = datetime.now().isoformat()
-                        else:
-                            place_copy[field] = ''
-                
-                # Ajouter les informations du propriétaire
-                owner_id = place_copy.get('owner_id')
-                if owner_id and owner_id in self.users_db:
-                    owner = self.users_db[owner_id]
-                    place_copy['owner'] = {
-                        'id': owner_id,
-                        'first_name': owner.get('first_name', ''),
-                        'last_name': owner.get('last_name', ''),
-                        'email': owner.get('email', '')
-                    }
-                else:
-                    place_copy['owner'] = {
-                        'id': owner_id or '',
-                        'first_name': '(unknown)',
-                        'last_name': '(unknown)',
-                        'email': '(unknown)'
-                    }
-                
-                # Gérer les amenities
-                # Si place_copy['amenities'] est déjà une liste d'objets avec id et name,
-                # nous pouvons la conserver telle quelle
-                if isinstance(place_copy.get('amenities'), list):
-                    amenities_in_place = place_copy.get('amenities', [])
-                    
-                    # Si les éléments de la liste sont des dictionnaires avec 'id' et 'name', on les conserve
-                    if all(isinstance(a, dict) and 'id' in a and 'name' in a for a in amenities_in_place):
-                        # Déjà au bon format, ne rien faire
-                        pass
-                    # Si ce sont des ID (chaînes), les convertir en objets
-                    elif all(isinstance(a, str) for a in amenities_in_place):
-                        amenities_objects = []
-                        for amenity_id in amenities_in_place:
-                            if amenity_id in self.amenities_db:
-                                amenity = self.amenities_db[amenity_id]
-                                amenities_objects.append({
-                                    'id': amenity_id,
-                                    'name': amenity.get('name', 'Unknown amenity')
-                                })
-                        place_copy['amenities'] = amenities_objects
-                    # Sinon, initialiser à une liste vide
-                    else:
-                        place_copy['amenities'] = []
-                else:
-                    place_copy['amenities'] = []
-                
-                places.append(place_copy)
-            
-            return places
+            return list(self.iter_places())
             
         except Exception as e:
             print(f"Error in get_places(): {str(e)}")
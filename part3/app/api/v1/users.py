@@ -108,8 +108,7 @@ class UserList(Resource):
             data = api.payload
             
             # Vérifier si l'email est unique
-            existing_user = db.session.query(UserModel).filter_by(email=data['email']).first()
-            if existing_user:
+            if not UserModel.check_email_uniqueness(data['email']):
                 return {"message": "email already used"}, 400
             
             new_user = facade.create_user(data)
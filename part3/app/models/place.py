@@ -16,7 +16,7 @@ class Place(BaseModel, db.Model):
     longitude = Column(Float, default=0.0)
 
     # Relations (rétablies)
-    owner_id = Column(String, ForeignKey('users.id'), nullable=False)
+    owner_id = Column(String, ForeignKey('users.id'), nullable=False, index=True)
     owner = relationship("User", back_populates="places")
     amenities = relationship("Amenity", secondary=place_amenity, back_populates="places")
     reviews = relationship("Review", cascade="all, delete-orphan", back_populates="place")
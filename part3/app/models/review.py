@@ -13,8 +13,8 @@ class Review(BaseModel, db.Model):
     # Colonnes de base
     text = Column(String, nullable=False)
     rating = Column(Integer, nullable=False)
-    place_id = Column(String, ForeignKey('places.id'), nullable=False)
-    user_id = Column(String, ForeignKey('users.id'), nullable=False)
+    place_id = Column(String, ForeignKey('places.id'), nullable=False, index=True)
+    user_id = Column(String, ForeignKey('users.id'), nullable=False, index=True)
 
     # Relations (rétablies)
     place = relationship("Place", back_populates="reviews")
@@ -1,6 +1,6 @@
 import re
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from app.extensions import bcrypt, db
 from .base_model import BaseModel
 
@@ -13,6 +13,8 @@ class User(BaseModel):
     first_name = db.Column(db.String(50), nullable=False)
     last_name = db.Column(db.String(50), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
+    # Email en minuscules, tenu à jour à chaque affectation de email (unicité sans casse)
+    email_normalized = db.Column(db.String(120), nullable=False, unique=True, index=True)
     is_admin = db.Column(db.Boolean, default=False)
     password = db.Column(db.String(128), nullable=False)
 
@@ -52,6 +54,16 @@ class User(BaseModel):
         if not re.match(r"[^@]+@[^@]+\.[^@]+", email):
             raise ValueError("Invalid email format")
 
+    @staticmethod
+    def normalize_email(email):
+        """Return the canonical form of an email (trimmed, lower-cased)."""
+        return email.strip().lower()
+
+    @validates('email')
+    def _sync_email_normalized(self, key, email):
+        self.email_normalized = self.normalize_email(email)
+        return email
+
     def set_password(self, password: str):
         """
         Hashes and sets the password.
@@ -87,5 +99,5 @@ class User(BaseModel):
 
     @classmethod
     def check_email_uniqueness(cls, email):
-        """Vérifie si l'email existe déjà"""
-        return cls.query.filter_by(email=email).first() is None
+        """Vérifie si l'email existe déjà (sans tenir compte de la casse)"""
+        return cls.query.filter_by(email_normalized=cls.normalize_email(email)).first() is None
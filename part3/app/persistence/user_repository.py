@@ -11,7 +11,7 @@ class UserRepository(SQLAlchemyRepository):
 
     def get_by_email(self, email):
         """Retrieve a user by their email."""
-        return self.model.query.filter_by(email=email).first()
+        return self.model.query.filter_by(email_normalized=User.normalize_email(email)).first()
 
     def create_user(self, user_data):
         """Create a new user with validation and password hashing."""
@@ -52,7 +52,8 @@ class UserRepository(SQLAlchemyRepository):
         """Update a user."""
         user = self.get(user_id)
         if user:
-            if 'email' in user_data and user_data['email'] != user.email:
+            if 'email' in user_data and \
+                    User.normalize_email(user_data['email']) != user.email_normalized:
                 if not User.check_email_uniqueness(user_data['email']):
                     raise ValueError(f"Email {user_data['email']} already exists")
             for key, value in user_data.items():
@@ -0,0 +1,47 @@
+"""Normalized user email
+
+Revision ID: 4b7e2d91c0a5
+Revises: 19dca831a264
+Create Date: 2026-10-17 10:12:41.503217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7e2d91c0a5'
+down_revision = '19dca831a264'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('email_normalized', sa.String(length=120), nullable=True))
+
+    # Remplit la colonne pour les utilisateurs existants (même règle que User.normalize_email)
+    connection = op.get_bind()
+    users = sa.table('users', sa.column('id', sa.String), sa.column('email', sa.String),
+                     sa.column('email_normalized', sa.String))
+    rows = connection.execute(sa.select(users.c.id, users.c.email)).all()
+    for row in rows:
+        connection.execute(users.update().where(users.c.id == row.id)
+                           .values(email_normalized=row.email.strip().lower()))
+
+    conflicts = connection.execute(
+        sa.select(users.c.email_normalized).group_by(users.c.email_normalized)
+        .having(sa.func.count() > 1)
+    ).scalars().all()
+    if conflicts:
+        raise RuntimeError(f"Emails used by several users (ignoring case): {', '.join(conflicts)}")
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('email_normalized', existing_type=sa.String(length=120), nullable=False)
+        batch_op.create_index(batch_op.f('ix_users_email_normalized'), ['email_normalized'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_email_normalized'))
+        batch_op.drop_column('email_normalized')
@@ -0,0 +1,40 @@
+"""Foreign key indexes
+
+Revision ID: 8c3f5a17d2e4
+Revises: 4b7e2d91c0a5
+Create Date: 2026-10-17 14:05:12.318904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c3f5a17d2e4'
+down_revision = '4b7e2d91c0a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_places_owner_id'), ['owner_id'], unique=False)
+
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_reviews_place_id'), ['place_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_reviews_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('place_amenity', schema=None) as batch_op:
+        batch_op.create_index('ix_place_amenity_amenity_id', ['amenity_id', 'place_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('place_amenity', schema=None) as batch_op:
+        batch_op.drop_index('ix_place_amenity_amenity_id')
+
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_reviews_user_id'))
+        batch_op.drop_index(batch_op.f('ix_reviews_place_id'))
+
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_places_owner_id'))
@@ -1,12 +1,17 @@
 from flask import Flask, jsonify, render_template
 import os
 from flask_restx import Api
-from app.extensions import db, bcrypt, jwt
+from app.extensions import db, bcrypt, jwt, password_hasher, token_store
 from datetime import timedelta
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 from flask_cors import CORS  # 👈 Import ajouté ici
 from app.models import User, Place, Review, Amenity
+from app.hashing import HashingPoolSaturated, HashingPoolTimeout
+from app.persistence.schema import enforce_foreign_keys, upgrade_schema
+from app.persistence.search import search_cli
+from app.persistence.spatial import geo_cli
+from app.persistence.ratings import ratings_cli
 
 def create_app(config_class="config.DevelopmentConfig"):
     """
@@ -26,13 +31,23 @@ def create_app(config_class="config.DevelopmentConfig"):
 
     # Configuration spécifique JWT
     app.config['JWT_SECRET_KEY'] = app.config.get('SECRET_KEY', 'fallback-secret-key')
-    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
+    app.config.setdefault('JWT_ACCESS_TOKEN_EXPIRES', timedelta(hours=1))
+    app.config.setdefault('JWT_SESSION_MAX_AGE', timedelta(days=90))
 
     # Initialisation des extensions
     db.init_app(app)
     bcrypt.init_app(app)
+    password_hasher.init_app(app)
+    token_store.init_app(app)
     jwt.init_app(app)
     migrate = Migrate(app, db)
+    app.cli.add_command(search_cli)  # flask search rebuild
+    app.cli.add_command(geo_cli)  # flask geo rebuild
+    app.cli.add_command(ratings_cli)  # flask ratings check [--fix] / rebuild
+
+    # Les caches du facade sont partagés : on les règle (et vide) pour cette application
+    from app.services import facade
+    facade.configure_caches(app.config)
 
     # Configuration du gestionnaire JWT
     jwt_manager = JWTManager(app)
@@ -45,6 +60,14 @@ def create_app(config_class="config.DevelopmentConfig"):
     def invalid_token_callback(error):
         return jsonify({"message": "Invalid token"}), 401
 
+    @jwt_manager.token_in_blocklist_loader
+    def token_in_blocklist_callback(jwt_header, jwt_payload):
+        return token_store.is_revoked(jwt_payload)
+
+    @jwt_manager.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        return jsonify({"message": "Token has been revoked"}), 401
+
     api = Api(
         app,
         version='1.0',
@@ -62,6 +85,15 @@ def create_app(config_class="config.DevelopmentConfig"):
         security='Bearer'
     )
 
+    # Pool bcrypt saturé : on refuse vite plutôt que de ralentir toutes les routes
+    @api.errorhandler(HashingPoolSaturated)
+    def hashing_pool_saturated(error):
+        return {'message': str(error)}, 429, {'Retry-After': '1'}
+
+    @api.errorhandler(HashingPoolTimeout)
+    def hashing_pool_timeout(error):
+        return {'message': str(error)}, 503, {'Retry-After': '1'}
+
     # Import des namespaces
     from .api.v1.users import api as users_ns
     from .api.v1.auth import api as auth_ns
@@ -87,7 +119,9 @@ def create_app(config_class="config.DevelopmentConfig"):
 
     # Initialisation de l'application : création de la base et de l'admin si nécessaire
     with app.app_context():
+        enforce_foreign_keys(db.engine)  # ON DELETE CASCADE appliqué par SQLite
         db.create_all()
+        upgrade_schema(db.engine)  # Colonnes et index ajoutés depuis la création de la base
         if not User.query.filter_by(email="admin@hbnb.com").first():
             admin = User(
                 first_name="Admin",
@@ -99,5 +133,10 @@ def create_app(config_class="config.DevelopmentConfig"):
             db.session.add(admin)
             db.session.commit()
             print("✅ Utilisateur admin créé avec succès")
+        # Filtre des révocations prêt avant la première requête, tenu à jour en arrière-plan
+        token_store.warm_up()
+        db.session.remove()
+    if app.config.get('JWT_REVOCATION_MAINTENANCE_THREAD', True):
+        token_store.start_maintenance(app)
 
     return app
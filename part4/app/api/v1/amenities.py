@@ -1,6 +1,8 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt
 from app.api.v1 import facade  # Import the shared facade instance
+from app.api.v1.pagination import multi_get_parser, is_paginated, page_response, parse_ids
+from app.api.v1.bulk import bulk_response
 
 api = Namespace('amenities', description='Amenity operations')
 
@@ -9,6 +11,8 @@ amenity_model = api.model('Amenity', {
     'name': fields.String(required=True, description='Name of the amenity')
 })
 
+AMENITY_ITEM_COLUMNS = ('id', 'name')
+
 # Helper function to check admin privileges
 def is_admin_user():
     claims = get_jwt()  # Retrieve the JWT claims
@@ -34,11 +38,48 @@ class AmenityList(Resource):
         except ValueError as e:
             return {'error': str(e)}, 400
 
+    @api.expect(multi_get_parser)
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(400, 'Invalid cursor, limit or ids')
     def get(self):
-        """Retrieve a list of all amenities"""
-        amenities = facade.get_all_amenities()
-        return [{'id': amenity.id, 'name': amenity.name} for amenity in amenities], 200
+        """Retrieve a list of all amenities (one page when cursor or limit is given, or ?ids=a,b,c)"""
+        args = multi_get_parser.parse_args()
+        if args['ids'] is not None:
+            try:
+                amenities = facade.get_amenities_by_ids(parse_ids(args['ids']), columns=AMENITY_ITEM_COLUMNS)
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            return [{'id': amenity.id, 'name': amenity.name} for amenity in amenities], 200
+
+        if not is_paginated(args):
+            amenities = facade.get_all_amenities(columns=AMENITY_ITEM_COLUMNS)
+            return [{'id': amenity.id, 'name': amenity.name} for amenity in amenities], 200
+
+        try:
+            amenities, next_cursor, total = facade.get_amenities_page(
+                args['cursor'], args['limit'], args['include_total'], columns=AMENITY_ITEM_COLUMNS)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        items = [{'id': amenity.id, 'name': amenity.name} for amenity in amenities]
+        return page_response(items, next_cursor, total), 200
+
+
+@api.route('/bulk')
+class AmenityBulk(Resource):
+    @jwt_required()
+    @api.expect([amenity_model])
+    @api.response(201, 'Every amenity created')
+    @api.response(207, 'Some amenities created, the others listed in errors')
+    @api.response(400, 'No amenity created')
+    @api.response(403, 'Admin privileges required')
+    def post(self):
+        """Register up to 500 amenities at once (Admin only)"""
+        if not is_admin_user():
+            return {'error': 'Admin privileges required'}, 403
+        try:
+            return bulk_response(*facade.create_amenities_bulk(api.payload))
+        except ValueError as e:
+            return {'error': str(e)}, 400
 
 
 @api.route('/<amenity_id>')
@@ -1,5 +1,10 @@
+import time
+import uuid
+from datetime import timedelta
+from flask import current_app
 from flask_restx import Namespace, Resource, fields
-from flask_jwt_extended import create_access_token
+from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt, get_jwt_identity, jwt_required
+from app.extensions import token_store
 from app.services import facade
 
 api = Namespace('auth', description='Authentication operations', path='/api/auth')
@@ -10,6 +15,29 @@ login_model = api.model('Login', {
     'password': fields.String(required=True, description='User password')
 })
 
+
+def issue_tokens(user, family=None, auth_time=None):
+    """
+    Create an access token and a refresh token for one login session.
+
+    Both carry the session id ('fam') so the whole session can be revoked;
+    the refresh token also carries the login time ('auth_time'): refreshing
+    slides its expiry, but never past JWT_SESSION_MAX_AGE after the login.
+    """
+    now = int(time.time())
+    family = family or str(uuid.uuid4())
+    auth_time = auth_time or now
+    identity = {'id': str(user.id)}
+    access_token = create_access_token(identity=identity,
+                                       additional_claims={'is_admin': user.is_admin, 'fam': family})
+    session_left = timedelta(seconds=auth_time - now) + current_app.config['JWT_SESSION_MAX_AGE']
+    refresh_token = create_refresh_token(
+        identity=identity,
+        additional_claims={'fam': family, 'auth_time': auth_time},
+        expires_delta=min(current_app.config['JWT_REFRESH_TOKEN_EXPIRES'], session_left))
+    return {'access_token': access_token, 'refresh_token': refresh_token}
+
+
 @api.route('/login')
 class Login(Resource):
     @api.expect(login_model)
@@ -17,18 +45,41 @@ class Login(Resource):
         """Authenticate user and return a JWT token"""
         credentials = api.payload  # Get the email and password from the request payload
 
-        # Step 1: Retrieve the user based on the provided email
-        user = facade.get_user_by_email(credentials['email'])
-
-        # Step 2: Check if the user exists and the password is correct
-        if not user or not user.verify_password(credentials['password']):
+        # Step 1 & 2: Retrieve the user by email and check the password
+        user = facade.authenticate(credentials['email'], credentials['password'])
+        if not user:
             return {'error': 'Invalid credentials'}, 401
 
-        # Step 3: Create a JWT token with the user's id and is_admin flag
-        access_token = create_access_token(
-    identity={'id': str(user.id)},
-    additional_claims={'is_admin': user.is_admin}
-)
+        # Step 3 & 4: Return an access token (id + is_admin) and a refresh token to the client
+        return issue_tokens(user), 200
+
 
-        # Step 4: Return the JWT token to the client
-        return {'access_token': access_token}, 200
\ No newline at end of file
+@api.route('/refresh')
+class Refresh(Resource):
+    @jwt_required(refresh=True)
+    @api.response(200, 'New access and refresh tokens issued')
+    @api.response(401, 'Refresh token expired, revoked or already used')
+    def post(self):
+        """Exchange a refresh token for a new token pair, without checking the password again"""
+        claims = get_jwt()
+        user = facade.get_user(get_jwt_identity()['id'])
+        if not user:
+            return {'error': 'User not found'}, 401
+
+        # Rotation : le refresh token présenté ne pourra plus servir. Deux appels simultanés
+        # passent tous deux le blocklist ; seul celui qui l'a révoqué reçoit une nouvelle paire,
+        # l'autre rejoue un token déjà utilisé et la session est révoquée comme pour un vol
+        if not token_store.revoke(claims['jti'], claims['exp']):
+            token_store.revoke_family(claims.get('fam'))
+            return {'error': 'Refresh token already used'}, 401
+        return issue_tokens(user, family=claims.get('fam'), auth_time=claims.get('auth_time')), 200
+
+
+@api.route('/logout')
+class Logout(Resource):
+    @jwt_required(verify_type=False)
+    @api.response(200, 'Session revoked')
+    def post(self):
+        """Revoke the presented token (access or refresh) and every token of its session"""
+        token_store.revoke_session(get_jwt())
+        return {'message': 'Successfully logged out'}, 200
@@ -0,0 +1,10 @@
+def bulk_response(created, errors):
+    """Serialize the (created, errors) pairs of a bulk creation with its status code.
+
+    201 when every item was created, 207 when only some were, 400 when none was.
+    """
+    body = {'created': [{'index': index, 'id': obj_id} for index, obj_id in created],
+            'errors': [{'index': index, 'error': message} for index, message in errors]}
+    if not errors:
+        return body, 201
+    return body, 207 if created else 400
@@ -0,0 +1,39 @@
+from flask_restx import reqparse, inputs
+
+# Query parameters shared by every paginated list endpoint
+pagination_parser = reqparse.RequestParser()
+pagination_parser.add_argument('cursor', type=str, location='args',
+                               help='Opaque cursor returned as next_cursor by the previous page')
+pagination_parser.add_argument('limit', type=int, location='args',
+                               help='Maximum number of items per page')
+pagination_parser.add_argument('include_total', type=inputs.boolean, default=False, location='args',
+                               help='Also return the total number of items (extra COUNT query)')
+
+
+# List endpoints that also support multi-get: ?ids=a,b,c
+multi_get_parser = pagination_parser.copy()
+multi_get_parser.add_argument('ids', type=str, location='args',
+                              help='Comma-separated IDs to fetch in a single round trip')
+
+MAX_IDS = 100
+
+
+def parse_ids(raw_ids):
+    """Split the ?ids= query parameter, refusing more than MAX_IDS values."""
+    ids = [value.strip() for value in raw_ids.split(',') if value.strip()]
+    if len(ids) > MAX_IDS:
+        raise ValueError(f"At most {MAX_IDS} ids can be requested at once")
+    return ids
+
+
+def is_paginated(args):
+    """Return True when the client asked for a page rather than the full list."""
+    return args.get('cursor') is not None or args.get('limit') is not None
+
+
+def page_response(items, next_cursor, total=None):
+    """Build the JSON envelope returned by paginated list endpoints."""
+    response = {'items': items, 'next_cursor': next_cursor}
+    if total is not None:
+        response['total'] = total
+    return response
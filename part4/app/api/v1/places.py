@@ -1,6 +1,10 @@
 import logging
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Namespace, Resource, fields, reqparse
+from app.models.place import average_rating
+from app.persistence.place_repository import PLACE_SORTS
 from app.api.v1 import facade  # Import the shared facade instance
+from app.api.v1.pagination import multi_get_parser, is_paginated, page_response, parse_ids
+from app.api.v1.bulk import bulk_response
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 
 logger = logging.getLogger(__name__)
@@ -27,6 +31,71 @@ place_update_model = api.model('PlaceUpdate', {
     'amenities': fields.List(fields.String, description="List of amenities ID's")
 })
 
+# Filtres et tri de GET /places/, appliqués en SQL
+place_search_parser = multi_get_parser.copy()
+place_search_parser.add_argument('price_min', type=float, location='args',
+                                 help='Lowest price per night (inclusive)')
+place_search_parser.add_argument('price_max', type=float, location='args',
+                                 help='Highest price per night (inclusive)')
+place_search_parser.add_argument('amenities', type=str, location='args',
+                                 help='Comma-separated amenity IDs; places must have all of them')
+place_search_parser.add_argument('owner_id', type=int, location='args',
+                                 help='Only the places of this owner')
+place_search_parser.add_argument('sort', type=str, location='args',
+                                 choices=[prefix + field for field in PLACE_SORTS for prefix in ('', '-')],
+                                 help="Sort order; prefix with '-' for descending (default: created_at)")
+
+PLACE_FILTERS = ('price_min', 'price_max', 'amenities', 'owner_id')
+
+# Recherche plein texte : GET /places/search?q=
+place_text_search_parser = reqparse.RequestParser()
+place_text_search_parser.add_argument('q', type=str, required=True, location='args',
+                                      help='Words to find in titles, descriptions and reviews')
+place_text_search_parser.add_argument('limit', type=int, location='args',
+                                      help='Maximum number of results')
+
+# Requêtes géographiques : GET /places/nearby et GET /places/within
+nearby_parser = reqparse.RequestParser()
+nearby_parser.add_argument('lat', type=float, required=True, location='args', help='Latitude of the centre')
+nearby_parser.add_argument('lon', type=float, required=True, location='args', help='Longitude of the centre')
+nearby_parser.add_argument('radius_km', type=float, required=True, location='args',
+                           help='Search radius in kilometres (at most 2000)')
+nearby_parser.add_argument('limit', type=int, location='args', help='Maximum number of places')
+
+within_parser = reqparse.RequestParser()
+within_parser.add_argument('bbox', type=str, required=True, location='args',
+                           help='west,south,east,north in degrees, at most 30 apart '
+                                '(west > east crosses longitude 180)')
+within_parser.add_argument('limit', type=int, location='args', help='Maximum number of places')
+
+
+def parse_bbox(raw_bbox):
+    """Split ?bbox=west,south,east,north into (south, west, north, east)."""
+    try:
+        west, south, east, north = (float(value) for value in raw_bbox.split(','))
+    except ValueError:
+        raise ValueError("bbox must be four numbers: west,south,east,north")
+    return south, west, north, east
+
+# Colonnes lues par les listes : pas d'hydratation ORM, les amenities viennent de la table d'association
+PLACE_CARD_COLUMNS = ('id', 'title', 'description', 'price', 'latitude', 'longitude', 'owner_id',
+                      'review_count', 'rating_sum')
+
+def place_cards(rows, amenity_ids):
+    """Serialize place rows for list responses, with their amenity IDs"""
+    return [{
+        'id': row.id,
+        'title': row.title,
+        'description': row.description,
+        'price': row.price,
+        'latitude': row.latitude,
+        'longitude': row.longitude,
+        'owner_id': row.owner_id,
+        'review_count': row.review_count,
+        'avg_rating': round(average_rating(row.rating_sum, row.review_count), 2),
+        'amenities': amenity_ids.get(row.id, [])
+    } for row in rows]
+
 @api.route('/')
 class PlaceList(Resource):
     @jwt_required()  # Require authentication to create a new place
@@ -61,20 +130,136 @@ class PlaceList(Resource):
         except ValueError as e:
             return {'error': str(e)}, 400
 
+    @api.expect(place_search_parser)
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(400, 'Invalid cursor, limit, ids or filter')
+    def get(self):
+        """Retrieve a list of places, filtered and sorted (one page when cursor or limit is given, or ?ids=a,b,c)"""
+        args = place_search_parser.parse_args()
+        if args['ids'] is not None:
+            try:
+                places = facade.get_places_by_ids(parse_ids(args['ids']), columns=PLACE_CARD_COLUMNS)
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            amenity_ids = facade.get_place_amenity_ids([place.id for place in places])
+            return place_cards(places, amenity_ids), 200
+
+        if args['sort'] is not None or any(args[name] is not None for name in PLACE_FILTERS):
+            filters = {'price_min': args['price_min'], 'price_max': args['price_max'],
+                       'owner_id': args['owner_id'], 'amenity_ids': None}
+            try:
+                if args['amenities'] is not None:
+                    filters['amenity_ids'] = parse_ids(args['amenities'])
+                places, next_cursor, total = facade.search_places(
+                    filters, args['sort'], args['cursor'], args['limit'], args['include_total'],
+                    columns=PLACE_CARD_COLUMNS)
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            cards = place_cards(places, facade.get_place_amenity_ids([place.id for place in places]))
+            if not is_paginated(args):
+                return cards, 200
+            return page_response(cards, next_cursor, total), 200
+
+        if not is_paginated(args):
+            places = facade.get_all_places(columns=PLACE_CARD_COLUMNS)
+            return place_cards(places, facade.get_place_amenity_ids()), 200
+
+        try:
+            places, next_cursor, total = facade.get_places_page(
+                args['cursor'], args['limit'], args['include_total'], columns=PLACE_CARD_COLUMNS)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        amenity_ids = facade.get_place_amenity_ids([place.id for place in places])
+        return page_response(place_cards(places, amenity_ids), next_cursor, total), 200
+
+@api.route('/bulk')
+class PlaceBulk(Resource):
+    @jwt_required()
+    @api.expect([place_model])
+    @api.response(201, 'Every place created')
+    @api.response(207, 'Some places created, the others listed in errors')
+    @api.response(400, 'No place created')
+    def post(self):
+        """Register up to 500 places at once, in one transaction"""
+        current_user = get_jwt_identity()
+        is_admin = get_jwt().get('is_admin', False)
+        # Comme POST /places/ : seul un admin choisit le propriétaire (owner_id de chaque élément)
+        owner_id = None if is_admin else current_user['id']
+        try:
+            return bulk_response(*facade.create_places_bulk(api.payload, owner_id=owner_id))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.expect(place_text_search_parser)
+    @api.response(200, 'Matching places, best match first')
+    @api.response(400, 'Missing or empty query')
+    @api.response(501, 'Full-text search is not available on this database')
     def get(self):
-        """Retrieve a list of all places"""
-        places = facade.get_all_places()
+        """Search places by title, description and review text (BM25 ranking, highlighted snippets)"""
+        args = place_text_search_parser.parse_args()
+        try:
+            rows = facade.full_text_search_places(args['q'], limit=args['limit'])
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        except NotImplementedError as e:
+            return {'error': str(e)}, 501
         return [{
-            'id': place.id,
-            'title': place.title,
-            'description': place.description,
-            'price': place.price,
-            'latitude': place.latitude,
-            'longitude': place.longitude,
-            'owner_id': place.owner.id,
-            'amenities': [amenity.id for amenity in place.amenities]
-        } for place in places], 200
+            'id': row.id,
+            'title': row.title,
+            'price': row.price,
+            'latitude': row.latitude,
+            'longitude': row.longitude,
+            'owner_id': row.owner_id,
+            'title_highlight': row.title_highlight,
+            'snippet': row.snippet,
+            'rank': row.rank
+        } for row in rows], 200
+
+def geo_cards(found):
+    """Serialize (row, distance_km) results of a geo query as place cards with their distance"""
+    rows = [row for row, _ in found]
+    cards = place_cards(rows, facade.get_place_amenity_ids([row.id for row in rows]))
+    for card, (_, distance) in zip(cards, found):
+        card['distance_km'] = round(distance, 3)
+    return cards
+
+@api.route('/nearby')
+class PlacesNearby(Resource):
+    @api.expect(nearby_parser)
+    @api.response(200, 'Places within the radius, nearest first')
+    @api.response(400, 'Invalid point or radius, or too many places in the area')
+    @api.response(501, 'Geo queries are not available on this database')
+    def get(self):
+        """Places within radius_km of a point, ordered by distance"""
+        args = nearby_parser.parse_args()
+        try:
+            found = facade.get_places_nearby(args['lat'], args['lon'], args['radius_km'],
+                                             limit=args['limit'], columns=PLACE_CARD_COLUMNS)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        except NotImplementedError as e:
+            return {'error': str(e)}, 501
+        return geo_cards(found), 200
+
+@api.route('/within')
+class PlacesWithin(Resource):
+    @api.expect(within_parser)
+    @api.response(200, 'Places inside the box, nearest to its centre first')
+    @api.response(400, 'Invalid or too large bounding box, or too many places in it')
+    @api.response(501, 'Geo queries are not available on this database')
+    def get(self):
+        """Places inside a bounding box (for a map view)"""
+        args = within_parser.parse_args()
+        try:
+            found = facade.get_places_within(*parse_bbox(args['bbox']), limit=args['limit'],
+                                             columns=PLACE_CARD_COLUMNS)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        except NotImplementedError as e:
+            return {'error': str(e)}, 501
+        return geo_cards(found), 200
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
@@ -82,7 +267,7 @@ class PlaceResource(Resource):
     @api.response(404, 'Place not found')
     def get(self, place_id):
         """Get place details by ID"""
-        place = facade.get_place(place_id)
+        place = facade.get_place(place_id, profile='place_card')
         if not place:
             return {'error': 'Place not found'}, 404
 
@@ -93,7 +278,9 @@ class PlaceResource(Resource):
             'price': place.price,
             'latitude': place.latitude,
             'longitude': place.longitude,
-            'owner_id': place.owner.id,
+            'owner_id': place.owner_id,
+            'review_count': place.review_count,
+            'avg_rating': round(place.avg_rating, 2),
             'amenities': [amenity.id for amenity in place.amenities]
         }, 200
 
@@ -1,6 +1,8 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.facade import HBnBFacade
+from app.api.v1.pagination import pagination_parser, is_paginated, page_response
+from app.api.v1.bulk import bulk_response
 
 api = Namespace('reviews', description='Review operations')
 facade = HBnBFacade()
@@ -18,6 +20,16 @@ review_update_model = api.model('ReviewUpdate', {
     'rating': fields.Integer(description='Rating of the place (1-5)')
 })
 
+REVIEW_ITEM_COLUMNS = ('id', 'text', 'rating', 'user_id', 'place_id')
+
+def review_item(review):
+    """Serialize a review for list responses (reads FK columns only)"""
+    return {'id': review.id,
+            'text': review.text,
+            'rating': review.rating,
+            'user_id': review.user_id,
+            'place_id': review.place_id}
+
 @api.route('/')
 class ReviewList(Resource):
     @jwt_required()  # Require authentication to create a review
@@ -33,7 +45,9 @@ class ReviewList(Resource):
         try:
             # Validate that the user is not reviewing their own place
             place = facade.get_place(review_data['place_id'])
-            if int(place.owner.id) == int(current_user['id']):
+            if not place:
+                return {'error': "Place not found"}, 400
+            if int(place.owner_id) == int(current_user['id']):
                 return {'error': "You cannot review your own place"}, 403
 
             # Validate that the user has not already reviewed this place
@@ -55,15 +69,37 @@ class ReviewList(Resource):
         except ValueError as e:
             return {'error': str(e)}, 400
 
+    @api.expect(pagination_parser)
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid cursor or limit')
     def get(self):
-        """Retrieve a list of all reviews"""
-        reviews = facade.get_all_reviews()
-        return [{'id': review.id,
-                 'text': review.text,
-                 'rating': review.rating,
-                 'user_id': review.user.id,
-                 'place_id': review.place.id} for review in reviews], 200
+        """Retrieve a list of all reviews (one page when cursor or limit is given)"""
+        args = pagination_parser.parse_args()
+        if not is_paginated(args):
+            reviews = facade.get_all_reviews(columns=REVIEW_ITEM_COLUMNS)
+            return [review_item(review) for review in reviews], 200
+
+        try:
+            reviews, next_cursor, total = facade.get_reviews_page(
+                args['cursor'], args['limit'], args['include_total'], columns=REVIEW_ITEM_COLUMNS)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return page_response([review_item(review) for review in reviews], next_cursor, total), 200
+
+@api.route('/bulk')
+class ReviewBulk(Resource):
+    @jwt_required()
+    @api.expect([review_model])
+    @api.response(201, 'Every review created')
+    @api.response(207, 'Some reviews created, the others listed in errors')
+    @api.response(400, 'No review created')
+    def post(self):
+        """Register up to 500 reviews of the authenticated user at once, in one transaction"""
+        current_user = get_jwt_identity()
+        try:
+            return bulk_response(*facade.create_reviews_bulk(api.payload, user_id=current_user['id']))
+        except ValueError as e:
+            return {'error': str(e)}, 400
 
 @api.route('/<review_id>')
 class ReviewResource(Resource):
@@ -141,15 +177,24 @@ class ReviewResource(Resource):
 
 @api.route('/places/<place_id>/reviews')
 class PlaceReviewList(Resource):
+    @api.expect(pagination_parser)
     @api.response(200, 'List of reviews for the place retrieved successfully')
+    @api.response(400, 'Invalid cursor or limit')
     @api.response(404, 'Place not found')
     def get(self, place_id):
-        """Get all reviews for a specific place"""
+        """Get all reviews for a specific place (one page when cursor or limit is given)"""
+        args = pagination_parser.parse_args()
         try:
-            reviews = facade.get_reviews_by_place(place_id)
-            return [{'id': review.id,
-                     'text': review.text,
-                     'rating': review.rating,
-                     'user_id': review.user.id} for review in reviews], 200
+            reviews, next_cursor, total = facade.get_reviews_by_place(
+                place_id, args['cursor'], args['limit'], args['include_total'],
+                columns=REVIEW_ITEM_COLUMNS)
         except ValueError as e:
-            return {'error': str(e)}, 404
+            status = 404 if str(e) == "Place not found" else 400
+            return {'error': str(e)}, status
+        items = [{'id': review.id,
+                  'text': review.text,
+                  'rating': review.rating,
+                  'user_id': review.user_id} for review in reviews]
+        if not is_paginated(args):
+            return items, 200
+        return page_response(items, next_cursor, total), 200
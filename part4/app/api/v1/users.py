@@ -1,6 +1,7 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.api.v1 import facade  # Import the shared facade instance
+from app.api.v1.pagination import pagination_parser, is_paginated, page_response
 
 api = Namespace('users', description='User operations')
 
@@ -25,16 +26,35 @@ def is_admin_user():
     return claims.get('is_admin', False)
 
 
+USER_ITEM_COLUMNS = ('id', 'first_name', 'last_name', 'email')
+
+
+def user_item(user):
+    """Serialize a user for list responses (password excluded)"""
+    return {'id': user.id,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'email': user.email}
+
+
 @api.route('/')
 class UserList(Resource):
+    @api.expect(pagination_parser)
     @api.response(200, 'List of users retrieved successfully')
+    @api.response(400, 'Invalid cursor or limit')
     def get(self):
-        """Get list of all users"""
-        users = facade.get_all_users()
-        return [{'id': user.id,
-                 'first_name': user.first_name,
-                 'last_name': user.last_name,
-                 'email': user.email} for user in users], 200
+        """Get list of all users (one page when cursor or limit is given)"""
+        args = pagination_parser.parse_args()
+        if not is_paginated(args):
+            users = facade.get_all_users(columns=USER_ITEM_COLUMNS)
+            return [user_item(user) for user in users], 200
+
+        try:
+            users, next_cursor, total = facade.get_users_page(
+                args['cursor'], args['limit'], args['include_total'], columns=USER_ITEM_COLUMNS)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return page_response([user_item(user) for user in users], next_cursor, total), 200
 
     @api.expect(user_model, validate=True)
     @jwt_required()  # Require authentication to create a new user
@@ -46,20 +66,14 @@ class UserList(Resource):
         if not is_admin_user():
             return {'error': 'Admin privileges required'}, 403
 
-        from app import bcrypt  # Import différé pour éviter les imports circulaires
         user_data = api.payload
 
         # Check if email is already in use
-        existing_user = facade.get_user_by_email(user_data['email'])
-        if existing_user:
+        if facade.is_email_registered(user_data['email']):
             return {'error': 'Email already registered'}, 400
 
         try:
-            # Hash the password before storing it
-            hashed_password = bcrypt.generate_password_hash(user_data['password']).decode('utf-8')
-            user_data['password'] = hashed_password
-
-            # Create the new user
+            # Create the new user (the password is hashed once, by the model)
             new_user = facade.create_user(user_data)
 
             # Return only the user's ID and a success message (exclude password)
@@ -99,7 +113,6 @@ class UserResource(Resource):
         if not is_admin and str(current_user['id']) != id:
             return {'error': "Unauthorized action"}, 403
 
-        from app import bcrypt  # Import différé pour éviter les imports circulaires
         update_data = api.payload
 
         # Prevent modification of email and password by regular users
@@ -1,7 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
+from app.hashing import PasswordHasher
+from app.revocation import TokenRevocationStore
 
 jwt = JWTManager()
 db = SQLAlchemy()
 bcrypt = Bcrypt()
+password_hasher = PasswordHasher()  # Seul chemin de hashage des mots de passe
+token_store = TokenRevocationStore()  # JWT révoqués (rotation des refresh tokens)
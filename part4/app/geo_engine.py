@@ -0,0 +1,231 @@
+import logging
+import math
+import threading
+import time
+import numpy as np
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.persistence.spatial import EARTH_RADIUS_KM
+
+logger = logging.getLogger(__name__)
+
+
+def to_xyz(lat, lon):
+    """Unit-sphere coordinates of points given in degrees (scalars or arrays)."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+class GeoEngine:
+    """
+    In-process nearest-place index, answering geo queries without SQL.
+
+    Place positions are kept as unit vectors in one contiguous (n, 3) float64
+    array. A query is a single matrix-vector product: the closer a place, the
+    larger the dot product with the query point, so kNN is an argpartition
+    over that vector and a radius query a threshold on it. Exact distances
+    are computed only for the selected rows, from the chord length.
+
+    The positions are loaded lazily through loader(), which returns objects
+    or rows with id, latitude and longitude (the places table, an
+    InMemoryRepository...). When model is given, inserts, updates and
+    deletes of that model committed through any session of this process are
+    applied incrementally; changes made elsewhere are picked up by a full
+    reload every max_age seconds.
+
+    :param loader: Callable returning an iterable of places, or None to feed
+        the engine only through load() / upsert() / remove().
+    :param model: SQLAlchemy model whose committed changes are tracked.
+    :param max_age: Seconds before a full reload, None to never reload.
+    """
+
+    def __init__(self, loader=None, model=None, max_age=None, clock=time.monotonic):
+        self.loader = loader
+        self.model = model
+        self.max_age = max_age
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._clear_arrays()
+        self._loaded_at = None
+        if model is not None:
+            event.listen(Session, 'after_flush', self._collect_changes)
+            event.listen(Session, 'after_commit', self._apply_changes)
+            event.listen(Session, 'after_soft_rollback', self._discard_changes)
+
+    def _clear_arrays(self, capacity=1024):
+        self._xyz = np.zeros((capacity, 3))
+        self._ids = np.empty(capacity, dtype=object)  # int (SQL) ou str (InMemoryRepository)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._rows = {}  # place id -> ligne des tableaux
+        self._free = []  # lignes libérées par remove(), réutilisées par upsert()
+        self._size = 0
+
+    def configure(self, max_age=None):
+        """Change the reload period and drop every position (reloaded on the next query)."""
+        self.max_age = max_age
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._clear_arrays()
+            self._loaded_at = None
+
+    def __len__(self):
+        return len(self._rows)
+
+    def stats(self):
+        return {'places': len(self._rows), 'rows': self._size, 'capacity': len(self._ids),
+                'nbytes': self._xyz.nbytes + self._ids.nbytes + self._alive.nbytes,
+                'loaded': self._loaded_at is not None}
+
+    def load(self, places):
+        """Replace every position with those of places (objects or rows)."""
+        ids, lats, lons = [], [], []
+        for place in places:
+            ids.append(place.id)
+            lats.append(place.latitude)
+            lons.append(place.longitude)
+        with self._lock:
+            self._clear_arrays(max(1024, len(ids)))
+            size = len(ids)
+            if size:
+                self._ids[:size] = ids
+                self._xyz[:size] = to_xyz(np.asarray(lats, dtype=float), np.asarray(lons, dtype=float))
+                self._alive[:size] = True
+            # Un id présent deux fois : la dernière position l'emporte
+            self._rows = {place_id: row for row, place_id in enumerate(ids)}
+            for row in set(range(size)) - set(self._rows.values()):
+                self._alive[row] = False
+                self._free.append(row)
+            self._size = size
+            self._loaded_at = self.clock()
+        logger.debug(f"Geo engine loaded {len(self._rows)} places")
+
+    def _ensure_loaded(self):
+        if self.loader is None:
+            return
+        loaded_at = self._loaded_at
+        if loaded_at is not None and (self.max_age is None or self.clock() - loaded_at < self.max_age):
+            return
+        with self._lock:
+            if self._loaded_at is loaded_at:
+                self.load(self.loader())
+
+    def upsert(self, place_id, lat, lon):
+        """Add a place or move it."""
+        with self._lock:
+            row = self._rows.get(place_id)
+            if row is None:
+                row = self._free.pop() if self._free else self._append_row()
+                self._rows[place_id] = row
+            self._ids[row] = place_id
+            self._xyz[row] = to_xyz(lat, lon)
+            self._alive[row] = True
+
+    def upsert_many(self, positions):
+        """Add places written outside the session (bulk inserts) as (place_id, lat, lon) tuples."""
+        # Pas encore chargé : le premier chargement lira ces lieux dans la base
+        if self._loaded_at is None:
+            return
+        for place_id, lat, lon in positions:
+            self.upsert(place_id, lat, lon)
+
+    def _append_row(self):
+        if self._size == len(self._ids):
+            # Tableaux pleins : on double la capacité
+            capacity = 2 * len(self._ids)
+            self._xyz = np.resize(self._xyz, (capacity, 3))
+            self._ids = np.resize(self._ids, capacity)
+            self._alive = np.concatenate([self._alive[:self._size],
+                                          np.zeros(capacity - self._size, dtype=bool)])
+        self._size += 1
+        return self._size - 1
+
+    def remove(self, place_id):
+        with self._lock:
+            row = self._rows.pop(place_id, None)
+            if row is not None:
+                self._alive[row] = False
+                self._free.append(row)
+
+    def _similarities(self, lat, lon):
+        """Dot products of the query point with every row (-2 for free rows)."""
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValueError("Latitude must be between -90 and 90 and longitude between -180 and 180")
+        query = to_xyz(lat, lon)
+        size = self._size
+        dots = self._xyz[:size] @ query
+        dots[~self._alive[:size]] = -2.0
+        return query, dots
+
+    def _results(self, query, rows, dots):
+        """(id, distance_km) of rows, nearest first (ties in row order)."""
+        rows = np.sort(rows)
+        rows = rows[np.argsort(-dots[rows], kind='stable')]
+        chords = np.linalg.norm(self._xyz[rows] - query, axis=1)
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chords / 2, 1.0))
+        return list(zip(self._ids[rows].tolist(), distances.tolist()))
+
+    def nearest(self, lat, lon, k):
+        """The k places closest to (lat, lon) as (id, distance_km) tuples, nearest first."""
+        if k < 1:
+            raise ValueError("k must be a positive integer")
+        self._ensure_loaded()
+        with self._lock:
+            k = min(k, len(self._rows))
+            if k == 0:
+                return []
+            query, dots = self._similarities(lat, lon)
+            rows = np.argpartition(-dots, k - 1)[:k] if k < len(dots) else np.arange(len(dots))
+            return self._results(query, rows, dots)
+
+    def within_radius(self, lat, lon, radius_km, limit=None):
+        """Places within radius_km of (lat, lon) as (id, distance_km) tuples, nearest first."""
+        if radius_km <= 0:
+            raise ValueError("radius_km must be positive")
+        self._ensure_loaded()
+        with self._lock:
+            query, dots = self._similarities(lat, lon)
+            # Distance <= r  <=>  produit scalaire >= cos(r / R)
+            threshold = math.cos(min(radius_km / EARTH_RADIUS_KM, math.pi))
+            rows = np.flatnonzero(dots >= threshold)
+            results = self._results(query, rows, dots)
+        return results[:limit] if limit is not None else results
+
+    def _collect_changes(self, session, flush_context):
+        changes = session.info.setdefault(('geo_changes', id(self)), {})
+        for obj in list(session.new) + list(session.dirty):
+            if isinstance(obj, self.model):
+                state = inspect(obj)
+                lat, lon = state.dict.get('latitude'), state.dict.get('longitude')
+                # Position non chargée : on ne sait pas où est le lieu, rechargement complet
+                changes[state.dict['id']] = (lat, lon) if lat is not None and lon is not None else 'reload'
+        for obj in session.deleted:
+            if isinstance(obj, self.model):
+                changes[inspect(obj).dict['id']] = None
+
+    def _apply_changes(self, session):
+        changes = session.info.pop(('geo_changes', id(self)), None)
+        if not changes or self._loaded_at is None:
+            return
+        if 'reload' in changes.values():
+            self._loaded_at = None
+            return
+        for place_id, position in changes.items():
+            if position is None:
+                self.remove(place_id)
+            else:
+                self.upsert(place_id, *position)
+
+    def _discard_changes(self, session, previous_transaction):
+        if previous_transaction.parent is None:
+            session.info.pop(('geo_changes', id(self)), None)
+
+    def close(self):
+        """Unregister the session event listeners of this engine."""
+        if self.model is not None:
+            event.remove(Session, 'after_flush', self._collect_changes)
+            event.remove(Session, 'after_commit', self._apply_changes)
+            event.remove(Session, 'after_soft_rollback', self._discard_changes)
+        self.reset()
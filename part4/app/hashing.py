@@ -0,0 +1,218 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUNDS = 12
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+
+class HashingPoolSaturated(Exception):
+    """Raised when the hashing pool queue is full (answered with 429)."""
+
+
+class HashingPoolTimeout(Exception):
+    """Raised when a hashing job waited longer than the pool timeout (answered with 503)."""
+
+
+class HashingPool:
+    """
+    Bounded thread pool running bcrypt jobs off the request thread.
+
+    bcrypt releases the GIL, so at most `workers` hashes burn CPU at the same
+    time whatever the number of concurrent logins; the other request threads
+    keep the remaining CPU. At most max_queue jobs may wait for a worker:
+    beyond that run() fails fast with HashingPoolSaturated instead of letting
+    latency grow for every route.
+
+    :param workers: Number of hashing threads.
+    :param max_queue: Number of jobs allowed to wait for a free thread.
+    :param timeout: Seconds a caller waits for its result, None for no limit.
+    """
+
+    def __init__(self, workers, max_queue, timeout=None, clock=time.monotonic):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._lock = threading.Lock()
+        self._started_at = clock()
+        self._in_flight = 0
+        self._active = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._busy_seconds = 0.0
+        self._wait_seconds = 0.0
+
+    def run(self, fn, *args):
+        """Run fn(*args) on a pool thread and return its result."""
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HashingPoolSaturated("Too many password operations in progress")
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(self._call, self.clock(), fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise HashingPoolTimeout("Password operation timed out")
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _call(self, submitted_at, fn, *args):
+        started_at = self.clock()
+        with self._lock:
+            self._active += 1
+            self._wait_seconds += started_at - submitted_at
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self.completed += 1
+                self._busy_seconds += self.clock() - started_at
+
+    def stats(self):
+        """Return the utilisation counters of the pool."""
+        with self._lock:
+            uptime = max(self.clock() - self._started_at, 1e-9)
+            return {
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'active': self._active,
+                'queued': self._in_flight - self._active,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': self._wait_seconds / self.completed * 1000 if self.completed else 0.0,
+                'utilisation': min(self._busy_seconds / (self.workers * uptime), 1.0),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+class PasswordHasher:
+    """
+    Single entry point for hashing and checking user passwords (bcrypt).
+
+    The work factor comes from BCRYPT_LOG_ROUNDS. When PASSWORD_HASH_TARGET_MS
+    is set, init_app() instead calibrates the highest cost whose hash stays
+    under that latency on this machine (never below BCRYPT_LOG_ROUNDS).
+    Hashes made with another cost still verify; verify_and_update() returns
+    a new hash for them so the caller can store it on login.
+
+    With PASSWORD_POOL_WORKERS > 0 (the default is one thread less than the
+    number of CPUs), hashing and checking run on a bounded HashingPool.
+    """
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, pool=None):
+        self.rounds = rounds
+        self.pool = pool
+
+    def init_app(self, app):
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_ROUNDS)
+        target_ms = app.config.get('PASSWORD_HASH_TARGET_MS')
+        if target_ms:
+            self.rounds = self.calibrate(target_ms, min_rounds=self.rounds,
+                                         max_rounds=app.config.get('PASSWORD_HASH_MAX_ROUNDS', 16))
+        logger.debug(f"Password hashing cost set to {self.rounds} rounds")
+
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        workers = app.config.get('PASSWORD_POOL_WORKERS')
+        if workers is None:
+            workers = max(1, (os.cpu_count() or 2) - 1)
+        if workers > 0:
+            self.pool = HashingPool(workers, app.config.get('PASSWORD_POOL_QUEUE', 32),
+                                    timeout=app.config.get('PASSWORD_POOL_TIMEOUT'))
+
+    def _run(self, fn, *args):
+        if self.pool is None:
+            return fn(*args)
+        return self.pool.run(fn, *args)
+
+    def stats(self):
+        """Return the hashing pool counters (None when hashing runs inline)."""
+        return self.pool.stats() if self.pool is not None else None
+
+    def hash(self, password):
+        """Hash a plain-text password with the current cost."""
+        return self._run(self._hash, password, self.rounds)
+
+    @staticmethod
+    def _hash(password, rounds):
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+    def verify(self, hashed, password):
+        """Check a plain-text password against a stored hash."""
+        if not hashed:
+            return False
+        return self._run(self._verify, hashed, password)
+
+    @staticmethod
+    def _verify(hashed, password):
+        try:
+            return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        except ValueError:
+            # Valeur stockée qui n'est pas un hash bcrypt
+            return False
+
+    @staticmethod
+    def cost_of(hashed):
+        """Return the work factor of a bcrypt hash ($2b$<cost>$...), or None."""
+        try:
+            return int(hashed.split('$')[2])
+        except (AttributeError, IndexError, ValueError):
+            return None
+
+    def needs_rehash(self, hashed):
+        return self.cost_of(hashed) != self.rounds
+
+    def verify_and_update(self, hashed, password):
+        """
+        Check a password and tell whether its hash should be replaced.
+
+        :return: A tuple (valid, new_hash); new_hash is None unless the
+            password is valid and was hashed with another cost.
+        """
+        if not self.verify(hashed, password):
+            return False, None
+        if self.needs_rehash(hashed):
+            return True, self.hash(password)
+        return True, None
+
+    def calibrate(self, target_ms, min_rounds=MIN_ROUNDS, max_rounds=16):
+        """
+        Return the highest cost whose hash takes at most target_ms here.
+
+        bcrypt doubles its work with every round, so one timing at min_rounds
+        is enough to extrapolate the others.
+        """
+        start = time.perf_counter()
+        bcrypt.hashpw(b'calibration', bcrypt.gensalt(min_rounds))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        rounds = min_rounds
+        while rounds < min(max_rounds, MAX_ROUNDS) and elapsed_ms * 2 <= target_ms:
+            elapsed_ms *= 2
+            rounds += 1
+        logger.info(f"Calibrated password hashing to {rounds} rounds (~{elapsed_ms:.0f} ms)")
+        return rounds
@@ -8,3 +8,4 @@ from .user import User
 from .place import Place
 from .review import Review
 from .amenity import Amenity
+from .revoked_token import RevokedToken
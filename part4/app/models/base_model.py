@@ -2,7 +2,8 @@
 import uuid
 from datetime import datetime
 from app import db  # Import de SQLAlchemy pour que BaseModel soit un modèle ORM
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Index
+from sqlalchemy.orm import declared_attr
 
 class BaseModel(db.Model):
     __abstract__ = True  # Indique que cette classe ne doit pas créer de table
@@ -11,6 +12,14 @@ class BaseModel(db.Model):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Index propres à un modèle, ajoutés à celui de la pagination (ne pas redéfinir __table_args__)
+    __indexes__ = ()
+
+    @declared_attr
+    def __table_args__(cls):
+        # Index (created_at, id) utilisé par la pagination par curseur
+        return (Index(f'ix_{cls.__tablename__}_created_at_id', 'created_at', 'id'), *cls.__indexes__)
+
     def save(self):
         """Update the updated_at timestamp whenever the object is modified"""
         self.updated_at = datetime.utcnow()
@@ -1,18 +1,47 @@
 from app import db
 from .base_model import BaseModel
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Table, Index, case, cast, inspect, literal_column
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.elements import ClauseElement
 
 # 👇 on définit l'association ici, comme demandé par ton école
 place_amenity_association = Table(
     'place_amenity_association',
     db.metadata,
-    Column('place_id', Integer, ForeignKey('places.id'), primary_key=True),
-    Column('amenity_id', Integer, ForeignKey('amenities.id'), primary_key=True)
+    Column('place_id', Integer, ForeignKey('places.id', ondelete='CASCADE'), primary_key=True),
+    Column('amenity_id', Integer, ForeignKey('amenities.id', ondelete='CASCADE'), primary_key=True),
+    # La clé primaire commence par place_id : filtre "lieux ayant l'amenity X"
+    Index('ix_place_amenity_amenity_id', 'amenity_id', 'place_id'),
 )
 
+
+def average_rating(rating_sum, review_count):
+    """Average of the ratings of a place, 0 when it has no review."""
+    return rating_sum / review_count if review_count else 0.0
+
+
+def _average_rating_sql(rating_sum, review_count):
+    # Même expression pour le tri et pour l'index ix_places_avg_rating_id, constantes écrites en
+    # littéraux : avec des paramètres liés (?), SQLite ne reconnaît plus l'expression de l'index
+    return case((review_count > literal_column('0'), cast(rating_sum, Float) / review_count),
+                else_=literal_column('0.0'))
+
+
 class Place(BaseModel, db.Model):
     __tablename__ = 'places'
+    __indexes__ = (
+        # Filtres et tris de GET /places/ (voir PlaceRepository.search)
+        Index('ix_places_price_id', 'price', 'id'),
+        Index('ix_places_owner_id', 'owner_id'),
+    )
+
+    @classmethod
+    def __declare_last__(cls):
+        # Index sur une expression : déclaré une fois les colonnes mappées
+        Index('ix_places_avg_rating_id', _average_rating_sql(cls.__table__.c.rating_sum,
+                                                             cls.__table__.c.review_count),
+              cls.__table__.c.id)
 
     id = Column(Integer, primary_key=True)
     title = Column(String(100), nullable=False)
@@ -20,14 +49,21 @@ class Place(BaseModel, db.Model):
     price = Column(Float, default=0.0)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    # Agrégats des reviews, tenus à jour par le facade dans la transaction qui écrit la review
+    review_count = Column(Integer, nullable=False, default=0, server_default='0')
+    rating_sum = Column(Integer, nullable=False, default=0, server_default='0')
 
-    owner_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    owner_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     owner = relationship('User', back_populates='places', lazy=True)
 
-    reviews = relationship('Review', back_populates='place', lazy=True)
+    # Suppression d'un lieu : la base supprime ses reviews et ses liens vers les amenities
+    # (ON DELETE CASCADE), sans que l'ORM les charge
+    reviews = relationship('Review', back_populates='place', lazy=True, cascade='all, delete-orphan',
+                           passive_deletes=True)
 
     # Utilisation d'une string dans relationship() pour éviter les imports circulaires
-    amenities = relationship('Amenity', secondary=place_amenity_association, back_populates='places', lazy=True)
+    amenities = relationship('Amenity', secondary=place_amenity_association, back_populates='places', lazy=True,
+                             passive_deletes=True)
 
     def __init__(self, title, description="", price=0.0, latitude=0.0, longitude=0.0, owner_id=None, owner=None):
         super().__init__()
@@ -36,6 +72,8 @@ class Place(BaseModel, db.Model):
         self.price = price
         self.latitude = latitude
         self.longitude = longitude
+        self.review_count = 0
+        self.rating_sum = 0
 
         # Gestion de owner et owner_id :
         if owner and owner_id:
@@ -68,6 +106,31 @@ class Place(BaseModel, db.Model):
         if not isinstance(self.longitude, (int, float)) or not (-180 <= self.longitude <= 180):
             raise ValueError("Longitude must be between -180 and 180")
 
+    @hybrid_property
+    def avg_rating(self):
+        return average_rating(self.rating_sum, self.review_count)
+
+    @avg_rating.expression
+    def avg_rating(cls):
+        return _average_rating_sql(cls.rating_sum, cls.review_count)
+
+    def adjust_ratings(self, count_delta, sum_delta):
+        """
+        Add deltas to review_count and rating_sum.
+
+        On a stored place the change is flushed as "column = column + delta",
+        so two reviews written at the same time cannot overwrite each other's
+        update. Several calls before a flush add up.
+        """
+        persistent = inspect(self).persistent
+        for name, delta in (('review_count', count_delta), ('rating_sum', sum_delta)):
+            current = self.__dict__.get(name)
+            if not persistent:
+                setattr(self, name, (current or 0) + delta)
+            else:
+                base = current if isinstance(current, ClauseElement) else getattr(Place, name)
+                setattr(self, name, base + delta)
+
     def add_amenity(self, amenity):
         if amenity not in self.amenities:
             self.amenities.append(amenity)
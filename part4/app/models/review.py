@@ -2,20 +2,28 @@ from app import db
 from .base_model import BaseModel
 from .place import Place
 from .user import User
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 class Review(BaseModel, db.Model):
     __tablename__ = 'reviews'
+    __indexes__ = (
+        # Note moyenne par lieu lue dans l'index, sans toucher la table
+        Index('ix_reviews_place_id_rating', 'place_id', 'rating'),
+        # Reviews d'un lieu dans l'ordre de pagination (ReviewRepository.get_by_place_id)
+        Index('ix_reviews_place_id_created_at_id', 'place_id', 'created_at', 'id'),
+        # Une review par utilisateur et par lieu, même pour deux POST simultanés
+        Index('ix_reviews_user_id_place_id', 'user_id', 'place_id', unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
     text = Column(String, nullable=False)
     rating = Column(Integer, nullable=False)
 
-    place_id = Column(Integer, ForeignKey('places.id'), nullable=False)
+    place_id = Column(Integer, ForeignKey('places.id', ondelete='CASCADE'), nullable=False)
     place = relationship("Place", back_populates="reviews", lazy=True)
 
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     user = relationship("User", back_populates="reviews", lazy=True)
 
     def __init__(self, text, rating, place=None, user=None):
@@ -0,0 +1,23 @@
+from app import db
+from sqlalchemy import Column, Integer, String, Index
+
+
+class RevokedToken(db.Model):
+    """
+    Révocation d'un JWT (kind='jti') ou de toute une session (kind='fam'),
+    conservée jusqu'à expires_at (timestamp Unix) puis purgée.
+    """
+    __tablename__ = 'revoked_tokens'
+
+    # Identifiant croissant : les workers se synchronisent sur les lignes d'id > au dernier vu.
+    # AUTOINCREMENT : sans lui, SQLite réattribue les ids des dernières lignes purgées
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(3), nullable=False)
+    key = Column(String(64), nullable=False)
+    expires_at = Column(Integer, nullable=False, index=True)
+
+    __table_args__ = (Index('ux_revoked_tokens_kind_key', 'kind', 'key', unique=True),
+                      {'sqlite_autoincrement': True})
+
+    def __repr__(self):
+        return f"<RevokedToken {self.kind}={self.key}>"
@@ -1,21 +1,36 @@
-from app import db, bcrypt
+from app import db
+from app.extensions import password_hasher
 from .base_model import BaseModel
 import re
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Index
 from sqlalchemy.orm import validates, relationship
 
+
+def normalize_email(email):
+    """Forme canonique d'un email pour les recherches et l'unicité (sans casse ni espaces)."""
+    return email.strip().lower()
+
+
 class User(BaseModel, db.Model):
     __tablename__ = 'users'
+    __indexes__ = (
+        # Recherche du login et unicité insensible à la casse
+        Index('ix_users_email_normalized', 'email_normalized', unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
     first_name = Column(String(50), nullable=False)
     last_name = Column(String(50), nullable=False)
     email = Column(String(120), unique=True, nullable=False)
+    email_normalized = Column(String(120), nullable=False)  # Tenu à jour par validate_email
     password = Column(String(128), nullable=False)
     is_admin = Column(Boolean, default=False)
 
-    places = relationship('Place', back_populates='owner', cascade='all, delete-orphan')
-    reviews = relationship("Review", back_populates="user", lazy=True)
+    # Suppression d'un utilisateur : ses lieux et ses reviews sont supprimés par la base
+    # (ON DELETE CASCADE) au lieu d'être chargés puis supprimés un par un
+    places = relationship('Place', back_populates='owner', cascade='all, delete-orphan', passive_deletes=True)
+    reviews = relationship("Review", back_populates="user", lazy=True, cascade='all, delete-orphan',
+                           passive_deletes=True)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -27,17 +42,20 @@ class User(BaseModel, db.Model):
     def validate_email(self, key, email):
         if not re.match(r'^[\w\.-]+@[\w-]+\.[\w]{2,3}$', email):
             raise ValueError("Email invalide")
+        self.email_normalized = normalize_email(email)
         return email
 
     def hash_password(self, password):
         if not password.strip():
             raise ValueError("Mot de passe vide")
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password = password_hasher.hash(password)
 
     def verify_password(self, password):
-        if not self.password:
-            return False
-        return bcrypt.check_password_hash(self.password, password)
+        """Check the password; re-hash it in place if the bcrypt cost has changed."""
+        valid, new_hash = password_hasher.verify_and_update(self.password, password)
+        if new_hash:
+            self.password = new_hash
+        return valid
 
     def validate(self):
         if not self.first_name or len(self.first_name) > 50:
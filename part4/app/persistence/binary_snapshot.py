@@ -0,0 +1,321 @@
+import bisect
+import json
+import logging
+import mmap
+import os
+import struct
+from array import array
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from app.persistence.repository import DEFAULT_BATCH_SIZE, InMemoryRepository
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'HBNBSNP1'
+EPOCH = datetime(1970, 1, 1)
+
+# Column layouts of the four entities, id first (rows are stored sorted by id)
+SCHEMAS = {
+    'users': [('id', 'i64'), ('first_name', 'str'), ('last_name', 'str'), ('email', 'str'),
+              ('password', 'str'), ('is_admin', 'bool'), ('created_at', 'datetime'),
+              ('updated_at', 'datetime')],
+    'places': [('id', 'i64'), ('title', 'str'), ('description', 'str'), ('price', 'f64'),
+               ('latitude', 'f64'), ('longitude', 'f64'), ('owner_id', 'i64'),
+               ('created_at', 'datetime'), ('updated_at', 'datetime')],
+    'reviews': [('id', 'i64'), ('text', 'str'), ('rating', 'i64'), ('place_id', 'i64'),
+                ('user_id', 'i64'), ('created_at', 'datetime'), ('updated_at', 'datetime')],
+    'amenities': [('id', 'i64'), ('name', 'str'), ('created_at', 'datetime'),
+                  ('updated_at', 'datetime')],
+}
+
+_TYPECODES = {'i64': 'q', 'f64': 'd', 'bool': 'B', 'datetime': 'q'}
+
+
+def _to_micros(value):
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _pad(buffer):
+    buffer.write(b'\0' * (-buffer.tell() % 8))
+
+
+def write_snapshot(path, schema, objects):
+    """
+    Write objects to path in the binary snapshot format.
+
+    Layout: MAGIC, u64 header length, JSON header, then for every column an
+    8-byte aligned null mask (one byte per row) and its data: a packed array
+    for numbers/booleans/datetimes (microseconds since epoch), or a u64
+    offsets array (rows + 1 entries) followed by a UTF-8 blob for strings.
+
+    :param schema: List of (attribute, kind) pairs, the first one being the id.
+    :param objects: Objects or dicts to store.
+    """
+    rows = [obj if isinstance(obj, dict) else {name: getattr(obj, name, None) for name, _ in schema}
+            for obj in objects]
+    rows.sort(key=lambda row: row[schema[0][0]])
+    sections = []
+    for name, kind in schema:
+        values = [row.get(name) for row in rows]
+        nulls = bytes(value is None for value in values)
+        if kind == 'str':
+            offsets, chunks, position = array('Q', [0]), [], 0
+            for value in values:
+                encoded = (value or '').encode('utf-8')
+                chunks.append(encoded)
+                position += len(encoded)
+                offsets.append(position)
+            sections.append((name, kind, nulls, offsets.tobytes(), b''.join(chunks)))
+        else:
+            if kind == 'datetime':
+                values = [_to_micros(value) if value is not None else 0 for value in values]
+            else:
+                values = [value if value is not None else 0 for value in values]
+            sections.append((name, kind, nulls, array(_TYPECODES[kind], values).tobytes(), None))
+
+    # Les offsets dépendent de la taille de l'en-tête : on itère jusqu'à ce qu'elle soit stable
+    header_len = 0
+    while True:
+        start = 16 + header_len + (-(16 + header_len) % 8)
+        raw_header = json.dumps(_describe(sections, start, len(rows))).encode('utf-8')
+        if len(raw_header) <= header_len:
+            break
+        header_len = len(raw_header)
+    raw_header = raw_header.ljust(header_len)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as snapshot:
+        snapshot.write(MAGIC)
+        snapshot.write(struct.pack('<Q', header_len))
+        snapshot.write(raw_header)
+        _pad(snapshot)
+        for _, kind, nulls, data, blob in sections:
+            for part in (nulls, data, blob):
+                if part is not None:
+                    snapshot.write(part)
+                    _pad(snapshot)
+        snapshot.flush()
+        os.fsync(snapshot.fileno())
+    os.replace(tmp_path, path)
+    logger.debug(f"Wrote {len(rows)} rows to binary snapshot {path}")
+
+
+def _describe(sections, position, nb_rows):
+    columns = []
+    for name, kind, nulls, data, blob in sections:
+        column = {'name': name, 'kind': kind, 'nulls': position}
+        position += len(nulls) + (-len(nulls) % 8)
+        column['data'] = position
+        position += len(data) + (-len(data) % 8)
+        if blob is not None:
+            column['blob'] = position
+            column['blob_len'] = len(blob)
+            position += len(blob) + (-len(blob) % 8)
+        columns.append(column)
+    return {'rows': nb_rows, 'columns': columns}
+
+
+class BinarySnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot written by write_snapshot().
+
+    Opening only parses the JSON header; numeric columns are zero-copy
+    memoryviews over the mapping and strings are decoded on access, so the
+    cost of reading a row does not depend on the size of the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:8] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an HBnB binary snapshot")
+        view = memoryview(self._mmap)
+        self._views = [view]
+        header_len, = struct.unpack_from('<Q', view, 8)
+        header = json.loads(bytes(view[16:16 + header_len]))
+        self.rows = header['rows']
+        self.schema = [(column['name'], column['kind']) for column in header['columns']]
+        self._columns = {}
+        for column in header['columns']:
+            kind, rows = column['kind'], self.rows
+            nulls = view[column['nulls']:column['nulls'] + rows]
+            if kind == 'str':
+                raw = view[column['data']:column['data'] + (rows + 1) * 8]
+                offsets = raw.cast('Q')
+                blob = view[column['blob']:column['blob'] + column['blob_len']]
+                self._views.extend((nulls, raw, offsets, blob))
+                self._columns[column['name']] = (kind, nulls, offsets, blob)
+            else:
+                size = 1 if kind == 'bool' else 8
+                raw = view[column['data']:column['data'] + rows * size]
+                data = raw.cast(_TYPECODES[kind])
+                self._views.extend((nulls, raw, data))
+                self._columns[column['name']] = (kind, nulls, data, None)
+        self.ids = self._columns[self.schema[0][0]][2]
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        """Return the raw column (memoryview) of a numeric attribute."""
+        return self._columns[name][2]
+
+    def value(self, name, index):
+        kind, nulls, data, blob = self._columns[name]
+        if nulls[index]:
+            return None
+        if kind == 'str':
+            return bytes(blob[data[index]:data[index + 1]]).decode('utf-8')
+        if kind == 'bool':
+            return bool(data[index])
+        if kind == 'datetime':
+            return EPOCH + timedelta(microseconds=data[index])
+        return data[index]
+
+    def row(self, index):
+        """Decode one row into a dict."""
+        return {name: self.value(name, index) for name, _ in self.schema}
+
+    def find(self, obj_id):
+        """Return the row index of obj_id (binary search on the id column), or None."""
+        try:
+            obj_id = int(obj_id)
+        except (TypeError, ValueError):
+            return None
+        index = bisect.bisect_left(self.ids, obj_id)
+        if index < self.rows and self.ids[index] == obj_id:
+            return index
+        return None
+
+    def close(self):
+        self._columns = {}
+        self.ids = None
+        # Les vues dérivées doivent être libérées avant la vue parente, puis le mapping
+        for view in reversed(getattr(self, '_views', [])):
+            view.release()
+        self._views = []
+        self._mmap.close()
+        self._file.close()
+
+
+class MappedInMemoryRepository(InMemoryRepository):
+    """
+    InMemoryRepository backed by a memory-mapped BinarySnapshot.
+
+    Objects stay in the snapshot until first accessed: get() binary-searches
+    the id column and materializes only that row with factory(row_dict). Writes
+    go to the in-memory overlay (deleted snapshot rows are remembered), so a
+    worker can serve reads right after mapping the file. Operations that need
+    every object (get_all, get_page, non-indexed lookups) materialize the
+    whole snapshot once.
+    """
+
+    def __init__(self, snapshot_path, factory=None, unique_indexes=(), indexes=()):
+        super().__init__(unique_indexes=unique_indexes, indexes=indexes)
+        self.snapshot = BinarySnapshot(snapshot_path)
+        self.factory = factory or (lambda row: SimpleNamespace(**row))
+        self._deleted = set()
+        self._fully_materialized = len(self.snapshot) == 0
+
+    def _materialize(self, index):
+        obj = self.factory(self.snapshot.row(index))
+        self._storage[obj.id] = obj
+        self._index(obj)
+        return obj
+
+    def _materialize_all(self):
+        if self._fully_materialized:
+            return
+        for index in range(len(self.snapshot)):
+            obj_id = self.snapshot.ids[index]
+            if obj_id not in self._storage and obj_id not in self._deleted:
+                self._materialize(index)
+        self._fully_materialized = True
+        logger.debug(f"Materialized {len(self.snapshot)} rows from {self.snapshot.path}")
+
+    def get(self, obj_id):
+        obj = self._storage.get(obj_id)
+        if obj is not None:
+            return obj
+        index = self.snapshot.find(obj_id)
+        if index is None or self.snapshot.ids[index] in self._deleted:
+            return None
+        if self.snapshot.ids[index] in self._storage:
+            return self._storage[self.snapshot.ids[index]]
+        return self._materialize(index)
+
+    def get_many(self, obj_ids):
+        found = {}
+        for obj_id in obj_ids:
+            obj = self.get(obj_id)
+            if obj is not None:
+                found.setdefault(obj.id, obj)
+        return list(found.values())
+
+    def get_all(self):
+        self._materialize_all()
+        return super().get_all()
+
+    def iter_all(self, batch_size=DEFAULT_BATCH_SIZE, where=None):
+        """
+        Stream the store in snapshot order without materializing it: rows not
+        yet accessed are decoded on the fly and not kept, followed by the
+        objects added since the snapshot.
+        """
+        for start in range(0, len(self.snapshot), batch_size):
+            for index in range(start, min(start + batch_size, len(self.snapshot))):
+                obj_id = self.snapshot.ids[index]
+                if obj_id in self._deleted:
+                    continue
+                obj = self._storage.get(obj_id)
+                if obj is None:
+                    obj = self.factory(self.snapshot.row(index))
+                if where is None or where(obj):
+                    yield obj
+        for obj_id in list(self._storage):
+            obj = self._storage.get(obj_id)
+            if obj is not None and self.snapshot.find(obj_id) is None and (where is None or where(obj)):
+                yield obj
+
+    def get_page(self, cursor=None, limit=None, with_total=False):
+        self._materialize_all()
+        return super().get_page(cursor=cursor, limit=limit, with_total=with_total)
+
+    def add(self, obj):
+        self._deleted.discard(obj.id)
+        return super().add(obj)
+
+    def update(self, obj_id, data):
+        if self.get(obj_id) is None:
+            return None
+        return super().update(obj_id, data)
+
+    def delete(self, obj_id):
+        obj = self.get(obj_id)
+        if obj is None:
+            return False
+        self._deleted.add(obj.id)
+        return super().delete(obj.id)
+
+    def get_by_attribute(self, attr_name, attr_value):
+        # Les index secondaires ne couvrent que les objets matérialisés
+        self._materialize_all()
+        return super().get_by_attribute(attr_name, attr_value)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        self._materialize_all()
+        return super().get_all_by_attribute(attr_name, attr_value)
+
+    def close(self):
+        self.snapshot.close()
+
+
+def write_model_snapshot(path, model):
+    """Dump the table of a part4 SQLAlchemy model into a binary snapshot."""
+    from app.extensions import db
+    schema = SCHEMAS[model.__tablename__]
+    columns = [getattr(model, name) for name, _ in schema]
+    rows = [dict(row._mapping) for row in db.session.execute(db.select(*columns))]
+    write_snapshot(path, schema, rows)
@@ -0,0 +1,299 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from app.extensions import db
+
+logger = logging.getLogger(__name__)
+
+
+class CachedRepository:
+    """
+    Read-through LRU/TTL cache in front of a SQLAlchemyRepository.
+
+    get() serves an object from the cache without any SQL: the cache keeps a
+    copy of the committed column values and merges a rebuilt instance into the
+    current session (relationships are still lazy-loaded on demand). Entries
+    are invalidated by this wrapper's own update/delete and, for changes made
+    through any session, by SQLAlchemy after_commit events (or after the
+    rollback of the transaction). Objects read in a transaction that has
+    flushed changes to them are not cached: their values are not committed
+    yet. Every other repository method is delegated unchanged.
+
+    Invalidation only sees the commits of this process: with several
+    workers, a row changed by another one is served stale until its entry
+    expires (ttl). Do not put in front of rows whose staleness matters for
+    security, such as User (is_admin, password).
+
+    :param repository: The SQLAlchemyRepository to wrap.
+    :param max_size: Maximum number of cached objects (least recently used evicted).
+    :param ttl: Lifetime of an entry in seconds, None for no expiry.
+    :param enabled: When False, get() goes straight to the repository.
+    """
+
+    def __init__(self, repository, max_size=1024, ttl=300, enabled=True, clock=time.monotonic):
+        self.repository = repository
+        self.model = repository.model
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = enabled
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()  # id -> (expires_at, column values)
+        self._lock = threading.Lock()
+        event.listen(Session, 'after_flush', self._collect_changes)
+        event.listen(Session, 'after_commit', self._apply_invalidations)
+        event.listen(Session, 'after_soft_rollback', self._discard_changes)
+
+    def __getattr__(self, name):
+        if name == 'repository':
+            raise AttributeError(name)
+        return getattr(self.repository, name)
+
+    def configure(self, max_size=None, ttl=None, enabled=None):
+        """Change the cache settings and drop every entry."""
+        if max_size is not None:
+            self.max_size = max_size
+        if ttl is not None:
+            self.ttl = ttl
+        if enabled is not None:
+            self.enabled = enabled
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return the hit/miss counters of this cache."""
+        return {'model': self.model.__name__, 'enabled': self.enabled, 'size': len(self._entries),
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'invalidations': self.invalidations}
+
+    def _key(self, obj_id):
+        return self.repository._coerce_id(obj_id)
+
+    def get(self, obj_id, profile=None):
+        if not self.enabled:
+            return self.repository.get(obj_id, profile=profile)
+        key = self._key(obj_id)
+        if key is None:
+            return None
+        values = self._lookup(key)
+        if values is not None:
+            self.hits += 1
+            return self._attach(key, values)
+        self.misses += 1
+        obj = self.repository.get(key, profile=profile)
+        if obj is not None:
+            self._store(key, obj)
+        return obj
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at is not None and expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return values
+
+    def _store(self, key, obj):
+        state = inspect(obj)
+        if state.modified or state.pending or self._pending(key):
+            return
+        columns = [attr.key for attr in state.mapper.column_attrs]
+        # Un objet chargé avec load_only n'a pas toutes ses colonnes : on ne le met pas en cache
+        if any(column not in state.dict for column in columns):
+            return
+        values = {column: state.dict[column] for column in columns}
+        expires_at = self.clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _attach(self, key, values):
+        """Return the session's instance for key, rebuilding it from values if needed."""
+        session = db.session()
+        mapper = self.model.__mapper__
+        existing = session.identity_map.get(mapper.identity_key_from_primary_key((key,)))
+        if existing is not None:
+            return existing
+        obj = mapper.class_manager.new_instance()
+        for column, value in values.items():
+            set_committed_value(obj, column, value)
+        make_transient_to_detached(obj)
+        return session.merge(obj, load=False)
+
+    def invalidate(self, obj_id):
+        key = self._key(obj_id)
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def update(self, obj_id, data):
+        obj = self.repository.update(obj_id, data)
+        self.invalidate(obj_id)
+        return obj
+
+    def delete(self, obj_id):
+        deleted = self.repository.delete(obj_id)
+        self.invalidate(obj_id)
+        return deleted
+
+    def _pending(self, key):
+        # Écrit par la transaction en cours : valeurs pas encore validées
+        return key in db.session().info.get(('cache_invalidations', id(self)), ())
+
+    def _collect_changes(self, session, flush_context):
+        changed = session.info.setdefault(('cache_invalidations', id(self)), set())
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, self.model):
+                changed.add(inspect(obj).mapper.primary_key_from_instance(obj)[0])
+
+    def _apply_invalidations(self, session):
+        for key in session.info.pop(('cache_invalidations', id(self)), ()):
+            self.invalidate(key)
+
+    def _discard_changes(self, session, previous_transaction):
+        if previous_transaction.parent is None:
+            # Lignes écrites puis annulées : aucune entrée ne doit garder leurs valeurs
+            self._apply_invalidations(session)
+
+    def close(self):
+        """Unregister the session event listeners of this cache."""
+        event.remove(Session, 'after_flush', self._collect_changes)
+        event.remove(Session, 'after_commit', self._apply_invalidations)
+        event.remove(Session, 'after_soft_rollback', self._discard_changes)
+        self.clear()
+
+
+class EmailLookupCache:
+    """
+    LRU/TTL cache of normalized email -> user id.
+
+    Answers the duplicate-email check of a signup without SQL. Only existing
+    users are cached. When a user is inserted, updated or deleted through any
+    session of this process, the entries of its old and new emails are
+    dropped after the commit; another worker's change is only seen once the
+    entry expires, which at worst delays a signup check by the TTL. The
+    password hash and is_admin are never cached: a password change or a
+    demotion on one worker must apply to the next login on every worker.
+
+    :param repository: The UserRepository (or its CachedRepository) providing
+        get_user_id(email) and normalize_email(email).
+    :param max_size: Maximum number of cached emails (least recently used evicted).
+    :param ttl: Lifetime of an entry in seconds, None for no expiry.
+    :param enabled: When False, every lookup goes to the repository.
+    """
+
+    def __init__(self, repository, max_size=1024, ttl=300, enabled=True, clock=time.monotonic):
+        self.repository = repository
+        self.model = repository.model
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = enabled
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()  # email normalisé -> (expires_at, id)
+        self._lock = threading.Lock()
+        event.listen(Session, 'after_flush', self._collect_changes)
+        event.listen(Session, 'after_commit', self._apply_invalidations)
+        event.listen(Session, 'after_soft_rollback', self._discard_changes)
+
+    def configure(self, max_size=None, ttl=None, enabled=None):
+        """Change the cache settings and drop every entry."""
+        if max_size is not None:
+            self.max_size = max_size
+        if ttl is not None:
+            self.ttl = ttl
+        if enabled is not None:
+            self.enabled = enabled
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return the hit/miss counters of this cache."""
+        return {'model': f'{self.model.__name__}.email', 'enabled': self.enabled,
+                'size': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'invalidations': self.invalidations}
+
+    def get(self, email):
+        """Return the id of the user with this email (any case), or None."""
+        if not self.enabled:
+            return self.repository.get_user_id(email)
+        key = self.repository.normalize_email(email)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > self.clock()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        self.misses += 1
+        user_id = self.repository.get_user_id(email)
+        if user_id is not None and not self._pending(key):
+            expires_at = self.clock() + self.ttl if self.ttl is not None else None
+            with self._lock:
+                self._entries[key] = (expires_at, user_id)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return user_id
+
+    def _pending(self, key):
+        # Lu dans une transaction qui modifie cet utilisateur : pas encore validé
+        pending = db.session().info.get(('email_invalidations', id(self)), ())
+        return key in pending or None in pending
+
+    def invalidate(self, email):
+        key = self.repository.normalize_email(email)
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def _collect_changes(self, session, flush_context):
+        changed = session.info.setdefault(('email_invalidations', id(self)), set())
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, self.model):
+                emails = [email for email in inspect(obj).attrs.email_normalized.history.sum() if email]
+                # Email non chargé : on ne sait pas quelle entrée retirer, on les retire toutes
+                changed.update(emails or [None])
+
+    def _apply_invalidations(self, session):
+        emails = session.info.pop(('email_invalidations', id(self)), ())
+        if None in emails:
+            self.invalidations += len(self._entries)
+            self.clear()
+            return
+        for email in emails:
+            self.invalidate(email)
+
+    def _discard_changes(self, session, previous_transaction):
+        if previous_transaction.parent is None:
+            session.info.pop(('email_invalidations', id(self)), None)
+
+    def close(self):
+        """Unregister the session event listeners of this cache."""
+        event.remove(Session, 'after_flush', self._collect_changes)
+        event.remove(Session, 'after_commit', self._apply_invalidations)
+        event.remove(Session, 'after_soft_rollback', self._discard_changes)
+        self.clear()
@@ -0,0 +1,307 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from app.persistence.repository import InMemoryRepository
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = 'snapshot.jsonl'
+LOG_PATTERN = re.compile(r'^wal\.(\d+)\.log$')
+
+
+def _encode(value):
+    """json.dumps hook: keep datetimes round-trippable."""
+    if isinstance(value, datetime):
+        return {'$dt': value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode(value):
+    """json.loads hook, inverse of _encode."""
+    if len(value) == 1 and '$dt' in value:
+        return datetime.fromisoformat(value['$dt'])
+    return value
+
+
+# Encodeur/décodeur partagés : json.loads(object_hook=...) en recrée un à chaque ligne
+_ENCODER = json.JSONEncoder(default=_encode, separators=(',', ':'))
+_DECODER = json.JSONDecoder(object_hook=_decode)
+
+
+def _dump_line(value):
+    return _ENCODER.encode(value).encode('utf-8') + b'\n'
+
+
+def default_to_record(obj):
+    """Serialize the public attributes of an object."""
+    return {key: value for key, value in vars(obj).items() if not key.startswith('_')}
+
+
+class WriteAheadLog:
+    """
+    Append-only JSON-lines log with group-commit fsync.
+
+    Writers append under a lock and, when they need durability, wait until a
+    background thread has fsynced past their entry. The flusher collects every
+    entry written during group_commit_interval into a single fsync, so N
+    concurrent writers cost one fsync instead of N.
+    """
+
+    def __init__(self, path, group_commit_interval=0.002):
+        self.path = path
+        self.group_commit_interval = group_commit_interval
+        self.fsync_count = 0
+        self._file = open(path, 'ab')
+        self._lock = threading.Lock()
+        self._written = threading.Condition(self._lock)
+        self._synced = threading.Condition(self._lock)
+        self._written_seq = 0
+        self._synced_seq = 0
+        self._closed = False
+        self._flusher = threading.Thread(target=self._run, name='wal-flusher', daemon=True)
+        self._flusher.start()
+
+    def append(self, entry, wait=True):
+        """Append one entry; block until it is on disk when wait is True."""
+        line = _dump_line(entry)
+        with self._lock:
+            self._file.write(line)
+            self._written_seq += 1
+            seq = self._written_seq
+            self._written.notify()
+        if wait:
+            self.wait_for(seq)
+        return seq
+
+    def wait_for(self, seq=None):
+        """Block until every entry up to seq (default: all written) is fsynced."""
+        with self._lock:
+            if seq is None:
+                seq = self._written_seq
+            self._written.notify()
+            while self._synced_seq < seq and not self._closed:
+                self._synced.wait()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while self._written_seq == self._synced_seq and not self._closed:
+                    self._written.wait()
+                if self._closed:
+                    return
+            # Laisse les autres écrivains rejoindre le même fsync
+            time.sleep(self.group_commit_interval)
+            self._sync()
+
+    def _sync(self):
+        with self._lock:
+            if self._written_seq == self._synced_seq:
+                return
+            target = self._written_seq
+            self._file.flush()
+            fd = self._file.fileno()
+            os.fsync(fd)
+            self.fsync_count += 1
+            self._synced_seq = target
+            self._synced.notify_all()
+
+    def rotate(self, new_path):
+        """Sync and close the current log file, then continue appending to new_path."""
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._synced_seq = self._written_seq
+            self._synced.notify_all()
+            self._file.close()
+            self.path = new_path
+            self._file = open(new_path, 'ab')
+
+    def close(self):
+        self._sync()
+        with self._lock:
+            self._closed = True
+            self._written.notify_all()
+            self._synced.notify_all()
+        self._flusher.join()
+        self._file.close()
+
+    @staticmethod
+    def read(path):
+        """Yield the entries of a log file, ignoring a torn last line."""
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as log:
+            for line in log:
+                try:
+                    yield _DECODER.decode(line.decode('utf-8'))
+                except ValueError:
+                    logger.warning(f"Ignoring torn entry at the end of {path}")
+                    return
+
+
+class DurableInMemoryRepository(InMemoryRepository):
+    """
+    InMemoryRepository whose writes survive a restart.
+
+    Every add/update/delete is appended to a write-ahead log (group-commit
+    fsync) after being applied in memory. Every snapshot_every log entries a
+    compact snapshot of the whole store is written and the logs it covers are
+    deleted. On startup the snapshot is loaded and the log tail replayed, so
+    reads keep in-memory latency while acknowledged writes are durable.
+
+    Logs are numbered by generation (wal.<n>.log); the snapshot header records
+    the last generation it contains, so a crash at any point of snapshot()
+    leaves either the old snapshot with its logs or the new one.
+
+    :param data_dir: Directory holding the snapshot and the logs.
+    :param to_record: Callable turning an object into a JSON-able dict.
+    :param from_record: Callable rebuilding an object from that dict.
+    :param synchronous: When False, writes return before their fsync
+        (the flusher still syncs them within group_commit_interval).
+    """
+
+    def __init__(self, data_dir, to_record=default_to_record, from_record=None,
+                 snapshot_every=100_000, synchronous=True, group_commit_interval=0.002,
+                 unique_indexes=(), indexes=()):
+        super().__init__(unique_indexes=unique_indexes, indexes=indexes)
+        os.makedirs(data_dir, exist_ok=True)
+        self.data_dir = data_dir
+        self.to_record = to_record
+        self.from_record = from_record or (lambda record: SimpleNamespace(**record))
+        self.snapshot_every = snapshot_every
+        self.synchronous = synchronous
+        self._write_lock = threading.RLock()
+        self._entries_since_snapshot = 0
+        self._generation = self._recover()
+        self._log = WriteAheadLog(self._log_path(self._generation), group_commit_interval)
+
+    def _path(self, name):
+        return os.path.join(self.data_dir, name)
+
+    def _log_path(self, generation):
+        return self._path(f'wal.{generation:08d}.log')
+
+    def _log_generations(self):
+        generations = []
+        for name in os.listdir(self.data_dir):
+            match = LOG_PATTERN.match(name)
+            if match:
+                generations.append(int(match.group(1)))
+        return sorted(generations)
+
+    def _recover(self):
+        """Load the snapshot and replay newer logs; return the generation to write to."""
+        entries = WriteAheadLog.read(self._path(SNAPSHOT_FILE))
+        header = next(entries, None)
+        covered = header['generation'] if header else 0
+        for record in entries:
+            self._load(self.from_record(record))
+
+        generations = self._log_generations()
+        replayed = 0
+        for generation in generations:
+            if generation <= covered:
+                os.remove(self._log_path(generation))
+                continue
+            for entry in WriteAheadLog.read(self._log_path(generation)):
+                self._replay(entry)
+                replayed += 1
+        last = max([covered, *generations])
+        if replayed:
+            # Compacte tout de suite pour que le prochain démarrage soit rapide
+            self._write_snapshot(last)
+            for generation in generations:
+                if generation > covered:
+                    os.remove(self._log_path(generation))
+        logger.debug(f"Recovered {len(self._storage)} items ({replayed} log entries) from {self.data_dir}")
+        return last + 1
+
+    def _load(self, obj):
+        """Insert a recovered object without logging it again."""
+        self._unindex(obj.id)
+        self._storage[obj.id] = obj
+        self._index(obj)
+
+    def _replay(self, entry):
+        if entry['op'] == 'put':
+            self._load(self.from_record(entry['record']))
+        elif entry['op'] == 'delete':
+            super().delete(entry['id'])
+
+    def _log_entry(self, entry):
+        """Append entry to the log; called under _write_lock, right after applying it in memory."""
+        seq = self._log.append(entry, wait=False)
+        self._entries_since_snapshot += 1
+        if self._entries_since_snapshot >= self.snapshot_every:
+            self.snapshot()
+        return seq
+
+    def _wait_durable(self, seq):
+        # Hors du verrou : les autres écrivains rejoignent le même fsync groupé
+        if self.synchronous:
+            self._log.wait_for(seq)
+
+    def add(self, obj):
+        # Application et ajout au log sous le même verrou : le log suit l'ordre des écritures en mémoire
+        with self._write_lock:
+            super().add(obj)
+            seq = self._log_entry({'op': 'put', 'record': self.to_record(obj)})
+        self._wait_durable(seq)
+        return obj
+
+    def update(self, obj_id, data):
+        with self._write_lock:
+            obj = super().update(obj_id, data)
+            if obj is None:
+                return None
+            seq = self._log_entry({'op': 'put', 'record': self.to_record(obj)})
+        self._wait_durable(seq)
+        return obj
+
+    def delete(self, obj_id):
+        with self._write_lock:
+            if not super().delete(obj_id):
+                return False
+            seq = self._log_entry({'op': 'delete', 'id': obj_id})
+        self._wait_durable(seq)
+        return True
+
+    def snapshot(self):
+        """Write a compact snapshot of the store and drop the logs it covers."""
+        with self._write_lock:
+            covered = self._generation
+            self._generation += 1
+            self._log.rotate(self._log_path(self._generation))
+            self._write_snapshot(covered)
+            for generation in self._log_generations():
+                if generation <= covered:
+                    os.remove(self._log_path(generation))
+            self._entries_since_snapshot = 0
+        logger.debug(f"Snapshot of {len(self._storage)} items written to {self.data_dir}")
+
+    def _write_snapshot(self, generation):
+        """Atomically replace the snapshot file with the current store."""
+        tmp_path = self._path(SNAPSHOT_FILE + '.tmp')
+        with open(tmp_path, 'wb') as snapshot:
+            snapshot.write(_dump_line({'generation': generation}))
+            for obj in self._storage.values():
+                snapshot.write(_dump_line(self.to_record(obj)))
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(tmp_path, self._path(SNAPSHOT_FILE))
+
+    @property
+    def fsync_count(self):
+        return self._log.fsync_count
+
+    def sync(self):
+        """Block until every write made so far is on disk."""
+        self._log.wait_for()
+
+    def close(self):
+        self._log.close()
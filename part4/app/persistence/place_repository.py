@@ -1,56 +1,254 @@
 # app/persistence/place_repository.py
 
-from app.models.place import Place
-from app import db
+import heapq
+import logging
+from datetime import datetime
+from sqlalchemy import and_, bindparam, func, or_, select, update
 from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.place import Place, place_amenity_association
+from app.persistence import search as full_text
+from app.persistence import spatial
+from app.persistence.repository import (SQLAlchemyRepository, clamp_page_size, commit_or_flush,
+                                        decode_keyset_cursor, encode_keyset_cursor)
+
+logger = logging.getLogger(__name__)
 
-class PlaceRepository:
-    """Repository spécifique pour le modèle Place (sans relations)."""
+# Tris acceptés par search() ; un '-' devant le nom inverse l'ordre
+PLACE_SORTS = ('price', 'rating', 'created_at')
 
-    def __init__(self):
-        self.model = Place
+
+class PlaceRepository(SQLAlchemyRepository):
+    """Repository spécifique pour le modèle Place (recherche filtrée et triée en SQL)."""
+
+    def __init__(self, load_profiles=None):
+        super().__init__(Place, load_profiles=load_profiles)
 
     def get_by_id(self, place_id):
         """Récupère un lieu (Place) par son ID."""
-        return db.session.query(self.model).get(place_id)
+        return db.session.get(self.model, self._coerce_id(place_id))
 
     def create(self, title, description, price, latitude, longitude, owner_id=None):
         """Crée un nouveau lieu (Place) et l'enregistre en base."""
+        place = self.model(
+            title=title,
+            description=description,
+            price=price,
+            latitude=latitude,
+            longitude=longitude,
+            owner_id=owner_id,
+        )
         try:
-            place = self.model(
-                title=title,
-                description=description,
-                price=price,
-                latitude=latitude,
-                longitude=longitude,
-                owner_id=owner_id,
-            )
-            db.session.add(place)
-            db.session.commit()
-            return place
+            # Savepoint : une contrainte violée n'annule pas le reste de l'unit of work
+            with db.session.begin_nested():
+                db.session.add(place)
         except IntegrityError:
-            db.session.rollback()
             raise ValueError("Erreur lors de la création du lieu (doublon ou contrainte invalide).")
+        commit_or_flush()
+        return place
 
-    def update(self, place_id, data):
-        """Met à jour les informations d'un lieu (Place)."""
-        place = self.get_by_id(place_id)
-        if not place:
-            raise ValueError("Lieu introuvable.")
+    def add_ratings(self, totals):
+        """
+        Ajoute des reviews aux agrégats de plusieurs lieux en un seul UPDATE
+        (executemany), sous la forme "column = column + delta" comme
+        Place.adjust_ratings.
 
-        # On ignore 'id' s'il est dans data, pour éviter des collisions
-        for key, value in data.items():
-            if hasattr(place, key) and key != "id":
-                setattr(place, key, value)
+        :param totals: dict place_id -> (nombre de reviews, somme des notes) à ajouter.
+        """
+        if not totals:
+            return
+        table = self.model.__table__
+        query = update(table).where(table.c.id == bindparam('place')).values(
+            review_count=table.c.review_count + bindparam('count_delta'),
+            rating_sum=table.c.rating_sum + bindparam('sum_delta'))
+        db.session.execute(query, [{'place': place_id, 'count_delta': count, 'sum_delta': total}
+                                   for place_id, (count, total) in totals.items()])
 
-        db.session.commit()
-        return place
+    @staticmethod
+    def parse_sort(sort):
+        """Split 'price' / '-price' into (field, descending), refusing unknown fields."""
+        sort = sort or 'created_at'
+        field, descending = sort.lstrip('-'), sort.startswith('-')
+        if field not in PLACE_SORTS:
+            raise ValueError(f"sort must be one of {', '.join(PLACE_SORTS)} (prefix with '-' to reverse)")
+        return field, descending
+
+    @staticmethod
+    def _valid_cursor_id(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    @staticmethod
+    def _cursor_value(field, value):
+        """Check the sort value read from a cursor, which the client can forge."""
+        if value is None:
+            return None
+        if field == 'created_at':
+            try:
+                return datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value
+        raise ValueError("Invalid cursor")
+
+    def _filters(self, price_min=None, price_max=None, amenity_ids=None, owner_id=None):
+        criteria = []
+        if price_min is not None:
+            criteria.append(Place.price >= price_min)
+        if price_max is not None:
+            criteria.append(Place.price <= price_max)
+        if owner_id is not None:
+            criteria.append(Place.owner_id == owner_id)
+        if amenity_ids:
+            try:
+                wanted = {int(amenity_id) for amenity_id in amenity_ids}
+            except (TypeError, ValueError):
+                raise ValueError("Amenity IDs must be integers")
+            # Lieux ayant toutes les amenities : une ligne d'association par amenity trouvée
+            association = place_amenity_association
+            criteria.append(Place.id.in_(
+                select(association.c.place_id)
+                .where(association.c.amenity_id.in_(wanted))
+                .group_by(association.c.place_id)
+                .having(func.count() == len(wanted))
+            ))
+        return criteria
+
+    def search(self, price_min=None, price_max=None, amenity_ids=None, owner_id=None, sort=None,
+               cursor=None, limit=None, with_total=False, profile=None, columns=None):
+        """
+        Filter and sort places in one SQL query.
+
+        Every filter is optional and they combine with AND. The page is cut
+        with keyset pagination on (sort value, id), so deep pages cost the
+        same as the first one; ties are ordered by id in the sort direction.
+
+        :param price_min: Lowest price per night (inclusive).
+        :param price_max: Highest price per night (inclusive).
+        :param amenity_ids: Only places having all of these amenities.
+        :param owner_id: Only places of this owner.
+        :param sort: 'price', 'rating' (average of the reviews, 0 without
+            review) or 'created_at', prefixed with '-' for descending order.
+        :param cursor: Opaque cursor returned with the previous page, or None.
+        :param limit: Maximum number of places; None returns every match
+            (unless a cursor is given).
+        :param with_total: Also count the matching places (extra query).
+        :param profile: Optional name of a loading profile to apply.
+        :param columns: Optional attribute names; Row tuples are returned
+            instead of model instances (see select_rows).
+        :return: A tuple (items, next_cursor, total).
+        """
+        field, descending = self.parse_sort(sort)
+        sort = f"-{field}" if descending else field
+        criteria = self._filters(price_min, price_max, amenity_ids, owner_id)
+        # Note moyenne stockée sur le lieu (review_count / rating_sum) : pas de jointure sur reviews
+        sort_key = Place.avg_rating if field == 'rating' else getattr(Place, field)
+
+        if columns:
+            selected = [getattr(Place, name) for name in self._with_columns(columns, 'id')]
+        else:
+            selected = [Place]
+        query = select(*selected, sort_key.label('sort_key')).select_from(Place).where(*criteria)
+        if not columns:
+            query = query.options(*self._loader_options(profile))
+
+        if cursor:
+            cursor_sort, last_value, last_id = decode_keyset_cursor(cursor, 3)
+            # Curseur d'un autre tri : ses valeurs ne se comparent pas à cette colonne
+            if cursor_sort != sort or not self._valid_cursor_id(last_id):
+                raise ValueError("Invalid cursor")
+            last_value = self._cursor_value(field, last_value)
+            after = sort_key < last_value if descending else sort_key > last_value
+            tie = Place.id < last_id if descending else Place.id > last_id
+            query = query.where(or_(after, and_(sort_key == last_value, tie)))
+        # Égalités départagées par id dans le même sens : l'index (valeur, id) donne tout l'ordre
+        query = query.order_by(*((sort_key.desc(), Place.id.desc()) if descending else (sort_key, Place.id)))
+        if limit is not None or cursor:
+            limit = clamp_page_size(limit)
+            query = query.limit(limit + 1)
+
+        rows = db.session.execute(query).all()
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_keyset_cursor(sort, rows[-1].sort_key,
+                                               rows[-1].id if columns else rows[-1][0].id)
+        items = rows if columns else [row[0] for row in rows]
+
+        total = None
+        if with_total:
+            total = db.session.execute(
+                select(func.count()).select_from(Place).where(*criteria)).scalar()
+        logger.debug(f"Place search returned {len(items)} places")
+        return items, next_cursor, total
+
+    def full_text_search(self, query, limit=None):
+        """
+        Search the titles, descriptions and review texts of the places (FTS5).
+
+        :param query: Free text; every word must match, as a prefix.
+        :param limit: Maximum number of results.
+        :return: SearchResult tuples ranked by BM25 (see search.search_places).
+        """
+        connection = db.session.connection()
+        if not full_text.is_supported(connection):
+            raise NotImplementedError("Full-text search requires SQLite FTS5")
+        return full_text.search_places(connection, query, clamp_page_size(limit))
+
+    def _geo_columns(self, columns):
+        columns = self._with_columns(columns or ['id'], 'id', 'latitude', 'longitude')
+        for name in columns:
+            if name not in Place.__table__.c:
+                raise ValueError(f"Unknown column for Place: {name}")
+        return columns
+
+    def _geo_connection(self):
+        connection = db.session.connection()
+        if not spatial.is_supported(connection):
+            raise NotImplementedError("Geo queries require the SQLite R*Tree module")
+        return connection
+
+    def nearby(self, lat, lon, radius_km, limit=None, columns=None):
+        """
+        Places within radius_km of a point, nearest first (R*Tree + haversine).
+
+        :param lat: Latitude of the centre, in degrees.
+        :param lon: Longitude of the centre, in degrees.
+        :param radius_km: Search radius in kilometres.
+        :param limit: Maximum number of places.
+        :param columns: Place columns to return (id, latitude and longitude are added).
+        :return: A list of (row, distance_km) tuples.
+        """
+        spatial.validate_point(lat, lon)
+        if not 0 < radius_km <= spatial.MAX_RADIUS_KM:
+            raise ValueError(f"radius_km must be between 0 and {spatial.MAX_RADIUS_KM:.0f}")
+        limit = clamp_page_size(limit)
+        boxes = spatial.radius_boxes(lat, lon, radius_km)
+        rows = spatial.candidates(self._geo_connection(), boxes, self._geo_columns(columns))
+        found = ((row, spatial.haversine_km(lat, lon, row.latitude, row.longitude)) for row in rows)
+        # Seuls les limit plus proches sont triés
+        return heapq.nsmallest(limit, (item for item in found if item[1] <= radius_km),
+                               key=lambda item: (item[1], item[0].id))
+
+    def within(self, south, west, north, east, limit=None, columns=None):
+        """
+        Places inside a bounding box, nearest to its centre first.
 
-    def delete(self, place_id):
-        """Supprime un lieu par son ID."""
-        place = self.get_by_id(place_id)
-        if not place:
-            raise ValueError("Lieu introuvable.")
+        A box with west > east crosses longitude 180.
 
-        db.session.delete(place)
-        db.session.commit()
+        :return: A list of (row, distance_km) tuples, the distance being
+            measured from the centre of the box.
+        """
+        spatial.validate_point(south, west)
+        spatial.validate_point(north, east)
+        if south > north:
+            raise ValueError("The south edge of the box must not be above its north edge")
+        spatial.validate_box(south, west, north, east)
+        limit = clamp_page_size(limit)
+        centre_lat = (south + north) / 2
+        centre_lon = (west + east) / 2 if west <= east else ((west + east + 360) / 2 + 180) % 360 - 180
+        boxes = spatial.split_antimeridian(south, west, north, east)
+        rows = spatial.candidates(self._geo_connection(), boxes, self._geo_columns(columns))
+        found = ((row, spatial.haversine_km(centre_lat, centre_lon, row.latitude, row.longitude))
+                 for row in rows if spatial.in_box(row.latitude, row.longitude, south, west, north, east))
+        return heapq.nsmallest(limit, found, key=lambda item: (item[1], item[0].id))
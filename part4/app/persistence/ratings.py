@@ -0,0 +1,99 @@
+"""
+Agrégats des notes des lieux : places.review_count et places.rating_sum.
+
+Ils évitent de parcourir les reviews pour afficher ou trier par note
+moyenne : le facade les met à jour dans la même transaction que la review
+(Place.adjust_ratings). Sur une base existante, add_rating_columns() (étape de
+upgrade_schema) ajoute les colonnes puis recalcule les lieux désynchronisés.
+`flask ratings check` liste les lieux dont les agrégats ne correspondent plus
+aux reviews (écritures faites hors du facade) ; `--fix` les recalcule.
+"""
+import logging
+import click
+from flask.cli import AppGroup
+from sqlalchemy import bindparam, inspect, text
+from app.persistence.repository import MAX_IN_PARAMS
+
+logger = logging.getLogger(__name__)
+
+# Agrégats réels, lus dans l'index ix_reviews_place_id_rating
+_ACTUAL = ("SELECT place_id, count(*) AS review_count, sum(rating) AS rating_sum "
+           "FROM reviews GROUP BY place_id")
+
+
+def rebuild_rating_aggregates(connection, place_ids=None):
+    """Recompute review_count and rating_sum from the reviews; return the number of places updated."""
+    query = ("UPDATE places SET "
+             "review_count = (SELECT count(*) FROM reviews WHERE reviews.place_id = places.id), "
+             "rating_sum = (SELECT coalesce(sum(rating), 0) FROM reviews WHERE reviews.place_id = places.id)")
+    if place_ids is None:
+        count = connection.execute(text(query)).rowcount
+    else:
+        place_ids, count = list(place_ids), 0
+        by_ids = text(query + " WHERE id IN :ids").bindparams(bindparam('ids', expanding=True))
+        for start in range(0, len(place_ids), MAX_IN_PARAMS):
+            count += connection.execute(by_ids, {'ids': place_ids[start:start + MAX_IN_PARAMS]}).rowcount
+    logger.info(f"Rating aggregates recomputed for {count} places")
+    return count
+
+
+def find_rating_drift(connection):
+    """
+    Return the places whose stored aggregates differ from their reviews.
+
+    :return: Rows (id, review_count, rating_sum, actual_count, actual_sum).
+    """
+    return connection.execute(text(
+        f"SELECT p.id, p.review_count, p.rating_sum, "
+        f"coalesce(r.review_count, 0) AS actual_count, coalesce(r.rating_sum, 0) AS actual_sum "
+        f"FROM places AS p LEFT JOIN ({_ACTUAL}) AS r ON r.place_id = p.id "
+        f"WHERE p.review_count != coalesce(r.review_count, 0) OR p.rating_sum != coalesce(r.rating_sum, 0) "
+        f"ORDER BY p.id")).all()
+
+
+def add_rating_columns(connection):
+    """
+    Add places.review_count and places.rating_sum when missing, then fill
+    the aggregates of every place that disagrees with its reviews.
+
+    The fill does not depend on the columns being new: an upgrade stopped
+    after they were added must still fill them when it is run again.
+    """
+    inspector = inspect(connection)
+    if not inspector.has_table('places') or not inspector.has_table('reviews'):
+        return
+    existing = {column['name'] for column in inspector.get_columns('places')}
+    for name in ('review_count', 'rating_sum'):
+        if name not in existing:
+            connection.execute(text(f"ALTER TABLE places ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0"))
+            logger.info(f"Added column places.{name}")
+    drift = find_rating_drift(connection)
+    if drift:
+        rebuild_rating_aggregates(connection, [row.id for row in drift])
+
+
+ratings_cli = AppGroup('ratings', help="Place rating aggregate commands.")
+
+
+@ratings_cli.command('check')
+@click.option('--fix', is_flag=True, help="Recompute the aggregates of the places found.")
+def check_command(fix):
+    """List the places whose review_count / rating_sum disagree with their reviews."""
+    from app.extensions import db
+    with db.engine.begin() as connection:
+        drift = find_rating_drift(connection)
+        for row in drift:
+            click.echo(f"Place {row.id}: {row.review_count} reviews / sum {row.rating_sum} stored, "
+                       f"{row.actual_count} / {row.actual_sum} actual")
+        if drift and fix:
+            rebuild_rating_aggregates(connection, [row.id for row in drift])
+    click.echo(f"{len(drift)} places out of sync" + (", fixed" if drift and fix else ""))
+
+
+@ratings_cli.command('rebuild')
+def rebuild_command():
+    """Recompute the rating aggregates of every place."""
+    from app.extensions import db
+    with db.engine.begin() as connection:
+        count = rebuild_rating_aggregates(connection)
+    click.echo(f"Recomputed {count} places")
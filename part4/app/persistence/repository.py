@@ -1,9 +1,98 @@
+import base64
+import json
 import logging
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import and_, func, insert, inspect, or_, select
 from app.extensions import db  # Import SQLAlchemy instance for database operations
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+DEFAULT_BATCH_SIZE = 1000
+MAX_IN_PARAMS = 900  # valeurs par clause IN (SQLite < 3.32 accepte 999 paramètres)
+
+
+def encode_cursor(obj):
+    """Build an opaque cursor pointing just after obj in (created_at, id) order."""
+    created_at = obj.created_at.isoformat() if obj.created_at else None
+    raw = json.dumps([created_at, obj.id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor built by encode_cursor into a (created_at, id) tuple."""
+    try:
+        created_at, obj_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return (datetime.fromisoformat(created_at) if created_at else None), obj_id
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+
+def encode_keyset_cursor(*values):
+    """Build an opaque cursor from the sort values of the last item of a page."""
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+
+def decode_keyset_cursor(cursor, size):
+    """Decode a cursor built by encode_keyset_cursor into a list of size values."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Group every repository write made inside the block into one transaction.
+
+    Inside a unit of work, SQLAlchemyRepository only flushes; the outermost
+    block commits once on success and rolls everything back on error.
+    Blocks can be nested, only the outermost one commits.
+    """
+    session = db.session
+    depth = session.info.get('uow_depth', 0)
+    session.info['uow_depth'] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+    except Exception:
+        if depth == 0:
+            session.rollback()
+        raise
+    finally:
+        session.info['uow_depth'] = depth
+
+
+def in_unit_of_work():
+    """Return True when called inside a unit_of_work() block."""
+    return db.session.info.get('uow_depth', 0) > 0
+
+
+def commit_or_flush():
+    """Commit the session, or only flush it when inside a unit of work."""
+    if in_unit_of_work():
+        db.session.flush()
+    else:
+        db.session.commit()
+
+
+def clamp_page_size(limit):
+    """Return a page size between 1 and MAX_PAGE_SIZE."""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, MAX_PAGE_SIZE)
+
 
 class Repository(ABC):
     """Abstract base class for repositories."""
@@ -18,11 +107,37 @@ class Repository(ABC):
         """Retrieve an object by its ID."""
         pass
 
+    @abstractmethod
+    def get_many(self, obj_ids):
+        """Retrieve several objects by ID in one lookup, in the order requested.
+
+        Unknown IDs are skipped and duplicates are returned once.
+        """
+        pass
+
     @abstractmethod
     def get_all(self):
         """Retrieve all objects in the repository."""
         pass
 
+    @abstractmethod
+    def iter_all(self, batch_size=DEFAULT_BATCH_SIZE, where=None):
+        """Iterate over all objects (optionally filtered) without building a list.
+
+        Objects are fetched batch_size at a time, so memory stays flat
+        whatever the size of the repository.
+        """
+        pass
+
+    @abstractmethod
+    def get_page(self, cursor=None, limit=None, with_total=False):
+        """Retrieve one page of objects ordered by (created_at, id).
+
+        Returns a tuple (items, next_cursor, total); total is None unless
+        with_total is set, next_cursor is None on the last page.
+        """
+        pass
+
     @abstractmethod
     def update(self, obj_id, data):
         """Update an object by its ID with new data."""
@@ -38,16 +153,79 @@ class Repository(ABC):
         """Retrieve an object by a specific attribute."""
         pass
 
+    @abstractmethod
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """Retrieve every object whose attribute equals the given value."""
+        pass
 
-class InMemoryRepository(Repository):
-    """In-memory implementation of the repository for testing and prototyping."""
 
-    def __init__(self):
+class InMemoryRepository(Repository):
+    """In-memory implementation of the repository for testing and prototyping.
+
+    Secondary hash indexes can be declared per repository: unique_indexes
+    map one value to one object (e.g. a user's email), indexes map one value
+    to every object holding it (e.g. a place's owner_id). They make
+    get_by_attribute / get_all_by_attribute O(1) on those attributes and
+    are kept in sync by add, update and delete; other attributes fall back
+    to a full scan. Objects mutated outside the repository must be passed
+    to reindex().
+    """
+
+    def __init__(self, unique_indexes=(), indexes=()):
         self._storage = {}
+        self._unique_indexes = {attr: {} for attr in unique_indexes}  # attr -> {value: obj}
+        self._indexes = {attr: {} for attr in indexes}  # attr -> {value: {obj_id: obj}}
+        self._indexed_values = {}  # obj_id -> {attr: value indexed for this object}
+
+    def _check_unique(self, obj, values):
+        for attr, value in values.items():
+            index = self._unique_indexes.get(attr)
+            if index is None or value is None:
+                continue
+            other = index.get(value)
+            if other is not None and other.id != obj.id:
+                raise ValueError(f"An item with {attr}={value} already exists")
+
+    def _index(self, obj):
+        values = {attr: getattr(obj, attr, None)
+                  for attr in (*self._unique_indexes, *self._indexes)}
+        self._check_unique(obj, values)
+        for attr, index in self._unique_indexes.items():
+            if values[attr] is not None:
+                index[values[attr]] = obj
+        for attr, index in self._indexes.items():
+            index.setdefault(values[attr], {})[obj.id] = obj
+        self._indexed_values[obj.id] = values
+
+    def _unindex(self, obj_id):
+        values = self._indexed_values.pop(obj_id, None)
+        if values is None:
+            return
+        for attr, index in self._unique_indexes.items():
+            if values[attr] is not None and getattr(index.get(values[attr]), 'id', None) == obj_id:
+                del index[values[attr]]
+        for attr, index in self._indexes.items():
+            bucket = index.get(values[attr])
+            if bucket is not None:
+                bucket.pop(obj_id, None)
+                if not bucket:
+                    del index[values[attr]]
+
+    def reindex(self, obj_id):
+        """Refresh the secondary indexes of an object mutated outside the repository."""
+        obj = self._storage.get(obj_id)
+        if obj is None:
+            return
+        self._check_unique(obj, {attr: getattr(obj, attr, None) for attr in self._unique_indexes})
+        self._unindex(obj_id)
+        self._index(obj)
 
     def add(self, obj):
         logger.debug(f"Adding item with ID {obj.id} to repository")
+        self._check_unique(obj, {attr: getattr(obj, attr, None) for attr in self._unique_indexes})
+        self._unindex(obj.id)
         self._storage[obj.id] = obj
+        self._index(obj)
         logger.debug(f"Repository now contains {len(self._storage)} items")
         return obj
 
@@ -60,14 +238,56 @@ class InMemoryRepository(Repository):
             logger.debug(f"No item found with ID {obj_id}")
         return obj
 
+    def get_many(self, obj_ids):
+        found = {}
+        for obj_id in obj_ids:
+            if obj_id in self._storage:
+                found.setdefault(obj_id, self._storage[obj_id])
+        logger.debug(f"Found {len(found)} items out of {len(obj_ids)} requested IDs")
+        return list(found.values())
+
     def get_all(self):
         return list(self._storage.values())
 
+    def iter_all(self, batch_size=DEFAULT_BATCH_SIZE, where=None):
+        """
+        Iterate over the stored objects, batch_size IDs at a time.
+
+        :param where: Optional predicate; only objects for which it returns True are yielded.
+        """
+        # Copie des IDs seulement : le dépôt peut être modifié pendant l'itération
+        obj_ids = list(self._storage)
+        for start in range(0, len(obj_ids), batch_size):
+            for obj_id in obj_ids[start:start + batch_size]:
+                obj = self._storage.get(obj_id)
+                if obj is not None and (where is None or where(obj)):
+                    yield obj
+
+    def get_page(self, cursor=None, limit=None, with_total=False):
+        limit = clamp_page_size(limit)
+
+        def sort_key(obj):
+            return (getattr(obj, 'created_at', None) or datetime.min, obj.id)
+
+        objects = sorted(self._storage.values(), key=sort_key)
+        if cursor:
+            created_at, obj_id = decode_cursor(cursor)
+            position = (created_at or datetime.min, obj_id)
+            objects = [o for o in objects if sort_key(o) > position]
+        items = objects[:limit]
+        next_cursor = encode_cursor(items[-1]) if len(objects) > limit else None
+        total = len(self._storage) if with_total else None
+        return items, next_cursor, total
+
     def update(self, obj_id, data):
         if obj_id in self._storage:
             obj = self._storage[obj_id]
+            # Vérifie l'unicité avant de modifier l'objet pour ne pas le laisser à moitié à jour
+            self._check_unique(obj, data)
+            self._unindex(obj_id)
             for key, value in data.items():
                 setattr(obj, key, value)
+            self._index(obj)
             logger.debug(f"Updated item with ID {obj_id}")
             return obj
         logger.debug(f"Failed to update: no item with ID {obj_id}")
@@ -75,6 +295,7 @@ class InMemoryRepository(Repository):
 
     def delete(self, obj_id):
         if obj_id in self._storage:
+            self._unindex(obj_id)
             del self._storage[obj_id]
             logger.debug(f"Deleted item with ID {obj_id}")
             return True
@@ -83,6 +304,11 @@ class InMemoryRepository(Repository):
 
     def get_by_attribute(self, attr_name, attr_value):
         logger.debug(f"Searching for item with {attr_name}={attr_value}")
+        if attr_name in self._unique_indexes:
+            return self._unique_indexes[attr_name].get(attr_value)
+        if attr_name in self._indexes:
+            bucket = self._indexes[attr_name].get(attr_value)
+            return next(iter(bucket.values())) if bucket else None
         for obj in self._storage.values():
             if getattr(obj, attr_name, None) == attr_value:
                 logger.debug(f"Found item with {attr_name}={attr_value}")
@@ -90,17 +316,43 @@ class InMemoryRepository(Repository):
         logger.debug(f"No item found with {attr_name}={attr_value}")
         return None
 
+    def get_all_by_attribute(self, attr_name, attr_value):
+        logger.debug(f"Searching for all items with {attr_name}={attr_value}")
+        if attr_name in self._unique_indexes:
+            obj = self._unique_indexes[attr_name].get(attr_value)
+            return [obj] if obj is not None else []
+        if attr_name in self._indexes:
+            return list(self._indexes[attr_name].get(attr_value, {}).values())
+        return [obj for obj in self._storage.values() if getattr(obj, attr_name, None) == attr_value]
+
 
 class SQLAlchemyRepository(Repository):
     """SQLAlchemy implementation of the repository for persistent storage."""
 
-    def __init__(self, model):
+    def __init__(self, model, load_profiles=None):
         """
         Initialize the repository with a specific SQLAlchemy model.
 
         :param model: The SQLAlchemy model class this repository manages.
+        :param load_profiles: Optional mapping of profile name to a list of
+            loader options (selectinload, joinedload, raiseload...) applied
+            when a read is made with that profile.
         """
         self.model = model
+        self.load_profiles = dict(load_profiles or {})
+
+    def _loader_options(self, profile):
+        """
+        Resolve a named loading profile into its loader options.
+
+        :param profile: The profile name, or None for the model defaults.
+        :return: A list of loader options.
+        """
+        if profile is None:
+            return []
+        if profile not in self.load_profiles:
+            raise ValueError(f"Unknown load profile '{profile}' for {self.model.__name__}")
+        return list(self.load_profiles[profile])
 
     def add(self, obj):
         """
@@ -111,27 +363,347 @@ class SQLAlchemyRepository(Repository):
         """
         logger.debug(f"Adding item with ID {getattr(obj, 'id', None)} to repository")
         db.session.add(obj)
-        db.session.commit()
+        commit_or_flush()
         return obj
 
-    def get(self, obj_id):
+    def get(self, obj_id, profile=None):
         """
         Fetch an object by its ID.
 
         :param obj_id: The ID of the object to fetch.
+        :param profile: Optional name of a loading profile to apply.
         :return: The fetched object or None if not found.
         """
         logger.debug(f"Fetching item with ID {obj_id}")
-        return self.model.query.get(obj_id)
+        if profile is None:
+            return self.model.query.get(obj_id)
+        return db.session.get(self.model, obj_id, options=self._loader_options(profile))
 
-    def get_all(self):
+    def get_many(self, obj_ids, profile=None, columns=None):
+        """
+        Fetch several objects by ID with a single IN query.
+
+        :param obj_ids: The IDs to fetch (strings from a query string are accepted).
+        :param profile: Optional name of a loading profile to apply.
+        :param columns: Optional attribute names; Row tuples are returned
+            instead of model instances (see select_rows).
+        :return: The objects found, in the order of obj_ids, without duplicates.
+        """
+        wanted = []
+        for obj_id in obj_ids:
+            obj_id = self._coerce_id(obj_id)
+            if obj_id is not None and obj_id not in wanted:
+                wanted.append(obj_id)
+        if not wanted:
+            return []
+        logger.debug(f"Fetching {len(wanted)} items by ID")
+        if columns:
+            rows = self.select_rows(self._with_columns(columns, 'id'), self.model.id.in_(wanted))
+        else:
+            rows = self.model.query.options(*self._loader_options(profile)) \
+                .filter(self.model.id.in_(wanted)).all()
+        by_id = {row.id: row for row in rows}
+        return [by_id[obj_id] for obj_id in wanted if obj_id in by_id]
+
+    def _coerce_id(self, obj_id):
+        """Convert an ID to the primary key's Python type, or None if impossible."""
+        try:
+            return self.model.id.type.python_type(obj_id)
+        except (TypeError, ValueError):
+            return None
+
+    def get_all(self, profile=None, columns=None):
         """
         Fetch all objects of this model.
 
+        :param profile: Optional name of a loading profile to apply, so that
+            relationships are loaded in a fixed number of queries.
+        :param columns: Optional attribute names; Row tuples are returned
+            instead of model instances (see select_rows).
         :return: A list of all objects.
         """
         logger.debug("Fetching all items from repository")
-        return self.model.query.all()
+        if columns:
+            return self.select_rows(columns, order_by=[self.model.id])
+        return self.model.query.options(*self._loader_options(profile)).all()
+
+    def iter_all(self, batch_size=DEFAULT_BATCH_SIZE, where=None, profile=None, columns=None):
+        """
+        Stream every object of this model, in ID order, batch_size rows at a time.
+
+        The query runs once with yield_per (a server-side cursor on backends
+        that support it). Once the caller asks for the next batch, the objects
+        of the previous one are expunged from the session, so the identity map
+        never holds more than one batch. Objects modified by the caller, and
+        those the session already held before the iteration, are kept.
+
+        Do not commit while iterating: wrap write jobs in unit_of_work(), which
+        only flushes until the end of the block.
+
+        :param batch_size: Number of rows fetched per round trip.
+        :param where: Optional WHERE clause, or list of clauses.
+        :param profile: Optional name of a loading profile to apply.
+        :param columns: Optional attribute names; Row tuples are yielded
+            instead of model instances (see select_rows).
+        :return: A generator of objects (or rows).
+        """
+        criteria = [] if where is None else list(where) if isinstance(where, (list, tuple)) else [where]
+        if columns:
+            query = select(*[getattr(self.model, name) for name in columns])
+        else:
+            query = select(self.model).options(*self._loader_options(profile))
+        query = query.where(*criteria).order_by(self.model.id) \
+            .execution_options(yield_per=batch_size, stream_results=True)
+        session = db.session()
+        # Objets déjà chargés par l'appelant : ils restent attachés
+        loaded = {key for key in session.identity_map.keys() if issubclass(key[0], self.model)}
+        result = session.execute(query)
+        if not columns:
+            result = result.scalars()
+        try:
+            for batch in result.partitions():
+                yield from batch
+                if not columns:
+                    self._expunge_batch(batch, loaded)
+        finally:
+            result.close()
+
+    def _expunge_batch(self, batch, loaded=()):
+        """Detach the unmodified objects of a streamed batch, except the identity keys in loaded."""
+        session = db.session()
+        for obj in batch:
+            state = inspect(obj)
+            if state.session_id == session.hash_key and not state.modified and state.key not in loaded:
+                session.expunge(obj)
+
+    def _with_columns(self, columns, *required):
+        """Append the required attribute names missing from columns."""
+        return list(columns) + [name for name in required if name not in columns]
+
+    def select_rows(self, columns, *criteria, order_by=None, limit=None):
+        """
+        Fetch only some columns, as lightweight Row tuples.
+
+        Rows are not added to the session identity map and no model instance
+        is built, so list endpoints skip the cost of full ORM hydration (and of
+        loading columns they do not return). Rows support attribute access
+        (row.title) like the model they come from.
+
+        :param columns: Attribute names of the model to select.
+        :param criteria: Optional WHERE clauses.
+        :param order_by: Optional list of ORDER BY clauses.
+        :param limit: Optional maximum number of rows.
+        :return: A list of Row tuples.
+        """
+        try:
+            selected = [getattr(self.model, name) for name in columns]
+        except AttributeError as e:
+            raise ValueError(f"Unknown column for {self.model.__name__}: {e}")
+        query = select(*selected).where(*criteria)
+        if order_by:
+            query = query.order_by(*order_by)
+        if limit is not None:
+            query = query.limit(limit)
+        return db.session.execute(query).all()
+
+    def existing_ids(self, obj_ids):
+        """
+        Tell which of several IDs exist, reading only the primary key index.
+
+        :param obj_ids: The IDs to look up; long lists are queried
+            MAX_IN_PARAMS IDs at a time, IDs of the wrong type are skipped.
+        :return: The set of IDs found.
+        """
+        wanted = sorted({obj_id for obj_id in map(self._coerce_id, obj_ids) if obj_id is not None})
+        found = set()
+        for start in range(0, len(wanted), MAX_IN_PARAMS):
+            chunk = wanted[start:start + MAX_IN_PARAMS]
+            found.update(db.session.execute(select(self.model.id).where(self.model.id.in_(chunk))).scalars())
+        return found
+
+    def insert_many(self, rows):
+        """
+        Insert several rows with multi-row INSERT ... RETURNING statements
+        (SQLAlchemy's insertmanyvalues: as many rows per statement as the
+        parameter limit allows).
+
+        The rows are written to the table directly, without building model
+        instances: the session events (caches, geo engine) do not see them,
+        the caller refreshes what depends on them. Python-side column
+        defaults (created_at...) still apply.
+
+        :param rows: A list of dicts of column values.
+        :return: The IDs of the new rows, in the order of rows.
+        """
+        if not rows:
+            return []
+        table = self.model.__table__
+        session = db.session()
+        if session.get_bind().dialect.name == 'sqlite':
+            # sort_by_parameter_order ferait une requête par ligne sous SQLite. Les IDs d'un
+            # INTEGER PRIMARY KEY y sont attribués dans l'ordre des VALUES, et la transaction
+            # garde le verrou d'écriture d'un lot à l'autre : l'ordre croissant est celui de rows.
+            ids = sorted(session.execute(insert(table).returning(table.c.id), rows).scalars())
+        else:
+            query = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+            ids = session.execute(query, rows).scalars().all()
+        logger.debug(f"Inserted {len(ids)} {self.model.__name__} rows")
+        return ids
+
+    def related_ids(self, relationship, obj_ids=None):
+        """
+        Read the IDs on the other side of a many-to-many relationship from
+        its association table, without loading either side.
+
+        :param relationship: Name of a relationship with a secondary table.
+        :param obj_ids: Optional IDs to restrict the lookup to (None for all);
+            long lists are queried MAX_IN_PARAMS IDs at a time.
+        :return: A dict mapping each ID of this model to its list of related IDs.
+        """
+        prop = self.model.__mapper__.relationships[relationship]
+        if prop.secondary is None:
+            raise ValueError(f"{self.model.__name__}.{relationship} has no association table")
+        local = prop.synchronize_pairs[0][1]
+        remote = prop.secondary_synchronize_pairs[0][1]
+        query = select(local, remote).order_by(local, remote)
+        if obj_ids is None:
+            queries = [query]
+        else:
+            obj_ids = list(obj_ids)
+            # SQLite limite le nombre de paramètres d'une requête
+            queries = [query.where(local.in_(obj_ids[start:start + MAX_IN_PARAMS]))
+                       for start in range(0, len(obj_ids), MAX_IN_PARAMS)]
+        related = {}
+        for chunk in queries:
+            for obj_id, related_id in db.session.execute(chunk):
+                related.setdefault(obj_id, []).append(related_id)
+        return related
+
+    def set_related_ids(self, relationship, obj_id, related_ids):
+        """
+        Make the association rows of one object match related_ids, writing
+        only the difference: one DELETE for the IDs removed, one INSERT for
+        the IDs added, after checking in one query that the added IDs exist.
+
+        The association table is written directly; the relationship
+        collections already loaded in the session are expired so that they
+        are read again on next access.
+
+        :param relationship: Name of a relationship with a secondary table.
+        :param obj_id: ID of the object of this model.
+        :param related_ids: The complete list of related IDs wanted.
+        :return: A tuple (added, removed) of sets of related IDs.
+        :raises ValueError: When some of the related IDs do not exist.
+        """
+        prop = self.model.__mapper__.relationships[relationship]
+        if prop.secondary is None:
+            raise ValueError(f"{self.model.__name__}.{relationship} has no association table")
+        local = prop.synchronize_pairs[0][1]
+        remote = prop.secondary_synchronize_pairs[0][1]
+        target = prop.mapper
+        target_id = target.primary_key[0]
+        obj_id = self._coerce_id(obj_id)
+
+        wanted, invalid = set(), []
+        for related_id in related_ids:
+            try:
+                wanted.add(target_id.type.python_type(related_id))
+            except (TypeError, ValueError):
+                invalid.append(str(related_id))
+        session = db.session()
+        current = set(session.execute(select(remote).where(local == obj_id)).scalars())
+        added, removed = wanted - current, current - wanted
+
+        # Existence des IDs ajoutés seulement : les IDs déjà associés sont garantis par la clé étrangère
+        added_ids = sorted(added)
+        found = set()
+        for start in range(0, len(added_ids), MAX_IN_PARAMS):
+            chunk = added_ids[start:start + MAX_IN_PARAMS]
+            found.update(session.execute(select(target_id).where(target_id.in_(chunk))).scalars())
+        missing = invalid + [str(related_id) for related_id in added_ids if related_id not in found]
+        if missing:
+            raise ValueError(f"{target.class_.__name__} not found: {', '.join(missing)}")
+
+        removed_ids = sorted(removed)
+        for start in range(0, len(removed_ids), MAX_IN_PARAMS):
+            chunk = removed_ids[start:start + MAX_IN_PARAMS]
+            session.execute(prop.secondary.delete().where(local == obj_id, remote.in_(chunk)))
+        if added_ids:
+            session.execute(prop.secondary.insert(),
+                            [{local.key: obj_id, remote.key: related_id} for related_id in added_ids])
+
+        # Les collections déjà chargées ne voient pas les écritures directes sur la table
+        identity_map = session.identity_map
+        obj = identity_map.get(self.model.__mapper__.identity_key_from_primary_key((obj_id,)))
+        if obj is not None:
+            session.expire(obj, [relationship])
+        if prop.back_populates:
+            for related_id in added | removed:
+                related = identity_map.get(target.identity_key_from_primary_key((related_id,)))
+                if related is not None:
+                    session.expire(related, [prop.back_populates])
+        logger.debug(f"{self.model.__name__} {obj_id}: {len(added)} {relationship} added, "
+                     f"{len(removed)} removed")
+        return added, removed
+
+    def insert_related_ids(self, relationship, pairs):
+        """
+        Link new objects (see insert_many) to their related objects with one
+        executemany INSERT into the association table.
+
+        The IDs are not checked here: the caller looks them up first
+        (existing_ids), the foreign keys reject the rest.
+
+        :param relationship: Name of a relationship with a secondary table.
+        :param pairs: (obj_id, related_id) tuples, without duplicates.
+        """
+        prop = self.model.__mapper__.relationships[relationship]
+        if prop.secondary is None:
+            raise ValueError(f"{self.model.__name__}.{relationship} has no association table")
+        local = prop.synchronize_pairs[0][1]
+        remote = prop.secondary_synchronize_pairs[0][1]
+        rows = [{local.key: obj_id, remote.key: related_id} for obj_id, related_id in pairs]
+        if rows:
+            db.session.execute(prop.secondary.insert(), rows)
+
+    def get_page(self, cursor=None, limit=None, with_total=False, profile=None, columns=None):
+        """
+        Fetch one page of objects using keyset pagination on (created_at, id).
+
+        Unlike OFFSET, the cost of a page does not grow with its depth: the
+        cursor is turned into a WHERE clause served by the (created_at, id) index.
+
+        :param cursor: Opaque cursor returned with the previous page, or None.
+        :param limit: Maximum number of objects to return.
+        :param with_total: Also run a COUNT(*) over the table when True.
+        :param profile: Optional name of a loading profile to apply.
+        :param columns: Optional attribute names; Row tuples are returned
+            instead of model instances (see select_rows).
+        :return: A tuple (items, next_cursor, total).
+        """
+        limit = clamp_page_size(limit)
+        criteria = []
+        if cursor:
+            created_at, obj_id = decode_cursor(cursor)
+            criteria.append(or_(
+                self.model.created_at > created_at,
+                and_(self.model.created_at == created_at, self.model.id > obj_id),
+            ))
+        order_by = [self.model.created_at, self.model.id]
+        if columns:
+            # Le curseur a besoin de created_at et id
+            rows = self.select_rows(self._with_columns(columns, 'created_at', 'id'), *criteria,
+                                    order_by=order_by, limit=limit + 1)
+        else:
+            rows = self.model.query.options(*self._loader_options(profile)) \
+                .filter(*criteria).order_by(*order_by).limit(limit + 1).all()
+        items = rows[:limit]
+        next_cursor = encode_cursor(items[-1]) if len(rows) > limit else None
+        total = None
+        if with_total:
+            total = db.session.query(func.count(self.model.id)).scalar()
+        logger.debug(f"Fetched page of {len(items)} items")
+        return items, next_cursor, total
 
     def update(self, obj_id, data):
         """
@@ -145,7 +717,7 @@ class SQLAlchemyRepository(Repository):
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            commit_or_flush()
             logger.debug(f"Updated item with ID {obj_id}")
             return obj
         logger.debug(f"Failed to update: no item with ID {obj_id}")
@@ -161,7 +733,7 @@ class SQLAlchemyRepository(Repository):
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            commit_or_flush()
             logger.debug(f"Deleted item with ID {obj_id}")
             return True
         logger.debug(f"Failed to delete: no item with ID {obj_id}")
@@ -178,3 +750,14 @@ class SQLAlchemyRepository(Repository):
         logger.debug(f"Searching for item with {attr_name}={attr_value}")
         # Use getattr to access the attribute of the model and filter by it
         return self.model.query.filter(getattr(self.model, attr_name) == attr_value).first()
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """
+        Fetch every object whose attribute equals the given value.
+
+        :param attr_name: The name of the attribute to filter by.
+        :param attr_value: The value of the attribute to filter by.
+        :return: A list of matching objects.
+        """
+        logger.debug(f"Searching for all items with {attr_name}={attr_value}")
+        return self.model.query.filter(getattr(self.model, attr_name) == attr_value).all()
@@ -1,43 +1,51 @@
 # app/persistence/review_repository.py
 
+import logging
+from sqlalchemy import and_, exists, func, or_, select
+from sqlalchemy.exc import IntegrityError
 from app.models.review import Review
 from app import db
-from sqlalchemy.exc import IntegrityError
+from app.persistence.repository import (SQLAlchemyRepository, clamp_page_size, commit_or_flush,
+                                        decode_cursor, encode_cursor)
+
+logger = logging.getLogger(__name__)
+
 
-class ReviewRepository:
+class ReviewRepository(SQLAlchemyRepository):
     """
-    Repository spécifique pour le modèle Review,
-    sans relations (pas de foreign key).
+    Repository spécifique pour le modèle Review (lectures limitées à un lieu
+    ou à un utilisateur, servies par les index de la table reviews).
     """
 
-    def __init__(self):
-        self.model = Review
+    def __init__(self, load_profiles=None):
+        super().__init__(Review, load_profiles=load_profiles)
 
     def get_by_id(self, review_id):
         """Récupère un avis (Review) par son ID."""
-        return db.session.query(self.model).get(review_id)
+        return db.session.get(self.model, self._coerce_id(review_id))
 
     def create(self, text, rating, place_id=None, user_id=None):
         """
         Crée un nouvel avis (Review) et l'enregistre en base.
         """
+        review = self.model(
+            text=text,
+            rating=rating
+        )
+        # place_id et user_id sont des colonnes simples
+        if place_id is not None:
+            review.place_id = place_id
+        if user_id is not None:
+            review.user_id = user_id
+
         try:
-            review = self.model(
-                text=text,
-                rating=rating
-            )
-            # place_id et user_id sont des colonnes simples
-            if place_id is not None:
-                review.place_id = place_id
-            if user_id is not None:
-                review.user_id = user_id
-
-            db.session.add(review)
-            db.session.commit()
-            return review
+            # Savepoint : seule la review est annulée en cas de doublon, pas le reste de la transaction
+            with db.session.begin_nested():
+                db.session.add(review)
         except IntegrityError:
-            db.session.rollback()
             raise ValueError("Erreur lors de la création du review (contrainte invalide).")
+        commit_or_flush()
+        return review
 
     def update(self, review_id, data):
         """
@@ -51,7 +59,7 @@ class ReviewRepository:
             if hasattr(review, key) and key != "id":
                 setattr(review, key, value)
 
-        db.session.commit()
+        commit_or_flush()
         return review
 
     def delete(self, review_id):
@@ -63,4 +71,58 @@ class ReviewRepository:
             raise ValueError("Review introuvable.")
 
         db.session.delete(review)
-        db.session.commit()
\ No newline at end of file
+        commit_or_flush()
+        return True
+
+    def get_by_place_id(self, place_id, cursor=None, limit=None, with_total=False, profile=None,
+                        columns=None):
+        """
+        Fetch the reviews of one place in (created_at, id) order.
+
+        Served by the (place_id, created_at, id) index: the cost depends on
+        the size of the page, not on the number of reviews in the table.
+
+        :param place_id: ID of the place.
+        :param cursor: Opaque cursor returned with the previous page, or None.
+        :param limit: Maximum number of reviews; None returns every review
+            of the place (unless a cursor is given).
+        :param with_total: Also count the reviews of the place (extra query).
+        :param profile: Optional name of a loading profile to apply.
+        :param columns: Optional attribute names; Row tuples are returned
+            instead of model instances (see select_rows).
+        :return: A tuple (items, next_cursor, total).
+        """
+        place_id = self._coerce_id(place_id)
+        criteria = [Review.place_id == place_id]
+        if cursor:
+            created_at, review_id = decode_cursor(cursor)
+            criteria.append(or_(Review.created_at > created_at,
+                                and_(Review.created_at == created_at, Review.id > review_id)))
+        order_by = [Review.created_at, Review.id]
+        if limit is not None or cursor:
+            limit = clamp_page_size(limit)
+        fetch = limit + 1 if limit is not None else None
+        if columns:
+            # Le curseur a besoin de created_at et id
+            rows = self.select_rows(self._with_columns(columns, 'created_at', 'id'), *criteria,
+                                    order_by=order_by, limit=fetch)
+        else:
+            rows = self.model.query.options(*self._loader_options(profile)) \
+                .filter(*criteria).order_by(*order_by).limit(fetch).all()
+        items, next_cursor = rows, None
+        if limit is not None and len(rows) > limit:
+            items = rows[:limit]
+            next_cursor = encode_cursor(items[-1])
+
+        total = None
+        if with_total:
+            total = db.session.execute(
+                select(func.count()).select_from(Review).where(Review.place_id == place_id)).scalar()
+        logger.debug(f"Fetched {len(items)} reviews of place {place_id}")
+        return items, next_cursor, total
+
+    def exists_review(self, user_id, place_id):
+        """Return True when the user has already reviewed the place (one index lookup)."""
+        query = select(exists().where(Review.user_id == self._coerce_id(user_id),
+                                      Review.place_id == self._coerce_id(place_id)))
+        return db.session.execute(query).scalar()
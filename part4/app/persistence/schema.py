@@ -0,0 +1,243 @@
+"""
+Mise à niveau des bases créées par une version précédente de l'application.
+
+db.create_all() crée les tables manquantes mais ne modifie jamais une table
+existante. Chaque étape de UPGRADE_STEPS complète donc une base existante ;
+elles sont idempotentes et rejouées dans l'ordre par create_app(), juste
+après create_all() (sur une base neuve, elles n'ont rien à faire).
+"""
+import logging
+import re
+from collections import Counter
+from sqlalchemy import event, inspect, text
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.sql.visitors import iterate
+from app.models.user import normalize_email
+from app.persistence.ratings import add_rating_columns
+from app.persistence.search import ensure_search_index
+from app.persistence.spatial import ensure_spatial_index
+
+logger = logging.getLogger(__name__)
+
+
+def _columns(connection, table):
+    return {column['name'] for column in inspect(connection).get_columns(table)}
+
+
+def _indexes(connection, table):
+    if connection.dialect.name == 'sqlite':
+        # get_indexes() ne renvoie pas les index sur expression
+        return set(connection.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"
+        ), {'table': table}).scalars())
+    return {index['name'] for index in inspect(connection).get_indexes(table)}
+
+
+def add_users_email_normalized(connection):
+    """
+    Add users.email_normalized, fill it for existing rows and index it (unique).
+
+    Existing emails that differ only by case cannot share the unique index:
+    the step stops with the list of conflicts so they can be merged by hand.
+    """
+    if 'email_normalized' not in _columns(connection, 'users'):
+        connection.execute(text("ALTER TABLE users ADD COLUMN email_normalized VARCHAR(120)"))
+        logger.info("Added column users.email_normalized")
+
+    # Même normalisation qu'en Python (lower() de SQLite ignore les caractères non ASCII)
+    rows = connection.execute(text("SELECT id, email FROM users WHERE email_normalized IS NULL")).all()
+    if rows:
+        connection.execute(text("UPDATE users SET email_normalized = :normalized WHERE id = :id"),
+                           [{'id': row.id, 'normalized': normalize_email(row.email)} for row in rows])
+        logger.info(f"Normalized the email of {len(rows)} users")
+
+    if 'ix_users_email_normalized' in _indexes(connection, 'users'):
+        return
+    conflicts = connection.execute(text(
+        "SELECT email_normalized FROM users GROUP BY email_normalized HAVING count(*) > 1"
+    )).scalars().all()
+    if conflicts:
+        raise RuntimeError(f"Emails used by several users (ignoring case): {', '.join(conflicts)}")
+    connection.execute(text(
+        "CREATE UNIQUE INDEX ix_users_email_normalized ON users (email_normalized)"))
+    logger.info("Created unique index ix_users_email_normalized")
+
+
+def check_duplicate_reviews(connection):
+    """
+    Stop the upgrade when a user reviewed a place twice, before the unique
+    index ix_reviews_user_id_place_id is created by create_missing_indexes.
+
+    Which review to keep is a product decision: the duplicates are listed so
+    they can be removed by hand.
+    """
+    if not inspect(connection).has_table('reviews') \
+            or 'ix_reviews_user_id_place_id' in _indexes(connection, 'reviews'):
+        return
+    duplicates = connection.execute(text(
+        "SELECT user_id, place_id FROM reviews GROUP BY user_id, place_id HAVING count(*) > 1"
+    )).all()
+    if duplicates:
+        pairs = ', '.join(f"user {row.user_id} / place {row.place_id}" for row in duplicates)
+        raise RuntimeError(f"Places reviewed several times by the same user: {pairs}")
+
+
+def _enable_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys = ON")
+    cursor.close()
+
+
+def enforce_foreign_keys(engine):
+    """
+    Make SQLite check the foreign keys, and apply their ON DELETE CASCADE,
+    on every connection of engine (SQLite leaves them off by default).
+
+    Must be called before the engine opens its first connection.
+    """
+    if engine.dialect.name == 'sqlite' and not event.contains(engine, 'connect', _enable_foreign_keys):
+        event.listen(engine, 'connect', _enable_foreign_keys)
+
+
+def _stale_foreign_keys(connection, table):
+    """True when a foreign key of the table lacks the ON DELETE rule declared on the model."""
+    # Colonnes de foreign_key_list : id, seq, table, from, to, on_update, on_delete, match
+    existing = {(row[2], row[3], row[6].upper())
+                for row in connection.exec_driver_sql(f"PRAGMA foreign_key_list({table.name})")}
+    for constraint in table.foreign_key_constraints:
+        for column, element in zip(constraint.column_keys, constraint.elements):
+            rule = (constraint.ondelete or 'NO ACTION').upper()
+            if (element.target_fullname.split('.')[0], column, rule) not in existing:
+                return True
+    return False
+
+
+def _rebuild_table(connection, table):
+    """
+    Create table again from its model under a temporary name, copy the rows
+    of the existing one, drop it and rename the copy (SQLite cannot alter a
+    constraint or a column definition). Indexes and triggers are lost.
+    """
+    temporary = f"_rebuild_{table.name}"
+    create = str(CreateTable(table).compile(connection)).replace(
+        f"CREATE TABLE {table.name} ", f"CREATE TABLE {temporary} ", 1)
+    existing = _columns(connection, table.name)
+    columns = ', '.join(column.name for column in table.columns if column.name in existing)
+    connection.execute(text(create))
+    connection.execute(text(f"INSERT INTO {temporary} ({columns}) SELECT {columns} FROM {table.name}"))
+    connection.execute(text(f"DROP TABLE {table.name}"))
+    connection.execute(text(f"ALTER TABLE {temporary} RENAME TO {table.name}"))
+
+
+def add_cascading_foreign_keys(connection):
+    """
+    Rebuild the tables whose foreign keys lack the ON DELETE CASCADE of the models.
+
+    SQLite cannot alter a constraint: the table is created again under a
+    temporary name from the model, filled from the old one, which is then
+    dropped (foreign keys are off during upgrade_schema). The indexes and
+    the triggers lost with the old table are recreated by the next steps;
+    triggers that mention a rebuilt table are dropped first, as SQLite
+    refuses the final RENAME while a trigger refers to a missing table.
+    Rows referencing a missing parent stop the upgrade, as they would be
+    rejected by the new constraints.
+    """
+    if connection.dialect.name != 'sqlite':
+        return
+    from app.extensions import db
+    inspector = inspect(connection)
+    stale = [table for table in db.metadata.sorted_tables
+             if inspector.has_table(table.name) and _stale_foreign_keys(connection, table)]
+    if not stale:
+        return
+    orphans = Counter(row[0] for row in connection.exec_driver_sql("PRAGMA foreign_key_check"))
+    if orphans:
+        counts = ', '.join(f"{table} ({count})" for table, count in sorted(orphans.items()))
+        raise RuntimeError(f"Rows referencing a deleted parent: {counts}")
+    rebuilt = {table.name for table in stale}
+    triggers = connection.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'")).all()
+    for name, sql in triggers:
+        # Recréés par ensure_search_index / ensure_spatial_index, qui remplissent alors leur index
+        if rebuilt & set(re.findall(r'\w+', sql)):
+            connection.execute(text(f"DROP TRIGGER {name}"))
+    for table in stale:
+        _rebuild_table(connection, table)
+        logger.info(f"Rebuilt table {table.name} with ON DELETE CASCADE foreign keys")
+
+
+def add_revoked_tokens_autoincrement(connection):
+    """
+    Rebuild revoked_tokens with AUTOINCREMENT when it was created without.
+
+    Workers sync their revocation filter on "id > last id seen"; a plain
+    rowid is reused once the highest rows are pruned, so a new revocation
+    could get an id the workers already passed. The rows keep their ids and
+    sqlite_sequence starts after the highest one.
+    """
+    if connection.dialect.name != 'sqlite' or not inspect(connection).has_table('revoked_tokens'):
+        return
+    sql = connection.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'revoked_tokens'")).scalar()
+    if 'AUTOINCREMENT' in sql.upper():
+        return
+    from app.extensions import db
+    # Index recréés par create_missing_indexes
+    _rebuild_table(connection, db.metadata.tables['revoked_tokens'])
+    logger.info("Rebuilt table revoked_tokens with AUTOINCREMENT ids")
+
+
+def create_missing_indexes(connection):
+    """Create the indexes declared on the models that an existing table lacks."""
+    from app.extensions import db
+    for table in db.metadata.sorted_tables:
+        if not inspect(connection).has_table(table.name):
+            continue
+        existing = _indexes(connection, table.name)
+        columns = _columns(connection, table.name)
+        for index in table.indexes:
+            # Une colonne manquante doit d'abord être ajoutée par une étape dédiée
+            # (index.columns ne liste pas toutes les colonnes d'un index sur expression)
+            needed = {element.name for expression in index.expressions
+                      for element in iterate(expression) if getattr(element, 'table', None) is table}
+            if index.name not in existing and needed <= columns:
+                index.create(connection)
+                logger.info(f"Created index {index.name}")
+
+
+UPGRADE_STEPS = [
+    add_users_email_normalized,
+    add_rating_columns,
+    check_duplicate_reviews,
+    add_cascading_foreign_keys,
+    add_revoked_tokens_autoincrement,
+    create_missing_indexes,
+    ensure_search_index,
+    ensure_spatial_index,
+]
+
+
+def upgrade_schema(engine):
+    """
+    Run every upgrade step in one transaction: a failed step leaves the
+    database as it was, DDL included.
+
+    On SQLite the foreign keys are not enforced during the steps, so that a
+    parent table can be rebuilt (add_cascading_foreign_keys) without its
+    children being deleted; they are switched back on afterwards.
+    """
+    with engine.connect() as connection:
+        sqlite = connection.dialect.name == 'sqlite'
+        if sqlite:
+            # Sans effet dans une transaction : première requête de la connexion
+            connection.exec_driver_sql("PRAGMA foreign_keys = OFF")
+            # pysqlite n'ouvre de transaction qu'avant un INSERT/UPDATE/DELETE et valide
+            # chaque ALTER / CREATE aussitôt : BEGIN explicite pour tout annuler en cas d'échec
+            connection.exec_driver_sql("BEGIN")
+        try:
+            for step in UPGRADE_STEPS:
+                step(connection)
+            connection.commit()
+        finally:
+            if sqlite:
+                connection.rollback()
+                connection.exec_driver_sql("PRAGMA foreign_keys = ON")
@@ -0,0 +1,210 @@
+"""
+Recherche plein texte des lieux avec SQLite FTS5.
+
+La table virtuelle place_search contient une ligne par lieu (rowid = id du
+lieu) avec son titre et sa description ; review_search une ligne par review
+(rowid = id de la review) avec son texte et le lieu. Écrire une review ne
+touche ainsi qu'une ligne d'index, quel que soit le nombre de reviews du
+lieu ; les deux tables sont fusionnées par lieu au moment de la recherche.
+Des triggers SQLite les tiennent à jour à chaque écriture sur places et
+reviews, y compris les insertions en masse qui ne passent pas par l'ORM.
+Sur une base existante, ensure_search_index() (étape de upgrade_schema) les
+crée puis les remplit ; `flask search rebuild` les reconstruit à la demande.
+"""
+import html
+import logging
+import re
+from collections import namedtuple
+import click
+from flask.cli import AppGroup
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = 'place_search'
+REVIEW_SEARCH_TABLE = 'review_search'
+
+_TOKENIZE = "tokenize = 'unicode61 remove_diacritics 2'"
+
+# Poids BM25 des colonnes (title, description, reviews) : le titre compte le plus
+BM25_WEIGHTS = (10.0, 4.0, 1.0)
+
+# Marqueurs posés par highlight()/snippet() : caractères à usage privé qu'un texte saisi ne
+# contient pas, remplacés par <mark> seulement après l'échappement HTML du texte
+_MARK_START, _MARK_END = '\ue000', '\ue001'
+
+SearchResult = namedtuple('SearchResult', ['id', 'title', 'price', 'latitude', 'longitude', 'owner_id',
+                                           'title_highlight', 'snippet', 'rank'])
+
+_TRIGGERS = {
+    'place_search_place_insert': f"""
+        AFTER INSERT ON places BEGIN
+            INSERT INTO {SEARCH_TABLE} (rowid, title, description)
+            VALUES (new.id, new.title, coalesce(new.description, ''));
+        END""",
+    'place_search_place_update': f"""
+        AFTER UPDATE OF title, description ON places BEGIN
+            UPDATE {SEARCH_TABLE} SET title = new.title, description = coalesce(new.description, '')
+            WHERE rowid = new.id;
+        END""",
+    'place_search_place_delete': f"""
+        AFTER DELETE ON places BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+        END""",
+    'place_search_review_insert': f"""
+        AFTER INSERT ON reviews BEGIN
+            INSERT INTO {REVIEW_SEARCH_TABLE} (rowid, text, place_id) VALUES (new.id, new.text, new.place_id);
+        END""",
+    'place_search_review_update': f"""
+        AFTER UPDATE OF text, place_id ON reviews BEGIN
+            UPDATE {REVIEW_SEARCH_TABLE} SET text = new.text, place_id = new.place_id WHERE rowid = new.id;
+        END""",
+    # Aussi pour les reviews supprimées en cascade avec leur lieu : une ligne chacune
+    'place_search_review_delete': f"""
+        AFTER DELETE ON reviews BEGIN
+            DELETE FROM {REVIEW_SEARCH_TABLE} WHERE rowid = old.id;
+        END""",
+}
+
+
+def is_supported(connection):
+    return connection.dialect.name == 'sqlite'
+
+
+def rebuild_search_index(connection):
+    """Refill place_search and review_search from the places and reviews tables; return the number of places."""
+    connection.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    connection.execute(text(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, title, description) "
+        f"SELECT id, title, coalesce(description, '') FROM places"))
+    connection.execute(text(f"DELETE FROM {REVIEW_SEARCH_TABLE}"))
+    connection.execute(text(
+        f"INSERT INTO {REVIEW_SEARCH_TABLE} (rowid, text, place_id) SELECT id, text, place_id FROM reviews"))
+    # Fusionne les segments des index après un remplissage complet
+    for table in (SEARCH_TABLE, REVIEW_SEARCH_TABLE):
+        connection.execute(text(f"INSERT INTO {table} ({table}) VALUES ('optimize')"))
+    count = connection.execute(text(f"SELECT count(*) FROM {SEARCH_TABLE}")).scalar()
+    logger.info(f"Full-text search index rebuilt with {count} places")
+    return count
+
+
+def ensure_search_index(connection):
+    """Create place_search, review_search and their triggers when missing, then fill the index if needed."""
+    if not is_supported(connection):
+        logger.warning("Full-text search needs SQLite FTS5: place_search not created")
+        return
+    inspector = inspect(connection)
+    if not (inspector.has_table('places') and inspector.has_table('reviews')):
+        return
+    missing = not inspector.has_table(SEARCH_TABLE)
+    if not missing:
+        columns = {row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({SEARCH_TABLE})")}
+        if 'reviews' in columns:
+            # Ancien format : le texte de toutes les reviews dans la ligne du lieu
+            connection.execute(text(f"DROP TABLE {SEARCH_TABLE}"))
+            logger.info(f"Dropped {SEARCH_TABLE}: review text moves to {REVIEW_SEARCH_TABLE}")
+            missing = True
+    if missing:
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(title, description, {_TOKENIZE})"))
+    if not inspector.has_table(REVIEW_SEARCH_TABLE):
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE {REVIEW_SEARCH_TABLE} USING fts5(text, place_id UNINDEXED, {_TOKENIZE})"))
+        missing = True
+    existing = dict(connection.execute(
+        text("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'")).all())
+    for name, body in _TRIGGERS.items():
+        if name not in existing:
+            # Un trigger absent (table recréée par drop_all/create_all) : l'index a pu dériver
+            missing = True
+        elif existing[name] != f"CREATE TRIGGER {name} {body}":
+            # Définition changée depuis la création de la base : remplacée, l'index reste juste
+            connection.execute(text(f"DROP TRIGGER {name}"))
+        else:
+            continue
+        connection.execute(text(f"CREATE TRIGGER {name} {body}"))
+    if missing:
+        rebuild_search_index(connection)
+
+
+def to_match_terms(query):
+    """
+    Turn free text typed by a user into FTS5 MATCH terms, one per word.
+
+    Each word matches as a prefix, so 'appart' finds 'appartement'; FTS5
+    operators and punctuation in the input are ignored.
+    """
+    words = re.findall(r'\w+', query or '')
+    if not words:
+        raise ValueError("Search query must contain at least one word")
+    return [f'"{word}"*' for word in words]
+
+
+def search_places(connection, query, limit):
+    """
+    Return the places matching query as SearchResult tuples, best BM25 score first.
+
+    Every word must appear in the title, the description or one of the
+    reviews of the place. Each result has the place columns of a card plus
+    title_highlight (the title with the matched words wrapped in <mark>),
+    snippet (the best matching fragment of the place or of its reviews) and
+    rank (BM25 of the place or of its best review, whichever is better;
+    lower is better). title_highlight and snippet are HTML: the text is escaped, only
+    the <mark> tags are markup.
+    """
+    terms = to_match_terms(query)
+    title_weight, description_weight, review_weight = BM25_WEIGHTS
+    params = {f'term{i}': term for i, term in enumerate(terms)}
+    # Lieux contenant chaque mot, dans leur ligne ou dans au moins une de leurs reviews
+    matched = ' INTERSECT '.join(
+        f"SELECT place_id FROM (SELECT rowid AS place_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :term{i} "
+        f"UNION SELECT place_id FROM {REVIEW_SEARCH_TABLE} WHERE {REVIEW_SEARCH_TABLE} MATCH :term{i})"
+        for i in range(len(terms)))
+    rows = connection.execute(text(
+        f"WITH matched(place_id) AS MATERIALIZED ({matched}), "
+        f"hits AS (SELECT rowid AS place_id, bm25({SEARCH_TABLE}, {title_weight}, {description_weight}) AS rank, "
+        f"  NULL AS review_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :any "
+        f"  UNION ALL SELECT place_id, bm25({REVIEW_SEARCH_TABLE}, {review_weight}), rowid "
+        f"  FROM {REVIEW_SEARCH_TABLE} WHERE {REVIEW_SEARCH_TABLE} MATCH :any), "
+        # Colonne nue avec min() : review_id vient de la ligne du meilleur score (NULL pour le lieu)
+        f"top AS MATERIALIZED (SELECT place_id, min(rank) AS rank, review_id FROM hits "
+        f"  WHERE place_id IN matched GROUP BY place_id ORDER BY rank, place_id LIMIT :limit), "
+        # highlight()/snippet() des seuls résultats retenus ; +rowid : filtre appliqué après le
+        # MATCH, sans relancer la recherche pour chaque rowid
+        f"place_text AS MATERIALIZED (SELECT rowid AS place_id, "
+        f"  highlight({SEARCH_TABLE}, 0, :start, :end) AS title_highlight, "
+        f"  snippet({SEARCH_TABLE}, -1, :start, :end, '…', 12) AS snippet "
+        f"  FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :any AND +rowid IN (SELECT place_id FROM top)), "
+        f"review_text AS MATERIALIZED (SELECT rowid AS review_id, "
+        f"  snippet({REVIEW_SEARCH_TABLE}, 0, :start, :end, '…', 12) AS snippet "
+        f"  FROM {REVIEW_SEARCH_TABLE} WHERE {REVIEW_SEARCH_TABLE} MATCH :any "
+        f"  AND +rowid IN (SELECT review_id FROM top)) "
+        f"SELECT p.id, p.title, p.price, p.latitude, p.longitude, p.owner_id, "
+        f"coalesce(pt.title_highlight, p.title) AS title_highlight, "
+        f"CASE WHEN top.review_id IS NULL THEN pt.snippet ELSE rt.snippet END AS snippet, top.rank "
+        f"FROM top JOIN places AS p ON p.id = top.place_id "
+        f"LEFT JOIN place_text AS pt ON pt.place_id = top.place_id "
+        f"LEFT JOIN review_text AS rt ON rt.review_id = top.review_id "
+        f"ORDER BY top.rank, top.place_id"
+    ), {**params, 'any': ' OR '.join(terms), 'limit': limit, 'start': _MARK_START, 'end': _MARK_END}).all()
+    return [row._replace(title_highlight=_marked_html(row.title_highlight), snippet=_marked_html(row.snippet))
+            for row in map(SearchResult._make, rows)]
+
+
+def _marked_html(fragment):
+    """Escape a highlight()/snippet() result and turn its markers into <mark> tags."""
+    escaped = html.escape(fragment or '')
+    return escaped.replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+search_cli = AppGroup('search', help="Full-text search index commands.")
+
+
+@search_cli.command('rebuild')
+def rebuild_command():
+    """Rebuild the place_search and review_search indexes from the places and reviews tables."""
+    from app.extensions import db
+    with db.engine.begin() as connection:
+        ensure_search_index(connection)
+        count = rebuild_search_index(connection)
+    click.echo(f"Indexed {count} places")
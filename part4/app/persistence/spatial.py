@@ -0,0 +1,180 @@
+"""
+Requêtes géographiques sur les lieux avec un index SQLite R*Tree.
+
+La table virtuelle place_geo contient le point (latitude, longitude) de
+chaque lieu, sous forme de boîte de taille nulle (id = id du lieu). Des
+triggers SQLite la tiennent à jour à chaque écriture sur places. Une
+recherche lit d'abord les candidats d'une boîte englobante dans l'index,
+puis ne garde que ceux réellement dans le rayon (distance haversine) ou
+dans la boîte demandée : le R*Tree stocke des flottants 32 bits arrondis
+vers l'extérieur, sa réponse est donc un sur-ensemble.
+Les endpoints sont publics : le rayon et la taille de la boîte sont bornés à
+ce qu'affiche une carte, et une zone qui contient plus de MAX_CANDIDATES
+lieux est refusée plutôt que lue en entier.
+Sur une base existante, ensure_spatial_index() (étape de upgrade_schema) la
+crée puis la remplit ; `flask geo rebuild` la reconstruit à la demande.
+"""
+import logging
+import math
+import click
+from flask.cli import AppGroup
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+SPATIAL_TABLE = 'place_geo'
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+MAX_RADIUS_KM = 2000  # une région sur une carte ; au-delà, autant paginer toute la table
+MAX_BOX_DEGREES = 30  # écart maximal en latitude et en longitude d'une boîte
+MAX_CANDIDATES = 10_000  # lieux lus dans l'index pour une requête, au plus
+
+_TRIGGERS = {
+    'place_geo_insert': f"""
+        AFTER INSERT ON places BEGIN
+            INSERT INTO {SPATIAL_TABLE} (id, min_lat, max_lat, min_lon, max_lon)
+            VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+        END""",
+    'place_geo_update': f"""
+        AFTER UPDATE OF latitude, longitude ON places BEGIN
+            UPDATE {SPATIAL_TABLE}
+            SET min_lat = new.latitude, max_lat = new.latitude,
+                min_lon = new.longitude, max_lon = new.longitude
+            WHERE id = new.id;
+        END""",
+    'place_geo_delete': f"""
+        AFTER DELETE ON places BEGIN
+            DELETE FROM {SPATIAL_TABLE} WHERE id = old.id;
+        END""",
+}
+
+
+def is_supported(connection):
+    return connection.dialect.name == 'sqlite'
+
+
+def rebuild_spatial_index(connection):
+    """Refill place_geo from the places table; return the number of places."""
+    connection.execute(text(f"DELETE FROM {SPATIAL_TABLE}"))
+    connection.execute(text(
+        f"INSERT INTO {SPATIAL_TABLE} (id, min_lat, max_lat, min_lon, max_lon) "
+        f"SELECT id, latitude, latitude, longitude, longitude FROM places"))
+    count = connection.execute(text(f"SELECT count(*) FROM {SPATIAL_TABLE}")).scalar()
+    logger.info(f"Spatial index rebuilt with {count} places")
+    return count
+
+
+def ensure_spatial_index(connection):
+    """Create place_geo and its triggers when missing, then fill the index if needed."""
+    if not is_supported(connection):
+        logger.warning("Geo queries need the SQLite R*Tree module: place_geo not created")
+        return
+    inspector = inspect(connection)
+    if not inspector.has_table('places'):
+        return
+    missing = not inspector.has_table(SPATIAL_TABLE)
+    if missing:
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE {SPATIAL_TABLE} USING rtree(id, min_lat, max_lat, min_lon, max_lon)"))
+    existing = set(connection.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars())
+    for name, body in _TRIGGERS.items():
+        if name not in existing:
+            # Un trigger absent (table recréée par drop_all/create_all) : l'index a pu dériver
+            missing = True
+            connection.execute(text(f"CREATE TRIGGER {name} {body}"))
+    if missing:
+        rebuild_spatial_index(connection)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres between two points given in degrees."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 \
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def validate_point(lat, lon):
+    if not -90 <= lat <= 90:
+        raise ValueError("Latitude must be between -90 and 90")
+    if not -180 <= lon <= 180:
+        raise ValueError("Longitude must be between -180 and 180")
+
+
+def split_antimeridian(south, west, north, east):
+    """Return the (south, west, north, east) boxes covering a box that may cross longitude ±180."""
+    if west <= east:
+        return [(south, west, north, east)]
+    return [(south, west, north, 180.0), (south, -180.0, north, east)]
+
+
+def radius_boxes(lat, lon, radius_km):
+    """Bounding boxes (south, west, north, east) containing every point within radius_km."""
+    delta_lat = radius_km / KM_PER_DEGREE
+    south, north = lat - delta_lat, lat + delta_lat
+    if south <= -90 or north >= 90:
+        # Le cercle contient un pôle : toutes les longitudes sont concernées
+        return [(max(south, -90.0), -180.0, min(north, 90.0), 180.0)]
+    # Plus grand écart de longitude atteint par le cercle (à la latitude de son point de tangence)
+    delta_lon = math.degrees(math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM)
+                                             / math.cos(math.radians(lat)))))
+    if delta_lon >= 180:
+        return [(south, -180.0, north, 180.0)]
+    west, east = lon - delta_lon, lon + delta_lon
+    # Cercle à cheval sur la longitude ±180 : deux boîtes
+    if west < -180:
+        return split_antimeridian(south, west + 360, north, east)
+    if east > 180:
+        return split_antimeridian(south, west, north, east - 360)
+    return [(south, west, north, east)]
+
+
+def validate_box(south, west, north, east):
+    """Refuse a box larger than MAX_BOX_DEGREES (west > east crosses longitude 180)."""
+    width = east - west if west <= east else east - west + 360
+    if north - south > MAX_BOX_DEGREES or width > MAX_BOX_DEGREES:
+        raise ValueError(f"The box must not span more than {MAX_BOX_DEGREES} degrees")
+
+
+def candidates(connection, boxes, columns, max_rows=None):
+    """
+    Return the rows of places whose point falls in one of the boxes, according to place_geo.
+
+    Raises ValueError when the boxes hold more than max_rows places: the
+    query stops reading the index one row after the bound.
+    """
+    max_rows = MAX_CANDIDATES if max_rows is None else max_rows
+    selected = ', '.join(f'p.{column}' for column in columns)
+    query = text(
+        f"SELECT {selected} FROM {SPATIAL_TABLE} AS g JOIN places AS p ON p.id = g.id "
+        f"WHERE g.max_lat >= :south AND g.min_lat <= :north "
+        f"AND g.max_lon >= :west AND g.min_lon <= :east LIMIT :limit")
+    rows = []
+    for south, west, north, east in boxes:
+        rows += connection.execute(query, {'south': south, 'north': north, 'west': west,
+                                           'east': east, 'limit': max_rows - len(rows) + 1}).all()
+        if len(rows) > max_rows:
+            raise ValueError("Too many places in this area, zoom in")
+    return rows
+
+
+def in_box(lat, lon, south, west, north, east):
+    if not south <= lat <= north:
+        return False
+    if west <= east:
+        return west <= lon <= east
+    return lon >= west or lon <= east
+
+
+geo_cli = AppGroup('geo', help="Spatial index commands.")
+
+
+@geo_cli.command('rebuild')
+def rebuild_command():
+    """Rebuild the place_geo index from the places table."""
+    from app.extensions import db
+    with db.engine.begin() as connection:
+        ensure_spatial_index(connection)
+        count = rebuild_spatial_index(connection)
+    click.echo(f"Indexed {count} places")
@@ -1,38 +1,58 @@
-from app.models.user import User
+from collections import namedtuple
+from app.models.user import User, normalize_email
 from app import db
+from app.persistence.repository import SQLAlchemyRepository, commit_or_flush
 from sqlalchemy.exc import IntegrityError
 
-class UserRepository:
+# Ce dont le login et le contrôle d'unicité ont besoin, sans charger un User
+UserCredentials = namedtuple('UserCredentials', ['id', 'password', 'is_admin'])
+
+class UserRepository(SQLAlchemyRepository):
     """Repository spécifique pour le modèle User."""
 
     def __init__(self):
-        self.model = User
+        super().__init__(User)
+
+    normalize_email = staticmethod(normalize_email)
 
     def get_by_id(self, user_id):
         """Récupère un utilisateur par son ID."""
         return db.session.query(self.model).get(user_id)
 
     def get_by_email(self, email):
-        """Récupère un utilisateur par son email."""
-        return db.session.query(self.model).filter_by(email=email).first()
+        """Récupère un utilisateur par son email (sans tenir compte de la casse)."""
+        return db.session.query(self.model).filter_by(email_normalized=normalize_email(email)).first()
+
+    def get_user_id(self, email):
+        """Retourne l'ID de l'utilisateur qui a cet email, ou None."""
+        rows = self.select_rows(['id'], self.model.email_normalized == normalize_email(email), limit=1)
+        return rows[0].id if rows else None
+
+    def get_credentials(self, email):
+        """Retourne (id, hash du mot de passe, is_admin) de l'utilisateur, ou None."""
+        rows = self.select_rows(['id', 'password', 'is_admin'],
+                                self.model.email_normalized == normalize_email(email), limit=1)
+        if not rows:
+            return None
+        return UserCredentials(rows[0].id, rows[0].password, bool(rows[0].is_admin))
 
     def create(self, first_name, last_name, email, password, is_admin=False):
         """Crée un nouvel utilisateur."""
+        user = self.model(
+            first_name=first_name,
+            last_name=last_name,
+            email=email,
+            password=password,  # Hashé une seule fois par User.__init__
+            is_admin=is_admin,
+        )
         try:
-            user = self.model(
-                first_name=first_name,
-                last_name=last_name,
-                email=email,
-                password=password,
-                is_admin=is_admin,
-            )
-            user.hash_password(password)  # Hashage du mot de passe
-            db.session.add(user)
-            db.session.commit()
-            return user
+            # Savepoint : un email déjà pris n'annule que cet utilisateur, pas l'unit of work en cours
+            with db.session.begin_nested():
+                db.session.add(user)
         except IntegrityError:
-            db.session.rollback()
             raise ValueError("Email déjà utilisé.")
+        commit_or_flush()
+        return user
 
     def update(self, user_id, data):
         """Met à jour les informations d'un utilisateur."""
@@ -41,10 +61,12 @@ class UserRepository:
             raise ValueError("Utilisateur introuvable.")
 
         for key, value in data.items():
-            if hasattr(user, key) and key != "id":
+            if key == "password":
+                user.hash_password(value)
+            elif hasattr(user, key) and key != "id":
                 setattr(user, key, value)
 
-        db.session.commit()
+        commit_or_flush()
         return user
 
     def delete(self, user_id):
@@ -54,8 +76,10 @@ class UserRepository:
             raise ValueError("Utilisateur introuvable.")
 
         db.session.delete(user)
-        db.session.commit()
+        commit_or_flush()
 
-    def get_all(self):
-        """Retourne la liste de tous les utilisateurs."""
+    def get_all(self, profile=None, columns=None):
+        """Retourne la liste de tous les utilisateurs (ou des Row si columns est donné)."""
+        if columns:
+            return self.select_rows(columns, order_by=[self.model.id])
         return db.session.query(self.model).all()
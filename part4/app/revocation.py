@@ -0,0 +1,416 @@
+import hashlib
+import heapq
+import logging
+import math
+import threading
+import time
+from datetime import timedelta
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over byte strings.
+
+    Sized for `capacity` keys at `error_rate` false positives; positions are
+    derived from one blake2b digest by double hashing. Keys cannot be
+    removed: the filter is rebuilt instead.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    @staticmethod
+    def _hash(key):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def add(self, key):
+        h1, h2 = self._hash(key)
+        bits, size = self._bits, self.size
+        for _ in range(self.hashes):
+            position = h1 % size
+            bits[position >> 3] |= 1 << (position & 7)
+            h1 += h2
+        self.count += 1
+
+    def __contains__(self, key):
+        h1, h2 = self._hash(key)
+        bits, size = self._bits, self.size
+        for _ in range(self.hashes):
+            position = h1 % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+            h1 += h2
+        return True
+
+    @property
+    def nbytes(self):
+        return len(self._bits)
+
+
+class InMemoryRevocationBackend:
+    """Exact revocation list kept in this process (single worker, tests)."""
+
+    def __init__(self):
+        self._entries = {}  # (kind, key) -> expires_at
+        self._expiries = []  # heap of (expires_at, kind, key)
+        # add() vient des requêtes, prune() du thread de maintenance
+        self._lock = threading.Lock()
+
+    def add(self, kind, key, expires_at):
+        with self._lock:
+            current = self._entries.get((kind, key))
+            if current is not None and current >= expires_at:
+                return False
+            self._entries[(kind, key)] = expires_at
+            heapq.heappush(self._expiries, (expires_at, kind, key))
+            return current is None
+
+    def expiry(self, kind, key):
+        return self._entries.get((kind, key))
+
+    def last_cursor(self):
+        return None
+
+    def changes_since(self, cursor):
+        # Tout passe par ce processus : le filtre est déjà à jour
+        return [], cursor
+
+    def active(self, now):
+        with self._lock:
+            return [entry for entry, expires_at in self._entries.items() if expires_at > now]
+
+    def prune(self, now):
+        removed = 0
+        with self._lock:
+            while self._expiries and self._expiries[0][0] <= now:
+                expires_at, kind, key = heapq.heappop(self._expiries)
+                # Une révocation plus longue a pu remplacer celle-ci
+                if self._entries.get((kind, key)) == expires_at:
+                    del self._entries[(kind, key)]
+                    removed += 1
+        return removed
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self._expiries.clear()
+
+
+class SQLAlchemyRevocationBackend:
+    """
+    Exact revocation list in the revoked_tokens table, shared by every worker.
+
+    add() returns True only for the call that inserted the row: the unique
+    index on (kind, key) makes the winner of a race between workers unique.
+    """
+
+    def add(self, kind, key, expires_at):
+        from sqlalchemy.exc import IntegrityError
+        from app.extensions import db
+        from app.models.revoked_token import RevokedToken
+        from app.persistence.repository import commit_or_flush
+        try:
+            # Savepoint : un conflit n'annule pas le travail en cours de l'appelant
+            with db.session.begin_nested():
+                row = RevokedToken.query.filter_by(kind=kind, key=key).first()
+                if row is None:
+                    db.session.add(RevokedToken(kind=kind, key=key, expires_at=expires_at))
+                elif row.expires_at < expires_at:
+                    row.expires_at = expires_at
+            inserted = row is None
+        except IntegrityError:
+            # Révoqué au même instant par un autre worker : on garde l'expiration la plus lointaine
+            table = RevokedToken.__table__
+            db.session.execute(table.update().where(
+                table.c.kind == kind, table.c.key == key, table.c.expires_at < expires_at
+            ).values(expires_at=expires_at))
+            inserted = False
+        commit_or_flush()
+        return inserted
+
+    def expiry(self, kind, key):
+        from app.extensions import db
+        from app.models.revoked_token import RevokedToken
+        return db.session.execute(
+            db.select(RevokedToken.expires_at).where(RevokedToken.kind == kind, RevokedToken.key == key)
+        ).scalar()
+
+    def last_cursor(self):
+        from app.extensions import db
+        from app.models.revoked_token import RevokedToken
+        return db.session.execute(db.select(db.func.max(RevokedToken.id))).scalar()
+
+    def changes_since(self, cursor):
+        from app.extensions import db
+        from app.models.revoked_token import RevokedToken
+        rows = db.session.execute(
+            db.select(RevokedToken.id, RevokedToken.kind, RevokedToken.key)
+            .where(RevokedToken.id > (cursor or 0)).order_by(RevokedToken.id)
+        ).all()
+        return [(row.kind, row.key) for row in rows], (rows[-1].id if rows else cursor)
+
+    def active(self, now):
+        from app.extensions import db
+        from app.models.revoked_token import RevokedToken
+        query = db.select(RevokedToken.kind, RevokedToken.key).where(RevokedToken.expires_at > now)
+        for row in db.session.execute(query.execution_options(yield_per=10_000)):
+            yield row.kind, row.key
+
+    def prune(self, now):
+        from app.extensions import db
+        from app.models.revoked_token import RevokedToken
+        table = RevokedToken.__table__
+        # Transaction à part : jamais celle d'une requête, que la purge ne doit pas valider
+        with db.engine.begin() as connection:
+            return connection.execute(table.delete().where(table.c.expires_at <= now)).rowcount
+
+    def __len__(self):
+        from app.models.revoked_token import RevokedToken
+        return RevokedToken.query.count()
+
+    def clear(self):
+        from app.extensions import db
+        from app.models.revoked_token import RevokedToken
+        RevokedToken.query.delete()
+        db.session.commit()
+
+
+class TokenRevocationStore:
+    """
+    Revoked JWTs, checked by the blocklist loader on every protected request.
+
+    Two things are revoked, each until the tokens it concerns expire: single
+    tokens by jti (a refresh token after rotation, a logged-out token) and
+    whole sessions by their 'fam' claim. The exact list lives in a backend
+    (the revoked_tokens table by default); an in-process Bloom filter in
+    front of it answers "not revoked" for almost every request without
+    touching the backend, which is only queried to confirm a positive.
+
+    The filter is built when the application starts (warm_up) and pulls the
+    rows added by other workers every sync_interval seconds. Expired rows
+    are deleted every prune_interval seconds by maintain(), run by a
+    background thread (start_maintenance), never by a request; the filter
+    is then rebuilt aside and swapped in, so checks do not wait for it.
+
+    Presenting an already rotated refresh token is treated as theft: the
+    whole session is revoked, including the tokens of the legitimate client.
+    """
+
+    def __init__(self, backend=None, capacity=100_000, error_rate=0.001, sync_interval=5,
+                 prune_interval=3600, session_ttl=timedelta(days=14), clock=time.time):
+        self.backend = backend if backend is not None else InMemoryRevocationBackend()
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.prune_interval = prune_interval
+        self.session_ttl = session_ttl
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._maintenance = None
+        self._reset()
+
+    def _reset(self):
+        self._bloom = BloomFilter(self.capacity, self.error_rate)
+        self._cursor = None
+        self._loaded = False
+        self._added_during_rebuild = None
+        self._next_sync = self._next_prune = 0
+        self.checks = self.positives = self.false_positives = 0
+
+    def init_app(self, app):
+        config = app.config
+        if config.get('JWT_REVOCATION_BACKEND', 'database') == 'memory':
+            self.backend = InMemoryRevocationBackend()
+        else:
+            self.backend = SQLAlchemyRevocationBackend()
+        self.capacity = config.get('JWT_REVOCATION_BLOOM_CAPACITY', 100_000)
+        self.error_rate = config.get('JWT_REVOCATION_BLOOM_ERROR_RATE', 0.001)
+        self.sync_interval = config.get('JWT_REVOCATION_SYNC_INTERVAL', 5)
+        self.prune_interval = config.get('JWT_REVOCATION_PRUNE_INTERVAL', 3600)
+        # Une session peut encore avoir des tokens valides jusqu'à la plus longue des deux durées
+        self.session_ttl = max(config.get('JWT_ACCESS_TOKEN_EXPIRES', timedelta(hours=1)),
+                               config.get('JWT_REFRESH_TOKEN_EXPIRES', timedelta(days=14)))
+        self.stop_maintenance()
+        with self._lock:
+            self._reset()
+
+    @staticmethod
+    def _key(kind, key):
+        return f'{kind}:{key}'.encode('utf-8')
+
+    def warm_up(self):
+        """Prune the backend and build the filter, before the first request needs it."""
+        now = self.clock()
+        self.prune(now)
+        if not self._loaded:
+            self.rebuild(now)
+
+    def prune(self, now=None):
+        """Delete expired entries; rebuild the filter once a quarter of it is stale."""
+        now = self.clock() if now is None else now
+        self._next_prune = now + self.prune_interval
+        removed = self.backend.prune(now)
+        if self._loaded and removed * 4 >= self._bloom.count:
+            self.rebuild(now)
+        logger.debug(f"Pruned {removed} expired revocations")
+        return removed
+
+    def rebuild(self, now=None):
+        """
+        Rebuild the filter from the entries of the backend.
+
+        The new filter is built without holding the lock, then swapped in:
+        the revocations made meanwhile by this process are replayed into it,
+        those of other workers come with the sync from the cursor read first.
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            self._added_during_rebuild = []
+        try:
+            # Lu avant les entrées : une révocation concurrente sera reprise par la synchro
+            cursor = self.backend.last_cursor()
+            entries = list(self.backend.active(now))
+            bloom = BloomFilter(max(self.capacity, 2 * len(entries)), self.error_rate)
+            for kind, key in entries:
+                bloom.add(self._key(kind, key))
+            with self._lock:
+                for key in self._added_during_rebuild:
+                    bloom.add(key)
+                self._bloom, self._loaded = bloom, True
+                self._cursor = cursor
+                self._sync(now)
+        finally:
+            with self._lock:
+                self._added_during_rebuild = None
+        logger.debug(f"Revocation filter rebuilt with {len(entries)} entries")
+
+    def _sync(self, now):
+        entries, self._cursor = self.backend.changes_since(self._cursor)
+        for kind, key in entries:
+            self._bloom.add(self._key(kind, key))
+        self._next_sync = now + self.sync_interval
+
+    def maintain(self, now=None):
+        """Background upkeep: prune every prune_interval, resize a filter past its capacity."""
+        now = self.clock() if now is None else now
+        if now >= self._next_prune:
+            self.prune(now)
+        elif self._bloom.count > self._bloom.capacity:
+            # Filtre plein : le taux de faux positifs augmente, on le redimensionne
+            self.rebuild(now)
+
+    def start_maintenance(self, app):
+        """Run maintain() every sync_interval seconds in a daemon thread, inside an app context."""
+        from app.extensions import db
+        self.stop_maintenance()
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(self.sync_interval):
+                with app.app_context():
+                    try:
+                        self.maintain()
+                    except Exception:
+                        logger.exception("Revocation maintenance failed")
+                    finally:
+                        db.session.remove()
+
+        thread = threading.Thread(target=run, name='revocation-maintenance', daemon=True)
+        self._maintenance = (stop, thread)
+        thread.start()
+
+    def stop_maintenance(self):
+        if self._maintenance is not None:
+            stop, thread = self._maintenance
+            stop.set()
+            thread.join()
+            self._maintenance = None
+
+    def _maintain(self, now):
+        """Request path: only the cheap sync with the other workers."""
+        if not self._loaded:
+            # Pas de warm_up (store créé hors de create_app) : construit à la première requête
+            self.rebuild(now)
+        elif now >= self._next_sync:
+            with self._lock:
+                if now >= self._next_sync:
+                    self._sync(now)
+
+    def _add(self, kind, key, expires_at):
+        if key is None:
+            return False
+        with self._lock:
+            self._maintain(self.clock())
+            inserted = self.backend.add(kind, key, int(expires_at))
+            self._bloom.add(self._key(kind, key))
+            if self._added_during_rebuild is not None:
+                self._added_during_rebuild.append(self._key(kind, key))
+        return inserted
+
+    def revoke(self, jti, expires_at):
+        """
+        Revoke one token until its expiry (a Unix timestamp).
+
+        Return True when this call revoked it, False when it already was
+        (by this process or by another worker): refresh token rotation uses
+        it so that only one of two concurrent refreshes succeeds.
+        """
+        return self._add('jti', jti, expires_at)
+
+    def revoke_family(self, family, expires_at=None):
+        """Revoke every token of a login session (until the last one can have expired)."""
+        if expires_at is None:
+            expires_at = self.clock() + self.session_ttl.total_seconds()
+        self._add('fam', family, expires_at)
+
+    def revoke_session(self, payload):
+        """Revoke the token described by payload and, if it has one, its whole session."""
+        self.revoke(payload.get('jti'), payload['exp'])
+        self.revoke_family(payload.get('fam'))
+
+    def _confirmed(self, kind, key, now):
+        if key is None or self._key(kind, key) not in self._bloom:
+            return False
+        self.positives += 1
+        expires_at = self.backend.expiry(kind, key)
+        if expires_at is not None and expires_at > now:
+            return True
+        self.false_positives += 1
+        return False
+
+    def is_revoked(self, payload):
+        """Return True if the decoded token payload has been revoked."""
+        now = self.clock()
+        self._maintain(now)
+        self.checks += 1
+        if self._confirmed('fam', payload.get('fam'), now):
+            return True
+        if not self._confirmed('jti', payload.get('jti'), now):
+            return False
+        if payload.get('type') == 'refresh' and payload.get('fam') is not None:
+            # Réutilisation d'un refresh token déjà échangé : on coupe toute la session
+            self.revoke_family(payload['fam'])
+        return True
+
+    def stats(self):
+        return {'checks': self.checks, 'positives': self.positives,
+                'false_positives': self.false_positives, 'filter_keys': self._bloom.count,
+                'filter_bytes': self._bloom.nbytes, 'filter_hashes': self._bloom.hashes}
+
+    def __len__(self):
+        return len(self.backend)
+
+    def clear(self):
+        with self._lock:
+            self.backend.clear()
+            self._reset()
@@ -0,0 +1,126 @@
+"""
+Validation par lots des créations en masse (POST /places/bulk, /amenities/bulk
+et /reviews/bulk).
+
+Chaque élément est d'abord contrôlé seul (présence et type des champs), puis
+les bornes des champs numériques sont vérifiées pour tout le lot à la fois,
+sur des tableaux NumPy. L'existence des utilisateurs, lieux et amenities
+référencés est vérifiée ensuite par le facade, en une requête par table.
+Les erreurs sont rendues par élément, {index: message}, avec les messages de
+la création unitaire ; seule la première erreur d'un élément est gardée.
+"""
+import numbers
+import numpy as np
+
+# Un lot tient dans une seule clause IN (MAX_IN_PARAMS) pour ses lieux et utilisateurs
+MAX_BULK_ITEMS = 500
+
+PLACE_RANGES = (
+    ('price', 0, np.inf, "Price must be a non-negative number"),
+    ('latitude', -90, 90, "Latitude must be between -90 and 90"),
+    ('longitude', -180, 180, "Longitude must be between -180 and 180"),
+)
+RATING_RANGE = ('rating', 1, 5, "Rating must be an integer between 1 and 5")
+
+
+def check_batch(items):
+    """Refuse a payload that is not a non-empty list of at most MAX_BULK_ITEMS items."""
+    if not isinstance(items, list) or not items:
+        raise ValueError("Expected a non-empty list of items")
+    if len(items) > MAX_BULK_ITEMS:
+        raise ValueError(f"At most {MAX_BULK_ITEMS} items can be created at once")
+
+
+def _is_number(value, integer=False):
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, numbers.Integral if integer else numbers.Real)
+
+
+def numeric_column(items, key, integer=False):
+    """items[i][key] as a float array, NaN where the item has no such number."""
+    return np.array([float(item[key]) if isinstance(item, dict) and _is_number(item.get(key), integer)
+                     else np.nan for item in items])
+
+
+def range_errors(items, errors, ranges, integer=False):
+    """Add an error for every item whose value is missing or outside [low, high], checked per column."""
+    for key, low, high, message in ranges:
+        values = numeric_column(items, key, integer)
+        # NaN échoue aux deux comparaisons : valeur absente ou pas un nombre
+        for index in np.flatnonzero(~((values >= low) & (values <= high))):
+            errors.setdefault(int(index), message)
+
+
+def _text_error(value, name, max_length=None):
+    if not isinstance(value, str) or not value.strip():
+        return f"{name} must be a non-empty string"
+    if max_length is not None and len(value) > max_length:
+        return f"{name} must be {max_length} characters or less"
+    return None
+
+
+def validate_places(items):
+    """Check a batch of place payloads; return {index: message} for the invalid ones."""
+    errors = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index] = "Each item must be an object"
+            continue
+        message = _text_error(item.get('title'), "Title", 100)
+        if message is None and not isinstance(item.get('description', ''), str):
+            message = "Description must be a string"
+        if message is None and not isinstance(item.get('amenities', []), list):
+            message = "Amenities must be a list of IDs"
+        if message:
+            errors[index] = message
+    range_errors(items, errors, PLACE_RANGES)
+    return errors
+
+
+def validate_amenities(items):
+    """Check a batch of amenity payloads; return {index: message} for the invalid ones."""
+    errors = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index] = "Each item must be an object"
+            continue
+        message = _text_error(item.get('name'), "Name", 50)
+        if message:
+            errors[index] = message
+    return errors
+
+
+def validate_reviews(items):
+    """Check a batch of review payloads; return {index: message} for the invalid ones."""
+    errors = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index] = "Each item must be an object"
+            continue
+        message = _text_error(item.get('text'), "Text")
+        if message:
+            errors[index] = message
+    range_errors(items, errors, (RATING_RANGE,), integer=True)
+    return errors
+
+
+def coerce_id(value):
+    """
+    An ID from a JSON payload as an int, or None.
+
+    Only integers and strings of digits are IDs: int() would also turn 1.9
+    into 1 and silently reference another row.
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.isascii() and value.isdigit():
+        return int(value)
+    return None
+
+
+def id_error(value, name):
+    """The error message for an ID given but not usable as one, or None."""
+    if value is not None and coerce_id(value) is None:
+        return f"{name} must be an integer ID"
+    return None
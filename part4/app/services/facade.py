@@ -1,6 +1,16 @@
 import logging
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only, selectinload
 from app.persistence.user_repository import UserRepository
-from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.place_repository import PlaceRepository
+from app.persistence.review_repository import ReviewRepository
+from app.persistence.repository import SQLAlchemyRepository, unit_of_work
+from app.persistence.cached_repository import CachedRepository, EmailLookupCache
+from app.persistence.ratings import rebuild_rating_aggregates
+from app.extensions import db, password_hasher
+from app.geo_engine import GeoEngine
+from app.services.bulk import (check_batch, coerce_id, id_error, validate_amenities, validate_places,
+                               validate_reviews)
 from app.models.user import User
 from app.models.amenity import Amenity
 from app.models.place import Place
@@ -20,17 +30,57 @@ class HBnBFacade:
 
     def __init__(self):
         if not self._initialized:
-            # Utilise UserRepository pour les Users et SQLAlchemyRepository pour les autres modèles
+            # Repositories spécifiques pour les Users, Places et Reviews, SQLAlchemyRepository sinon
+            # Chaque repository est précédé d'un cache d'identité (voir configure_caches), sauf
+            # celui des Users : is_admin et le mot de passe ne doivent pas rester périmés dans un worker
             self.user_repo = UserRepository()
-            self.place_repo = SQLAlchemyRepository(Place)
-            self.amenity_repo = SQLAlchemyRepository(Amenity)
-            self.review_repo = SQLAlchemyRepository(Review)
+            # email -> id pour le contrôle d'unicité à l'inscription (jamais le hash ni is_admin)
+            self.user_emails = EmailLookupCache(self.user_repo)
+            self.place_repo = CachedRepository(PlaceRepository(load_profiles={
+                # Colonnes d'une carte de lieu + IDs des amenities en une seule requête IN
+                'place_card': [
+                    load_only(Place.id, Place.title, Place.description, Place.price,
+                              Place.latitude, Place.longitude, Place.owner_id,
+                              Place.review_count, Place.rating_sum),
+                    selectinload(Place.amenities).load_only(Amenity.id),
+                ],
+            }))
+            self.amenity_repo = CachedRepository(SQLAlchemyRepository(Amenity))
+            self.review_repo = CachedRepository(ReviewRepository(load_profiles={
+                # Les listes lisent place_id / user_id directement, sans charger les relations
+                'review_list': [
+                    load_only(Review.id, Review.text, Review.rating, Review.place_id, Review.user_id),
+                ],
+            }))
+            # Positions des lieux en mémoire (NumPy) pour find_nearest_places, chargées au premier appel
+            self.geo_engine = GeoEngine(
+                loader=lambda: self.place_repo.iter_all(columns=['id', 'latitude', 'longitude']),
+                model=Place)
             self._initialized = True
 
+    def _caches(self):
+        return [self.user_emails, self.place_repo, self.amenity_repo, self.review_repo]
+
+    def configure_caches(self, config):
+        """Apply the REPOSITORY_CACHE_* settings of the app config and empty the caches"""
+        disabled = set(config.get('REPOSITORY_CACHE_DISABLED', []))
+        for cache in self._caches():
+            cache.configure(max_size=config.get('REPOSITORY_CACHE_SIZE'),
+                            ttl=config.get('REPOSITORY_CACHE_TTL'),
+                            enabled=config.get('REPOSITORY_CACHE_ENABLED', True)
+                            and cache.model.__name__ not in disabled)
+        # Nouvelle base possible : le moteur géo se recharge à la prochaine requête
+        self.geo_engine.configure(max_age=config.get('GEO_ENGINE_MAX_AGE'))
+
+    def cache_stats(self):
+        """Hit/miss counters of every repository cache"""
+        return [cache.stats() for cache in self._caches()]
+
     def create_user(self, user_data):
         logger.debug(f"Creating user with data: {user_data}")
         try:
-            user = self.user_repo.create(**user_data)
+            with unit_of_work():
+                user = self.user_repo.create(**user_data)
             logger.debug(f"User created with ID: {user.id}")
             return user
         except ValueError as e:
@@ -39,7 +89,7 @@ class HBnBFacade:
 
     def get_user(self, user_id):
         logger.debug(f"Looking for user with ID: {user_id}")
-        user = self.user_repo.get_by_id(user_id)
+        user = self.user_repo.get(user_id)
         if user:
             logger.debug(f"Found user: {user.first_name} {user.last_name}")
         else:
@@ -55,34 +105,114 @@ class HBnBFacade:
             logger.debug("User not found")
         return user
 
-    def get_all_users(self):
-        """Retrieve all users from the repository"""
-        return self.user_repo.get_all()
+    def is_email_registered(self, email):
+        """Tell whether a user already has this email (ignoring case)"""
+        return self.user_emails.get(email) is not None
+
+    def authenticate(self, email, password):
+        """Return the user matching the credentials, or None.
+
+        The password hash and is_admin are read from the database at every
+        login (one indexed query, no User loaded for a wrong password), so a
+        change made by another worker applies immediately. When the bcrypt
+        cost has changed since the password was hashed, the new hash is saved.
+        """
+        credentials = self.user_repo.get_credentials(email)
+        if credentials is None:
+            return None
+        valid, new_hash = password_hasher.verify_and_update(credentials.password, password)
+        if not valid:
+            return None
+        user = self.user_repo.get(credentials.id)
+        if user and new_hash:
+            logger.debug(f"Re-hashing password of user {user.id} with the current cost")
+            with unit_of_work():
+                user.password = new_hash
+                self.user_repo.add(user)
+        return user
+
+    def get_all_users(self, columns=None):
+        """Retrieve all users from the repository (Row tuples when columns are given)"""
+        return self.user_repo.get_all(columns=columns)
+
+    def get_users_page(self, cursor=None, limit=None, with_total=False, columns=None):
+        """Retrieve one page of users as (items, next_cursor, total)"""
+        return self.user_repo.get_page(cursor=cursor, limit=limit, with_total=with_total,
+                                       columns=columns)
 
     def update_user(self, user_id, user_data):
         """Update user with new data"""
         try:
-            user = self.user_repo.update(user_id, user_data)
+            with unit_of_work():
+                user = self.user_repo.update(user_id, user_data)
             return user
         except ValueError as e:
             logger.error(f"Error updating user: {e}")
             raise
 
+    def delete_user(self, user_id):
+        """Delete a user; the database deletes their places and reviews (ON DELETE CASCADE).
+
+        Only IDs are read beforehand, to refresh what the session events cannot
+        see: the rating aggregates of the other users' places they reviewed,
+        the repository caches and the geo engine.
+        """
+        user = self.user_repo.get(user_id)
+        if not user:
+            return False
+        with unit_of_work():
+            place_ids = {row.id for row in self.place_repo.select_rows(['id'], Place.owner_id == user.id)}
+            reviewed = {row.place_id
+                        for row in self.review_repo.select_rows(['place_id'], Review.user_id == user.id)}
+            self.user_repo.delete(user.id)
+            rebuild_rating_aggregates(db.session.connection(), reviewed - place_ids)
+        for place_id in place_ids | reviewed:
+            self.place_repo.invalidate(place_id)
+        for place_id in place_ids:
+            self.geo_engine.remove(place_id)
+        self.review_repo.clear()
+        logger.debug(f"User {user_id} deleted with {len(place_ids)} places")
+        return True
+
     def create_amenity(self, amenity_data):
         """Create a new amenity"""
         if len(amenity_data['name']) > 50:
             raise ValueError("Amenity name must be 50 characters or less")
         amenity = Amenity(**amenity_data)
-        self.amenity_repo.add(amenity)
+        with unit_of_work():
+            self.amenity_repo.add(amenity)
         return amenity
 
+    def create_amenities_bulk(self, items):
+        """Create many amenities with one INSERT; return (created, errors).
+
+        created lists (index, amenity_id) pairs and errors (index, message)
+        pairs, index being the position of the item in items.
+        """
+        check_batch(items)
+        errors = validate_amenities(items)
+        valid = [index for index in range(len(items)) if index not in errors]
+        with unit_of_work():
+            amenity_ids = self.amenity_repo.insert_many([{'name': items[index]['name']} for index in valid])
+        logger.debug(f"{len(amenity_ids)} amenities created, {len(errors)} rejected")
+        return list(zip(valid, amenity_ids)), sorted(errors.items())
+
     def get_amenity(self, amenity_id):
         """Get an amenity by ID"""
         return self.amenity_repo.get(amenity_id)
 
-    def get_all_amenities(self):
-        """Get all amenities"""
-        return self.amenity_repo.get_all()
+    def get_all_amenities(self, columns=None):
+        """Get all amenities (Row tuples when columns are given)"""
+        return self.amenity_repo.get_all(columns=columns)
+
+    def get_amenities_by_ids(self, amenity_ids, columns=None):
+        """Get several amenities in one query, in the order of amenity_ids"""
+        return self.amenity_repo.get_many(amenity_ids, columns=columns)
+
+    def get_amenities_page(self, cursor=None, limit=None, with_total=False, columns=None):
+        """Get one page of amenities as (items, next_cursor, total)"""
+        return self.amenity_repo.get_page(cursor=cursor, limit=limit, with_total=with_total,
+                                          columns=columns)
 
     def update_amenity(self, amenity_id, amenity_data):
         """Update an amenity"""
@@ -90,7 +220,8 @@ class HBnBFacade:
             raise ValueError("Amenity name must be 50 characters or less")
         amenity = self.get_amenity(amenity_id)
         if amenity:
-            self.amenity_repo.update(amenity_id, amenity_data)
+            with unit_of_work():
+                self.amenity_repo.update(amenity_id, amenity_data)
             return amenity
         return None
 
@@ -109,22 +240,25 @@ class HBnBFacade:
             raise ValueError(f"User with id {owner_id} not found")
 
         try:
-            # Création de l'objet Place en passant les données centrales
-            place = Place(
-                **place_data,
-                owner=owner
-            )
-
-            # Ajout des amenities à partir des IDs
-            for amenity_id in amenities_ids:
-                amenity = self.amenity_repo.get(amenity_id)
-                if amenity:
+            with unit_of_work():
+                # Résolution des amenities à partir des IDs (une seule requête IN),
+                # avant de créer le Place pour éviter un autoflush d'un objet incomplet
+                amenities = self.amenity_repo.get_many(amenities_ids)
+                found = {str(amenity.id) for amenity in amenities}
+                for amenity_id in amenities_ids:
+                    if str(amenity_id) not in found:
+                        logger.warning(f"Amenity {amenity_id} not found")
+
+                # Création de l'objet Place en passant les données centrales
+                place = Place(
+                    **place_data,
+                    owner=owner
+                )
+                for amenity in amenities:
                     # Utilise la méthode add_amenity() du modèle Place
                     place.add_amenity(amenity)
-                else:
-                    logger.warning(f"Amenity {amenity_id} not found")
 
-            self.place_repo.add(place)
+                self.place_repo.add(place)
             logger.debug(f"Place added to repository with owner {owner.id}")
 
             return place
@@ -133,11 +267,106 @@ class HBnBFacade:
             logger.error(f"Error creating place: {str(e)}")
             raise ValueError(str(e))
 
-    def get_place(self, place_id):
-        return self.place_repo.get(place_id)
+    def create_places_bulk(self, items, owner_id=None):
+        """Create many places in one transaction; return (created, errors).
 
-    def get_all_places(self):
-        return self.place_repo.get_all()
+        The whole batch is validated first (see app.services.bulk), then the
+        owners and amenities are looked up with one query per table. Valid
+        places are written with one INSERT and their amenity links with
+        another; invalid items are skipped and reported. created lists
+        (index, place_id) pairs and errors (index, message) pairs, index
+        being the position of the item in items. When owner_id is given it
+        owns every place (non-admin callers).
+        """
+        check_batch(items)
+        errors = validate_places(items)
+        owners, amenities = {}, {}
+        for index, item in enumerate(items):
+            if index not in errors:
+                owners[index] = owner_id if owner_id is not None else item.get('owner_id')
+                amenities[index] = item.get('amenities', [])
+        known_owners = self.user_repo.existing_ids(map(coerce_id, owners.values()))
+        known_amenities = self.amenity_repo.existing_ids(
+            coerce_id(amenity_id) for amenity_ids in amenities.values() for amenity_id in amenity_ids)
+        for index, owner in owners.items():
+            missing = [str(amenity_id) for amenity_id in amenities[index]
+                       if coerce_id(amenity_id) not in known_amenities]
+            invalid_owner = id_error(owner, "owner_id")
+            if owner is None:
+                errors[index] = "owner_id is required"
+            elif invalid_owner:
+                errors[index] = invalid_owner
+            elif coerce_id(owner) not in known_owners:
+                errors[index] = f"User with id {owner} not found"
+            elif missing:
+                errors[index] = f"Amenity not found: {', '.join(missing)}"
+
+        valid = [index for index in owners if index not in errors]
+        rows = [{'title': items[index]['title'], 'description': items[index].get('description', ''),
+                 'price': float(items[index]['price']), 'latitude': float(items[index]['latitude']),
+                 'longitude': float(items[index]['longitude']), 'owner_id': coerce_id(owners[index])}
+                for index in valid]
+        try:
+            with unit_of_work():
+                place_ids = self.place_repo.insert_many(rows)
+                self.place_repo.insert_related_ids('amenities', [
+                    (place_id, amenity_id) for index, place_id in zip(valid, place_ids)
+                    for amenity_id in dict.fromkeys(map(coerce_id, amenities[index]))])
+        except IntegrityError:
+            # Propriétaire ou amenity supprimé entre la vérification et l'INSERT
+            raise ValueError("A referenced user or amenity was deleted meanwhile, no place was created")
+        # Index plein texte et R*Tree tenus à jour par les triggers ; le moteur géo ne voit pas l'INSERT
+        self.geo_engine.upsert_many((place_id, row['latitude'], row['longitude'])
+                                    for place_id, row in zip(place_ids, rows))
+        logger.debug(f"{len(place_ids)} places created, {len(errors)} rejected")
+        return list(zip(valid, place_ids)), sorted(errors.items())
+
+    def get_place(self, place_id, profile=None):
+        return self.place_repo.get(place_id, profile=profile)
+
+    def get_all_places(self, columns=None):
+        if columns:
+            return self.place_repo.get_all(columns=columns)
+        return self.place_repo.get_all(profile='place_card')
+
+    def get_places_by_ids(self, place_ids, columns=None):
+        if columns:
+            return self.place_repo.get_many(place_ids, columns=columns)
+        return self.place_repo.get_many(place_ids, profile='place_card')
+
+    def get_places_page(self, cursor=None, limit=None, with_total=False, columns=None):
+        if columns:
+            return self.place_repo.get_page(cursor=cursor, limit=limit, with_total=with_total,
+                                            columns=columns)
+        return self.place_repo.get_page(cursor=cursor, limit=limit, with_total=with_total,
+                                        profile='place_card')
+
+    def search_places(self, filters, sort=None, cursor=None, limit=None, with_total=False,
+                      columns=None):
+        """Filter and sort places in SQL (see PlaceRepository.search) as (items, next_cursor, total)"""
+        profile = None if columns else 'place_card'
+        return self.place_repo.search(**filters, sort=sort, cursor=cursor, limit=limit,
+                                      with_total=with_total, profile=profile, columns=columns)
+
+    def full_text_search_places(self, query, limit=None):
+        """Places whose title, description or reviews match query, best match first"""
+        return self.place_repo.full_text_search(query, limit=limit)
+
+    def get_places_nearby(self, lat, lon, radius_km, limit=None, columns=None):
+        """Places within radius_km of (lat, lon) as (row, distance_km) tuples, nearest first"""
+        return self.place_repo.nearby(lat, lon, radius_km, limit=limit, columns=columns)
+
+    def get_places_within(self, south, west, north, east, limit=None, columns=None):
+        """Places inside a bounding box as (row, distance_km) tuples, nearest to its centre first"""
+        return self.place_repo.within(south, west, north, east, limit=limit, columns=columns)
+
+    def find_nearest_places(self, lat, lon, k=10):
+        """The k places closest to (lat, lon) as (place_id, distance_km) tuples, from the in-memory geo engine"""
+        return self.geo_engine.nearest(lat, lon, k)
+
+    def get_place_amenity_ids(self, place_ids=None):
+        """Map place IDs to their amenity IDs, read from the association table only"""
+        return self.place_repo.related_ids('amenities', place_ids)
 
     def update_place(self, place_id, place_data):
         place = self.place_repo.get(place_id)
@@ -145,43 +374,42 @@ class HBnBFacade:
             return None
 
         try:
-            # Validation et mise à jour des attributs
-            if 'title' in place_data:
-                if len(place_data['title']) > 100:
-                    raise ValueError("Title must be 100 characters or less")
-                place.title = place_data['title']
-
-            if 'description' in place_data:
-                place.description = place_data['description']
-
-            if 'price' in place_data:
-                if place_data['price'] < 0:
-                    raise ValueError("Price must be a non-negative number")
-                place.price = float(place_data['price'])
-
-            if 'latitude' in place_data:
-                if not (-90 <= place_data['latitude'] <= 90):
-                    raise ValueError("Latitude must be between -90 and 90")
-                place.latitude = float(place_data['latitude'])
-
-            if 'longitude' in place_data:
-                if not (-180 <= place_data['longitude'] <= 180):
-                    raise ValueError("Longitude must be between -180 and 180")
-                place.longitude = float(place_data['longitude'])
-
-            if 'owner_id' in place_data:
-                owner = self.user_repo.get(place_data['owner_id'])
-                if owner:
-                    place.owner = owner
-                else:
-                    raise ValueError(f"User with id {place_data['owner_id']} not found")
-
-            if 'amenities' in place_data:
-                place.amenities = []  # Réinitialise la liste des amenities
-                for amenity_id in place_data['amenities']:
-                    amenity = self.amenity_repo.get(amenity_id)
-                    if amenity:
-                        place.add_amenity(amenity)
+            # Toutes les modifications sont validées en un seul commit
+            with unit_of_work():
+                # Validation et mise à jour des attributs
+                if 'title' in place_data:
+                    if len(place_data['title']) > 100:
+                        raise ValueError("Title must be 100 characters or less")
+                    place.title = place_data['title']
+
+                if 'description' in place_data:
+                    place.description = place_data['description']
+
+                if 'price' in place_data:
+                    if place_data['price'] < 0:
+                        raise ValueError("Price must be a non-negative number")
+                    place.price = float(place_data['price'])
+
+                if 'latitude' in place_data:
+                    if not (-90 <= place_data['latitude'] <= 90):
+                        raise ValueError("Latitude must be between -90 and 90")
+                    place.latitude = float(place_data['latitude'])
+
+                if 'longitude' in place_data:
+                    if not (-180 <= place_data['longitude'] <= 180):
+                        raise ValueError("Longitude must be between -180 and 180")
+                    place.longitude = float(place_data['longitude'])
+
+                if 'owner_id' in place_data:
+                    owner = self.user_repo.get(place_data['owner_id'])
+                    if owner:
+                        place.owner = owner
+                    else:
+                        raise ValueError(f"User with id {place_data['owner_id']} not found")
+
+                if 'amenities' in place_data:
+                    # Seules les associations ajoutées ou retirées sont écrites
+                    self.place_repo.set_related_ids('amenities', place.id, place_data['amenities'])
 
             logger.debug(f"Successfully updated place {place_id}")
             return place
@@ -195,7 +423,12 @@ class HBnBFacade:
         place = self.place_repo.get(place_id)
         if not place:
             raise ValueError("Place not found")
-        self.place_repo.delete(place_id)
+        with unit_of_work():
+            # Reviews supprimées par la base (ON DELETE CASCADE) : retirées du cache ensuite
+            review_ids = [row.id for row in self.review_repo.select_rows(['id'], Review.place_id == place.id)]
+            self.place_repo.delete(place_id)
+        for review_id in review_ids:
+            self.review_repo.invalidate(review_id)
         logger.debug(f"Place with ID {place_id} deleted")
         return True
 
@@ -214,34 +447,125 @@ class HBnBFacade:
             place=place,
             user=user
         )
-        self.review_repo.add(review)
+        try:
+            with unit_of_work():
+                self.review_repo.add(review)
+                # Agrégats du lieu dans la même transaction que la review
+                place.adjust_ratings(1, review.rating)
+        except IntegrityError as error:
+            # Index unique (user_id, place_id) : un POST simultané a déjà créé la review ;
+            # toute autre contrainte (lieu supprimé entre-temps...) n'est pas un doublon
+            if self.review_repo.exists_review(review_data['user_id'], review_data['place_id']):
+                raise ValueError("You have already reviewed this place")
+            raise ValueError("The review conflicts with a concurrent change, it was not created") from error
         return review
 
+    def create_reviews_bulk(self, items, user_id=None):
+        """Create many reviews in one transaction; return (created, errors).
+
+        After the batch validation, the users, the places (with their owner)
+        and the reviews the users already left on those places are read with
+        one query each, then checked with set lookups. Valid reviews are
+        written with one INSERT and the rating aggregates of their places
+        with one executemany UPDATE. created lists (index, review_id) pairs
+        and errors (index, message) pairs, index being the position of the
+        item in items. When user_id is given it writes every review
+        (non-admin callers).
+        """
+        check_batch(items)
+        errors = validate_reviews(items)
+        pairs = {}
+        for index, item in enumerate(items):
+            if index in errors:
+                continue
+            user = user_id if user_id is not None else item.get('user_id')
+            message = id_error(user, "user_id") or id_error(item.get('place_id'), "place_id")
+            if message:
+                errors[index] = message
+            else:
+                pairs[index] = (coerce_id(user), coerce_id(item.get('place_id')))
+        user_ids = {user for user, _ in pairs.values()} - {None}
+        place_ids = {place for _, place in pairs.values()} - {None}
+        known_users = self.user_repo.existing_ids(user_ids)
+        owners = {row.id: row.owner_id
+                  for row in self.place_repo.get_many(place_ids, columns=['id', 'owner_id'])}
+        reviewed = {(row.user_id, row.place_id) for row in self.review_repo.select_rows(
+            ['user_id', 'place_id'], Review.user_id.in_(known_users), Review.place_id.in_(owners))}
+        for index, (user, place) in pairs.items():
+            if user not in known_users:
+                errors[index] = "User not found"
+            elif place not in owners:
+                errors[index] = "Place not found"
+            elif owners[place] == user:
+                errors[index] = "You cannot review your own place"
+            elif (user, place) in reviewed:
+                errors[index] = "You have already reviewed this place"
+            else:
+                # Deux fois le même couple dans le lot : seul le premier passe
+                reviewed.add((user, place))
+
+        valid = [index for index in pairs if index not in errors]
+        totals = {}
+        for index in valid:
+            count, total = totals.get(pairs[index][1], (0, 0))
+            totals[pairs[index][1]] = (count + 1, total + items[index]['rating'])
+        try:
+            with unit_of_work():
+                review_ids = self.review_repo.insert_many([
+                    {'text': items[index]['text'], 'rating': items[index]['rating'],
+                     'user_id': pairs[index][0], 'place_id': pairs[index][1]} for index in valid])
+                self.place_repo.add_ratings(totals)
+        except IntegrityError:
+            # Index unique (user_id, place_id) ou clé étrangère : écriture simultanée
+            raise ValueError("The batch conflicts with a concurrent change, no review was created")
+        # Les agrégats ont changé hors de la session
+        for place_id in totals:
+            self.place_repo.invalidate(place_id)
+        logger.debug(f"{len(review_ids)} reviews created, {len(errors)} rejected")
+        return list(zip(valid, review_ids)), sorted(errors.items())
+
     def get_review(self, review_id):
         return self.review_repo.get(review_id)
 
-    def get_all_reviews(self):
-        return self.review_repo.get_all()
-
-    def get_reviews_by_place(self, place_id):
-        place = self.get_place(place_id)
-        if not place:
+    def get_all_reviews(self, columns=None):
+        if columns:
+            return self.review_repo.get_all(columns=columns)
+        return self.review_repo.get_all(profile='review_list')
+
+    def get_reviews_page(self, cursor=None, limit=None, with_total=False, columns=None):
+        if columns:
+            return self.review_repo.get_page(cursor=cursor, limit=limit, with_total=with_total,
+                                             columns=columns)
+        return self.review_repo.get_page(cursor=cursor, limit=limit, with_total=with_total,
+                                         profile='review_list')
+
+    def get_reviews_by_place(self, place_id, cursor=None, limit=None, with_total=False, columns=None):
+        """Reviews of one place as (items, next_cursor, total); every review when no cursor/limit is given"""
+        if not self.get_place(place_id):
             raise ValueError("Place not found")
-        return [review for review in self.review_repo.get_all() if review.place.id == place_id]
+        profile = None if columns else 'review_list'
+        return self.review_repo.get_by_place_id(place_id, cursor=cursor, limit=limit,
+                                                with_total=with_total, profile=profile, columns=columns)
 
     def update_review(self, review_id, review_data):
         review = self.review_repo.get(review_id)
         if review:
             if 'rating' in review_data and not (1 <= review_data['rating'] <= 5):
                 raise ValueError("Rating must be between 1 and 5")
-            self.review_repo.update(review_id, review_data)
+            old_rating = review.rating
+            with unit_of_work():
+                self.review_repo.update(review_id, review_data)
+                if review.rating != old_rating:
+                    review.place.adjust_ratings(0, review.rating - old_rating)
             return review
         return None
 
     def delete_review(self, review_id):
         review = self.review_repo.get(review_id)
         if review:
-            self.review_repo.delete(review_id)
+            with unit_of_work():
+                review.place.adjust_ratings(-1, -review.rating)
+                self.review_repo.delete(review_id)
             return True
         return False
 
@@ -255,5 +579,4 @@ class HBnBFacade:
         """
         Check if a user has already left a review for a given place.
         """
-        reviews = self.get_reviews_by_place(place_id)
-        return any(review.user.id == int(user_id) for review in reviews)
+        return self.review_repo.exists_review(user_id, place_id)
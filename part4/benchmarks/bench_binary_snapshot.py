@@ -0,0 +1,79 @@
+"""
+Démarrage à froid : snapshot binaire mmap vs snapshot JSON (DurableInMemoryRepository).
+
+Usage : python -m benchmarks.bench_binary_snapshot [nb_lieux]
+"""
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from app.persistence.binary_snapshot import SCHEMAS, MappedInMemoryRepository, write_snapshot
+from app.persistence.durable_repository import DurableInMemoryRepository
+from benchmarks.common import report
+
+
+def make_place(i):
+    return SimpleNamespace(id=i, title=f"Place {i}", description="Appartement lumineux " * 5,
+                           price=float(i % 500), latitude=45.0, longitude=5.0, owner_id=i % 1000,
+                           created_at=datetime(2025, 1, 1), updated_at=datetime(2025, 1, 1))
+
+
+def main(nb_places=1_000_000):
+    logging.disable(logging.CRITICAL)
+    data_dir = tempfile.mkdtemp(prefix='hbnb-bench-snap-')
+    try:
+        places = [make_place(i) for i in range(1, nb_places + 1)]
+        path = os.path.join(data_dir, 'places.snap')
+        start = time.perf_counter()
+        write_snapshot(path, SCHEMAS['places'], places)
+        write_s = time.perf_counter() - start
+
+        json_repo = DurableInMemoryRepository(os.path.join(data_dir, 'json'), synchronous=False,
+                                              snapshot_every=nb_places + 1)
+        for place in places:
+            json_repo.add(place)
+        json_repo.snapshot()
+        json_repo.close()
+        del places
+
+        lookups = [random.randint(1, nb_places) for _ in range(10_000)]
+        rows = []
+
+        start = time.perf_counter()
+        repo = MappedInMemoryRepository(path)
+        first = repo.get(lookups[0])
+        boot_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for obj_id in lookups:
+            repo.get(obj_id)
+        get_us = (time.perf_counter() - start) / len(lookups) * 1e6
+        assert first.id == lookups[0]
+        repo.close()
+        rows.append(('binary mmap (lazy)', f"{boot_ms:.1f}", f"{get_us:.1f}",
+                     f"{os.path.getsize(path) / 1e6:.0f}"))
+
+        start = time.perf_counter()
+        repo = DurableInMemoryRepository(os.path.join(data_dir, 'json'))
+        repo.get(lookups[0])
+        boot_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for obj_id in lookups:
+            repo.get(obj_id)
+        get_us = (time.perf_counter() - start) / len(lookups) * 1e6
+        repo.close()
+        size = os.path.getsize(os.path.join(data_dir, 'json', 'snapshot.jsonl'))
+        rows.append(('JSON snapshot (eager)', f"{boot_ms:.1f}", f"{get_us:.1f}", f"{size / 1e6:.0f}"))
+
+        report(f"Cold start with {nb_places:,} places (binary snapshot written in {write_s:.1f} s)", rows,
+               ('format', 'boot + first read ms', 'get us', 'file MB'))
+    finally:
+        shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,108 @@
+"""
+Création de nb_places lieux (2 amenities chacun) puis de nb_reviews reviews :
+un appel par élément vs les créations en masse.
+
+Mesure la durée et le nombre de requêtes SQL de :
+- avant : facade.create_place / facade.create_review pour chaque élément
+          (validation, lectures et commit par élément)
+- après : facade.create_places_bulk / facade.create_reviews_bulk par lots de
+          MAX_BULK_ITEMS (validation du lot, une requête par table pour les
+          références, INSERT multi-lignes, un commit par lot)
+
+Chaque variante part d'une base neuve.
+
+Usage : python -m benchmarks.bench_bulk_create [nb_places] [nb_reviews]
+"""
+import logging
+import sys
+import time
+from sqlalchemy import event, func, select
+from app import db
+from app.models import User, Place, Amenity, Review
+from app.services import facade
+from app.services.bulk import MAX_BULK_ITEMS
+from benchmarks.common import make_app, report
+
+
+def seed(nb_reviewers):
+    users = [User(first_name=f"User{i}", last_name="B", email=f"user{i}@bench.io", password="x")
+             for i in range(nb_reviewers + 1)]
+    amenities = [Amenity(name=f"Amenity {i}") for i in range(2)]
+    db.session.add_all(users + amenities)
+    db.session.commit()
+    return [user.id for user in users], [amenity.id for amenity in amenities]
+
+
+def place_items(nb_places, amenity_ids):
+    return [{'title': f"Place {i}", 'description': "Quiet", 'price': 50 + i % 100,
+             'latitude': (i % 180) - 90.0, 'longitude': (i % 360) - 180.0, 'amenities': amenity_ids}
+            for i in range(nb_places)]
+
+
+def review_items(nb_reviews, place_ids, reviewer_ids):
+    # Chaque relecteur note chaque lieu au plus une fois
+    return [{'text': "Nice stay", 'rating': 1 + i % 5, 'place_id': place_ids[i % len(place_ids)],
+             'user_id': reviewer_ids[i // len(place_ids)]} for i in range(nb_reviews)]
+
+
+def one_by_one(owner_id, places, reviews):
+    place_ids = [facade.create_place(dict(item, owner_id=owner_id)).id for item in places]
+    for item in reviews:
+        facade.create_review(dict(item, place_id=place_ids[item['place_id']]))
+
+
+def in_batches(owner_id, places, reviews):
+    place_ids = []
+    for start in range(0, len(places), MAX_BULK_ITEMS):
+        created, errors = facade.create_places_bulk(places[start:start + MAX_BULK_ITEMS], owner_id=owner_id)
+        assert not errors
+        place_ids += [place_id for _, place_id in created]
+    reviews = [dict(item, place_id=place_ids[item['place_id']]) for item in reviews]
+    for start in range(0, len(reviews), MAX_BULK_ITEMS):
+        # Un lot vient d'un seul utilisateur dans l'API (POST /reviews/bulk)
+        batch = reviews[start:start + MAX_BULK_ITEMS]
+        for user_id in dict.fromkeys(item['user_id'] for item in batch):
+            created, errors = facade.create_reviews_bulk(
+                [item for item in batch if item['user_id'] == user_id], user_id=user_id)
+            assert not errors
+
+
+def measure(create, nb_places, nb_reviews):
+    logging.disable(logging.CRITICAL)
+    app = make_app()
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        user_ids, amenity_ids = seed(-(-nb_reviews // nb_places))
+        owner_id, reviewer_ids = user_ids[0], user_ids[1:]
+        places = place_items(nb_places, amenity_ids)
+        # place_id : position du lieu, remplacée par son ID une fois créé
+        reviews = review_items(nb_reviews, list(range(nb_places)), reviewer_ids)
+        db.session.remove()
+        event.listen(db.engine, 'before_cursor_execute', count)
+        start = time.perf_counter()
+        create(owner_id, places, reviews)
+        elapsed = (time.perf_counter() - start) * 1000
+        event.remove(db.engine, 'before_cursor_execute', count)
+        assert db.session.execute(select(func.count()).select_from(Place)).scalar() == nb_places
+        assert db.session.execute(select(func.count()).select_from(Review)).scalar() == nb_reviews
+        assert db.session.execute(select(func.sum(Place.review_count))).scalar() == nb_reviews
+    return elapsed, len(statements)
+
+
+def main(nb_places=2000, nb_reviews=10_000):
+    rows = []
+    for label, create in (("create_place / create_review per item", one_by_one),
+                          (f"*_bulk, batches of {MAX_BULK_ITEMS}", in_batches)):
+        ms, queries = measure(create, nb_places, nb_reviews)
+        rows.append((label, f"{ms:.1f}", queries))
+
+    report(f"Create {nb_places} places (2 amenities each) and {nb_reviews} reviews",
+           rows, ('create', 'ms', 'statements'))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,100 @@
+"""
+Suppression d'un utilisateur et de tout ce qui en dépend : cascade ORM vs
+ON DELETE CASCADE dans la base.
+
+L'utilisateur possède nb_places lieux (3 amenities chacun) ; chaque lieu a
+nb_reviews / nb_places reviews d'autres utilisateurs, et l'utilisateur a
+noté autant de lieux d'un autre propriétaire. Mesure la durée et le nombre
+de requêtes SQL de :
+- avant : cascade='all, delete-orphan' sans passive_deletes, c'est-à-dire
+          lieux, reviews et liens vers les amenities chargés dans la session
+          puis supprimés par l'ORM
+- après : facade.delete_user (un DELETE sur users, la base supprime le reste ;
+          seuls les IDs nécessaires aux caches et aux agrégats sont lus)
+
+Chaque variante part d'une base neuve.
+
+Usage : python -m benchmarks.bench_cascading_deletes [nb_places] [nb_reviews]
+"""
+import logging
+import sys
+import time
+from sqlalchemy import event, func, select
+from app import db
+from app.models import User, Place, Amenity, Review
+from app.models.place import place_amenity_association
+from app.services import facade
+from benchmarks.common import make_app, report
+
+
+def seed(nb_places, nb_reviews):
+    per_place = max(1, nb_reviews // nb_places)
+    users = [User(first_name=f"User{i}", last_name="B", email=f"user{i}@bench.io", password="x")
+             for i in range(per_place + 2)]
+    db.session.add_all(users)
+    db.session.flush()
+    doomed, other, reviewers = users[0], users[1], users[2:]
+    db.session.execute(Amenity.__table__.insert(), [{'name': f"Amenity {i}"} for i in range(3)])
+    amenity_ids = db.session.execute(select(Amenity.id)).scalars().all()
+    db.session.execute(Place.__table__.insert(), [
+        {'title': f"Place {i}", 'description': "", 'price': 100, 'latitude': 0.0, 'longitude': 0.0,
+         'owner_id': doomed.id if i < nb_places else other.id}
+        for i in range(nb_places + per_place)])
+    place_ids = db.session.execute(select(Place.id).where(Place.owner_id == doomed.id)).scalars().all()
+    other_ids = db.session.execute(select(Place.id).where(Place.owner_id == other.id)).scalars().all()
+    db.session.execute(place_amenity_association.insert(), [
+        {'place_id': place_id, 'amenity_id': amenity_id} for place_id in place_ids for amenity_id in amenity_ids])
+    db.session.execute(Review.__table__.insert(), [
+        {'text': "ok", 'rating': 4, 'place_id': place_id, 'user_id': reviewer.id}
+        for place_id in place_ids for reviewer in reviewers])
+    db.session.execute(Review.__table__.insert(), [
+        {'text': "ok", 'rating': 2, 'place_id': place_id, 'user_id': doomed.id} for place_id in other_ids])
+    db.session.commit()
+    return doomed.id
+
+
+def orm_cascade(user_id):
+    user = db.session.get(User, user_id)
+    # Ce que chargeait la cascade ORM avant passive_deletes
+    for place in user.places:
+        place.reviews, place.amenities
+    user.reviews
+    db.session.delete(user)
+    db.session.commit()
+
+
+def measure(delete, nb_places, nb_reviews):
+    logging.disable(logging.CRITICAL)
+    app = make_app()
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        user_id = seed(nb_places, nb_reviews)
+        db.session.remove()
+        event.listen(db.engine, 'before_cursor_execute', count)
+        start = time.perf_counter()
+        delete(user_id)
+        elapsed = (time.perf_counter() - start) * 1000
+        event.remove(db.engine, 'before_cursor_execute', count)
+        left = db.session.execute(select(func.count()).select_from(Review)
+                                  .where(Review.user_id == user_id)).scalar()
+        assert left == 0
+    return elapsed, len(statements)
+
+
+def main(nb_places=2000, nb_reviews=20_000):
+    rows = []
+    for label, delete in (("ORM cascade (collections loaded)", orm_cascade),
+                          ("facade.delete_user (ON DELETE CASCADE)", facade.delete_user)):
+        ms, queries = measure(delete, nb_places, nb_reviews)
+        rows.append((label, f"{ms:.1f}", queries))
+
+    report(f"Delete a user with {nb_places} places and {nb_reviews} reviews on them",
+           rows, ('delete', 'ms', 'statements'))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,74 @@
+"""
+Listes : hydratation ORM complète vs projection de colonnes (select_rows).
+
+Mesure le débit (lignes/s) et le pic mémoire Python (tracemalloc) pour lire
+toute la table des lieux, chaque lieu ayant une description de ~2 Ko :
+- get_all()                      : instances Place dans l'identity map
+- get_all(profile='place_card')  : instances partielles (load_only)
+- get_all(columns=...)           : Row tuples, sans description
+
+Usage : python -m benchmarks.bench_column_projection [nb_lieux]
+"""
+import gc
+import logging
+import sys
+import time
+import tracemalloc
+from app import db
+from app.models import User, Place
+from app.services import facade
+from benchmarks.common import make_app, report
+
+LIST_COLUMNS = ('id', 'title', 'price', 'latitude', 'longitude', 'owner_id')
+
+
+def seed(nb_places):
+    owner = User(first_name="Owner", last_name="B", email="owner@bench.io", password="x")
+    db.session.add(owner)
+    db.session.flush()
+    description = "Lorem ipsum dolor sit amet. " * 75
+    db.session.execute(Place.__table__.insert(), [
+        {'title': f"Place {i}", 'description': description, 'price': i % 300,
+         'latitude': 0.0, 'longitude': 0.0, 'owner_id': owner.id}
+        for i in range(nb_places)
+    ])
+    db.session.commit()
+
+
+def measure(read):
+    db.session.remove()
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = read()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(rows)
+    del rows
+    db.session.remove()
+    return count, elapsed, peak
+
+
+def main(nb_places=50_000):
+    logging.disable(logging.CRITICAL)
+    app = make_app()
+    with app.app_context():
+        seed(nb_places)
+        repo = facade.place_repo
+        modes = [
+            ('full hydration', lambda: repo.get_all()),
+            ("profile 'place_card'", lambda: repo.get_all(profile='place_card')),
+            ('columns (Row tuples)', lambda: repo.get_all(columns=LIST_COLUMNS)),
+        ]
+        rows = []
+        for label, read in modes:
+            count, elapsed, peak = measure(read)
+            rows.append((label, count, f"{count / elapsed:,.0f}", f"{peak / 2**20:.1f}"))
+
+    report(f"Reading {nb_places} places (~2 KB description each)", rows,
+           ('mode', 'rows', 'rows/s', 'peak MiB'))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,84 @@
+"""
+DurableInMemoryRepository : débit d'écriture en group commit et temps de reprise.
+
+Usage : python -m benchmarks.bench_durable_repository [nb_objets] [taille_du_log]
+"""
+import logging
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from app.persistence.durable_repository import DurableInMemoryRepository
+from benchmarks.common import report
+
+
+def make_record(i):
+    return SimpleNamespace(id=str(i), email=f"user{i}@example.com", first_name="Jane",
+                           last_name="Doe", created_at=datetime(2025, 1, 1))
+
+
+def group_commit(data_dir, nb_threads=8, writes_per_thread=250):
+    repo = DurableInMemoryRepository(data_dir)
+
+    def writer(n):
+        for i in range(writes_per_thread):
+            repo.add(make_record(f"{n}-{i}"))
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(nb_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    writes = nb_threads * writes_per_thread
+    repo.close()
+    return writes, repo.fsync_count, writes / elapsed
+
+
+def main(nb_objects=1_000_000, log_tail=100_000):
+    logging.disable(logging.CRITICAL)
+    data_dir = tempfile.mkdtemp(prefix='hbnb-bench-wal-')
+    try:
+        writes, fsyncs, rate = group_commit(data_dir + '/group')
+        report("Synchronous writes from 8 threads", [(writes, fsyncs, f"{rate:,.0f}")],
+               ('writes', 'fsyncs', 'writes/s'))
+
+        repo = DurableInMemoryRepository(data_dir + '/store', synchronous=False,
+                                         snapshot_every=nb_objects + log_tail + 1)
+        start = time.perf_counter()
+        for i in range(nb_objects):
+            repo.add(make_record(i))
+        repo.snapshot()
+        for i in range(log_tail):
+            repo.update(str(i), {'first_name': "Updated"})
+        repo.sync()
+        load_s = time.perf_counter() - start
+        repo.close()
+
+        start = time.perf_counter()
+        recovered = DurableInMemoryRepository(data_dir + '/store')
+        recovery_s = time.perf_counter() - start
+        assert len(recovered.get_all()) == nb_objects
+        assert recovered.get(str(log_tail - 1)).first_name == "Updated"
+        recovered.close()
+
+        start = time.perf_counter()
+        reopened = DurableInMemoryRepository(data_dir + '/store')
+        compacted_s = time.perf_counter() - start
+        reopened.close()
+
+        report(f"Recovery of {nb_objects:,} objects", [
+            ('snapshot + log tail', f"{log_tail:,}", f"{recovery_s:.2f}"),
+            ('compacted snapshot only', 0, f"{compacted_s:.2f}"),
+        ], ('startup', 'log entries replayed', 'seconds'))
+        print(f"(initial load with asynchronous fsync: {load_s:.2f} s)")
+    finally:
+        shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
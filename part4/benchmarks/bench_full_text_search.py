@@ -0,0 +1,121 @@
+"""
+Recherche de lieux par mot : LIKE '%mot%' sur places/reviews vs index FTS5.
+
+Mesure la latence médiane d'une recherche (client de test Flask pour FTS5,
+requête SQL directe pour LIKE, qui n'a pas d'endpoint) et le coût de
+`flask search rebuild` sur une base de nb_lieux lieux avec une review chacun,
+puis le coût d'une review ajoutée à un lieu qui en a déjà POPULAR_REVIEWS
+(une ligne de review_search, quel que soit ce nombre).
+
+Usage : python -m benchmarks.bench_full_text_search [nb_lieux] [répétitions]
+"""
+import logging
+import random
+import statistics
+import sys
+import time
+from sqlalchemy import text
+from app import db
+from app.models import User, Place, Review
+from app.persistence.search import rebuild_search_index
+from benchmarks.common import make_app, report
+
+WORDS = ("sunny quiet cosy bright spacious modern rustic charming central calm garden terrace "
+         "balcony harbour mountain forest river lake beach studio loft villa cabin chalet").split()
+# Vocabulaire de remplissage : un mot de WORDS apparaît dans ~2 % des lieux
+VOCABULARY = WORDS + [f"word{i}" for i in range(3000)]
+POPULAR_REVIEWS = 2000
+
+
+def sentence(rng, size):
+    return ' '.join(rng.choice(VOCABULARY) for _ in range(size))
+
+
+def seed(nb_places):
+    rng = random.Random(7)
+    owner = User(first_name="Owner", last_name="B", email="owner@bench.io", password="x")
+    db.session.add(owner)
+    db.session.flush()
+    db.session.execute(Place.__table__.insert(), [
+        {'title': sentence(rng, 3), 'description': sentence(rng, 40), 'price': 100,
+         'latitude': 0.0, 'longitude': 0.0, 'owner_id': owner.id}
+        for _ in range(nb_places)
+    ])
+    db.session.execute(Review.__table__.insert(), [
+        {'text': sentence(rng, 15), 'rating': 4, 'place_id': place_id, 'user_id': owner.id}
+        for place_id in range(1, nb_places + 1)
+    ])
+    # Mot rare : quelques lieux seulement le contiennent
+    db.session.execute(text("UPDATE places SET title = title || ' panoramic' WHERE id % 997 = 0"))
+    db.session.commit()
+
+
+def seed_popular_place(rng):
+    """Give place 1 POPULAR_REVIEWS reviews, one per new guest; return one more guest id."""
+    db.session.execute(User.__table__.insert(), [
+        {'first_name': "Guest", 'last_name': "B", 'email': f"guest{i}@bench.io",
+         'email_normalized': f"guest{i}@bench.io", 'password': "x", 'is_admin': False}
+        for i in range(POPULAR_REVIEWS + 1)
+    ])
+    guest_ids = db.session.execute(text("SELECT id FROM users WHERE email LIKE 'guest%' ORDER BY id")).scalars().all()
+    db.session.execute(Review.__table__.insert(), [
+        {'text': sentence(rng, 15), 'rating': 4, 'place_id': 1, 'user_id': guest_id}
+        for guest_id in guest_ids[:-1]
+    ])
+    db.session.commit()
+    return guest_ids[-1]
+
+
+def add_and_remove_review(guest_id):
+    db.session.execute(text("INSERT INTO reviews (text, rating, place_id, user_id) "
+                            "VALUES ('harbour terrace at dusk', 5, 1, :guest)"), {'guest': guest_id})
+    db.session.commit()
+    db.session.execute(text("DELETE FROM reviews WHERE user_id = :guest"), {'guest': guest_id})
+    db.session.commit()
+
+
+def median_ms(run, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - start) * 1000)
+        db.session.remove()
+    return statistics.median(latencies)
+
+
+def like_search(word):
+    return db.session.execute(text(
+        "SELECT id, title FROM places WHERE title LIKE :pattern OR description LIKE :pattern "
+        "OR id IN (SELECT place_id FROM reviews WHERE text LIKE :pattern) LIMIT 20"
+    ), {'pattern': f'%{word}%'}).all()
+
+
+def main(nb_places=50_000, repeat=5):
+    logging.disable(logging.CRITICAL)
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        seed(nb_places)
+        start = time.perf_counter()
+        with db.engine.begin() as connection:
+            rebuild_search_index(connection)
+        rebuild_s = time.perf_counter() - start
+
+        rows = []
+        for word in ("panoramic", "harbour", "harbour terrace"):
+            like = median_ms(lambda: like_search(word.split()[0]), repeat)
+            fts = median_ms(lambda: client.get('/places/search', query_string={'q': word, 'limit': 20}),
+                            repeat)
+            rows.append((word, f"{like:.1f}", f"{fts:.1f}"))
+
+        guest_id = seed_popular_place(random.Random(8))
+        review_ms = median_ms(lambda: add_and_remove_review(guest_id), repeat)
+
+    report(f"Word search over {nb_places} places + reviews (median of {repeat}, first 20 results); "
+           f"index rebuild took {rebuild_s:.1f} s", rows, ('query', 'LIKE ms', 'FTS5 + BM25 ms'))
+    print(f"\nadd + delete a review on a place with {POPULAR_REVIEWS} reviews: {review_ms:.2f} ms")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,82 @@
+"""
+k plus proches lieux : R*Tree (SQL) vs moteur géo NumPy en mémoire.
+
+nb_lieux lieux sont répartis sur l'Europe comme dans bench_geo_queries. Pour
+plusieurs k autour de requêtes aléatoires, mesure la latence médiane de :
+- Python    : distance haversine de chaque lieu en pur Python, puis tri
+- R*Tree    : facade.get_places_nearby avec un rayon qui double jusqu'à
+              trouver k lieux (le R*Tree ne sait répondre qu'à un rayon)
+- NumPy     : facade.find_nearest_places (produit matrice-vecteur + argpartition)
+ainsi que le temps de chargement du moteur et la mémoire de ses tableaux.
+
+Usage : python -m benchmarks.bench_geo_engine [nb_lieux] [répétitions]
+"""
+import heapq
+import logging
+import random
+import statistics
+import sys
+import time
+from sqlalchemy import text
+from app import db
+from app.persistence.spatial import MAX_RADIUS_KM, haversine_km
+from app.services import facade
+from benchmarks.bench_geo_queries import seed
+from benchmarks.common import make_app, report
+
+
+def python_nearest(points, lat, lon, k):
+    return heapq.nsmallest(k, ((haversine_km(lat, lon, p_lat, p_lon), place_id)
+                               for place_id, p_lat, p_lon in points))
+
+
+def rtree_nearest(lat, lon, k):
+    radius, found = 1.0, []
+    while radius <= MAX_RADIUS_KM:
+        try:
+            found = facade.get_places_nearby(lat, lon, radius, limit=k, columns=['id'])
+        except ValueError:
+            return found  # Zone trop dense pour l'endpoint : on garde le rayon précédent
+        if len(found) == k:
+            return found
+        radius *= 2
+    return found
+
+
+def median_ms(run, queries):
+    latencies = []
+    for lat, lon in queries:
+        start = time.perf_counter()
+        run(lat, lon)
+        latencies.append((time.perf_counter() - start) * 1000)
+        db.session.remove()
+    return statistics.median(latencies)
+
+
+def main(nb_places=1_000_000, repeat=5):
+    logging.disable(logging.CRITICAL)
+    app = make_app()
+    rng = random.Random(13)
+    with app.app_context():
+        seed(nb_places)
+        points = db.session.execute(text("SELECT id, latitude, longitude FROM places")).all()
+        start = time.perf_counter()
+        facade.geo_engine.load(facade.place_repo.iter_all(columns=['id', 'latitude', 'longitude']))
+        load_s = time.perf_counter() - start
+        stats = facade.geo_engine.stats()
+
+        rows = []
+        for k in (1, 10, 100):
+            queries = [(rng.uniform(36, 60), rng.uniform(-10, 30)) for _ in range(repeat)]
+            python_ms = median_ms(lambda lat, lon: python_nearest(points, lat, lon, k), queries)
+            rtree_ms = median_ms(lambda lat, lon: rtree_nearest(lat, lon, k), queries)
+            numpy_ms = median_ms(lambda lat, lon: facade.find_nearest_places(lat, lon, k), queries)
+            rows.append((k, f"{python_ms:.0f}", f"{rtree_ms:.2f}", f"{numpy_ms:.2f}"))
+
+    report(f"k nearest places among {nb_places} (median of {repeat}); engine load took {load_s:.1f} s, "
+           f"arrays use {stats['nbytes'] / 2 ** 20:.1f} MiB", rows,
+           ('k', 'Python ms', 'R*Tree ms', 'NumPy ms'))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
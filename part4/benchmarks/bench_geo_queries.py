@@ -0,0 +1,103 @@
+"""
+Lieux autour d'un point : balayage complet vs index R*Tree (place_geo).
+
+nb_lieux lieux sont répartis uniformément sur l'Europe (lat 36..60, lon
+-10..30). Pour plusieurs rayons autour de Paris, mesure la latence médiane de :
+- full scan   : lire id/latitude/longitude de tous les lieux et calculer
+                la distance haversine en Python (ce que ferait un client
+                qui télécharge tout)
+- lat/lon SQL : filtre BETWEEN sur la boîte englobante, sans index
+                spatial (parcours de la table), puis haversine
+- R*Tree      : facade.get_places_nearby (index + haversine + tri)
+- endpoint    : GET /places/nearby (R*Tree + cartes JSON)
+puis la latence de l'endpoint au rayon maximal (MAX_RADIUS_KM), où la zone
+dépasse MAX_CANDIDATES lieux et doit être refusée sans lire tout l'index.
+
+Usage : python -m benchmarks.bench_geo_queries [nb_lieux] [répétitions]
+"""
+import logging
+import random
+import statistics
+import sys
+import time
+from sqlalchemy import text
+from app import db
+from app.models import User, Place
+from app.persistence.spatial import MAX_RADIUS_KM, haversine_km, radius_boxes
+from app.services import facade
+from benchmarks.common import make_app, report
+
+PARIS = (48.8566, 2.3522)
+CHUNK = 50_000
+
+
+def seed(nb_places):
+    rng = random.Random(11)
+    owner = User(first_name="Owner", last_name="B", email="owner@bench.io", password="x")
+    db.session.add(owner)
+    db.session.flush()
+    for start in range(0, nb_places, CHUNK):
+        db.session.execute(Place.__table__.insert(), [
+            {'title': f"Place {i}", 'description': "", 'price': 100,
+             'latitude': rng.uniform(36, 60), 'longitude': rng.uniform(-10, 30), 'owner_id': owner.id}
+            for i in range(start, min(start + CHUNK, nb_places))
+        ])
+    db.session.commit()
+
+
+def full_scan(lat, lon, radius_km):
+    rows = db.session.execute(text("SELECT id, latitude, longitude FROM places")).all()
+    return [row.id for row in rows if haversine_km(lat, lon, row.latitude, row.longitude) <= radius_km]
+
+
+def bbox_scan(lat, lon, radius_km):
+    (south, west, north, east), = radius_boxes(lat, lon, radius_km)
+    rows = db.session.execute(text(
+        "SELECT id, latitude, longitude FROM places "
+        "WHERE latitude BETWEEN :south AND :north AND longitude BETWEEN :west AND :east"
+    ), {'south': south, 'north': north, 'west': west, 'east': east}).all()
+    return [row.id for row in rows if haversine_km(lat, lon, row.latitude, row.longitude) <= radius_km]
+
+
+def median_ms(run, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        latencies.append((time.perf_counter() - start) * 1000)
+        db.session.remove()
+    return statistics.median(latencies), result
+
+
+def main(nb_places=1_000_000, repeat=5):
+    logging.disable(logging.CRITICAL)
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        start = time.perf_counter()
+        seed(nb_places)
+        seed_s = time.perf_counter() - start
+        rows = []
+        for radius in (1, 10, 50):
+            lat, lon = PARIS
+            scan_ms, matches = median_ms(lambda: full_scan(lat, lon, radius), repeat)
+            bbox_ms, _ = median_ms(lambda: bbox_scan(lat, lon, radius), repeat)
+            rtree_ms, found = median_ms(
+                lambda: facade.get_places_nearby(lat, lon, radius, limit=100, columns=['id']), repeat)
+            endpoint_ms, _ = median_ms(
+                lambda: client.get(f'/places/nearby?lat={lat}&lon={lon}&radius_km={radius}&limit=100'),
+                repeat)
+            rows.append((f"{radius} km", len(matches), f"{scan_ms:.1f}", f"{bbox_ms:.1f}",
+                         f"{rtree_ms:.2f}", f"{endpoint_ms:.2f}"))
+        widest_ms, response = median_ms(
+            lambda: client.get(f'/places/nearby?lat={PARIS[0]}&lon={PARIS[1]}&radius_km={MAX_RADIUS_KM}'),
+            repeat)
+
+    report(f"Places near Paris among {nb_places} (median of {repeat}; seeding with the index "
+           f"triggers took {seed_s:.0f} s)", rows,
+           ('radius', 'matches', 'full scan ms', 'lat/lon SQL ms', 'R*Tree ms', 'endpoint ms'))
+    print(f"\nendpoint at {MAX_RADIUS_KM} km: HTTP {response.status_code} in {widest_ms:.1f} ms")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
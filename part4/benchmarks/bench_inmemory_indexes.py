@@ -0,0 +1,51 @@
+"""
+InMemoryRepository.get_by_attribute : index de hachage vs parcours complet.
+
+Usage : python -m benchmarks.bench_inmemory_indexes [nb_objets]
+"""
+import logging
+import sys
+import time
+from app.persistence.repository import InMemoryRepository
+from benchmarks.common import report
+
+
+class Record:
+    __slots__ = ('id', 'email', 'owner_id')
+
+    def __init__(self, obj_id, email, owner_id):
+        self.id = obj_id
+        self.email = email
+        self.owner_id = owner_id
+
+
+def per_lookup_us(repo, attr, values):
+    start = time.perf_counter()
+    for value in values:
+        repo.get_by_attribute(attr, value)
+    return (time.perf_counter() - start) / len(values) * 1e6
+
+
+def main(nb_objects=1_000_000):
+    logging.disable(logging.CRITICAL)
+    records = [Record(str(i), f"user{i}@example.com", str(i % 1000)) for i in range(nb_objects)]
+    rows = []
+    for label, kwargs in (('full scan', {}),
+                          ('hash indexes', {'unique_indexes': ('email',), 'indexes': ('owner_id',)})):
+        repo = InMemoryRepository(**kwargs)
+        start = time.perf_counter()
+        for record in records:
+            repo.add(record)
+        load_s = time.perf_counter() - start
+        # Les pires cas pour un parcours : des emails en fin de table ou absents
+        nb_lookups = 5 if not kwargs else 100_000
+        emails = [f"user{nb_objects - 1 - i % 1000}@example.com" for i in range(nb_lookups)]
+        email_us = per_lookup_us(repo, 'email', emails)
+        missing_us = per_lookup_us(repo, 'email', ["missing@example.com"] * nb_lookups)
+        rows.append((label, f"{load_s:.2f}", f"{email_us:.2f}", f"{missing_us:.2f}"))
+    report(f"get_by_attribute on {nb_objects:,} objects", rows,
+           ('mode', 'load s', 'email hit us', 'email miss us'))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
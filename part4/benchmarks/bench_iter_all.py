@@ -0,0 +1,77 @@
+"""
+Export de toute la table des lieux : get_all() vs iter_all(batch_size).
+
+Mesure le pic mémoire Python (tracemalloc) et la durée d'un export CSV vers
+/dev/null. Avec get_all() le pic grandit avec la table ; avec iter_all() il
+est borné par la taille d'un lot, quelle que soit la taille de la table.
+
+Usage : python -m benchmarks.bench_iter_all [nb_lieux] [batch_size]
+"""
+import csv
+import gc
+import logging
+import os
+import sys
+import tracemalloc
+from app import db
+from app.models import User, Place
+from app.services import facade
+from benchmarks.common import make_app, timer, report
+
+EXPORT_COLUMNS = ('id', 'title', 'price', 'latitude', 'longitude', 'owner_id')
+
+
+def seed(nb_places):
+    owner = User(first_name="Owner", last_name="B", email="owner@bench.io", password="x")
+    db.session.add(owner)
+    db.session.flush()
+    description = "Lorem ipsum dolor sit amet. " * 20
+    db.session.execute(Place.__table__.insert(), [
+        {'title': f"Place {i}", 'description': description, 'price': i % 300,
+         'latitude': 0.0, 'longitude': 0.0, 'owner_id': owner.id}
+        for i in range(nb_places)
+    ])
+    db.session.commit()
+
+
+def export(places):
+    with open(os.devnull, 'w', newline='') as out:
+        writer = csv.writer(out)
+        for place in places:
+            writer.writerow([getattr(place, column) for column in EXPORT_COLUMNS])
+
+
+def measure(label, places_factory, results):
+    db.session.remove()
+    gc.collect()
+    tracemalloc.start()
+    with timer(label, results):
+        export(places_factory())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.session.remove()
+    return peak
+
+
+def main(nb_places=100_000, batch_size=1000):
+    logging.disable(logging.CRITICAL)
+    app = make_app()
+    with app.app_context():
+        seed(nb_places)
+        repo = facade.place_repo
+        modes = [
+            ('get_all()', lambda: repo.get_all()),
+            (f'iter_all({batch_size})', lambda: repo.iter_all(batch_size=batch_size)),
+            (f'iter_all({batch_size}, columns)',
+             lambda: repo.iter_all(batch_size=batch_size, columns=EXPORT_COLUMNS)),
+        ]
+        results, rows = {}, []
+        for label, places_factory in modes:
+            peak = measure(label, places_factory, results)
+            rows.append((label, f"{results[label]:.2f}", f"{peak / 2**20:.1f}"))
+
+    report(f"CSV export of {nb_places} places", rows, ('mode', 'seconds', 'peak MiB'))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,88 @@
+"""
+Tempête de connexions : latence des GET avec bcrypt sur le thread de la
+requête vs sur le HashingPool borné.
+
+Un serveur werkzeug multi-thread sert l'application. Des clients envoient
+des POST /api/auth/login en boucle pendant qu'une sonde mesure la latence de
+GET /amenities/. Sans pool, chaque connexion brûle un CPU et la sonde attend
+derrière elles ; avec le pool, au plus PASSWORD_POOL_WORKERS hashes tournent
+à la fois et le surplus reçoit un 429 immédiat.
+
+Usage : python -m benchmarks.bench_login_storm [nb_clients] [secondes] [rounds]
+"""
+import json
+import logging
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from werkzeug.serving import make_server
+from app.extensions import password_hasher
+from benchmarks.common import make_app, report
+
+
+def request(url, payload=None):
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def run_mode(nb_clients, duration, rounds, workers):
+    app = make_app(BCRYPT_LOG_ROUNDS=rounds, PASSWORD_POOL_WORKERS=workers, PASSWORD_POOL_QUEUE=2)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    stop = threading.Event()
+    statuses = []
+
+    def login_client():
+        while not stop.is_set():
+            statuses.append(request(f"{base}/api/auth/login",
+                                    {'email': "admin@hbnb.com", 'password': "admin123"}))
+
+    clients = [threading.Thread(target=login_client) for _ in range(nb_clients)]
+    for client in clients:
+        client.start()
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        request(f"{base}/amenities/")
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.02)
+    stop.set()
+    for client in clients:
+        client.join()
+    stats = password_hasher.stats()
+    server.shutdown()
+    latencies.sort()
+    return {
+        'p50': statistics.median(latencies),
+        'p95': latencies[int(len(latencies) * 0.95) - 1],
+        'ok': statuses.count(200),
+        'rejected': statuses.count(429) + statuses.count(503),
+        'utilisation': f"{stats['utilisation']:.0%}" if stats else '-',
+    }
+
+
+def main(nb_clients=16, duration=5, rounds=10):
+    logging.disable(logging.CRITICAL)
+    rows = []
+    for label, clients, workers in (('no logins', 0, 0), ('bcrypt inline', nb_clients, 0),
+                                    ('bcrypt pool (1 worker)', nb_clients, 1)):
+        result = run_mode(clients, duration, rounds, workers)
+        rows.append((label, f"{result['p50']:.1f}", f"{result['p95']:.1f}", result['ok'],
+                     result['rejected'], result['utilisation']))
+    report(f"GET /amenities/ latency while {nb_clients} clients log in ({rounds} bcrypt rounds)",
+           rows, ('mode', 'GET p50 ms', 'GET p95 ms', 'logins ok', 'logins 429/503', 'pool use'))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
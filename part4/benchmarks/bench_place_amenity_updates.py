@@ -0,0 +1,89 @@
+"""
+Mise à jour des amenities d'un lieu : remplacement de la collection ORM vs
+écriture de la seule différence dans la table d'association.
+
+Un lieu possède nb_amenities amenities ; chaque mise à jour en retire
+`changed` et en ajoute autant. Mesure la latence médiane et le nombre de
+requêtes SQL de :
+- avant : place.amenities = amenity_repo.get_many(ids) puis commit (l'ancien
+          update_place : l'ORM charge la collection et écrit chaque
+          association retirée ou ajoutée)
+- après : facade.update_place (set_related_ids : un DELETE pour les IDs
+          retirés, un INSERT pour les IDs ajoutés, existence vérifiée en
+          une requête)
+
+Usage : python -m benchmarks.bench_place_amenity_updates [nb_amenities] [changed] [répétitions]
+"""
+import logging
+import statistics
+import sys
+import time
+from sqlalchemy import event
+from app import db
+from app.models import User, Place, Amenity
+from app.models.place import place_amenity_association
+from app.services import facade
+from benchmarks.common import make_app, report
+
+
+def seed(nb_amenities):
+    owner = User(first_name="Owner", last_name="B", email="owner@bench.io", password="x")
+    db.session.add(owner)
+    db.session.flush()
+    db.session.execute(Amenity.__table__.insert(), [{'name': f"Amenity {i}"} for i in range(3 * nb_amenities)])
+    amenity_ids = sorted(db.session.execute(db.select(Amenity.id)).scalars())
+    place = Place(title="Palace", price=100, latitude=0.0, longitude=0.0, owner=owner)
+    db.session.add(place)
+    db.session.flush()
+    db.session.execute(place_amenity_association.insert(), [
+        {'place_id': place.id, 'amenity_id': amenity_id} for amenity_id in amenity_ids[:nb_amenities]])
+    db.session.commit()
+    return place.id, amenity_ids
+
+
+def replace_collection(place_id, ids):
+    place = db.session.get(Place, place_id)
+    place.amenities = facade.amenity_repo.get_many(ids)
+    db.session.commit()
+
+
+def measure(update, place_id, amenity_ids, nb_amenities, changed, repeat):
+    """Median latency (ms) and statements per update, moving a window of `changed` amenities."""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    latencies = []
+    for run in range(repeat):
+        start_index = (run + 1) * changed
+        ids = amenity_ids[start_index:start_index + nb_amenities]
+        db.session.remove()
+        event.listen(db.engine, 'before_cursor_execute', count)
+        start = time.perf_counter()
+        update(place_id, ids)
+        latencies.append((time.perf_counter() - start) * 1000)
+        event.remove(db.engine, 'before_cursor_execute', count)
+    return statistics.median(latencies), len(statements) // repeat
+
+
+def main(nb_amenities=500, changed=10, repeat=5):
+    logging.disable(logging.CRITICAL)
+    app = make_app()
+    with app.app_context():
+        place_id, amenity_ids = seed(nb_amenities)
+        rows = []
+        for label, update in (
+                ("replace ORM collection", replace_collection),
+                ("update_place (diff)", lambda pid, ids: facade.update_place(pid, {'amenities': ids}))):
+            # Chaque variante repart de la même fenêtre d'amenities
+            facade.update_place(place_id, {'amenities': amenity_ids[:nb_amenities]})
+            ms, queries = measure(update, place_id, amenity_ids, nb_amenities, changed, repeat)
+            rows.append((label, f"{ms:.2f}", queries))
+
+    report(f"Place with {nb_amenities} amenities, {changed} swapped per update (median of {repeat})",
+           rows, ('update', 'ms', 'statements'))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,98 @@
+"""
+Filtre par prix de la page d'accueil : tout télécharger puis filtrer dans le
+navigateur vs filtres, tri et limite appliqués en SQL par GET /places/.
+
+Mesure la taille de la réponse et la latence médiane (client de test Flask,
+sans réseau) sur une base de nb_lieux lieux, chacun avec ~3 amenities et
+une review en moyenne :
+- avant : GET /places/ puis filtre prix <= 50 côté client
+- après : GET /places/?price_max=50&sort=price (toute la sélection)
+- après : la même chose limitée à une page de 20
+- après : ?sort=-rating&limit=20 (tri par note moyenne, lue sur places)
+- après : ?amenities=1,2&sort=-rating&limit=20 (filtre all-of + tri par note)
+
+Usage : python -m benchmarks.bench_place_search [nb_lieux] [répétitions]
+"""
+import logging
+import random
+import statistics
+import sys
+import time
+from app import db
+from app.models import User, Place, Amenity, Review
+from app.models.place import place_amenity_association
+from app.persistence.ratings import rebuild_rating_aggregates
+from benchmarks.common import make_app, report
+
+
+def seed(nb_places, nb_amenities=10):
+    rng = random.Random(42)
+    owner = User(first_name="Owner", last_name="B", email="owner@bench.io", password="x")
+    db.session.add(owner)
+    db.session.add_all([Amenity(name=f"Amenity {i}") for i in range(nb_amenities)])
+    db.session.flush()
+    db.session.execute(Place.__table__.insert(), [
+        {'title': f"Place {i}", 'description': "Cosy place near the sea", 'price': rng.randint(5, 500),
+         'latitude': 0.0, 'longitude': 0.0, 'owner_id': owner.id}
+        for i in range(nb_places)
+    ])
+    db.session.execute(place_amenity_association.insert(), [
+        {'place_id': place_id, 'amenity_id': amenity_id}
+        for place_id in range(1, nb_places + 1)
+        for amenity_id in rng.sample(range(1, nb_amenities + 1), 3)
+    ])
+    # Une review par lieu en moyenne, au plus une par utilisateur et par lieu
+    reviewers = [User(first_name="Guest", last_name="B", email=f"guest{i}@bench.io", password="x")
+                 for i in range(5)]
+    db.session.add_all(reviewers)
+    db.session.flush()
+    db.session.execute(Review.__table__.insert(), [
+        {'text': "ok", 'rating': rng.randint(1, 5), 'place_id': place_id, 'user_id': reviewer.id}
+        for reviewer in reviewers
+        for place_id in rng.sample(range(1, nb_places + 1), nb_places // len(reviewers))
+    ])
+    # Insertion en masse hors du facade : agrégats de notes recalculés une fois
+    rebuild_rating_aggregates(db.session.connection())
+    db.session.commit()
+
+
+def measure(client, url, repeat, keep=None):
+    latencies, size, count = [], 0, 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url)
+        body = response.get_json()
+        places = body['items'] if isinstance(body, dict) else body
+        if keep is not None:
+            places = [place for place in places if keep(place)]
+        latencies.append((time.perf_counter() - start) * 1000)
+        size, count = len(response.data), len(places)
+        db.session.remove()
+    return count, size, statistics.median(latencies)
+
+
+def main(nb_places=50_000, repeat=5):
+    logging.disable(logging.CRITICAL)
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        seed(nb_places)
+        modes = [
+            ('before: all places, filtered client-side', '/places/', lambda place: place['price'] <= 50),
+            ('after: ?price_max=50&sort=price', '/places/?price_max=50&sort=price', None),
+            ('after: ... &limit=20', '/places/?price_max=50&sort=price&limit=20', None),
+            ('after: ?sort=-rating&limit=20', '/places/?sort=-rating&limit=20', None),
+            ('after: ?amenities=1,2&sort=-rating&limit=20',
+             '/places/?amenities=1,2&sort=-rating&limit=20', None),
+        ]
+        rows = []
+        for label, url, keep in modes:
+            count, size, latency = measure(client, url, repeat, keep)
+            rows.append((label, count, f"{size / 1024:,.1f}", f"{latency:.1f}"))
+
+    report(f"Price filter over {nb_places} places (median of {repeat} requests)", rows,
+           ('mode', 'places shown', 'payload KiB', 'latency ms'))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
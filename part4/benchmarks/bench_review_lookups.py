@@ -0,0 +1,89 @@
+"""
+Reviews d'un lieu et contrôle "déjà noté ?" : parcours de toutes les reviews
+en Python vs requêtes limitées au lieu (index de la table reviews).
+
+nb_reviews reviews sont réparties sur nb_reviews / 10 lieux, écrites par
+nb_reviews / 20 utilisateurs (au plus une par utilisateur et par lieu).
+Mesure la latence médiane de :
+- avant : get_all() puis filtre sur review.place.id (l'ancien
+          get_reviews_by_place), et le même parcours avec review.user.id
+          pour has_already_reviewed (exécuté à chaque POST /reviews/)
+- après : facade.get_reviews_by_place (index place_id, created_at, id),
+          facade.has_already_reviewed (EXISTS sur l'index unique
+          user_id, place_id) et GET /reviews/places/<id>/reviews?limit=20
+
+Usage : python -m benchmarks.bench_review_lookups [nb_reviews] [répétitions]
+"""
+import logging
+import random
+import statistics
+import sys
+import time
+from app import db
+from app.models import User, Place, Review
+from app.persistence.repository import SQLAlchemyRepository
+from app.services import facade
+from benchmarks.common import make_app, report
+
+
+def seed(nb_reviews):
+    rng = random.Random(21)
+    nb_places, nb_users = max(1, nb_reviews // 10), max(1, nb_reviews // 20)
+    users = [User(first_name="Guest", last_name="B", email=f"guest{i}@bench.io", password="x")
+             for i in range(nb_users)]
+    db.session.add_all(users)
+    db.session.flush()
+    db.session.execute(Place.__table__.insert(), [
+        {'title': f"Place {i}", 'description': "", 'price': 100, 'latitude': 0.0, 'longitude': 0.0,
+         'owner_id': users[0].id}
+        for i in range(nb_places)
+    ])
+    db.session.execute(Review.__table__.insert(), [
+        {'text': "ok", 'rating': rng.randint(1, 5), 'place_id': place_id, 'user_id': user.id}
+        for user in users
+        for place_id in rng.sample(range(1, nb_places + 1), min(20, nb_places))
+    ])
+    db.session.commit()
+    return nb_places, [user.id for user in users]
+
+
+def scan_reviews_of(place_id):
+    return [review for review in SQLAlchemyRepository(Review).get_all() if review.place.id == place_id]
+
+
+def scan_already_reviewed(user_id, place_id):
+    return any(review.user.id == user_id for review in scan_reviews_of(place_id))
+
+
+def median_ms(run, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - start) * 1000)
+        db.session.remove()
+    return statistics.median(latencies)
+
+
+def main(nb_reviews=20_000, repeat=3):
+    logging.disable(logging.CRITICAL)
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        nb_places, user_ids = seed(nb_reviews)
+        place_id, user_id = nb_places // 2, user_ids[-1]
+        rows = [
+            ("reviews of a place", f"{median_ms(lambda: scan_reviews_of(place_id), repeat):.1f}",
+             f"{median_ms(lambda: facade.get_reviews_by_place(place_id), repeat):.2f}"),
+            ("already reviewed?", f"{median_ms(lambda: scan_already_reviewed(user_id, place_id), repeat):.1f}",
+             f"{median_ms(lambda: facade.has_already_reviewed(user_id, place_id), repeat):.2f}"),
+            ("GET /reviews/places/<id>/reviews?limit=20", "-",
+             f"{median_ms(lambda: client.get(f'/reviews/places/{place_id}/reviews?limit=20'), repeat):.2f}"),
+        ]
+
+    report(f"Review lookups among {nb_reviews} reviews of {nb_places} places (median of {repeat})",
+           rows, ('lookup', 'full scan ms', 'scoped query ms'))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,74 @@
+"""
+Coût par requête du contrôle de révocation des JWT avec 1M de tokens révoqués.
+
+Compare, pour un token non révoqué (le cas de presque toutes les requêtes) :
+- une lecture exacte de la table revoked_tokens à chaque requête (approche naïve)
+- le filtre de Bloom de TokenRevocationStore, qui ne lit la table que sur un positif
+et donne le coût d'un token révoqué, la taille du filtre, son taux de faux
+positifs mesuré et le temps de reconstruction (démarrage / purge).
+
+Usage : python -m benchmarks.bench_token_revocation [nb_revoques] [nb_controles]
+"""
+import logging
+import sys
+import time
+import uuid
+from app import db
+from app.models import RevokedToken
+from app.revocation import SQLAlchemyRevocationBackend, TokenRevocationStore
+from benchmarks.common import make_app, timer, report
+
+
+def seed(nb_revoked, expires_at):
+    jtis = []
+    for start in range(0, nb_revoked, 50_000):
+        chunk = [str(uuid.uuid4()) for _ in range(min(50_000, nb_revoked - start))]
+        db.session.execute(RevokedToken.__table__.insert(),
+                           [{'kind': 'jti', 'key': jti, 'expires_at': expires_at} for jti in chunk])
+        jtis.extend(chunk[:10])
+    db.session.commit()
+    return jtis
+
+
+def main(nb_revoked=1_000_000, nb_checks=20_000):
+    logging.disable(logging.CRITICAL)
+    app = make_app()
+    with app.app_context():
+        expires_at = int(time.time()) + 3600
+        revoked = seed(nb_revoked, expires_at)
+        backend = SQLAlchemyRevocationBackend()
+        store = TokenRevocationStore(backend, capacity=100_000)
+        payloads = [{'jti': str(uuid.uuid4()), 'fam': str(uuid.uuid4()), 'type': 'access',
+                     'exp': expires_at} for _ in range(nb_checks)]
+        results = {}
+
+        with timer('rebuild', results):
+            store.warm_up()
+
+        with timer('naive', results):
+            for payload in payloads:
+                backend.expiry('fam', payload['fam'])
+                backend.expiry('jti', payload['jti'])
+        with timer('bloom', results):
+            for payload in payloads:
+                store.is_revoked(payload)
+        false_positives = store.stats()['false_positives']
+        with timer('revoked', results):
+            for jti in revoked:
+                assert store.is_revoked({'jti': jti, 'type': 'access', 'exp': expires_at})
+
+        stats = store.stats()
+        rows = [
+            ('exact table lookup per request', f"{results['naive'] / nb_checks * 1e6:.1f}", 2),
+            ('Bloom filter, token not revoked', f"{results['bloom'] / nb_checks * 1e6:.1f}",
+             f"{false_positives / nb_checks * 2:.4f}"),
+            ('Bloom filter, token revoked', f"{results['revoked'] / len(revoked) * 1e6:.1f}", 1),
+        ]
+    report(f"Revocation check with {nb_revoked} revoked tokens ({nb_checks} checks)", rows,
+           ('mode', 'us per request', 'SQL queries per request'))
+    print(f"\nfilter: {stats['filter_keys']} keys, {stats['filter_bytes'] / 2**20:.1f} MiB, "
+          f"{stats['filter_hashes']} hashes; rebuild from the table: {results['rebuild']:.1f} s")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
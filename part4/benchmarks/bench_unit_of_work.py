@@ -0,0 +1,64 @@
+"""
+Nombre de COMMIT (= fsync sur SQLite) par requête, avant / après unit_of_work.
+
+Une "requête" crée un lieu, lui associe trois amenities, met le lieu à jour
+puis ajoute un avis. Avant : chaque appel au repository commit. Après : la
+séquence est regroupée dans un seul unit_of_work().
+
+Usage : python -m benchmarks.bench_unit_of_work [nb_requetes]
+"""
+import logging
+import sys
+from sqlalchemy import event
+from app import db
+from app.models import User, Place, Review, Amenity
+from app.persistence.repository import unit_of_work
+from app.services import facade
+from benchmarks.common import make_app, timer, report
+
+
+def one_request(owner, guest, amenities, i):
+    place = Place(title=f"Place {i}", description="", price=50, latitude=1.0,
+                  longitude=1.0, owner=owner)
+    facade.place_repo.add(place)
+    for amenity in amenities:
+        place.add_amenity(amenity)
+    facade.place_repo.update(place.id, {'title': f"Place {i} (updated)"})
+    facade.review_repo.add(Review(text="Great", rating=5, place=place, user=guest))
+
+
+def main(nb_requests=200):
+    logging.disable(logging.CRITICAL)
+    app = make_app()
+    with app.app_context():
+        owner = User(first_name="Owner", last_name="B", email="owner@bench.io", password="x")
+        guest = User(first_name="Guest", last_name="B", email="guest@bench.io", password="x")
+        amenities = [Amenity(name=f"Amenity {i}") for i in range(3)]
+        db.session.add_all([owner, guest] + amenities)
+        db.session.commit()
+
+        commits = []
+        event.listen(db.engine, 'commit', lambda conn: commits.append(1))
+        results, rows = {}, []
+
+        commits.clear()
+        with timer('before', results):
+            for i in range(nb_requests):
+                one_request(owner, guest, amenities, i)
+        rows.append(('commit per repository call', len(commits) / nb_requests,
+                     f"{results['before'] / nb_requests * 1000:.2f}"))
+
+        commits.clear()
+        with timer('after', results):
+            for i in range(nb_requests):
+                with unit_of_work():
+                    one_request(owner, guest, amenities, i)
+        rows.append(('unit_of_work', len(commits) / nb_requests,
+                     f"{results['after'] / nb_requests * 1000:.2f}"))
+
+    report(f"{nb_requests} requests on a file-backed SQLite database", rows,
+           ('mode', 'fsync/commit per request', 'ms per request'))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,37 @@
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from app import create_app
+from config import TestingConfig
+
+
+def make_app(db_path=None, **settings):
+    """Create an application bound to a throw-away SQLite file (settings override the config)."""
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='hbnb-bench-'), 'bench.db')
+
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        BCRYPT_LOG_ROUNDS = 4
+
+    for name, value in settings.items():
+        setattr(BenchmarkConfig, name, value)
+    return create_app(BenchmarkConfig)
+
+
+@contextmanager
+def timer(label, results):
+    """Store the elapsed wall time of the block (seconds) in results[label]."""
+    start = time.perf_counter()
+    yield
+    results[label] = time.perf_counter() - start
+
+
+def report(title, rows, headers):
+    """Print a small aligned table."""
+    print(f"\n{title}")
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
@@ -1,12 +1,43 @@
 import os
+from datetime import timedelta
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     JWT_SECRET_KEY = SECRET_KEY
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+    # Chaque /api/auth/refresh repousse l'expiration, dans la limite de JWT_SESSION_MAX_AGE après le login
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=14)
+    JWT_SESSION_MAX_AGE = timedelta(days=90)
+    # L'identité des tokens est un dict ({'id': ...}) : PyJWT >= 2.10 exige sinon un 'sub' chaîne
+    JWT_VERIFY_SUB = False
+    # Révocation (logout, rotation) : table revoked_tokens ('database') ou processus courant ('memory'),
+    # précédée d'un filtre de Bloom en mémoire ; la table n'est lue qu'en cas de résultat positif
+    JWT_REVOCATION_BACKEND = 'database'
+    JWT_REVOCATION_BLOOM_CAPACITY = 100_000
+    JWT_REVOCATION_BLOOM_ERROR_RATE = 0.001
+    JWT_REVOCATION_SYNC_INTERVAL = 5  # secondes entre deux lectures des révocations des autres workers
+    JWT_REVOCATION_PRUNE_INTERVAL = 3600  # secondes entre deux purges des révocations expirées
+    JWT_REVOCATION_MAINTENANCE_THREAD = True  # purge et reconstruction du filtre hors des requêtes
     DEBUG = False
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Coût bcrypt ; si PASSWORD_HASH_TARGET_MS est défini, le coût est calibré au démarrage
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_TARGET_MS = None  # ex. 250
+    PASSWORD_HASH_MAX_ROUNDS = 16
+    # Pool de threads bcrypt : 0 pour hasher sur le thread de la requête, None = nb de CPU - 1
+    PASSWORD_POOL_WORKERS = None
+    PASSWORD_POOL_QUEUE = 32  # au-delà : 429
+    PASSWORD_POOL_TIMEOUT = 10  # secondes d'attente max : au-delà 503
+    # Cache d'identité devant les repositories (voir HBnBFacade.configure_caches)
+    REPOSITORY_CACHE_ENABLED = True
+    REPOSITORY_CACHE_SIZE = 1024
+    REPOSITORY_CACHE_TTL = 300  # secondes ; avec plusieurs workers, écart maximal avec les écritures des autres
+    REPOSITORY_CACHE_DISABLED = []  # noms de modèles, ex. ['Review']
+    # Moteur géo en mémoire (facade.find_nearest_places) : rechargement complet après N secondes,
+    # pour voir les écritures des autres processus ; None = jamais
+    GEO_ENGINE_MAX_AGE = 300
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -18,6 +49,7 @@ class ProductionConfig(Config):
 
 class TestingConfig(Config):
     TESTING = True
+    JWT_REVOCATION_MAINTENANCE_THREAD = False  # les tests appellent token_store.maintain() eux-mêmes
     SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(basedir, 'instance', 'development.db')}"
 
 config = {
@@ -35,6 +35,12 @@ document.addEventListener('DOMContentLoaded', () => {
     });
   }
 
+  // Page suivante de la liste des lieux (Tâche 2)
+  const loadMoreButton = document.getElementById('load-more');
+  if (loadMoreButton) {
+    loadMoreButton.addEventListener('click', loadMorePlaces);
+  }
+
   // ======================================================================
   // Code spécifique à la page Place Details (Tâche 3)
   // Se déclenche uniquement si l'élément #place-details existe
@@ -62,7 +68,7 @@ async function loginUser(email, password) {
 
     if (response.ok) {
       const data = await response.json();
-      document.cookie = `token=${data.access_token}; path=/`;
+      storeTokens(data);
 
       alert('✅ Login successful');
       window.location.href = 'index.html';
@@ -74,6 +80,37 @@ async function loginUser(email, password) {
   }
 }
 
+// Stocke le token d'accès et le refresh token en cookie
+function storeTokens(data) {
+  document.cookie = `token=${data.access_token}; path=/`;
+  document.cookie = `refresh_token=${data.refresh_token}; path=/`;
+}
+
+// Échange le refresh token contre une nouvelle paire de tokens (sans renvoyer le mot de passe)
+async function refreshTokens() {
+  const refreshToken = getCookie('refresh_token');
+  if (!refreshToken) return null;
+  const response = await fetch('http://localhost:5000/api/auth/refresh', {
+    method: 'POST',
+    headers: { 'Authorization': `Bearer ${refreshToken}` }
+  });
+  if (!response.ok) return null;
+  const data = await response.json();
+  storeTokens(data);
+  return data.access_token;
+}
+
+// fetch() authentifié : en cas de 401 (token expiré), rafraîchit le token puis réessaie une fois
+async function authFetch(url, token, options = {}) {
+  const withToken = (value) => ({ ...options, headers: { ...(options.headers || {}), 'Authorization': `Bearer ${value}` } });
+  let response = await fetch(url, withToken(token));
+  if (response.status === 401) {
+    const newToken = await refreshTokens();
+    if (newToken) response = await fetch(url, withToken(newToken));
+  }
+  return response;
+}
+
 // Vérifie la présence du token et adapte l'affichage du lien de connexion (pour la page index)
 function checkAuthentication() {
   const token = getCookie('token');
@@ -97,26 +134,47 @@ function getCookie(name) {
   return null;
 }
 
-// Récupère les lieux via l'API et les affiche (pour la page Index)
-async function fetchPlaces(token) {
+// Nombre de lieux demandés par page de GET /places/
+const PLACES_PAGE_SIZE = 20;
+
+// Filtres et curseur de la liste affichée, pour le bouton "Load more"
+let placesFilters = {};
+let placesNextCursor = null;
+let placesRequest = 0;
+
+// Récupère une page de lieux via l'API et l'affiche (pour la page Index)
+// filters : paramètres de GET /places/ (price_min, price_max, amenities, owner_id, sort)
+// cursor : next_cursor de la page précédente, pour ajouter la suite à la liste
+async function fetchPlaces(token, filters = {}, cursor = null) {
+  const params = new URLSearchParams({ ...filters, limit: PLACES_PAGE_SIZE });
+  if (cursor) params.set('cursor', cursor);
+  // Une réponse arrivée après un changement de filtre est ignorée
+  const request = ++placesRequest;
   try {
-    const response = await fetch('http://localhost:5000/places/', {
-      headers: { 'Authorization': `Bearer ${token}` }
-    });
+    const response = await authFetch(`http://localhost:5000/places/?${params}`, token);
     if (!response.ok) throw new Error('Erreur API: ' + response.statusText);
-    const places = await response.json();
-    displayPlaces(places);
-    window.allPlaces = places;
+    const page = await response.json();
+    if (request !== placesRequest) return;
+    placesFilters = filters;
+    placesNextCursor = page.next_cursor;
+    displayPlaces(page.items, Boolean(cursor));
   } catch (err) {
     console.error('⛔ fetchPlaces error:', err);
   }
 }
 
-// Affiche la liste des lieux (page Index)
-function displayPlaces(places) {
+// Ajoute la page suivante à la liste (page Index)
+function loadMorePlaces() {
+  if (placesNextCursor) fetchPlaces(getCookie('token'), placesFilters, placesNextCursor);
+}
+
+// Affiche la liste des lieux, à la suite des précédents si append (page Index)
+function displayPlaces(places, append = false) {
   const container = document.getElementById('places-list');
   if (!container) return;
-  container.innerHTML = '';
+  if (!append) container.innerHTML = '';
+  const loadMoreButton = document.getElementById('load-more');
+  if (loadMoreButton) loadMoreButton.style.display = placesNextCursor ? 'block' : 'none';
   places.forEach(place => {
     const div = document.createElement('div');
     div.className = 'place-card';
@@ -130,14 +188,11 @@ function displayPlaces(places) {
   });
 }
 
-// Filtrage local des lieux (page Index)
+// Filtrage des lieux par prix, fait par l'API : seule la première page des lieux retenus est
+// téléchargée, la suite au clic sur "Load more" (page Index)
 function filterPlacesByPrice(price) {
-  const places = window.allPlaces || [];
-  const filtered = places.filter(place => {
-    if (price === 'All') return true;
-    return place.price <= parseInt(price);
-  });
-  displayPlaces(filtered);
+  const filters = price === 'All' ? {} : { price_max: price, sort: 'price' };
+  fetchPlaces(getCookie('token'), filters);
 }
 
 // ======================================================================
@@ -171,9 +226,7 @@ function checkAuthAndFetchPlace(token, placeId) {
 // Récupère les détails d'un lieu via l'API
 async function fetchPlaceDetails(token, placeId) {
   try {
-    const response = await fetch(`http://localhost:5000/places/${placeId}`, {
-      headers: { 'Authorization': `Bearer ${token}` }
-    });
+    const response = await authFetch(`http://localhost:5000/places/${placeId}`, token);
     if (!response.ok) throw new Error('Erreur API: ' + response.statusText);
     const place = await response.json();
     displayPlaceDetails(place);
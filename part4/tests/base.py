@@ -0,0 +1,42 @@
+import unittest
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import create_app, db
+from config import TestingConfig
+
+
+class InMemoryTestingConfig(TestingConfig):
+    """Configuration de test : base SQLite en mémoire et bcrypt rapide."""
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    BCRYPT_LOG_ROUNDS = 4
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """TestCase qui crée une application sur une base en mémoire vierge."""
+
+    def setUp(self):
+        self.app = create_app(InMemoryTestingConfig)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    @contextmanager
+    def count_queries(self):
+        """Collect every SQL statement executed inside the block."""
+        # Repart d'une session vide pour ne pas profiter de l'identity map du seed
+        db.session.remove()
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from app import db
+from app.models import User, Place
+from app.persistence.binary_snapshot import (SCHEMAS, BinarySnapshot, MappedInMemoryRepository,
+                                             write_model_snapshot, write_snapshot)
+from tests.base import DatabaseTestCase
+
+
+def make_place(obj_id, **kwargs):
+    values = dict(id=obj_id, title=f"Place {obj_id}", description="Vue sur mer ☀", price=10.5 * obj_id,
+                  latitude=1.25, longitude=-2.5, owner_id=7,
+                  created_at=datetime(2025, 1, 2, 3, 4, 5, 6), updated_at=None)
+    values.update(kwargs)
+    return SimpleNamespace(**values)
+
+
+class TestBinarySnapshot(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp(prefix='hbnb-snap-')
+        self.path = os.path.join(self.data_dir, 'places.snap')
+        write_snapshot(self.path, SCHEMAS['places'],
+                       [make_place(i) for i in (5, 1, 3)] + [make_place(9, description=None)])
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_round_trip(self):
+        snapshot = BinarySnapshot(self.path)
+        self.assertEqual(list(snapshot.column('id')), [1, 3, 5, 9])
+        row = snapshot.row(snapshot.find(3))
+        self.assertEqual(row['title'], "Place 3")
+        self.assertEqual(row['description'], "Vue sur mer ☀")
+        self.assertEqual(row['price'], 31.5)
+        self.assertEqual(row['created_at'], datetime(2025, 1, 2, 3, 4, 5, 6))
+        self.assertIsNone(row['updated_at'])
+        self.assertIsNone(snapshot.row(snapshot.find(9))['description'])
+        self.assertIsNone(snapshot.find(4))
+        snapshot.close()
+
+    def test_rejects_other_files(self):
+        other = os.path.join(self.data_dir, 'other')
+        with open(other, 'wb') as f:
+            f.write(b'not a snapshot at all')
+        with self.assertRaises(ValueError):
+            BinarySnapshot(other)
+
+    def test_repository_materializes_lazily(self):
+        repo = MappedInMemoryRepository(self.path)
+        self.assertEqual(len(repo._storage), 0)
+        self.assertEqual(repo.get(5).title, "Place 5")
+        self.assertEqual(len(repo._storage), 1)
+        self.assertIsNone(repo.get(4))
+        repo.close()
+
+    def test_overlay_writes(self):
+        repo = MappedInMemoryRepository(self.path, indexes=('owner_id',))
+        repo.update(1, {'title': "Renamed"})
+        self.assertTrue(repo.delete(3))
+        repo.add(make_place(20, owner_id=8))
+        self.assertEqual(repo.get(1).title, "Renamed")
+        self.assertIsNone(repo.get(3))
+        self.assertEqual(sorted(place.id for place in repo.get_all()), [1, 5, 9, 20])
+        self.assertEqual(len(repo.get_all_by_attribute('owner_id', 7)), 3)
+        repo.close()
+
+
+class TestModelSnapshot(DatabaseTestCase):
+    def test_dump_places_table(self):
+        owner = User(first_name="Owner", last_name="Doe", email="owner@example.com", password="secret")
+        db.session.add(owner)
+        db.session.flush()
+        db.session.add(Place(title="Loft", description="", price=80, latitude=1.0, longitude=2.0,
+                             owner=owner))
+        db.session.commit()
+        data_dir = tempfile.mkdtemp(prefix='hbnb-snap-')
+        try:
+            path = os.path.join(data_dir, 'places.snap')
+            write_model_snapshot(path, Place)
+            repo = MappedInMemoryRepository(path)
+            place = repo.get(1)
+            self.assertEqual((place.title, place.owner_id), ("Loft", owner.id))
+            repo.close()
+        finally:
+            shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import unittest
+from sqlalchemy import text
+from app import db
+from app.models import User, Place, Amenity
+from app.persistence.ratings import find_rating_drift
+from app.services import facade
+from app.services.bulk import MAX_BULK_ITEMS
+from tests.base import DatabaseTestCase
+
+
+class TestBulkCreate(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        owner = User(first_name="Owner", last_name="Doe", email="owner@example.com", password="x")
+        guest = User(first_name="Guest", last_name="Doe", email="guest@example.com", password="x")
+        wifi, pool = Amenity(name="Wifi"), Amenity(name="Pool")
+        db.session.add_all([owner, guest, wifi, pool])
+        db.session.flush()
+        loft = Place(title="Loft", price=100, latitude=10.0, longitude=10.0, owner=owner)
+        db.session.add(loft)
+        db.session.commit()
+        self.owner_id, self.guest_id, self.loft_id = owner.id, guest.id, loft.id
+        self.amenity_ids = [wifi.id, pool.id]
+
+    def place(self, title, **fields):
+        return {'title': title, 'description': "", 'price': 50, 'latitude': 1.0, 'longitude': 1.0, **fields}
+
+    def count(self, sql, **params):
+        return db.session.execute(text(sql), params).scalar()
+
+    def test_places_are_inserted_together_and_rejects_reported(self):
+        items = [
+            self.place("Cabin", amenities=self.amenity_ids),
+            self.place("", amenities=[]),
+            self.place("Cheap", price=-1),
+            self.place("North", latitude=91),
+            self.place("Nowhere", longitude="east"),
+            self.place("Barn", amenities=[self.amenity_ids[0], 999, "abc"]),
+            "not an object",
+            self.place("Hut", latitude=-20.0, longitude=30.0),
+        ]
+        # Moteur géo chargé avant : il doit recevoir les lieux insérés hors de la session
+        facade.find_nearest_places(0.0, 0.0, 1)
+        with self.count_queries() as statements:
+            created, errors = facade.create_places_bulk(items, owner_id=self.owner_id)
+        self.assertEqual([index for index, _ in created], [0, 7])
+        self.assertEqual(errors, [
+            (1, "Title must be a non-empty string"),
+            (2, "Price must be a non-negative number"),
+            (3, "Latitude must be between -90 and 90"),
+            (4, "Longitude must be between -180 and 180"),
+            (5, "Amenity not found: 999, abc"),
+            (6, "Each item must be an object"),
+        ])
+        inserts = [s for s in statements if s.startswith("INSERT")]
+        self.assertEqual(len(inserts), 2)
+        self.assertTrue(inserts[0].startswith("INSERT INTO places"))
+        self.assertTrue(inserts[1].startswith("INSERT INTO place_amenity_association"))
+
+        cabin_id, hut_id = (place_id for _, place_id in created)
+        self.assertEqual(facade.get_place_amenity_ids([cabin_id]), {cabin_id: self.amenity_ids})
+        self.assertEqual(facade.get_place(hut_id).owner_id, self.owner_id)
+        self.assertEqual(facade.find_nearest_places(-20.0, 30.0, 1)[0][0], hut_id)
+        self.assertEqual([row.title for row in facade.full_text_search_places("cabin")], ["Cabin"])
+
+    def test_owner_comes_from_each_item_for_admins(self):
+        created, errors = facade.create_places_bulk([
+            self.place("Mine", owner_id=self.guest_id), self.place("Orphan"), self.place("Ghost", owner_id=999),
+            self.place("Rounded", owner_id=self.guest_id + 0.5), self.place("Typed", owner_id=str(self.guest_id))])
+        self.assertEqual(errors, [(1, "owner_id is required"), (2, "User with id 999 not found"),
+                                  (3, "owner_id must be an integer ID")])
+        self.assertEqual([index for index, _ in created], [0, 4])
+        self.assertEqual(facade.get_place(created[0][1]).owner_id, self.guest_id)
+
+    def test_batch_limits(self):
+        with self.assertRaisesRegex(ValueError, "non-empty list"):
+            facade.create_places_bulk({'title': "Loft"})
+        with self.assertRaisesRegex(ValueError, f"At most {MAX_BULK_ITEMS}"):
+            facade.create_amenities_bulk([{'name': "Sauna"}] * (MAX_BULK_ITEMS + 1))
+        self.assertEqual(self.count("SELECT count(*) FROM amenities"), 2)
+
+    def test_amenities(self):
+        created, errors = facade.create_amenities_bulk([{'name': "Sauna"}, {'name': " "}, {'name': "x" * 51}])
+        self.assertEqual(errors, [(1, "Name must be a non-empty string"), (2, "Name must be 50 characters or less")])
+        self.assertEqual(facade.get_amenity(created[0][1]).name, "Sauna")
+
+    def test_reviews_update_the_aggregates_once_per_place(self):
+        cabin_id = facade.create_places_bulk([self.place("Cabin")], owner_id=self.owner_id)[0][0][1]
+        facade.create_review({'text': "Earlier", 'rating': 3, 'user_id': self.guest_id, 'place_id': cabin_id})
+        # Lieu en cache avant : ses agrégats changent hors de la session
+        self.assertEqual(facade.get_place(self.loft_id).review_count, 0)
+        items = [
+            {'text': "Great", 'rating': 5, 'place_id': self.loft_id},
+            {'text': "Again", 'rating': 4, 'place_id': self.loft_id},
+            {'text': "Twice", 'rating': 4, 'place_id': cabin_id},
+            {'text': "Half", 'rating': 4.5, 'place_id': self.loft_id},
+            {'text': "", 'rating': 4, 'place_id': self.loft_id},
+            {'text': "Ghost", 'rating': 4, 'place_id': 999},
+            {'text': "Rounded", 'rating': 4, 'place_id': float(cabin_id)},
+            {'text': "Flag", 'rating': 4, 'place_id': True},
+        ]
+        with self.count_queries() as statements:
+            created, errors = facade.create_reviews_bulk(items, user_id=self.guest_id)
+        self.assertEqual([index for index, _ in created], [0])
+        self.assertEqual(errors, [
+            (1, "You have already reviewed this place"),
+            (2, "You have already reviewed this place"),
+            (3, "Rating must be an integer between 1 and 5"),
+            (4, "Text must be a non-empty string"),
+            (5, "Place not found"),
+            (6, "place_id must be an integer ID"),
+            (7, "place_id must be an integer ID"),
+        ])
+        self.assertEqual(len([s for s in statements if s.startswith(("INSERT", "UPDATE"))]), 2)
+        loft = facade.get_place(self.loft_id)
+        self.assertEqual((loft.review_count, loft.avg_rating), (1, 5.0))
+        self.assertEqual(find_rating_drift(db.session.connection()), [])
+
+        created, errors = facade.create_reviews_bulk(
+            [{'text': "Own", 'rating': 5, 'place_id': self.loft_id}], user_id=self.owner_id)
+        self.assertEqual((created, errors), ([], [(0, "You cannot review your own place")]))
+
+
+class TestBulkEndpoints(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        facade.create_user({'first_name': "Guest", 'last_name': "Doe", 'email': "guest@example.com",
+                            'password': "secret"})
+
+    def headers(self, email, password):
+        tokens = self.client.post('/api/auth/login', json={'email': email, 'password': password}).get_json()
+        return {'Authorization': f"Bearer {tokens['access_token']}"}
+
+    def test_places_are_owned_by_the_caller(self):
+        guest = self.headers("guest@example.com", "secret")
+        admin_id = facade.get_user_by_email("admin@hbnb.com").id
+        place = {'title': "Cabin", 'price': 10, 'latitude': 1.0, 'longitude': 1.0, 'amenities': [],
+                 'owner_id': admin_id}
+        response = self.client.post('/places/bulk', json=[place, dict(place, price=-5)], headers=guest)
+        self.assertEqual(response.status_code, 207)
+        body = response.get_json()
+        self.assertEqual(body['errors'], [{'index': 1, 'error': "Price must be a non-negative number"}])
+        guest_id = facade.get_user_by_email("guest@example.com").id
+        self.assertEqual(facade.get_place(body['created'][0]['id']).owner_id, guest_id)
+
+        response = self.client.post('/places/bulk', json=[dict(place, price=-5)], headers=guest)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/places/bulk', json=[place] * (MAX_BULK_ITEMS + 1), headers=guest)
+        self.assertEqual(response.status_code, 400)
+
+    def test_amenities_need_an_admin(self):
+        response = self.client.post('/amenities/bulk', json=[{'name': "Sauna"}],
+                                    headers=self.headers("guest@example.com", "secret"))
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post('/amenities/bulk', json=[{'name': "Sauna"}, {'name': "Gym"}],
+                                    headers=self.headers("admin@hbnb.com", "admin123"))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([item['index'] for item in response.get_json()['created']], [0, 1])
+
+    def test_reviews_are_written_by_the_caller(self):
+        admin = self.headers("admin@hbnb.com", "admin123")
+        place_id = self.client.post('/places/bulk', json=[{
+            'title': "Loft", 'price': 10, 'latitude': 1.0, 'longitude': 1.0, 'amenities': [],
+            'owner_id': facade.get_user_by_email("admin@hbnb.com").id}], headers=admin).get_json()['created'][0]['id']
+        response = self.client.post('/reviews/bulk', json=[{'text': "Nice", 'rating': 5, 'place_id': place_id}],
+                                    headers=self.headers("guest@example.com", "secret"))
+        self.assertEqual(response.status_code, 201)
+        review = facade.get_review(response.get_json()['created'][0]['id'])
+        self.assertEqual(review.user_id, facade.get_user_by_email("guest@example.com").id)
+
+
+if __name__ == '__main__':
+    unittest.main()
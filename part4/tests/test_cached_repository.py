@@ -0,0 +1,146 @@
+import unittest
+from sqlalchemy import text
+from app import db
+from app.models import User, Place, Amenity
+from app.persistence.cached_repository import CachedRepository
+from app.persistence.repository import SQLAlchemyRepository, unit_of_work
+from app.services import facade
+from tests.base import DatabaseTestCase
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCachedRepository(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.clock = FakeClock()
+        self.cache = CachedRepository(SQLAlchemyRepository(Amenity), max_size=2, ttl=60,
+                                      clock=self.clock)
+        db.session.add_all([Amenity(name="Wifi"), Amenity(name="Pool"), Amenity(name="Sauna")])
+        db.session.commit()
+
+    def tearDown(self):
+        self.cache.close()
+        super().tearDown()
+
+    def test_hit_runs_no_query(self):
+        self.cache.get(1)
+        with self.count_queries() as statements:
+            amenity = self.cache.get("1")
+            self.assertEqual(amenity.name, "Wifi")
+        self.assertEqual(statements, [])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_commit_invalidates(self):
+        self.cache.get(1)
+        db.session.remove()
+        amenity = db.session.get(Amenity, 1)
+        amenity.name = "Fiber"
+        db.session.commit()
+        db.session.remove()
+        self.assertEqual(self.cache.get(1).name, "Fiber")
+        self.assertEqual(self.cache.invalidations, 1)
+
+    def test_rollback_invalidates_flushed_entry(self):
+        self.cache.get(1)
+        db.session.remove()
+        db.session.get(Amenity, 1).name = "Fiber"
+        db.session.flush()
+        db.session.rollback()
+        db.session.remove()
+        self.assertEqual(self.cache.get(1).name, "Wifi")
+        self.assertEqual(self.cache.invalidations, 1)
+
+    def test_flushed_changes_are_not_cached(self):
+        with self.assertRaises(RuntimeError):
+            with unit_of_work():
+                db.session.get(Amenity, 1).name = "Uncommitted"
+                db.session.flush()
+                self.assertEqual(self.cache.get(1).name, "Uncommitted")
+                raise RuntimeError("boom")
+        db.session.remove()
+        self.assertEqual(self.cache.get(1).name, "Wifi")
+
+    def test_rolled_back_insert_is_not_served(self):
+        with self.assertRaises(RuntimeError):
+            with unit_of_work():
+                gym = Amenity(name="Gym")
+                db.session.add(gym)
+                db.session.flush()
+                gym_id = gym.id
+                self.assertEqual(self.cache.get(gym_id).name, "Gym")
+                raise RuntimeError("boom")
+        db.session.remove()
+        self.assertIsNone(self.cache.get(gym_id))
+
+    def test_repository_delete_invalidates(self):
+        self.cache.get(2)
+        self.cache.delete(2)
+        db.session.remove()
+        self.assertIsNone(self.cache.get(2))
+
+    def test_lru_and_ttl(self):
+        self.cache.get(1)
+        self.cache.get(2)
+        self.cache.get(1)
+        self.cache.get(3)  # évince 2, le moins récemment utilisé
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertEqual(self.cache.stats()['size'], 2)
+        self.clock.now = 61
+        self.cache.get(1)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 4)
+
+    def test_disabled_cache(self):
+        self.cache.configure(enabled=False)
+        self.cache.get(1)
+        self.cache.get(1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 0))
+
+
+class TestFacadeCaches(DatabaseTestCase):
+    def test_get_place_is_cached_and_invalidated_by_update(self):
+        owner = User(first_name="Owner", last_name="Doe", email="owner@example.com", password="secret")
+        db.session.add(owner)
+        db.session.commit()
+        place = facade.create_place({'title': "Loft", 'description': "", 'price': 10,
+                                     'latitude': 1.0, 'longitude': 1.0, 'owner_id': owner.id})
+        place_id = place.id
+        db.session.remove()
+        facade.get_place(place_id)
+        db.session.remove()
+        with self.count_queries() as statements:
+            self.assertEqual(facade.get_place(place_id).title, "Loft")
+        self.assertEqual(statements, [])
+
+        facade.update_place(place_id, {'title': "Flat"})
+        db.session.remove()
+        self.assertEqual(facade.get_place(place_id).title, "Flat")
+
+    def test_users_are_read_fresh(self):
+        user = facade.create_user({'first_name': "Jane", 'last_name': "Doe", 'email': "jane@example.com",
+                                   'password': "secret", 'is_admin': True})
+        user_id = user.id
+        self.assertTrue(facade.authenticate("jane@example.com", "secret").is_admin)
+        db.session.remove()
+        # Rétrogradée par un autre worker : aucun événement de session dans ce processus
+        with db.engine.begin() as connection:
+            connection.execute(text("UPDATE users SET is_admin = 0 WHERE id = :id"), {'id': user_id})
+        self.assertFalse(facade.get_user(user_id).is_admin)
+        self.assertFalse(facade.authenticate("jane@example.com", "secret").is_admin)
+
+    def test_per_model_switch(self):
+        facade.configure_caches({'REPOSITORY_CACHE_DISABLED': ['Review']})
+        enabled = {stats['model']: stats['enabled'] for stats in facade.cache_stats()}
+        self.assertEqual(enabled, {'User.email': True, 'Place': True, 'Amenity': True, 'Review': False})
+        facade.configure_caches(self.app.config)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import re
+import unittest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import User, Place, Amenity, Review
+from app.persistence.ratings import find_rating_drift
+from app.persistence.schema import upgrade_schema
+from app.services import facade
+from tests.base import DatabaseTestCase
+
+
+class TestCascadingDeletes(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        owner = User(first_name="Owner", last_name="Doe", email="owner@example.com", password="x")
+        guests = [User(first_name=f"Guest{i}", last_name="Doe", email=f"guest{i}@example.com",
+                       password="x") for i in range(2)]
+        wifi = Amenity(name="Wifi")
+        db.session.add_all([owner, *guests, wifi])
+        db.session.flush()
+        loft = Place(title="Loft", price=100, latitude=10.0, longitude=10.0, owner=owner)
+        loft.amenities = [wifi]
+        cabin = Place(title="Cabin", price=50, latitude=20.0, longitude=20.0, owner=owner)
+        hut = Place(title="Hut", price=20, latitude=30.0, longitude=30.0, owner=guests[0])
+        db.session.add_all([loft, cabin, hut])
+        db.session.flush()
+        db.session.commit()
+        self.reviews = [
+            facade.create_review({'text': "Lovely loft", 'rating': 5, 'user_id': guests[0].id, 'place_id': loft.id}),
+            facade.create_review({'text': "Cosy loft", 'rating': 4, 'user_id': guests[1].id, 'place_id': loft.id}),
+            facade.create_review({'text': "Tiny hut", 'rating': 2, 'user_id': owner.id, 'place_id': hut.id}),
+            facade.create_review({'text': "Nice hut", 'rating': 4, 'user_id': guests[1].id, 'place_id': hut.id}),
+        ]
+        self.review_ids = [review.id for review in self.reviews]
+        self.owner_id, self.guest_ids = owner.id, [guest.id for guest in guests]
+        self.loft_id, self.cabin_id, self.hut_id = loft.id, cabin.id, hut.id
+
+    def count(self, sql, **params):
+        return db.session.execute(text(sql), params).scalar()
+
+    def test_deleting_a_user_leaves_the_cascade_to_the_database(self):
+        # Caches et moteur géo remplis avant la suppression
+        facade.get_place(self.loft_id)
+        facade.get_review(self.review_ids[0])
+        self.assertEqual(len(facade.find_nearest_places(10.0, 10.0, 10)), 3)
+
+        with self.count_queries() as statements:
+            self.assertTrue(facade.delete_user(self.owner_id))
+        deletes = [s for s in statements if s.startswith('DELETE')]
+        self.assertEqual(len(deletes), 1)
+        self.assertTrue(deletes[0].startswith("DELETE FROM users"))
+        self.assertFalse(any(re.search(r'SELECT (places|reviews)\.\w+ AS', s) for s in statements))
+
+        self.assertEqual(self.count("SELECT count(*) FROM places WHERE owner_id = :id", id=self.owner_id), 0)
+        self.assertEqual(self.count("SELECT count(*) FROM reviews"), 1)
+        self.assertEqual(self.count("SELECT count(*) FROM place_amenity_association"), 0)
+        self.assertEqual(self.count("SELECT count(*) FROM place_search"), 1)
+        self.assertEqual(self.count("SELECT count(*) FROM review_search"), 1)
+        self.assertEqual(self.count("SELECT count(*) FROM place_geo"), 1)
+        self.assertIsNone(facade.get_place(self.loft_id))
+        self.assertIsNone(facade.get_review(self.review_ids[0]))
+        self.assertEqual(facade.find_nearest_places(10.0, 10.0, 10)[0][0], self.hut_id)
+        # La review du propriétaire supprimé ne compte plus dans la note du lieu d'un autre
+        self.assertEqual(facade.get_place(self.hut_id).avg_rating, 4.0)
+        self.assertEqual(facade.full_text_search_places("tiny"), [])
+        self.assertEqual([row.title for row in facade.full_text_search_places("nice")], ["Hut"])
+        self.assertEqual(find_rating_drift(db.session.connection()), [])
+
+    def test_deleting_a_place_deletes_its_reviews_and_links(self):
+        facade.get_review(self.review_ids[0])
+        self.assertTrue(facade.delete_place(self.loft_id))
+        self.assertEqual(self.count("SELECT count(*) FROM reviews WHERE place_id = :id", id=self.loft_id), 0)
+        self.assertEqual(self.count("SELECT count(*) FROM place_amenity_association"), 0)
+        self.assertIsNone(facade.get_review(self.review_ids[0]))
+        self.assertEqual([place.title for place in facade.full_text_search_places("loft")], [])
+        self.assertIsNotNone(facade.get_user(self.owner_id))
+
+    def test_foreign_keys_are_enforced(self):
+        with self.assertRaises(IntegrityError):
+            db.session.execute(text(
+                "INSERT INTO reviews (text, rating, place_id, user_id) VALUES ('Ghost', 3, 999, :user)"),
+                {'user': self.owner_id})
+        db.session.rollback()
+
+    def test_delete_user_endpoint(self):
+        tokens = self.client.post('/api/auth/login',
+                                  json={'email': "admin@hbnb.com", 'password': "admin123"}).get_json()
+        headers = {'Authorization': f"Bearer {tokens['access_token']}"}
+        response = self.client.delete(f'/users/{self.owner_id}', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.delete(f'/users/{self.owner_id}', headers=headers)
+        self.assertEqual(response.status_code, 404)
+
+
+class TestCascadeUpgrade(TestCascadingDeletes):
+    """Bases créées avant ON DELETE CASCADE : tables reconstruites par upgrade_schema."""
+
+    def make_legacy(self, *tables):
+        db.session.remove()
+        with db.engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA foreign_keys = OFF")
+            # Comme add_cascading_foreign_keys : RENAME refusé si un trigger vise une table absente
+            for name in connection.exec_driver_sql(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger'").scalars().all():
+                connection.exec_driver_sql(f"DROP TRIGGER {name}")
+            for table in tables:
+                sql = connection.exec_driver_sql(
+                    f"SELECT sql FROM sqlite_master WHERE type = 'table' AND name = '{table}'").scalar()
+                sql = re.sub(rf'CREATE TABLE "?{table}"? ', "CREATE TABLE legacy ", sql, count=1)
+                connection.exec_driver_sql(sql.replace(" ON DELETE CASCADE", ""))
+                connection.exec_driver_sql(f"INSERT INTO legacy SELECT * FROM {table}")
+                connection.exec_driver_sql(f"DROP TABLE {table}")
+                connection.exec_driver_sql(f"ALTER TABLE legacy RENAME TO {table}")
+            connection.commit()
+            connection.exec_driver_sql("PRAGMA foreign_keys = ON")
+
+    def on_delete_rules(self, table):
+        return {row[6] for row in db.session.execute(text(f"PRAGMA foreign_key_list({table})"))}
+
+    def setUp(self):
+        super().setUp()
+        self.make_legacy('reviews', 'place_amenity_association', 'places')
+        self.assertEqual(self.on_delete_rules('reviews'), {'NO ACTION'})
+        upgrade_schema(db.engine)
+
+    def test_tables_are_rebuilt_with_their_rows_and_indexes(self):
+        for table in ('places', 'reviews', 'place_amenity_association'):
+            self.assertEqual(self.on_delete_rules(table), {'CASCADE'})
+        self.assertEqual(self.count("SELECT count(*) FROM reviews"), 4)
+        self.assertEqual(self.count("SELECT count(*) FROM places"), 3)
+        names = set(db.session.execute(text("SELECT name FROM sqlite_master")).scalars())
+        self.assertTrue({'ix_reviews_user_id_place_id', 'ix_places_avg_rating_id',
+                         'place_search_review_insert', 'place_geo_insert'} <= names)
+        self.assertNotIn('_rebuild_places', names)
+        self.assertEqual([row.title for row in facade.full_text_search_places("cosy")], ["Loft"])
+
+    def test_orphans_stop_the_upgrade(self):
+        self.make_legacy('reviews')
+        with db.engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA foreign_keys = OFF")
+            connection.exec_driver_sql(
+                "INSERT INTO reviews (text, rating, place_id, user_id) VALUES ('Ghost', 3, 999, 1)")
+            connection.commit()
+            connection.exec_driver_sql("PRAGMA foreign_keys = ON")
+        with self.assertRaisesRegex(RuntimeError, r"deleted parent: reviews \(1\)"):
+            upgrade_schema(db.engine)
+        self.assertEqual(self.on_delete_rules('reviews'), {'NO ACTION'})
+        # Les clés étrangères sont réactivées même après l'échec
+        self.assertEqual(db.session.execute(text("PRAGMA foreign_keys")).scalar(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from app import db
+from app.models import User, Place, Amenity, Review
+from app.services import facade
+from tests.base import DatabaseTestCase
+
+
+class TestColumnProjection(DatabaseTestCase):
+    def seed(self):
+        owner = User(first_name="Owner", last_name="Doe", email="owner@example.com",
+                     password="secret")
+        amenities = [Amenity(name=f"Amenity {i}") for i in range(2)]
+        db.session.add_all([owner] + amenities)
+        db.session.flush()
+        for i in range(3):
+            place = Place(title=f"Place {i}", description="desc", price=10 + i, latitude=1.0,
+                          longitude=2.0, owner=owner)
+            if i < 2:
+                for amenity in amenities:
+                    place.add_amenity(amenity)
+            db.session.add(place)
+            db.session.add(Review(text="Nice", rating=4, place=place, user=owner))
+        db.session.commit()
+
+    def test_rows_are_not_hydrated(self):
+        self.seed()
+        db.session.remove()
+        rows = facade.place_repo.get_all(columns=['id', 'title', 'price'])
+        self.assertEqual([(row.id, row.title, row.price) for row in rows],
+                         [(1, "Place 0", 10), (2, "Place 1", 11), (3, "Place 2", 12)])
+        self.assertFalse(isinstance(rows[0], Place))
+        self.assertEqual(len(db.session.identity_map), 0)
+
+    def test_unknown_column(self):
+        with self.assertRaises(ValueError):
+            facade.place_repo.select_rows(['id', 'nope'])
+
+    def test_page_of_rows(self):
+        self.seed()
+        rows, next_cursor, _ = facade.place_repo.get_page(limit=2, columns=['title'])
+        self.assertEqual([row.title for row in rows], ["Place 0", "Place 1"])
+        rows, next_cursor, _ = facade.place_repo.get_page(cursor=next_cursor, limit=2,
+                                                          columns=['title'])
+        self.assertEqual([row.title for row in rows], ["Place 2"])
+        self.assertIsNone(next_cursor)
+
+    def test_get_many_rows_keep_order(self):
+        self.seed()
+        rows = facade.place_repo.get_many(['3', '1'], columns=['title'])
+        self.assertEqual([row.title for row in rows], ["Place 2", "Place 0"])
+
+    def test_related_ids(self):
+        self.seed()
+        self.assertEqual(facade.get_place_amenity_ids(), {1: [1, 2], 2: [1, 2]})
+        self.assertEqual(facade.get_place_amenity_ids([2, 3]), {2: [1, 2]})
+
+    def test_list_endpoints(self):
+        self.seed()
+        with self.count_queries() as statements:
+            places = self.client.get('/places/').get_json()
+        self.assertEqual(len(statements), 2)
+        self.assertNotIn('updated_at', statements[0].split('FROM')[0])
+        self.assertEqual([place['amenities'] for place in places], [[1, 2], [1, 2], []])
+        owner = facade.get_user_by_email("owner@example.com")
+        self.assertEqual(places[0]['owner_id'], owner.id)
+        users = self.client.get('/users/').get_json()
+        self.assertIn({'id': owner.id, 'first_name': "Owner", 'last_name': "Doe",
+                       'email': "owner@example.com"}, users)
+        reviews = self.client.get('/reviews/?limit=2').get_json()
+        self.assertEqual([review['place_id'] for review in reviews['items']], [1, 2])
+        amenities = self.client.get('/amenities/?ids=2').get_json()
+        self.assertEqual(amenities, [{'id': 2, 'name': "Amenity 1"}])
+
+
+if __name__ == '__main__':
+    unittest.main()
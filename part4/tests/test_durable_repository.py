@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from app.persistence.durable_repository import DurableInMemoryRepository
+
+
+class YieldingLock:
+    """RLock qui cède la main à chaque libération, pour élargir les fenêtres entre sections critiques."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._lock.release()
+        time.sleep(0.0002)
+
+
+class TestDurableInMemoryRepository(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp(prefix='hbnb-wal-')
+        self.repos = []
+
+    def tearDown(self):
+        for repo in self.repos:
+            repo.close()
+        shutil.rmtree(self.data_dir)
+
+    def open(self, **kwargs):
+        repo = DurableInMemoryRepository(self.data_dir, unique_indexes=('email',), **kwargs)
+        self.repos.append(repo)
+        return repo
+
+    def reopen(self, repo, **kwargs):
+        repo.close()
+        self.repos.remove(repo)
+        return self.open(**kwargs)
+
+    def test_writes_survive_restart(self):
+        repo = self.open()
+        created_at = datetime(2025, 3, 1, 12, 30)
+        repo.add(SimpleNamespace(id="1", email="a@example.com", created_at=created_at))
+        repo.add(SimpleNamespace(id="2", email="b@example.com", created_at=created_at))
+        repo.update("1", {'email': "c@example.com"})
+        repo.delete("2")
+
+        repo = self.reopen(repo)
+        self.assertIsNone(repo.get("2"))
+        self.assertEqual(repo.get("1").created_at, created_at)
+        self.assertEqual(repo.get_by_attribute('email', "c@example.com").id, "1")
+
+    def test_periodic_snapshot_truncates_log(self):
+        repo = self.open(snapshot_every=3)
+        for i in range(7):
+            repo.add(SimpleNamespace(id=str(i), email=f"{i}@example.com"))
+        logs = [name for name in os.listdir(self.data_dir) if name.startswith('wal.')]
+        self.assertEqual(len(logs), 1)
+        self.assertIn('snapshot.jsonl', os.listdir(self.data_dir))
+
+        repo = self.reopen(repo)
+        self.assertEqual(len(repo.get_all()), 7)
+
+    def test_torn_last_entry_is_ignored(self):
+        repo = self.open()
+        repo.add(SimpleNamespace(id="1", email="a@example.com"))
+        repo.sync()
+        with open(repo._log.path, 'ab') as log:
+            log.write(b'{"op":"put","rec')
+        repo = self.reopen(repo)
+        self.assertEqual([obj.id for obj in repo.get_all()], ["1"])
+
+    def test_concurrent_writers_share_fsyncs(self):
+        repo = self.open(group_commit_interval=0.005)
+
+        def writer(prefix):
+            for i in range(20):
+                repo.add(SimpleNamespace(id=f"{prefix}-{i}", email=f"{prefix}-{i}@example.com"))
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLess(repo.fsync_count, 160)
+        repo = self.reopen(repo)
+        self.assertEqual(len(repo.get_all()), 160)
+
+    def test_concurrent_updates_are_logged_in_memory_order(self):
+        repo = self.open(group_commit_interval=0.001)
+        repo._write_lock = YieldingLock()
+        repo.add(SimpleNamespace(id="1", email="a@example.com", v=None))
+
+        def writer(n):
+            for i in range(25):
+                repo.update("1", {'v': f"{n}-{i}"})
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        in_memory = repo.get("1").v
+        repo = self.reopen(repo)
+        self.assertEqual(repo.get("1").v, in_memory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+from sqlalchemy import create_engine, inspect, text
+from app import db
+from app.models import User
+from app.persistence.schema import upgrade_schema
+from app.services import facade
+from tests.base import DatabaseTestCase
+
+
+class TestNormalizedEmail(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        facade.create_user({'first_name': "Jane", 'last_name': "Doe",
+                            'email': "Jane.Doe@Example.com", 'password': "secret"})
+
+    def admin_headers(self):
+        tokens = self.client.post('/api/auth/login',
+                                  json={'email': "admin@hbnb.com", 'password': "admin123"}).get_json()
+        return {'Authorization': f"Bearer {tokens['access_token']}"}
+
+    def test_lookup_ignores_case(self):
+        user = facade.get_user_by_email(" jane.doe@EXAMPLE.com")
+        self.assertEqual(user.email, "Jane.Doe@Example.com")
+        self.assertEqual(user.email_normalized, "jane.doe@example.com")
+        self.assertTrue(facade.is_email_registered("JANE.DOE@example.com"))
+        self.assertFalse(facade.is_email_registered("john@example.com"))
+
+    def test_duplicate_email_is_rejected(self):
+        response = self.client.post('/users/', headers=self.admin_headers(),
+                                    json={'first_name': "J", 'last_name': "D",
+                                          'email': "jane.doe@example.com", 'password': "x"})
+        self.assertEqual(response.status_code, 400)
+        with self.assertRaises(ValueError):
+            facade.create_user({'first_name': "J", 'last_name': "D",
+                                'email': "JANE.doe@example.com", 'password': "x"})
+
+    def test_duplicate_check_is_served_from_the_cache(self):
+        self.assertTrue(facade.is_email_registered("jane.doe@example.com"))
+        with self.count_queries() as statements:
+            self.assertTrue(facade.is_email_registered("JANE.DOE@example.com"))
+        self.assertEqual(statements, [])
+
+    def test_login_sees_a_password_changed_by_another_worker(self):
+        self.assertIsNotNone(facade.authenticate("jane.doe@example.com", "secret"))
+        # Écriture d'un autre processus : aucun événement de session ici
+        new_hash = User(first_name="X", last_name="X", email="x@example.com", password="changed").password
+        with db.engine.begin() as connection:
+            connection.execute(text("UPDATE users SET password = :hash WHERE id = 2"), {'hash': new_hash})
+        self.assertIsNone(facade.authenticate("jane.doe@example.com", "secret"))
+        self.assertIsNotNone(facade.authenticate("jane.doe@example.com", "changed"))
+
+    def test_changes_invalidate_the_cache(self):
+        self.assertIsNotNone(facade.authenticate("jane.doe@example.com", "secret"))
+        facade.update_user(2, {'password': "changed"})
+        self.assertIsNone(facade.authenticate("jane.doe@example.com", "secret"))
+        self.assertIsNotNone(facade.authenticate("jane.doe@example.com", "changed"))
+
+        facade.update_user(2, {'email': "jane@example.com"})
+        self.assertFalse(facade.is_email_registered("jane.doe@example.com"))
+        self.assertTrue(facade.is_email_registered("Jane@example.com"))
+
+        db.session.delete(db.session.get(User, 2))
+        db.session.commit()
+        self.assertFalse(facade.is_email_registered("jane@example.com"))
+
+    def test_rolled_back_change_is_not_cached(self):
+        user = facade.get_user(2)
+        user.email = "jane@example.com"
+        db.session.flush()
+        self.assertEqual(facade.user_emails.get("jane@example.com"), 2)
+        db.session.rollback()
+        self.assertIsNone(facade.user_emails.get("jane@example.com"))
+
+
+class TestSchemaUpgrade(unittest.TestCase):
+    """Une base créée avant email_normalized est complétée au démarrage."""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.engine = create_engine(f'sqlite:///{self.path}')
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE users (id INTEGER PRIMARY KEY, first_name VARCHAR(50) NOT NULL, "
+                "last_name VARCHAR(50) NOT NULL, email VARCHAR(120) NOT NULL UNIQUE, "
+                "password VARCHAR(128) NOT NULL, is_admin BOOLEAN)"))
+            connection.execute(text(
+                "INSERT INTO users (first_name, last_name, email, password) "
+                "VALUES ('A', 'A', 'Alice@Example.com', 'x'), ('B', 'B', 'bob@example.com', 'x')"))
+
+    def tearDown(self):
+        self.engine.dispose()
+        os.remove(self.path)
+
+    def test_existing_rows_are_normalized_and_indexed(self):
+        upgrade_schema(self.engine)
+        upgrade_schema(self.engine)  # idempotent
+        with self.engine.connect() as connection:
+            emails = connection.execute(
+                text("SELECT email_normalized FROM users ORDER BY id")).scalars().all()
+        self.assertEqual(emails, ["alice@example.com", "bob@example.com"])
+        indexes = {index['name']: index['unique'] for index in inspect(self.engine).get_indexes('users')}
+        self.assertEqual(indexes['ix_users_email_normalized'], 1)
+
+    def test_case_duplicates_stop_the_upgrade(self):
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO users (first_name, last_name, email, password) "
+                "VALUES ('C', 'C', 'alice@example.com', 'x')"))
+        with self.assertRaisesRegex(RuntimeError, "alice@example.com"):
+            upgrade_schema(self.engine)
+
+
+if __name__ == '__main__':
+    unittest.main()
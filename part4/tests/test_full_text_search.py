@@ -0,0 +1,139 @@
+import unittest
+from sqlalchemy import text
+from app import db
+from app.models import User, Place, Review
+from app.persistence.schema import upgrade_schema
+from app.services import facade
+from tests.base import DatabaseTestCase
+
+
+class TestFullTextSearch(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        owner = User(first_name="Owner", last_name="Doe", email="owner@example.com", password="x")
+        db.session.add(owner)
+        db.session.flush()
+        self.places = {}
+        for title, description in [("Sea view loft", "Bright loft above the harbour"),
+                                   ("Garden studio", "Quiet studio, breakfast at the café"),
+                                   ("Mountain chalet", "Wooden chalet with a sea of pines")]:
+            place = Place(title=title, description=description, price=50, latitude=0.0,
+                          longitude=0.0, owner=owner)
+            db.session.add(place)
+            db.session.flush()
+            self.places[title] = place
+        db.session.add(Review(text="Amazing fondue evenings", rating=5,
+                              place=self.places["Mountain chalet"], user=owner))
+        db.session.commit()
+
+    def search(self, query, status=200):
+        response = self.client.get('/places/search', query_string={'q': query})
+        self.assertEqual(response.status_code, status, response.get_json())
+        return response.get_json()
+
+    def test_ranked_by_bm25(self):
+        results = self.search("sea")
+        # Le titre pèse plus que la description
+        self.assertEqual([place['title'] for place in results], ["Sea view loft", "Mountain chalet"])
+        self.assertEqual(results[0]['title_highlight'], "<mark>Sea</mark> view loft")
+        self.assertIn("<mark>sea</mark>", results[1]['snippet'])
+        self.assertLess(results[0]['rank'], results[1]['rank'])
+
+    def test_prefix_diacritics_and_reviews(self):
+        self.assertEqual([place['title'] for place in self.search("CAFE")], ["Garden studio"])
+        self.assertEqual([place['title'] for place in self.search("fond")], ["Mountain chalet"])
+        self.assertEqual(self.search("loft garden"), [])
+        # Mots répartis entre le lieu et une de ses reviews
+        result, = self.search("chalet fondue")
+        self.assertEqual(result['title_highlight'], "Mountain <mark>chalet</mark>")
+        self.assertIn("<mark>fondue</mark>", self.search("fondue")[0]['snippet'])
+        self.assertEqual(self.search('"OR" NEAR('), [])  # opérateurs FTS5 ignorés
+
+    def test_index_follows_writes(self):
+        chalet = self.places["Mountain chalet"]
+        facade.update_place(chalet.id, {'title': "Alpine hut"})
+        self.assertEqual([place['title'] for place in self.search("alpine")], ["Alpine hut"])
+        self.assertEqual(self.search("mountain"), [])
+
+        review = Review.query.filter_by(place_id=chalet.id).one()
+        db.session.delete(review)
+        db.session.commit()
+        self.assertEqual(self.search("fondue"), [])
+
+        db.session.delete(self.places["Garden studio"])
+        db.session.commit()
+        self.assertEqual(self.search("studio"), [])
+
+    def test_highlights_are_escaped(self):
+        chalet = self.places["Mountain chalet"]
+        facade.update_place(chalet.id, {'title': "Chalet <b>&</b> sauna"})
+        guest = User(first_name="Guest", last_name="Doe", email="guest@example.com", password="x")
+        db.session.add(guest)
+        db.session.add(Review(text="Fondue <script>alert('x')</script> night", rating=4,
+                              place=chalet, user=guest))
+        db.session.commit()
+        result, = self.search("sauna")
+        self.assertEqual(result['title_highlight'], "Chalet &lt;b&gt;&amp;&lt;/b&gt; <mark>sauna</mark>")
+        result, = self.search("alert")
+        self.assertNotIn("<script>", result['snippet'])
+        self.assertIn("&lt;script&gt;<mark>alert</mark>(&#x27;x&#x27;)&lt;/script&gt;", result['snippet'])
+
+    def test_review_writes_touch_one_index_row(self):
+        chalet = self.places["Mountain chalet"]
+        guest = User(first_name="Guest", last_name="Doe", email="guest@example.com", password="x")
+        db.session.add(guest)
+        db.session.add(Review(text="Raclette too", rating=4, place=chalet, user=guest))
+        db.session.commit()
+        rows = db.session.execute(text(
+            "SELECT rowid, text, place_id FROM review_search ORDER BY rowid")).all()
+        self.assertEqual([(row.text, row.place_id) for row in rows],
+                         [("Amazing fondue evenings", chalet.id), ("Raclette too", chalet.id)])
+        row = db.session.execute(text("SELECT * FROM place_search WHERE rowid = :id"),
+                                 {'id': chalet.id}).one()
+        self.assertNotIn("fondue", " ".join(row))
+        self.assertEqual([place['title'] for place in self.search("raclette fondue")], ["Mountain chalet"])
+
+    def test_empty_query(self):
+        self.assertIn('error', self.search("  !! ", status=400))
+
+    def test_rebuild_for_existing_data(self):
+        db.session.remove()
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP TABLE place_search"))
+        upgrade_schema(db.engine)
+        self.assertEqual(len(self.search("loft")), 1)
+
+        with db.engine.begin() as connection:
+            connection.execute(text("DELETE FROM place_search"))
+        result = self.app.test_cli_runner().invoke(args=['search', 'rebuild'])
+        self.assertIn("Indexed 3 places", result.output)
+        self.assertEqual(len(self.search("loft")), 1)
+
+    def test_outdated_trigger_is_replaced(self):
+        db.session.remove()
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP TRIGGER place_search_review_delete"))
+            connection.execute(text(
+                "CREATE TRIGGER place_search_review_delete AFTER DELETE ON reviews BEGIN SELECT 1; END"))
+        upgrade_schema(db.engine)
+        sql = db.session.execute(text(
+            "SELECT sql FROM sqlite_master WHERE name = 'place_search_review_delete'")).scalar()
+        self.assertIn("DELETE FROM review_search", sql)
+        db.session.execute(text("DELETE FROM reviews"))
+        db.session.commit()
+        self.assertEqual(self.search("fondue"), [])
+
+    def test_single_row_layout_is_migrated(self):
+        db.session.remove()
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP TABLE place_search"))
+            connection.execute(text("DROP TABLE review_search"))
+            connection.execute(text("CREATE VIRTUAL TABLE place_search USING fts5(title, description, reviews)"))
+        upgrade_schema(db.engine)
+        columns = {row[1] for row in db.session.execute(text("PRAGMA table_info(place_search)"))}
+        self.assertEqual(columns, {'title', 'description'})
+        self.assertEqual([place['title'] for place in self.search("fondue")], ["Mountain chalet"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import random
+import unittest
+from types import SimpleNamespace
+from app import db
+from app.geo_engine import GeoEngine
+from app.models import User, Place
+from app.persistence.repository import InMemoryRepository
+from app.persistence.spatial import haversine_km
+from app.services import facade
+from tests.base import DatabaseTestCase
+
+
+class TestGeoEngine(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        self.places = [SimpleNamespace(id=i, latitude=rng.uniform(-90, 90), longitude=rng.uniform(-180, 180))
+                       for i in range(1, 3001)]
+        self.engine = GeoEngine()
+        self.engine.load(self.places)
+
+    def brute_force(self, lat, lon, places=None):
+        return sorted((haversine_km(lat, lon, p.latitude, p.longitude), p.id)
+                      for p in (places if places is not None else self.places))
+
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(6)
+        for _ in range(50):
+            lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+            found = self.engine.nearest(lat, lon, 10)
+            expected = self.brute_force(lat, lon)[:10]
+            self.assertEqual([place_id for place_id, _ in found], [place_id for _, place_id in expected])
+            for (_, distance), (expected_distance, _) in zip(found, expected):
+                self.assertAlmostEqual(distance, expected_distance, places=6)
+
+    def test_within_radius(self):
+        found = self.engine.within_radius(48.85, 2.35, 1500)
+        expected = [place_id for distance, place_id in self.brute_force(48.85, 2.35) if distance <= 1500]
+        self.assertEqual([place_id for place_id, _ in found], expected)
+        self.assertEqual(len(self.engine.within_radius(48.85, 2.35, 1500, limit=2)), min(2, len(expected)))
+
+    def test_incremental_updates(self):
+        self.engine.upsert(9999, 48.8566, 2.3522)
+        self.assertEqual(self.engine.nearest(48.8566, 2.3522, 1), [(9999, 0.0)])
+        self.engine.upsert(9999, -33.86, 151.21)
+        self.assertEqual(self.engine.nearest(-33.86, 151.21, 1)[0][0], 9999)
+        self.engine.remove(9999)
+        self.engine.remove(1)
+        remaining = [p for p in self.places if p.id != 1]
+        found = self.engine.nearest(-33.86, 151.21, 3)
+        self.assertEqual([place_id for place_id, _ in found],
+                         [place_id for _, place_id in self.brute_force(-33.86, 151.21, remaining)[:3]])
+        self.assertEqual(len(self.engine), len(remaining))
+
+    def test_growth_beyond_initial_capacity(self):
+        engine = GeoEngine()
+        for i in range(3000):
+            engine.upsert(i, 0.0, i / 100)
+        self.assertEqual(engine.nearest(0.0, 10.0, 1)[0][0], 1000)
+        self.assertEqual(len(engine.nearest(0.0, 0.0, 5000)), 3000)
+
+    def test_invalid_queries(self):
+        with self.assertRaises(ValueError):
+            self.engine.nearest(91, 0, 1)
+        with self.assertRaises(ValueError):
+            self.engine.nearest(0, 0, 0)
+        with self.assertRaises(ValueError):
+            self.engine.within_radius(0, 0, -1)
+        self.assertEqual(GeoEngine().nearest(0, 0, 3), [])
+
+    def test_fed_from_in_memory_repository(self):
+        repo = InMemoryRepository()
+        repo.add(SimpleNamespace(id="paris", latitude=48.8566, longitude=2.3522))
+        repo.add(SimpleNamespace(id="lyon", latitude=45.7640, longitude=4.8357))
+        engine = GeoEngine(loader=repo.iter_all)
+        self.assertEqual([place_id for place_id, _ in engine.nearest(45.0, 5.0, 2)], ["lyon", "paris"])
+
+    def test_reload_after_max_age(self):
+        now = [0.0]
+        positions = [SimpleNamespace(id=1, latitude=0.0, longitude=0.0)]
+        engine = GeoEngine(loader=lambda: positions, max_age=60, clock=lambda: now[0])
+        self.assertEqual(len(engine.nearest(0, 0, 5)), 1)
+        positions.append(SimpleNamespace(id=2, latitude=1.0, longitude=1.0))
+        now[0] = 30
+        self.assertEqual(len(engine.nearest(0, 0, 5)), 1)
+        now[0] = 61
+        self.assertEqual(len(engine.nearest(0, 0, 5)), 2)
+
+
+class TestFindNearestPlaces(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User(first_name="Owner", last_name="Doe", email="owner@example.com", password="x")
+        db.session.add(self.owner)
+        db.session.flush()
+        self.paris = Place(title="Paris", price=10, latitude=48.8566, longitude=2.3522, owner=self.owner)
+        self.lyon = Place(title="Lyon", price=10, latitude=45.7640, longitude=4.8357, owner=self.owner)
+        db.session.add_all([self.paris, self.lyon])
+        db.session.commit()
+        self.owner_id, self.paris_id, self.lyon_id = self.owner.id, self.paris.id, self.lyon.id
+
+    def nearest_ids(self, lat, lon, k=10):
+        return [place_id for place_id, _ in facade.find_nearest_places(lat, lon, k)]
+
+    def test_loads_from_the_places_table(self):
+        found = facade.find_nearest_places(45.75, 4.85, 2)
+        self.assertEqual([place_id for place_id, _ in found], [self.lyon.id, self.paris.id])
+        self.assertAlmostEqual(found[1][1], haversine_km(45.75, 4.85, 48.8566, 2.3522), places=6)
+
+    def test_follows_committed_writes_without_reloading(self):
+        self.assertEqual(self.nearest_ids(0, 0), [self.lyon.id, self.paris.id])
+        stats = facade.geo_engine.stats()
+        with self.count_queries() as statements:
+            marseille = facade.create_place({'title': "Marseille", 'price': 10, 'latitude': 43.2965,
+                                             'longitude': 5.3698, 'owner_id': self.owner_id})
+            facade.update_place(self.paris_id, {'latitude': -33.86, 'longitude': 151.21})
+            db.session.delete(db.session.get(Place, self.lyon_id))
+            db.session.commit()
+            self.assertEqual(self.nearest_ids(0, 0), [marseille.id, self.paris_id])
+            select_places = [s for s in statements if s.startswith("SELECT places.id, places.latitude")]
+        self.assertEqual(select_places, [])
+        self.assertTrue(stats['loaded'])
+
+    def test_rolled_back_changes_are_ignored(self):
+        self.nearest_ids(0, 0)
+        db.session.get(Place, self.paris.id).latitude = -10.0
+        db.session.flush()
+        db.session.rollback()
+        self.assertAlmostEqual(facade.find_nearest_places(48.8566, 2.3522, 1)[0][1], 0.0, places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
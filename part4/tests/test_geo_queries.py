@@ -0,0 +1,101 @@
+import random
+import unittest
+from unittest import mock
+from app import db
+from app.models import User, Place
+from app.persistence import spatial
+from app.persistence.spatial import haversine_km, in_box, radius_boxes
+from app.services import facade
+from tests.base import DatabaseTestCase
+
+CITIES = {
+    "Paris": (48.8566, 2.3522),
+    "Versailles": (48.8049, 2.1204),
+    "Lyon": (45.7640, 4.8357),
+    "Suva": (-18.1248, 178.4501),
+    "Apia": (-13.8333, -171.7667),
+}
+
+
+class TestRadiusBoxes(unittest.TestCase):
+    def test_boxes_contain_the_circle(self):
+        rng = random.Random(3)
+        for _ in range(2000):
+            lat, lon = rng.uniform(-89, 89), rng.uniform(-180, 180)
+            radius = rng.choice([1, 50, 500, 3000])
+            point_lat, point_lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+            if haversine_km(lat, lon, point_lat, point_lon) <= radius:
+                self.assertTrue(any(in_box(point_lat, point_lon, *box)
+                                    for box in radius_boxes(lat, lon, radius)))
+
+    def test_antimeridian_and_poles(self):
+        self.assertEqual(len(radius_boxes(-18.0, 179.9, 100)), 2)
+        self.assertEqual(radius_boxes(89.5, 0.0, 100)[0][1:4:2], (-180.0, 180.0))
+
+
+class TestGeoEndpoints(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        owner = User(first_name="Owner", last_name="Doe", email="owner@example.com", password="x")
+        db.session.add(owner)
+        db.session.flush()
+        self.ids = {}
+        for name, (lat, lon) in CITIES.items():
+            place = Place(title=name, price=10, latitude=lat, longitude=lon, owner=owner)
+            db.session.add(place)
+            db.session.flush()
+            self.ids[name] = place.id
+        db.session.commit()
+
+    def get(self, url, status=200):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status, response.get_json())
+        return response.get_json()
+
+    def test_nearby_orders_by_distance(self):
+        places = self.get('/places/nearby?lat=48.85&lon=2.35&radius_km=500')
+        self.assertEqual([place['title'] for place in places], ["Paris", "Versailles", "Lyon"])
+        self.assertAlmostEqual(places[2]['distance_km'], 392, delta=2)
+        self.assertEqual(places[0]['amenities'], [])
+        self.assertEqual([p['title'] for p in self.get('/places/nearby?lat=48.85&lon=2.35&radius_km=20')],
+                         ["Paris", "Versailles"])
+
+    def test_nearby_across_the_antimeridian(self):
+        places = self.get('/places/nearby?lat=-16&lon=-178&radius_km=1200&limit=5')
+        self.assertEqual([place['title'] for place in places], ["Suva", "Apia"])
+
+    def test_within_bbox(self):
+        places = self.get('/places/within?bbox=2.0,48.0,5.0,49.0')
+        self.assertEqual([place['title'] for place in places], ["Paris", "Versailles"])
+        places = self.get('/places/within?bbox=170,-20,-170,-10')
+        self.assertEqual(sorted(place['title'] for place in places), ["Apia", "Suva"])
+
+    def test_index_follows_writes(self):
+        facade.update_place(self.ids["Lyon"], {'latitude': 48.86, 'longitude': 2.35})
+        places = self.get('/places/nearby?lat=48.86&lon=2.35&radius_km=0.1')
+        self.assertEqual([place['title'] for place in places], ["Lyon"])
+        db.session.delete(db.session.get(Place, self.ids["Lyon"]))
+        db.session.commit()
+        self.assertEqual(self.get('/places/nearby?lat=48.86&lon=2.35&radius_km=0.1'), [])
+
+    def test_invalid_parameters(self):
+        self.get('/places/nearby?lat=91&lon=0&radius_km=10', status=400)
+        self.get('/places/nearby?lat=0&lon=0&radius_km=0', status=400)
+        self.get('/places/within?bbox=1,2,3', status=400)
+        self.get('/places/within?bbox=0,10,5,0', status=400)
+        self.get('/places/nearby?lat=0&lon=0&radius_km=20000', status=400)
+        self.get('/places/within?bbox=-180,-90,180,90', status=400)
+        self.get('/places/within?bbox=170,0,-170,10', status=200)
+
+    def test_crowded_area_is_refused(self):
+        with mock.patch.object(spatial, 'MAX_CANDIDATES', 2):
+            self.get('/places/nearby?lat=48.85&lon=2.35&radius_km=500', status=400)
+            self.assertEqual(len(self.get('/places/nearby?lat=48.85&lon=2.35&radius_km=20')), 2)
+
+    def test_rebuild_command(self):
+        result = self.app.test_cli_runner().invoke(args=['geo', 'rebuild'])
+        self.assertIn(f"Indexed {len(CITIES)} places", result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
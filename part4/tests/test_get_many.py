@@ -0,0 +1,62 @@
+import unittest
+from types import SimpleNamespace
+from app import db
+from app.models import User, Amenity
+from app.persistence.repository import InMemoryRepository
+from app.services import facade
+from tests.base import DatabaseTestCase
+
+
+class TestGetMany(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User(first_name="Owner", last_name="Doe", email="owner@example.com",
+                          password="secret")
+        db.session.add(self.owner)
+        db.session.add_all([Amenity(name=f"Amenity {i}") for i in range(5)])
+        db.session.commit()
+
+    def test_single_in_query_in_requested_order(self):
+        with self.count_queries() as statements:
+            amenities = facade.amenity_repo.get_many(["3", 1, "42", "3", "abc"])
+        self.assertEqual([amenity.id for amenity in amenities], [3, 1])
+        self.assertEqual(len(statements), 1)
+        self.assertIn(' IN ', statements[0])
+
+    def test_create_place_resolves_amenities_in_one_query(self):
+        owner_id = self.owner.id
+        with self.count_queries() as statements:
+            place = facade.create_place({'title': "Loft", 'description': "", 'price': 10,
+                                         'latitude': 1.0, 'longitude': 1.0,
+                                         'owner_id': owner_id,
+                                         'amenities': ["1", "2", "3", "4"]})
+        self.assertEqual(sorted(amenity.id for amenity in place.amenities), [1, 2, 3, 4])
+        amenity_selects = [s for s in statements if s.startswith('SELECT') and 'FROM amenities' in s]
+        self.assertEqual(len(amenity_selects), 1)
+
+    def test_multi_get_endpoints(self):
+        response = self.client.get('/amenities/?ids=2,5,99')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.get_json()], [2, 5])
+
+        place = facade.create_place({'title': "Loft", 'description': "", 'price': 10,
+                                     'latitude': 1.0, 'longitude': 1.0,
+                                     'owner_id': self.owner.id, 'amenities': [1]})
+        response = self.client.get(f'/places/?ids={place.id}')
+        self.assertEqual(response.get_json()[0]['amenities'], [1])
+
+    def test_too_many_ids(self):
+        ids = ','.join(str(i) for i in range(101))
+        self.assertEqual(self.client.get(f'/amenities/?ids={ids}').status_code, 400)
+
+
+class TestInMemoryGetMany(unittest.TestCase):
+    def test_dict_lookup(self):
+        repo = InMemoryRepository()
+        for obj_id in ("a", "b", "c"):
+            repo.add(SimpleNamespace(id=obj_id))
+        self.assertEqual([o.id for o in repo.get_many(["c", "x", "a", "c"])], ["c", "a"])
+
+
+if __name__ == '__main__':
+    unittest.main()
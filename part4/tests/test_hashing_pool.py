@@ -0,0 +1,90 @@
+import threading
+import time
+import unittest
+from app import create_app
+from app.extensions import password_hasher
+from app.hashing import HashingPool, HashingPoolSaturated, HashingPoolTimeout
+from tests.base import DatabaseTestCase, InMemoryTestingConfig
+
+
+class TestHashingPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = HashingPool(workers=1, max_queue=1, timeout=5)
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.pool.shutdown()
+
+    def block(self):
+        self.started.set()
+        self.release.wait(5)
+        return 'done'
+
+    def test_runs_off_thread(self):
+        name = self.pool.run(lambda: threading.current_thread().name)
+        self.assertTrue(name.startswith('bcrypt'))
+        self.assertEqual(self.pool.stats()['completed'], 1)
+
+    def test_rejects_when_queue_is_full(self):
+        blocker = threading.Thread(target=self.pool.run, args=(self.block,))
+        blocker.start()
+        self.started.wait(5)
+        queued = threading.Thread(target=self.pool.run, args=(lambda: None,))
+        queued.start()
+        while self.pool.stats()['queued'] < 1:
+            time.sleep(0.001)
+        with self.assertRaises(HashingPoolSaturated):
+            self.pool.run(lambda: None)
+        stats = self.pool.stats()
+        self.assertEqual((stats['active'], stats['queued'], stats['rejected']), (1, 1, 1))
+        self.release.set()
+        blocker.join()
+        queued.join()
+        self.assertEqual(self.pool.run(lambda: 'ok'), 'ok')
+
+    def test_timeout(self):
+        self.pool.timeout = 0.05
+        with self.assertRaises(HashingPoolTimeout):
+            self.pool.run(self.block)
+        self.assertEqual(self.pool.stats()['timeouts'], 1)
+
+
+class SaturatedPoolConfig(InMemoryTestingConfig):
+    PASSWORD_POOL_WORKERS = 1
+    PASSWORD_POOL_QUEUE = 0
+
+
+class TestLoginWhenSaturated(DatabaseTestCase):
+    def setUp(self):
+        self.app = create_app(SaturatedPoolConfig)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+    def test_login_returns_429(self):
+        release, started = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        blocker = threading.Thread(target=password_hasher.pool.run, args=(block,))
+        blocker.start()
+        started.wait(5)
+        try:
+            response = self.client.post('/api/auth/login',
+                                        json={'email': "admin@hbnb.com", 'password': "admin123"})
+        finally:
+            release.set()
+            blocker.join()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '1')
+        response = self.client.post('/api/auth/login',
+                                    json={'email': "admin@hbnb.com", 'password': "admin123"})
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from types import SimpleNamespace
+from app.persistence.repository import InMemoryRepository
+
+
+def make_user(obj_id, email, owner_id=None):
+    return SimpleNamespace(id=obj_id, email=email, owner_id=owner_id, name="same")
+
+
+class TestInMemoryIndexes(unittest.TestCase):
+    def setUp(self):
+        self.repo = InMemoryRepository(unique_indexes=('email',), indexes=('owner_id',))
+        self.repo.add(make_user("1", "a@example.com", owner_id="x"))
+        self.repo.add(make_user("2", "b@example.com", owner_id="x"))
+        self.repo.add(make_user("3", "c@example.com", owner_id="y"))
+
+    def test_unique_lookup(self):
+        self.assertEqual(self.repo.get_by_attribute('email', "b@example.com").id, "2")
+        self.assertIsNone(self.repo.get_by_attribute('email', "zz@example.com"))
+
+    def test_multi_valued_lookup(self):
+        ids = [obj.id for obj in self.repo.get_all_by_attribute('owner_id', "x")]
+        self.assertEqual(ids, ["1", "2"])
+        self.assertEqual(self.repo.get_by_attribute('owner_id', "y").id, "3")
+
+    def test_fallback_scan_on_non_indexed_attribute(self):
+        self.assertEqual(len(self.repo.get_all_by_attribute('name', "same")), 3)
+        self.assertEqual(self.repo.get_by_attribute('name', "same").id, "1")
+
+    def test_duplicate_unique_value_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.repo.add(make_user("4", "a@example.com"))
+        with self.assertRaises(ValueError):
+            self.repo.update("2", {'email': "a@example.com"})
+        # L'objet n'a pas été modifié par la mise à jour refusée
+        self.assertEqual(self.repo.get("2").email, "b@example.com")
+        self.assertEqual(self.repo.get_by_attribute('email', "b@example.com").id, "2")
+
+    def test_update_moves_index_entries(self):
+        self.repo.update("1", {'email': "new@example.com", 'owner_id': "y"})
+        self.assertIsNone(self.repo.get_by_attribute('email', "a@example.com"))
+        self.assertEqual(self.repo.get_by_attribute('email', "new@example.com").id, "1")
+        self.assertEqual([o.id for o in self.repo.get_all_by_attribute('owner_id', "y")], ["3", "1"])
+
+    def test_delete_removes_index_entries(self):
+        self.repo.delete("3")
+        self.assertIsNone(self.repo.get_by_attribute('email', "c@example.com"))
+        self.assertEqual(self.repo.get_all_by_attribute('owner_id', "y"), [])
+        self.repo.add(make_user("5", "c@example.com"))
+
+    def test_reindex_after_external_mutation(self):
+        self.repo.get("1").email = "changed@example.com"
+        self.repo.reindex("1")
+        self.assertEqual(self.repo.get_by_attribute('email', "changed@example.com").id, "1")
+        self.assertIsNone(self.repo.get_by_attribute('email', "a@example.com"))
+
+
+if __name__ == '__main__':
+    unittest.main()
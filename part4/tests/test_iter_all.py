@@ -0,0 +1,79 @@
+import unittest
+from app import db
+from app.models import Amenity, Place, User
+from app.persistence.repository import InMemoryRepository, unit_of_work
+from app.services import facade
+from tests.base import DatabaseTestCase
+
+
+class TestIterAll(DatabaseTestCase):
+    def seed(self, count):
+        db.session.add_all([Amenity(name=f"Amenity {i}") for i in range(count)])
+        db.session.commit()
+        db.session.remove()
+
+    def test_streams_in_id_order(self):
+        self.seed(25)
+        names = [amenity.name for amenity in facade.amenity_repo.iter_all(batch_size=10)]
+        self.assertEqual(names, [f"Amenity {i}" for i in range(25)])
+
+    def test_session_holds_one_batch_at_most(self):
+        self.seed(25)
+        sizes = [len(db.session.identity_map) for _ in facade.amenity_repo.iter_all(batch_size=10)]
+        self.assertLessEqual(max(sizes), 10)
+        self.assertEqual(len(db.session.identity_map), 0)
+
+    def test_where_and_columns(self):
+        self.seed(5)
+        rows = list(facade.amenity_repo.iter_all(
+            batch_size=2, where=Amenity.name.in_(["Amenity 1", "Amenity 3"]), columns=['id', 'name']))
+        self.assertEqual([row.name for row in rows], ["Amenity 1", "Amenity 3"])
+
+    def test_modified_objects_are_kept_for_flush(self):
+        self.seed(5)
+        with unit_of_work():
+            for amenity in facade.amenity_repo.iter_all(batch_size=2):
+                amenity.name = amenity.name.upper()
+        db.session.remove()
+        self.assertEqual(facade.amenity_repo.repository.get(5).name, "AMENITY 4")
+
+    def test_objects_loaded_before_stay_attached(self):
+        self.seed(5)
+        amenity = db.session.get(Amenity, 3)
+        self.assertEqual(len(list(facade.amenity_repo.iter_all(batch_size=2))), 5)
+        self.assertIn(amenity, db.session)
+        self.assertEqual(len(db.session.identity_map), 1)
+
+    def test_profile(self):
+        owner = User(first_name="Owner", last_name="Doe", email="owner@example.com", password="secret")
+        place = Place(title="Place", description="", price=1, latitude=0, longitude=0, owner=owner)
+        place.add_amenity(Amenity(name="Wifi"))
+        db.session.add(place)
+        db.session.commit()
+        db.session.remove()
+        places = [(p.title, [a.name for a in p.amenities])
+                  for p in facade.place_repo.iter_all(profile='place_card')]
+        self.assertEqual(places, [("Place", ["Wifi"])])
+
+
+class TestInMemoryIterAll(unittest.TestCase):
+    def test_iter_all_with_predicate(self):
+        repo = InMemoryRepository()
+        for i in range(7):
+            repo.add(type('Obj', (), {'id': i, 'value': i % 2})())
+        odd = [obj.id for obj in repo.iter_all(batch_size=3, where=lambda obj: obj.value == 1)]
+        self.assertEqual(odd, [1, 3, 5])
+
+    def test_delete_while_iterating(self):
+        repo = InMemoryRepository()
+        for i in range(4):
+            repo.add(type('Obj', (), {'id': i})())
+        seen = []
+        for obj in repo.iter_all(batch_size=2):
+            seen.append(obj.id)
+            repo.delete(3)
+        self.assertEqual(seen, [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from app import db
+from app.models import User, Place, Review, Amenity
+from app.services import facade
+from tests.base import DatabaseTestCase
+
+
+class TestLoadProfiles(DatabaseTestCase):
+    def seed(self, nb_places):
+        owner = User(first_name="Owner", last_name="Doe", email=f"owner{nb_places}@example.com",
+                     password="secret")
+        guest = User(first_name="Guest", last_name="Doe", email=f"guest{nb_places}@example.com",
+                     password="secret")
+        amenities = [Amenity(name=f"Amenity {i}") for i in range(3)]
+        db.session.add_all([owner, guest] + amenities)
+        db.session.flush()
+        for i in range(nb_places):
+            place = Place(title=f"Place {i}", description="desc", price=10, latitude=1.0,
+                          longitude=2.0, owner=owner)
+            for amenity in amenities:
+                place.add_amenity(amenity)
+            db.session.add(place)
+            db.session.add(Review(text="Nice", rating=4, place=place, user=guest))
+        db.session.commit()
+
+    def list_query_count(self, url, nb_places):
+        self.seed(nb_places)
+        with self.count_queries() as statements:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()), nb_places)
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        return len(statements)
+
+    def test_place_list_query_count_is_constant(self):
+        small = self.list_query_count('/places/', 3)
+        large = self.list_query_count('/places/', 30)
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, 2)
+
+    def test_review_list_query_count_is_constant(self):
+        small = self.list_query_count('/reviews/', 3)
+        large = self.list_query_count('/reviews/', 30)
+        self.assertEqual(small, large)
+        self.assertEqual(large, 1)
+
+    def test_place_card_loads_amenity_ids(self):
+        self.seed(2)
+        with self.count_queries():
+            places = facade.get_all_places()
+            amenity_ids = [[amenity.id for amenity in place.amenities] for place in places]
+        self.assertEqual(amenity_ids, [[1, 2, 3], [1, 2, 3]])
+
+    def test_get_with_profile(self):
+        self.seed(1)
+        with self.count_queries() as statements:
+            place = facade.get_place(1, profile='place_card')
+            self.assertEqual(len(place.amenities), 3)
+        self.assertEqual(len(statements), 2)
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            facade.place_repo.get_all(profile='unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
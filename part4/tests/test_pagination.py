@@ -0,0 +1,78 @@
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from app import db
+from app.models import Amenity
+from app.persistence.repository import InMemoryRepository
+from tests.base import DatabaseTestCase
+
+
+class TestKeysetPagination(DatabaseTestCase):
+    def seed_amenities(self, count):
+        created_at = datetime(2025, 1, 1)
+        for i in range(count):
+            amenity = Amenity(name=f"Amenity {i}")
+            # Même horodatage pour tous : l'ordre doit être départagé par l'id
+            amenity.created_at = created_at
+            db.session.add(amenity)
+        db.session.commit()
+
+    def test_walk_all_pages(self):
+        self.seed_amenities(25)
+        seen, cursor, pages = [], None, 0
+        while True:
+            url = '/amenities/?limit=10' + (f'&cursor={cursor}' if cursor else '')
+            body = self.client.get(url).get_json()
+            seen.extend(item['id'] for item in body['items'])
+            cursor = body['next_cursor']
+            pages += 1
+            if cursor is None:
+                break
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen, list(range(1, 26)))
+
+    def test_total_is_optional(self):
+        self.seed_amenities(5)
+        body = self.client.get('/amenities/?limit=2').get_json()
+        self.assertNotIn('total', body)
+        body = self.client.get('/amenities/?limit=2&include_total=true').get_json()
+        self.assertEqual(body['total'], 5)
+
+    def test_deep_page_costs_one_query(self):
+        self.seed_amenities(50)
+        body = self.client.get('/amenities/?limit=45').get_json()
+        with self.count_queries() as statements:
+            response = self.client.get(f"/amenities/?limit=10&cursor={body['next_cursor']}")
+        self.assertEqual(len(response.get_json()['items']), 5)
+        self.assertEqual(len(statements), 1)
+        self.assertIn('WHERE', statements[0].upper())
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/places/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+    def test_unpaginated_list_is_unchanged(self):
+        self.seed_amenities(3)
+        body = self.client.get('/users/').get_json()
+        self.assertIsInstance(body, list)
+        body = self.client.get('/users/?limit=1').get_json()
+        self.assertEqual(len(body['items']), 1)
+        self.assertIsNone(body['next_cursor'])
+
+
+class TestInMemoryPagination(unittest.TestCase):
+    def test_pages(self):
+        repo = InMemoryRepository()
+        for i in range(5):
+            repo.add(SimpleNamespace(id=f"id-{i}", created_at=datetime(2025, 1, 5 - i)))
+        items, cursor, total = repo.get_page(limit=3, with_total=True)
+        self.assertEqual([o.id for o in items], ["id-4", "id-3", "id-2"])
+        self.assertEqual(total, 5)
+        items, cursor, total = repo.get_page(cursor=cursor, limit=3)
+        self.assertEqual([o.id for o in items], ["id-1", "id-0"])
+        self.assertIsNone(cursor)
+        self.assertIsNone(total)
+
+
+if __name__ == '__main__':
+    unittest.main()
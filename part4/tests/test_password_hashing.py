@@ -0,0 +1,65 @@
+import unittest
+from unittest import mock
+from app import db
+from app.extensions import password_hasher
+from app.hashing import PasswordHasher
+from app.models import User
+from app.services import facade
+from tests.base import DatabaseTestCase
+
+
+class TestPasswordHasher(unittest.TestCase):
+    def test_hash_and_verify(self):
+        hasher = PasswordHasher(rounds=4)
+        hashed = hasher.hash("s3cret")
+        self.assertEqual(PasswordHasher.cost_of(hashed), 4)
+        self.assertTrue(hasher.verify(hashed, "s3cret"))
+        self.assertFalse(hasher.verify(hashed, "wrong"))
+        self.assertFalse(hasher.verify("not-a-hash", "s3cret"))
+
+    def test_verify_and_update(self):
+        old = PasswordHasher(rounds=4).hash("s3cret")
+        hasher = PasswordHasher(rounds=5)
+        self.assertEqual(hasher.verify_and_update(old, "wrong"), (False, None))
+        valid, new_hash = hasher.verify_and_update(old, "s3cret")
+        self.assertTrue(valid)
+        self.assertEqual(PasswordHasher.cost_of(new_hash), 5)
+        self.assertEqual(hasher.verify_and_update(new_hash, "s3cret"), (True, None))
+
+    def test_calibrate(self):
+        hasher = PasswordHasher()
+        self.assertEqual(hasher.calibrate(0, min_rounds=4), 4)
+        self.assertEqual(hasher.calibrate(10 ** 9, min_rounds=4, max_rounds=6), 6)
+
+
+class TestSignupAndLogin(DatabaseTestCase):
+    def test_signup_hashes_once_and_login_works(self):
+        # Même chemin que UserList.post
+        with mock.patch.object(password_hasher, 'hash', wraps=password_hasher.hash) as hash_spy:
+            facade.create_user({'first_name': "Jane", 'last_name': "Doe",
+                                'email': "jane@example.com", 'password': "s3cret"})
+        self.assertEqual(hash_spy.call_count, 1)
+        response = self.client.post('/api/auth/login',
+                                    json={'email': "jane@example.com", 'password': "s3cret"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access_token', response.get_json())
+
+    def test_login_rehashes_when_cost_changes(self):
+        user = User(first_name="Jane", last_name="Doe", email="jane@example.com", password="s3cret")
+        db.session.add(user)
+        db.session.commit()
+        self.assertEqual(PasswordHasher.cost_of(user.password), 4)
+        with mock.patch.object(password_hasher, 'rounds', 5):
+            response = self.client.post('/api/auth/login',
+                                        json={'email': "jane@example.com", 'password': "s3cret"})
+        self.assertEqual(response.status_code, 200)
+        db.session.remove()
+        stored = User.query.filter_by(email="jane@example.com").first().password
+        self.assertEqual(PasswordHasher.cost_of(stored), 5)
+        response = self.client.post('/api/auth/login',
+                                    json={'email': "jane@example.com", 'password': "wrong"})
+        self.assertEqual(response.status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
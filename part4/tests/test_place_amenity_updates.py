@@ -0,0 +1,64 @@
+import unittest
+from sqlalchemy import text
+from app import db
+from app.models import User, Place, Amenity
+from app.services import facade
+from tests.base import DatabaseTestCase
+
+
+class TestPlaceAmenityUpdates(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        owner = User(first_name="Owner", last_name="Doe", email="owner@example.com", password="x")
+        amenities = [Amenity(name=f"Amenity {i}") for i in range(6)]
+        db.session.add_all([owner, *amenities])
+        db.session.flush()
+        place = Place(title="Loft", price=100, latitude=0.0, longitude=0.0, owner=owner)
+        place.amenities = amenities[:3]
+        db.session.add(place)
+        db.session.commit()
+        self.place_id = place.id
+        self.amenity_ids = [amenity.id for amenity in amenities]
+
+    def stored_ids(self):
+        return sorted(db.session.execute(text(
+            "SELECT amenity_id FROM place_amenity_association WHERE place_id = :id"),
+            {'id': self.place_id}).scalars())
+
+    def writes(self, statements):
+        return [s for s in statements if s.startswith(('INSERT', 'DELETE'))]
+
+    def test_only_the_difference_is_written(self):
+        ids = self.amenity_ids
+        with self.count_queries() as statements:
+            place = facade.update_place(self.place_id, {'amenities': [ids[1], str(ids[2]), ids[4], ids[5]]})
+        writes = self.writes(statements)
+        self.assertEqual(len(writes), 2)
+        self.assertTrue(writes[0].startswith("DELETE FROM place_amenity_association"))
+        self.assertTrue(writes[1].startswith("INSERT INTO place_amenity_association"))
+        self.assertEqual(self.stored_ids(), [ids[1], ids[2], ids[4], ids[5]])
+        # La collection du lieu renvoyé est relue après les écritures directes
+        self.assertEqual(sorted(amenity.id for amenity in place.amenities), self.stored_ids())
+
+    def test_unchanged_list_writes_nothing(self):
+        with self.count_queries() as statements:
+            facade.update_place(self.place_id, {'amenities': list(reversed(self.amenity_ids[:3]))})
+        self.assertEqual(self.writes(statements), [])
+        facade.update_place(self.place_id, {'amenities': []})
+        self.assertEqual(self.stored_ids(), [])
+
+    def test_loaded_amenity_sees_the_change(self):
+        amenity = db.session.get(Amenity, self.amenity_ids[4])
+        self.assertEqual(amenity.places, [])
+        facade.update_place(self.place_id, {'amenities': [self.amenity_ids[4]]})
+        self.assertEqual([place.id for place in amenity.places], [self.place_id])
+
+    def test_unknown_amenity_rejects_the_whole_update(self):
+        with self.assertRaisesRegex(ValueError, "Amenity not found: abc, 999"):
+            facade.update_place(self.place_id, {'title': "Flat", 'amenities': ["abc", 999, self.amenity_ids[5]]})
+        self.assertEqual(self.stored_ids(), self.amenity_ids[:3])
+        self.assertEqual(db.session.get(Place, self.place_id).title, "Loft")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import base64
+import json
+import unittest
+from app import db
+from app.models import User, Place, Amenity, Review
+from tests.base import DatabaseTestCase
+
+
+class TestPlaceSearch(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        alice = User(first_name="Alice", last_name="A", email="alice@example.com", password="x")
+        bob = User(first_name="Bob", last_name="B", email="bob@example.com", password="x")
+        wifi, pool = Amenity(name="WiFi"), Amenity(name="Pool")
+        db.session.add_all([alice, bob, wifi, pool])
+        db.session.flush()
+        # (titre, prix, propriétaire, amenities, notes)
+        specs = [("Cabin", 40, alice, [wifi], [5, 3]),
+                 ("Loft", 120, alice, [wifi, pool], [2]),
+                 ("Villa", 300, bob, [wifi, pool], [5]),
+                 ("Tent", 10, bob, [], [])]
+        self.ids = {}
+        for title, price, owner, amenities, ratings in specs:
+            place = Place(title=title, price=price, latitude=0.0, longitude=0.0, owner=owner)
+            for amenity in amenities:
+                place.add_amenity(amenity)
+            db.session.add(place)
+            # Une review par utilisateur et par lieu
+            for reviewer, rating in zip((alice, bob), ratings):
+                db.session.add(Review(text="ok", rating=rating, place=place, user=reviewer))
+                place.adjust_ratings(1, rating)
+            db.session.flush()
+            self.ids[title] = place.id
+        db.session.commit()
+        self.alice_id, self.pool_id, self.wifi_id = alice.id, pool.id, wifi.id
+
+    def titles(self, query):
+        response = self.client.get(f'/places/?{query}')
+        self.assertEqual(response.status_code, 200, response.get_json())
+        body = response.get_json()
+        return [place['title'] for place in (body['items'] if isinstance(body, dict) else body)]
+
+    def test_price_range(self):
+        self.assertEqual(self.titles('price_min=30&price_max=150'), ["Cabin", "Loft"])
+        self.assertEqual(self.titles('price_max=50&sort=-price'), ["Cabin", "Tent"])
+
+    def test_amenities_all_of(self):
+        self.assertEqual(self.titles(f'amenities={self.wifi_id},{self.pool_id}'), ["Loft", "Villa"])
+        self.assertEqual(self.titles(f'amenities={self.wifi_id}&owner_id={self.alice_id}'),
+                         ["Cabin", "Loft"])
+
+    def test_sorts(self):
+        self.assertEqual(self.titles('sort=price'), ["Tent", "Cabin", "Loft", "Villa"])
+        self.assertEqual(self.titles('sort=-rating'), ["Villa", "Cabin", "Loft", "Tent"])
+        self.assertEqual(self.titles('sort=-created_at'), ["Tent", "Villa", "Loft", "Cabin"])
+
+    def test_keyset_pages_follow_the_sort(self):
+        response = self.client.get('/places/?sort=-rating&limit=2&include_total=true').get_json()
+        self.assertEqual([place['title'] for place in response['items']], ["Villa", "Cabin"])
+        self.assertEqual(response['total'], 4)
+        response = self.client.get(f"/places/?sort=-rating&limit=2&cursor={response['next_cursor']}")
+        body = response.get_json()
+        self.assertEqual([place['title'] for place in body['items']], ["Loft", "Tent"])
+        self.assertIsNone(body['next_cursor'])
+
+    def test_one_query_for_the_places(self):
+        with self.count_queries() as statements:
+            places = self.client.get(f'/places/?price_min=20&amenities={self.pool_id}&sort=-rating&limit=5')
+        self.assertEqual(len(places.get_json()['items']), 2)
+        # Lieux filtrés/triés, puis IDs des amenities de la page
+        self.assertEqual(len(statements), 2)
+        self.assertIn('place_amenity_association', statements[0])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get('/places/?sort=title').status_code, 400)
+        self.assertEqual(self.client.get('/places/?amenities=x').status_code, 400)
+        self.assertEqual(self.client.get('/places/?sort=price&cursor=abc').status_code, 400)
+        cursor = self.client.get('/places/?sort=price&limit=1').get_json()['next_cursor']
+        self.assertEqual(self.client.get(f'/places/?sort=created_at&cursor={cursor}').status_code, 400)
+        self.assertEqual(self.client.get(f'/places/?sort=-price&cursor={cursor}').status_code, 400)
+        forged = base64.urlsafe_b64encode(json.dumps([{"a": 1}, [1]]).encode()).decode()
+        self.assertEqual(self.client.get(f'/places/?cursor={forged}').status_code, 400)
+        forged = base64.urlsafe_b64encode(json.dumps(["price", {"a": 1}, [1]]).encode()).decode()
+        self.assertEqual(self.client.get(f'/places/?sort=price&cursor={forged}').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
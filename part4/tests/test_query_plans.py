@@ -0,0 +1,198 @@
+"""
+Plans d'exécution des requêtes du facade.
+
+Chaque méthode publique de HBnBFacade est appelée sur une base où toutes les
+tables dépassent LARGE_TABLE_ROWS lignes ; le SQL émis est capturé puis passé
+à EXPLAIN QUERY PLAN. Un parcours complet (SCAN) d'une grande table fait
+échouer le test, sauf pour les tables listées dans `allow` : méthodes qui
+renvoient toute une table par définition, ou totaux COUNT(*). Seul le
+parcours d'index qui donne lui-même l'ORDER BY de la requête (boucle
+externe, sans B-tree temporaire pour le tri) et s'arrête au LIMIT n'est pas
+un parcours complet : c'est la pagination triée.
+"""
+import re
+import unittest
+from sqlalchemy import event, inspect, text
+from app import db
+from app.models import User, Place, Amenity, Review
+from app.models.place import place_amenity_association
+from app.services import facade
+from app.services.facade import HBnBFacade
+from tests.base import DatabaseTestCase
+
+LARGE_TABLE_ROWS = 100
+ROWS = 2 * LARGE_TABLE_ROWS
+
+# Méthodes sans requête SQL propre
+NO_SQL = {'configure_caches', 'cache_stats', 'is_valid_email'}
+
+
+def facade_calls(ids):
+    """(method, call, tables allowed to be scanned) for every facade method that reads or writes."""
+    user, other, doomed, place, lonely_place, amenity, review = (ids[key] for key in (
+        'user', 'other', 'doomed', 'place', 'lonely_place', 'amenity', 'review'))
+    return [
+        ('create_user', lambda: facade.create_user({'first_name': "New", 'last_name': "User",
+                                                    'email': "new@example.com", 'password': "x"}), ()),
+        ('get_user', lambda: facade.get_user(user), ()),
+        ('get_user_by_email', lambda: facade.get_user_by_email("user7@example.com"), ()),
+        ('is_email_registered', lambda: facade.is_email_registered("USER8@example.com"), ()),
+        ('authenticate', lambda: facade.authenticate("user9@example.com", "x"), ()),
+        ('get_all_users', lambda: facade.get_all_users(columns=['id', 'email']), {'users'}),
+        ('get_users_page', lambda: facade.get_users_page(limit=10, with_total=True), {'users'}),
+        ('update_user', lambda: facade.update_user(user, {'first_name': "Renamed"}), ()),
+        ('delete_user', lambda: facade.delete_user(doomed), ()),
+        ('create_amenity', lambda: facade.create_amenity({'name': "Sauna"}), ()),
+        ('create_amenities_bulk', lambda: facade.create_amenities_bulk([{'name': "Gym"}, {'name': "Spa"}]), ()),
+        ('get_amenity', lambda: facade.get_amenity(amenity), ()),
+        ('get_all_amenities', lambda: facade.get_all_amenities(columns=['id', 'name']), {'amenities'}),
+        ('get_amenities_by_ids', lambda: facade.get_amenities_by_ids([amenity, amenity + 1]), ()),
+        ('get_amenities_page', lambda: facade.get_amenities_page(limit=10), ()),
+        ('update_amenity', lambda: facade.update_amenity(amenity, {'name': "Jacuzzi"}), ()),
+        ('create_place', lambda: facade.create_place({
+            'title': "New", 'price': 10, 'latitude': 1.0, 'longitude': 1.0, 'owner_id': user,
+            'amenities': [amenity]}), ()),
+        ('create_places_bulk', lambda: facade.create_places_bulk([
+            {'title': "Bulk", 'price': 10, 'latitude': 1.0, 'longitude': 1.0, 'amenities': [amenity, amenity + 1]},
+            {'title': "Bulk 2", 'price': 20, 'latitude': 2.0, 'longitude': 2.0}], owner_id=user), ()),
+        ('get_place', lambda: facade.get_place(place, profile='place_card'), ()),
+        ('get_all_places', lambda: facade.get_all_places(columns=['id', 'title']), {'places'}),
+        ('get_places_by_ids', lambda: facade.get_places_by_ids([place, place + 1], columns=['id']), ()),
+        ('get_places_page', lambda: facade.get_places_page(limit=10), ()),
+        ('search_places', lambda: facade.search_places(
+            {'price_max': 50, 'amenity_ids': [amenity], 'owner_id': user}, sort='-rating', limit=10), ()),
+        ('full_text_search_places', lambda: facade.full_text_search_places("Place", limit=5), ()),
+        ('get_places_nearby', lambda: facade.get_places_nearby(0.0, 0.0, 50, limit=10), ()),
+        ('get_places_within', lambda: facade.get_places_within(-1.0, -1.0, 1.0, 1.0, limit=10), ()),
+        # Le moteur géo en mémoire se charge d'une lecture de toute la table, puis ne fait plus de SQL
+        ('find_nearest_places', lambda: facade.find_nearest_places(0.0, 0.0, 5), {'places'}),
+        ('get_place_amenity_ids', lambda: facade.get_place_amenity_ids([place, place + 1]), ()),
+        ('update_place', lambda: facade.update_place(place, {'title': "Renamed", 'price': 20,
+                                                             'amenities': [amenity + 1, amenity + 2]}), ()),
+        ('delete_place', lambda: facade.delete_place(lonely_place), ()),
+        ('create_review', lambda: facade.create_review({'text': "Nice", 'rating': 5, 'user_id': other,
+                                                        'place_id': place}), ()),
+        ('create_reviews_bulk', lambda: facade.create_reviews_bulk([
+            {'text': "Nice", 'rating': 5, 'place_id': place}, {'text': "Fine", 'rating': 3, 'place_id': place + 1}],
+            user_id=other), ()),
+        ('get_review', lambda: facade.get_review(review), ()),
+        ('get_all_reviews', lambda: facade.get_all_reviews(columns=['id', 'rating']), {'reviews'}),
+        ('get_reviews_page', lambda: facade.get_reviews_page(limit=10), ()),
+        ('get_reviews_by_place', lambda: facade.get_reviews_by_place(place, limit=10, with_total=True), ()),
+        ('update_review', lambda: facade.update_review(review, {'rating': 1}), ()),
+        ('delete_review', lambda: facade.delete_review(review), ()),
+        ('has_already_reviewed', lambda: facade.has_already_reviewed(user, place), ()),
+    ]
+
+
+def aliases(statement):
+    """Map the aliases of a statement ("places AS p", "places AS places_1") to their table."""
+    names = {name: name for name in db.metadata.tables}
+    for table, alias in re.findall(r'\b(\w+) AS (\w+)\b', statement):
+        if table in db.metadata.tables:
+            names[alias] = table
+    return names
+
+
+def full_scans(connection, statement, parameters, large_tables):
+    """Large tables that statement reads in full, according to EXPLAIN QUERY PLAN."""
+    names = aliases(statement)
+    plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    # ORDER BY servi par l'ordre de la boucle externe : SQLite ne trie pas dans un B-tree temporaire
+    ordered = re.search(r'\bORDER BY\b.*\bLIMIT\b', statement, re.S) is not None \
+        and not any(row[-1].startswith('USE TEMP B-TREE') and 'ORDER BY' in row[-1] for row in plan)
+    outer = next((row for row in plan if row[1] == 0 and re.match(r'(SCAN|SEARCH) ', row[-1])), None)
+    scans = set()
+    for row in plan:
+        match = re.match(r'SCAN (\w+)(?: AS \w+)?(.*)', row[-1])
+        if not match or 'VIRTUAL TABLE' in match.group(2):
+            continue
+        table = names.get(match.group(1))
+        # Parcours d'index dans l'ordre du tri, arrêté par LIMIT : pagination, pas parcours complet
+        if ordered and row is outer and 'INDEX' in match.group(2):
+            continue
+        if table in large_tables:
+            scans.add(table)
+    return scans
+
+
+class TestQueryPlans(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        password = User(first_name="P", last_name="P", email="p@example.com", password="x").password
+        db.session.execute(User.__table__.insert(), [
+            {'first_name': f"User{i}", 'last_name': "Doe", 'email': f"user{i}@example.com",
+             'email_normalized': f"user{i}@example.com", 'password': password, 'is_admin': False}
+            for i in range(ROWS)])
+        user_ids = db.session.execute(text("SELECT id FROM users ORDER BY id")).scalars().all()
+        db.session.execute(Amenity.__table__.insert(), [{'name': f"Amenity {i}"} for i in range(ROWS)])
+        amenity_ids = db.session.execute(text("SELECT id FROM amenities ORDER BY id")).scalars().all()
+        db.session.execute(Place.__table__.insert(), [
+            {'title': f"Place {i}", 'description': "Quiet", 'price': i, 'latitude': (i % 10) / 10,
+             'longitude': (i % 7) / 10, 'owner_id': user_ids[i], 'review_count': 1, 'rating_sum': 4}
+            for i in range(ROWS)])
+        place_ids = db.session.execute(text("SELECT id FROM places ORDER BY id")).scalars().all()
+        db.session.execute(place_amenity_association.insert(), [
+            {'place_id': place_id, 'amenity_id': amenity_ids[(i + offset) % ROWS]}
+            for i, place_id in enumerate(place_ids) for offset in (0, 1)])
+        # Chaque lieu est noté par le propriétaire du lieu suivant, sauf le dernier
+        db.session.execute(Review.__table__.insert(), [
+            {'text': "Good", 'rating': 4, 'place_id': place_id, 'user_id': user_ids[i + 1]}
+            for i, place_id in enumerate(place_ids[:-1])])
+        db.session.execute(text("UPDATE places SET review_count = 0, rating_sum = 0 WHERE id = :id"),
+                           {'id': place_ids[-1]})
+        db.session.commit()
+        self.ids = {'user': user_ids[0], 'other': user_ids[5], 'doomed': user_ids[10], 'place': place_ids[0],
+                    'lonely_place': place_ids[-1], 'amenity': amenity_ids[0],
+                    'review': db.session.execute(text("SELECT max(id) FROM reviews")).scalar()}
+
+    def test_seed_is_above_the_threshold(self):
+        for table in ('users', 'places', 'amenities', 'reviews', 'place_amenity_association'):
+            count = db.session.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+            self.assertGreater(count, LARGE_TABLE_ROWS, table)
+
+    def test_every_facade_method_is_covered(self):
+        public = {name for name in vars(HBnBFacade) if not name.startswith('_')
+                  and callable(getattr(HBnBFacade, name))}
+        covered = {name for name, _, _ in facade_calls(self.ids)} | NO_SQL
+        self.assertEqual(public - covered, set(), "Add the new facade methods to facade_calls()")
+
+    def test_only_index_scans_giving_the_order_are_exempted(self):
+        connection = db.session.connection()
+        self.assertEqual(full_scans(connection, "SELECT places.id FROM places ORDER BY places.price DESC, "
+                                                "places.id DESC LIMIT 5", (), {'places'}), set())
+        # Index couvrant parcouru en entier, LIMIT appliqué au seul résultat
+        self.assertEqual(full_scans(connection, "SELECT count(places.price) FROM places LIMIT 5",
+                                    (), {'places'}), {'places'})
+        self.assertEqual(full_scans(connection, "SELECT places.id, places.price FROM places ORDER BY "
+                                                "places.title LIMIT 5", (), {'places'}), {'places'})
+
+    def test_no_full_table_scan(self):
+        large_tables = {name for name in inspect(db.engine).get_table_names()
+                        if db.session.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+                        > LARGE_TABLE_ROWS}
+        for name, call, allow in facade_calls(self.ids):
+            with self.subTest(method=name):
+                db.session.remove()
+                statements = []
+
+                def capture(conn, cursor, statement, parameters, context, executemany):
+                    if not statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'WITH')):
+                        return
+                    statements.append((statement, parameters[0] if executemany else parameters))
+
+                event.listen(db.engine, 'before_cursor_execute', capture)
+                try:
+                    call()
+                finally:
+                    event.remove(db.engine, 'before_cursor_execute', capture)
+                db.session.rollback()
+                connection = db.session.connection()
+                for statement, parameters in statements:
+                    scans = full_scans(connection, statement, parameters, large_tables) - set(allow)
+                    self.assertEqual(scans, set(), f"{name}: full scan in\n{statement}")
+                db.session.remove()
+
+
+if __name__ == '__main__':
+    unittest.main()
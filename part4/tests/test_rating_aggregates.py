@@ -0,0 +1,131 @@
+import unittest
+from sqlalchemy import select, text
+from app import db
+from app.models import User, Place
+from app.persistence.ratings import find_rating_drift
+from app.persistence.schema import upgrade_schema
+from app.services import facade
+from tests.base import DatabaseTestCase
+
+
+class TestRatingAggregates(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        owner = User(first_name="Owner", last_name="Doe", email="owner@example.com", password="x")
+        self.guests = [User(first_name=f"Guest{i}", last_name="Doe", email=f"guest{i}@example.com",
+                            password="x") for i in range(3)]
+        db.session.add_all([owner, *self.guests])
+        db.session.flush()
+        loft = Place(title="Loft", price=100, latitude=0.0, longitude=0.0, owner=owner)
+        cabin = Place(title="Cabin", price=50, latitude=0.0, longitude=0.0, owner=owner)
+        db.session.add_all([loft, cabin])
+        db.session.commit()
+        self.loft_id, self.cabin_id = loft.id, cabin.id
+        self.guest_ids = [guest.id for guest in self.guests]
+
+    def review(self, guest, place_id, rating):
+        return facade.create_review({'text': "ok", 'rating': rating, 'user_id': self.guest_ids[guest],
+                                     'place_id': place_id})
+
+    def aggregates(self, place_id):
+        row = db.session.execute(text("SELECT review_count, rating_sum FROM places WHERE id = :id"),
+                                 {'id': place_id}).one()
+        return tuple(row)
+
+    def test_review_writes_update_the_place(self):
+        first = self.review(0, self.loft_id, 5)
+        self.review(1, self.loft_id, 2)
+        self.assertEqual(self.aggregates(self.loft_id), (2, 7))
+        self.assertEqual(facade.get_place(self.loft_id).avg_rating, 3.5)
+
+        facade.update_review(first.id, {'rating': 3})
+        self.assertEqual(self.aggregates(self.loft_id), (2, 5))
+        facade.update_review(first.id, {'text': "still ok"})
+        self.assertEqual(self.aggregates(self.loft_id), (2, 5))
+
+        facade.delete_review(first.id)
+        self.assertEqual(self.aggregates(self.loft_id), (1, 2))
+        self.assertEqual(find_rating_drift(db.session.connection()), [])
+
+    def test_aggregates_are_incremented_in_sql(self):
+        with self.count_queries() as statements:
+            self.review(0, self.loft_id, 4)
+        updates = [s for s in statements if s.startswith("UPDATE places")]
+        self.assertEqual(len(updates), 1)
+        self.assertIn("review_count=(places.review_count + ?)", updates[0])
+
+    def test_adjustments_before_a_flush_add_up(self):
+        place = db.session.get(Place, self.loft_id)
+        place.adjust_ratings(1, 4)
+        place.adjust_ratings(1, 2)
+        db.session.commit()
+        self.assertEqual(self.aggregates(self.loft_id), (2, 6))
+
+    def test_list_exposes_and_sorts_on_avg_rating(self):
+        self.review(0, self.loft_id, 3)
+        self.review(0, self.cabin_id, 5)
+        self.review(1, self.cabin_id, 4)
+        with self.count_queries() as statements:
+            places = self.client.get('/places/?sort=-rating').get_json()
+        self.assertEqual([(p['title'], p['avg_rating'], p['review_count']) for p in places],
+                         [("Cabin", 4.5, 2), ("Loft", 3.0, 1)])
+        self.assertFalse(any("reviews" in statement for statement in statements))
+        detail = self.client.get(f'/places/{self.cabin_id}').get_json()
+        self.assertEqual((detail['avg_rating'], detail['review_count']), (4.5, 2))
+
+    def test_rating_sort_reads_the_expression_index(self):
+        query = select(Place.id).order_by(Place.avg_rating.desc(), Place.id).limit(20)
+        sql = str(query.compile(db.engine, compile_kwargs={'literal_binds': True}))
+        plan = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+        self.assertIn("USING INDEX ix_places_avg_rating_id", " ".join(row[-1] for row in plan))
+
+    def test_check_command_finds_and_fixes_drift(self):
+        self.review(0, self.loft_id, 5)
+        db.session.remove()
+        with db.engine.begin() as connection:
+            connection.execute(text("UPDATE places SET review_count = 0, rating_sum = 0"))
+        runner = self.app.test_cli_runner()
+        result = runner.invoke(args=['ratings', 'check'])
+        self.assertIn(f"Place {self.loft_id}: 0 reviews / sum 0 stored, 1 / 5 actual", result.output)
+        self.assertIn("1 places out of sync", result.output)
+        result = runner.invoke(args=['ratings', 'check', '--fix'])
+        self.assertIn("1 places out of sync, fixed", result.output)
+        self.assertEqual(self.aggregates(self.loft_id), (1, 5))
+
+    def test_upgrade_backfills_existing_places(self):
+        self.review(0, self.loft_id, 5)
+        self.review(1, self.loft_id, 1)
+        db.session.remove()
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_places_avg_rating_id"))
+            connection.execute(text("ALTER TABLE places DROP COLUMN review_count"))
+            connection.execute(text("ALTER TABLE places DROP COLUMN rating_sum"))
+        upgrade_schema(db.engine)
+        upgrade_schema(db.engine)  # idempotent
+        self.assertEqual(self.aggregates(self.loft_id), (2, 6))
+        self.assertEqual(self.aggregates(self.cabin_id), (0, 0))
+        index = db.session.execute(text(
+            "SELECT name FROM sqlite_master WHERE name = 'ix_places_avg_rating_id'")).scalar()
+        self.assertIsNotNone(index)
+
+    def test_upgrade_stopped_midway_still_backfills(self):
+        self.review(0, self.loft_id, 5)
+        db.session.remove()
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_places_avg_rating_id"))
+            connection.execute(text("ALTER TABLE places DROP COLUMN review_count"))
+            connection.execute(text("ALTER TABLE places DROP COLUMN rating_sum"))
+            connection.execute(text("DROP INDEX ix_reviews_user_id_place_id"))
+            connection.execute(text("INSERT INTO reviews (id, text, rating, user_id, place_id) "
+                                    "SELECT id + 100, text, rating, user_id, place_id FROM reviews"))
+        with self.assertRaisesRegex(RuntimeError, "reviewed several times"):
+            upgrade_schema(db.engine)
+        with db.engine.begin() as connection:
+            connection.execute(text("DELETE FROM reviews WHERE id > 100"))
+        upgrade_schema(db.engine)
+        self.assertEqual(self.aggregates(self.loft_id), (1, 5))
+        self.assertEqual(find_rating_drift(db.session.connection()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
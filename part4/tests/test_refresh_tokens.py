@@ -0,0 +1,88 @@
+import unittest
+import uuid
+from unittest import mock
+from flask_jwt_extended import decode_token
+from app.extensions import password_hasher, token_store
+from app.revocation import TokenRevocationStore
+from tests.base import DatabaseTestCase
+
+
+class TestTokenRevocationStore(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000
+        self.store = TokenRevocationStore(clock=lambda: self.now, prune_interval=0)
+
+    def test_revoke_until_expiry(self):
+        jti = str(uuid.uuid4())
+        self.assertTrue(self.store.revoke(jti, 1100))
+        self.assertFalse(self.store.revoke(jti, 1100))
+        self.assertTrue(self.store.is_revoked({'jti': jti, 'type': 'access', 'exp': 1100}))
+        self.assertFalse(self.store.is_revoked({'jti': str(uuid.uuid4()), 'type': 'access', 'exp': 1100}))
+        self.now = 1100
+        self.assertFalse(self.store.is_revoked({'jti': jti, 'type': 'access', 'exp': 1100}))
+        self.store.maintain()
+        self.assertEqual(len(self.store), 0)
+
+    def test_reused_refresh_token_revokes_family(self):
+        family = str(uuid.uuid4())
+        used = {'jti': str(uuid.uuid4()), 'fam': family, 'type': 'refresh', 'exp': 2000}
+        sibling = {'jti': str(uuid.uuid4()), 'fam': family, 'type': 'access', 'exp': 1500}
+        self.store.revoke(used['jti'], used['exp'])
+        self.assertFalse(self.store.is_revoked(sibling))
+        self.assertTrue(self.store.is_revoked(used))
+        self.assertTrue(self.store.is_revoked(sibling))
+
+
+class TestRefreshEndpoint(DatabaseTestCase):
+    def login(self):
+        response = self.client.post('/api/auth/login',
+                                    json={'email': "admin@hbnb.com", 'password': "admin123"})
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def refresh(self, refresh_token):
+        return self.client.post('/api/auth/refresh',
+                                headers={'Authorization': f'Bearer {refresh_token}'})
+
+    def test_refresh_rotates_without_bcrypt(self):
+        tokens = self.login()
+        with mock.patch.object(password_hasher, 'verify') as verify, \
+                mock.patch.object(password_hasher, 'hash') as hash_:
+            response = self.refresh(tokens['refresh_token'])
+        self.assertEqual(response.status_code, 200)
+        verify.assert_not_called()
+        hash_.assert_not_called()
+        new_tokens = response.get_json()
+        self.assertNotEqual(new_tokens['refresh_token'], tokens['refresh_token'])
+        response = self.client.put('/users/1', json={'first_name': "Root"},
+                                   headers={'Authorization': f"Bearer {new_tokens['access_token']}"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_used_refresh_token_is_rejected_and_kills_the_session(self):
+        tokens = self.login()
+        new_tokens = self.refresh(tokens['refresh_token']).get_json()
+        self.assertEqual(self.refresh(tokens['refresh_token']).status_code, 401)
+        self.assertEqual(self.refresh(new_tokens['refresh_token']).status_code, 401)
+
+    def test_concurrent_refreshes_of_the_same_token(self):
+        tokens = self.login()
+        new_tokens = self.refresh(tokens['refresh_token']).get_json()
+        # Second appel passé au blocklist avant que le premier ait révoqué le token
+        with mock.patch.object(token_store, 'is_revoked', return_value=False):
+            self.assertEqual(self.refresh(tokens['refresh_token']).status_code, 401)
+        self.assertEqual(self.refresh(new_tokens['refresh_token']).status_code, 401)
+
+    def test_access_token_cannot_refresh(self):
+        tokens = self.login()
+        self.assertNotEqual(self.refresh(tokens['access_token']).status_code, 200)
+
+    def test_refresh_never_outlives_the_session(self):
+        self.app.config['JWT_SESSION_MAX_AGE'] = self.app.config['JWT_REFRESH_TOKEN_EXPIRES'] / 2
+        tokens = self.login()
+        claims = decode_token(tokens['refresh_token'])
+        self.assertLessEqual(claims['exp'] - claims['auth_time'],
+                             self.app.config['JWT_SESSION_MAX_AGE'].total_seconds())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from unittest import mock
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import User, Place, Review
+from app.persistence.schema import upgrade_schema
+from app.services import facade
+from tests.base import DatabaseTestCase
+
+
+class TestReviewLookups(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        owner = User(first_name="Owner", last_name="Doe", email="owner@example.com", password="x")
+        guests = [User(first_name=f"Guest{i}", last_name="Doe", email=f"guest{i}@example.com",
+                       password="x") for i in range(5)]
+        db.session.add_all([owner, *guests])
+        db.session.flush()
+        loft = Place(title="Loft", price=100, latitude=0.0, longitude=0.0, owner=owner)
+        cabin = Place(title="Cabin", price=50, latitude=0.0, longitude=0.0, owner=owner)
+        db.session.add_all([loft, cabin])
+        db.session.flush()
+        for guest in guests:
+            db.session.add(Review(text=f"Loft by {guest.first_name}", rating=4, place=loft, user=guest))
+        db.session.add(Review(text="Cabin", rating=2, place=cabin, user=guests[0]))
+        db.session.commit()
+        self.loft_id, self.cabin_id = loft.id, cabin.id
+        self.guest_ids = [guest.id for guest in guests]
+        self.owner_id = owner.id
+
+    def test_reviews_of_one_place_by_pages(self):
+        reviews, next_cursor, total = facade.get_reviews_by_place(self.loft_id, limit=2, with_total=True)
+        texts = [review.text for review in reviews]
+        self.assertEqual(total, 5)
+        while next_cursor:
+            reviews, next_cursor, _ = facade.get_reviews_by_place(self.loft_id, cursor=next_cursor, limit=2)
+            texts += [review.text for review in reviews]
+        self.assertEqual(texts, [f"Loft by Guest{i}" for i in range(5)])
+        reviews, next_cursor, _ = facade.get_reviews_by_place(self.cabin_id)
+        self.assertEqual(([review.text for review in reviews], next_cursor), (["Cabin"], None))
+        with self.assertRaisesRegex(ValueError, "Place not found"):
+            facade.get_reviews_by_place(999)
+
+    def test_already_reviewed_is_one_exists_query(self):
+        with self.count_queries() as statements:
+            self.assertTrue(facade.has_already_reviewed(self.guest_ids[0], self.cabin_id))
+            self.assertFalse(facade.has_already_reviewed(self.guest_ids[1], self.cabin_id))
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(all("EXISTS" in statement for statement in statements))
+
+    def test_second_review_of_the_same_place_is_rejected(self):
+        data = {'text': "Again", 'rating': 1, 'user_id': self.guest_ids[0], 'place_id': self.cabin_id}
+        with self.assertRaisesRegex(ValueError, "already reviewed"):
+            facade.create_review(data)
+        # Rien n'est resté de la tentative : ni review ni agrégats du lieu
+        reviews, _, _ = facade.get_reviews_by_place(self.cabin_id)
+        self.assertEqual(len(reviews), 1)
+        self.assertEqual(db.session.get(Place, self.cabin_id).review_count, 0)
+
+    def test_other_constraint_errors_are_not_duplicates(self):
+        data = {'text': "First", 'rating': 4, 'user_id': self.guest_ids[1], 'place_id': self.cabin_id}
+        error = IntegrityError("INSERT INTO reviews", {}, Exception("FOREIGN KEY constraint failed"))
+        with mock.patch.object(facade.review_repo, 'add', side_effect=error):
+            with self.assertRaisesRegex(ValueError, "concurrent change"):
+                facade.create_review(data)
+        self.assertFalse(facade.has_already_reviewed(self.guest_ids[1], self.cabin_id))
+
+    def test_place_reviews_endpoint(self):
+        url = f'/reviews/places/{self.loft_id}/reviews'
+        self.assertEqual(len(self.client.get(url).get_json()), 5)
+        page = self.client.get(f'{url}?limit=3&include_total=true').get_json()
+        self.assertEqual((len(page['items']), page['total']), (3, 5))
+        page = self.client.get(f"{url}?cursor={page['next_cursor']}").get_json()
+        self.assertEqual((len(page['items']), page['next_cursor']), (2, None))
+        self.assertEqual(self.client.get('/reviews/places/999/reviews').status_code, 404)
+        self.assertEqual(self.client.get(f'{url}?cursor=bad').status_code, 400)
+
+    def test_duplicates_stop_the_upgrade(self):
+        db.session.remove()
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_reviews_user_id_place_id"))
+            connection.execute(text(
+                "INSERT INTO reviews (text, rating, place_id, user_id) VALUES ('Again', 1, :place, :user)"),
+                {'place': self.cabin_id, 'user': self.guest_ids[0]})
+        with self.assertRaisesRegex(RuntimeError, f"user {self.guest_ids[0]} / place {self.cabin_id}"):
+            upgrade_schema(db.engine)
+        with db.engine.begin() as connection:
+            connection.execute(text("DELETE FROM reviews WHERE text = 'Again'"))
+        upgrade_schema(db.engine)
+        index = db.session.execute(text(
+            "SELECT name FROM sqlite_master WHERE name = 'ix_reviews_user_id_place_id'")).scalar()
+        self.assertIsNotNone(index)
+
+
+if __name__ == '__main__':
+    unittest.main()
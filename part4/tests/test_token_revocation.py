@@ -0,0 +1,138 @@
+import unittest
+import uuid
+from unittest import mock
+from sqlalchemy import text
+from app import db
+from app.models import Amenity, RevokedToken
+from app.revocation import BloomFilter, SQLAlchemyRevocationBackend, TokenRevocationStore
+from app.extensions import token_store
+from app.persistence.repository import unit_of_work
+from app.persistence.schema import upgrade_schema
+from tests.base import DatabaseTestCase
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter(10_000, error_rate=0.01)
+        keys = [uuid.uuid4().bytes for _ in range(10_000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(uuid.uuid4().bytes in bloom for _ in range(10_000))
+        self.assertLess(false_positives, 300)
+
+
+class TestDatabaseRevocation(DatabaseTestCase):
+    def make_store(self, **kwargs):
+        self.now = 1000
+        return TokenRevocationStore(SQLAlchemyRevocationBackend(), capacity=1000,
+                                    clock=lambda: self.now, **kwargs)
+
+    def test_negative_checks_do_not_query_the_table(self):
+        store = self.make_store()
+        store.revoke('revoked', 2000)
+        store.is_revoked({'jti': 'warm-up'})
+        with self.count_queries() as statements:
+            for i in range(50):
+                self.assertFalse(store.is_revoked({'jti': f'other-{i}'}))
+            self.assertTrue(store.is_revoked({'jti': 'revoked'}))
+        self.assertEqual(len(statements), 1)
+
+    def test_other_workers_see_revocations_after_sync(self):
+        worker_a, worker_b = self.make_store(sync_interval=5), self.make_store(sync_interval=5)
+        self.assertFalse(worker_b.is_revoked({'jti': 'stolen'}))
+        worker_a.revoke('stolen', 2000)
+        self.assertFalse(worker_b.is_revoked({'jti': 'stolen'}))
+        self.now += 5
+        self.assertTrue(worker_b.is_revoked({'jti': 'stolen'}))
+
+    def test_expired_rows_are_pruned(self):
+        store = self.make_store(prune_interval=60)
+        store.revoke('short', 1010)
+        store.revoke('long', 5000)
+        self.now = 1100
+        with self.count_queries() as statements:
+            self.assertFalse(store.is_revoked({'jti': 'short'}))
+        # La purge n'est jamais faite par une requête
+        self.assertFalse([s for s in statements if s.startswith(("DELETE", "COMMIT"))])
+        store.maintain()
+        self.assertEqual([row.key for row in RevokedToken.query.all()], ['long'])
+        self.assertTrue(store.is_revoked({'jti': 'long'}))
+
+    def test_prune_does_not_commit_the_request_session(self):
+        store = self.make_store()
+        store.revoke('expired', 900)
+        db.session.add(RevokedToken(kind='jti', key='pending', expires_at=5000))
+        self.assertEqual(store.prune(), 1)
+        db.session.rollback()
+        self.assertEqual(RevokedToken.query.count(), 0)
+
+    def test_revocation_added_after_a_prune_is_synced(self):
+        worker_a = self.make_store(prune_interval=60)
+        worker_b = self.make_store(sync_interval=5)
+        worker_a.revoke('first', 1010)
+        worker_a.revoke('second', 1010)
+        self.assertFalse(worker_b.is_revoked({'jti': 'other'}))  # curseur : id de 'second'
+        self.now = 1100
+        worker_a.maintain()  # purge 'first' et 'second'
+        worker_a.revoke_family('session', 5000)
+        self.assertEqual(RevokedToken.query.count(), 1)
+        self.now += 5
+        self.assertTrue(worker_b.is_revoked({'jti': 'other', 'fam': 'session'}))
+
+    def test_concurrent_revocation_keeps_the_unit_of_work(self):
+        backend = SQLAlchemyRevocationBackend()
+        self.assertTrue(backend.add('jti', 'raced', 1500))
+        with unit_of_work():
+            db.session.add(Amenity(name="Sauna"))
+            # Un autre worker a inséré la ligne entre la lecture et l'insertion
+            with mock.patch.object(RevokedToken, 'query') as query:
+                query.filter_by.return_value.first.return_value = None
+                self.assertFalse(backend.add('jti', 'raced', 2000))
+        self.assertEqual(Amenity.query.filter_by(name="Sauna").count(), 1)
+        self.assertEqual(backend.expiry('jti', 'raced'), 2000)
+
+    def test_upgrade_adds_autoincrement(self):
+        store = self.make_store()
+        store.revoke('kept', 5000)
+        db.session.remove()
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql("ALTER TABLE revoked_tokens RENAME TO legacy")
+            connection.exec_driver_sql("DROP INDEX ux_revoked_tokens_kind_key")
+            connection.exec_driver_sql(
+                "CREATE TABLE revoked_tokens (id INTEGER NOT NULL PRIMARY KEY, kind VARCHAR(3) NOT NULL, "
+                "key VARCHAR(64) NOT NULL, expires_at INTEGER NOT NULL)")
+            connection.exec_driver_sql("INSERT INTO revoked_tokens SELECT * FROM legacy")
+            connection.exec_driver_sql("DROP TABLE legacy")
+        upgrade_schema(db.engine)
+        sql = db.session.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'revoked_tokens'")).scalar()
+        self.assertIn("AUTOINCREMENT", sql)
+        self.assertEqual([row.key for row in RevokedToken.query.all()], ['kept'])
+        names = set(db.session.execute(text("SELECT name FROM sqlite_master")).scalars())
+        self.assertIn('ux_revoked_tokens_kind_key', names)
+
+
+class TestLogout(DatabaseTestCase):
+    def login(self):
+        return self.client.post('/api/auth/login',
+                                json={'email': "admin@hbnb.com", 'password': "admin123"}).get_json()
+
+    def test_logout_revokes_the_whole_session(self):
+        tokens, other_session = self.login(), self.login()
+        headers = {'Authorization': f"Bearer {tokens['access_token']}"}
+        self.assertEqual(self.client.post('/api/auth/logout', headers=headers).status_code, 200)
+        self.assertEqual(self.client.put('/users/1', json={'first_name': "Root"},
+                                         headers=headers).status_code, 401)
+        refresh = self.client.post('/api/auth/refresh',
+                                   headers={'Authorization': f"Bearer {tokens['refresh_token']}"})
+        self.assertEqual(refresh.status_code, 401)
+        response = self.client.put('/users/1', json={'first_name': "Root"},
+                                   headers={'Authorization': f"Bearer {other_session['access_token']}"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(RevokedToken.query.count(), 2)
+        self.assertGreaterEqual(token_store.stats()['positives'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
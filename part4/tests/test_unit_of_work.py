@@ -0,0 +1,88 @@
+import unittest
+from sqlalchemy import event
+from app import db
+from app.models import User, Place, Amenity
+from app.persistence.repository import unit_of_work
+from app.services import facade
+from tests.base import DatabaseTestCase
+
+
+class TestUnitOfWork(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User(first_name="Owner", last_name="Doe", email="owner@example.com",
+                          password="secret")
+        db.session.add(self.owner)
+        db.session.commit()
+        self.commits = []
+        self.listener = lambda conn: self.commits.append(1)
+        event.listen(db.engine, 'commit', self.listener)
+
+    def tearDown(self):
+        event.remove(db.engine, 'commit', self.listener)
+        super().tearDown()
+
+    def test_create_place_commits_once(self):
+        with unit_of_work():
+            amenity = Amenity(name="Wifi")
+            facade.amenity_repo.add(amenity)
+        self.commits.clear()
+        facade.create_place({'title': "Loft", 'description': "", 'price': 10, 'latitude': 1.0,
+                             'longitude': 1.0, 'owner_id': self.owner.id,
+                             'amenities': [amenity.id]})
+        self.assertEqual(len(self.commits), 1)
+
+    def test_update_place_is_persisted_in_one_commit(self):
+        place = facade.create_place({'title': "Loft", 'description': "", 'price': 10,
+                                     'latitude': 1.0, 'longitude': 1.0,
+                                     'owner_id': self.owner.id})
+        self.commits.clear()
+        facade.update_place(place.id, {'title': "Flat", 'price': 20})
+        self.assertEqual(len(self.commits), 1)
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Place, place.id).title, "Flat")
+
+    def test_failed_update_rolls_back(self):
+        place = facade.create_place({'title': "Loft", 'description': "", 'price': 10,
+                                     'latitude': 1.0, 'longitude': 1.0,
+                                     'owner_id': self.owner.id})
+        self.commits.clear()
+        with self.assertRaises(ValueError):
+            facade.update_place(place.id, {'title': "Flat", 'owner_id': 999})
+        self.assertEqual(self.commits, [])
+        self.assertEqual(db.session.get(Place, place.id).title, "Loft")
+
+    def test_nested_units_commit_once(self):
+        with unit_of_work():
+            facade.amenity_repo.add(Amenity(name="Wifi"))
+            with unit_of_work():
+                facade.amenity_repo.add(Amenity(name="Pool"))
+            self.assertEqual(self.commits, [])
+        self.assertEqual(len(self.commits), 1)
+        self.assertEqual(Amenity.query.count(), 2)
+
+    def test_error_rolls_back_whole_unit(self):
+        with self.assertRaises(RuntimeError):
+            with unit_of_work():
+                facade.amenity_repo.add(Amenity(name="Wifi"))
+                raise RuntimeError("boom")
+        self.assertEqual(Amenity.query.count(), 0)
+
+    def test_create_conflict_keeps_the_rest_of_the_unit(self):
+        with unit_of_work():
+            facade.amenity_repo.add(Amenity(name="Wifi"))
+            with self.assertRaises(ValueError):
+                facade.user_repo.create("Copy", "Doe", "owner@example.com", "secret")
+            facade.place_repo.create("Loft", "", 10, 1.0, 1.0, owner_id=self.owner.id)
+        self.assertEqual(len(self.commits), 1)
+        self.assertEqual(Amenity.query.count(), 1)
+        self.assertEqual(Place.query.count(), 1)
+        self.assertEqual(User.query.filter_by(first_name="Copy").count(), 0)
+
+    def test_repository_commits_outside_unit(self):
+        facade.amenity_repo.add(Amenity(name="Wifi"))
+        self.assertEqual(len(self.commits), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()